@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Compare DB size and query latency: flat ``instances`` vs path dictionary (--path-dict).
+
+Indexes the synthetic corpora (or takes existing .hch.db files), plus a generated
+fan-out tree (--fanout CLUSTERS,CORES,LANES; default 60,50,100 = 303k instances),
+converts a copy of each DB with ``convert_to_path_dict`` and times the same queries
+on both after ``VACUUM``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+CORPORA = [
+    ROOT / "design" / "synthetic_deep_rtl" / "quick.hc.f",
+    ROOT / "design" / "multihost_peri_soc" / "orion_soc.f",
+]
+REPORT = ROOT / "logs/path_dict_bench_report.json"
+
+
+def build_corpus(filelist: Path, db: Path) -> Path:
+    from hch.index.loader import build_index_from_filelist
+
+    build_index_from_filelist(str(filelist), str(db), force=True).close()
+    return db
+
+
+def build_fanout(db: Path, clusters: int, cores: int, lanes: int) -> Path:
+    from hch.index.store import HierarchyStore
+    from hch.schema import FlatInstance, ModuleRecord
+
+    store = HierarchyStore(str(db))
+    store.load_modules(
+        [ModuleRecord(module_name=m, file_path=f"/rtl/{m}.v") for m in ("top", "cl", "core", "lane")]
+    )
+
+    def rows():
+        yield FlatInstance(full_path="top", name="top", module="top", file="/rtl/top.v")
+        for a in range(clusters):
+            pa = f"top.u_cl{a}"
+            yield FlatInstance(
+                full_path=pa, name=f"u_cl{a}", module="cl", file="/rtl/cl.v",
+                depth=1, parent_path="top",
+            )
+            for b in range(cores):
+                pb = f"{pa}.u_core{b}"
+                yield FlatInstance(
+                    full_path=pb, name=f"u_core{b}", module="core", file="/rtl/core.v",
+                    depth=2, parent_path=pa, ports=["clk", "rst", "d", "q"],
+                )
+                for k in range(lanes):
+                    yield FlatInstance(
+                        full_path=f"{pb}.u_lane{k}", name=f"u_lane{k}", module="lane",
+                        file="/rtl/lane.v", depth=3, parent_path=pb, ports=["clk", "d"],
+                    )
+
+    store.load_instances(rows())
+    store.close()
+    return db
+
+
+def _median_ms(fn: Callable[[], object], repeat: int) -> float:
+    fn()
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return round(statistics.median(times) * 1000, 2)
+
+
+def _probes(conn: sqlite3.Connection) -> Dict[str, Callable[[], object]]:
+    from hch.apps.hierarchy_view import format_subtree_text
+    from hch.query.dql.paging import iter_dql_rows
+    from hch.query.dql.planner import plan_dql
+
+    paths = [r[0] for r in conn.execute("SELECT full_path FROM instances ORDER BY id")]
+    root = paths[0]
+    mid = paths[len(paths) // 2]
+    parent = conn.execute(
+        "SELECT parent_path FROM instances WHERE full_path = ?", (mid,)
+    ).fetchone()[0] or root
+    leaf = mid.rsplit(".", 1)[-1]
+    probes: Dict[str, Callable[[], object]] = {}
+    for label, query in (
+        ("dql path =", f'path = "{mid}"'),
+        ("dql inst =", f'inst = "{leaf}"'),
+        ("dql parent =", f'parent = "{parent}"'),
+        ("dql path ^=", f'path ^= "{parent}."'),
+        ("dql path ~ *x*", f'path ~ "*{leaf[-3:]}*"'),
+        ("dql all", 'path ~ "*"'),
+    ):
+        plan = plan_dql(query)
+        probes[f"{label} (all rows)"] = (
+            lambda p=plan: conn.execute(p.sql, p.params).fetchall()
+        )
+        probes[f"{label} (first page)"] = (
+            lambda p=plan: list(islice(iter_dql_rows(conn, p), 2000))
+        )
+    probes["children of root"] = lambda: conn.execute(
+        "SELECT full_path FROM instances WHERE parent_path = ? ORDER BY full_path", (root,)
+    ).fetchall()
+    probes["subtree text"] = lambda: format_subtree_text(conn, parent)
+    probes["count(*)"] = lambda: conn.execute("SELECT COUNT(*) FROM instances").fetchone()
+    return probes
+
+
+def compare(name: str, src: Path, work: Path, repeat: int) -> dict:
+    from hch.index.path_dict import convert_to_path_dict
+
+    flat = work / f"{name}.flat.db"
+    pdict = work / f"{name}.pdict.db"
+    shutil.copy(src, flat)
+    shutil.copy(src, pdict)
+    conn = sqlite3.connect(str(pdict))
+    t0 = time.perf_counter()
+    convert_to_path_dict(conn)
+    convert_s = round(time.perf_counter() - t0, 3)
+    conn.close()
+    out: dict = {"corpus": name, "convert_s": convert_s}
+    for kind, db in (("flat", flat), ("path_dict", pdict)):
+        conn = sqlite3.connect(str(db))
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.execute("VACUUM")
+        out[f"{kind}_instances"] = conn.execute("SELECT COUNT(*) FROM instances").fetchone()[0]
+        out[f"{kind}_bytes"] = db.stat().st_size
+        out[f"{kind}_ms"] = {k: _median_ms(f, repeat) for k, f in _probes(conn).items()}
+        conn.close()
+    out["size_ratio"] = round(out["path_dict_bytes"] / out["flat_bytes"], 3)
+    return out
+
+
+def _print(res: dict) -> None:
+    print(
+        f"\n== {res['corpus']}: {res['flat_instances']} instances, "
+        f"{res['flat_bytes'] / 1e6:.2f} MB -> {res['path_dict_bytes'] / 1e6:.2f} MB "
+        f"(x{res['size_ratio']}), convert {res['convert_s']}s"
+    )
+    for key, flat_ms in res["flat_ms"].items():
+        pd_ms = res["path_dict_ms"][key]
+        ratio = f"x{pd_ms / flat_ms:.2f}" if flat_ms else "-"
+        print(f"  {key:32s} {flat_ms:9.2f} ms {pd_ms:9.2f} ms  {ratio}")
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("dbs", nargs="*", help="Existing .hch.db files to compare (copied)")
+    ap.add_argument("--fanout", default="60,50,100", help="CLUSTERS,CORES,LANES ('' to skip)")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--report", default=str(REPORT))
+    args = ap.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="hch_pdict_") as tmp:
+        work = Path(tmp)
+        sources = [(Path(d).stem, Path(d)) for d in args.dbs]
+        if not args.dbs:
+            for fl in CORPORA:
+                if fl.is_file():
+                    sources.append((fl.parent.name, build_corpus(fl, work / f"{fl.stem}.src.db")))
+        if args.fanout:
+            a, b, c = (int(x) for x in args.fanout.split(","))
+            sources.append(
+                (f"fanout_{a}x{b}x{c}", build_fanout(work / "fanout.src.db", a, b, c))
+            )
+        for name, src in sources:
+            res = compare(name, src, work, args.repeat)
+            _print(res)
+            results.append(res)
+    report = Path(args.report)
+    report.parent.mkdir(parents=True, exist_ok=True)
+    report.write_text(json.dumps(results, indent=2))
+    print(f"\nreport: {report}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,560 @@
+"""asyncio hch-web server (``hch-web --async``) for many concurrent browsers on one DB.
+
+Same routes and payloads as :mod:`hch.apps.api.http_server`, plus:
+
+- a pool of read-only SQLite connections (``HCH_WEB_POOL``, default min(8, CPUs)),
+  handed out per request; queries run in a thread pool of the same size;
+- an LRU cache of encoded responses for ``/api/meta``, ``/api/help``,
+  ``/api/tree/children``, ``/api/subtree``, ``/api/instance`` and static files, keyed by
+  (endpoint, params, DB/WAL mtime and size) so deepen / re-index invalidate it
+  (``HCH_WEB_CACHE_ENTRIES``, default 256; 0 disables);
+- ``ETag`` / ``If-None-Match`` → 304 on cached endpoints;
+- gzip for bodies of 8 KiB or more when the client accepts it.
+
+``/api/query/text`` still streams chunked; the stream holds one pooled connection.
+JSON is encoded with ``orjson`` when installed (``pip install -e ".[fast]"``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+from urllib.parse import parse_qs, urlparse
+
+from hch.apps.api.db_service import HierarchyDbService
+from hch.apps.api.http_server import (
+    _STREAM_CHUNK_BYTES,
+    _WEB_DIR,
+    api_get_json,
+    api_post_json,
+    query_text_args,
+    query_text_content_type,
+    static_content_type,
+    static_target,
+)
+
+try:
+    import orjson
+except ImportError:  # optional: hch[fast]
+    orjson = None
+
+T = TypeVar("T")
+
+_CACHEABLE = frozenset(
+    {"/api/meta", "/api/help", "/api/tree/children", "/api/subtree", "/api/instance"}
+)
+_JSON_TYPE = "application/json; charset=utf-8"
+_GZIP_MIN_BYTES = 8 * 1024
+_KEEPALIVE_S = 75.0
+_MAX_HEADER_BYTES = 64 * 1024
+_CORS = ("Access-Control-Allow-Origin", "*")
+
+
+def web_pool_size() -> int:
+    raw = os.environ.get("HCH_WEB_POOL", "").strip()
+    if raw:
+        return max(1, int(raw))
+    return min(8, os.cpu_count() or 4)
+
+
+def web_cache_entries() -> int:
+    raw = os.environ.get("HCH_WEB_CACHE_ENTRIES", "").strip()
+    return max(0, int(raw)) if raw else 256
+
+
+def db_stamp(db_path: Path) -> Tuple[Optional[Tuple[int, int]], ...]:
+    """(mtime_ns, size) of the DB and its WAL: changes on every committed write.
+
+    An empty WAL counts as no WAL (the first reader to open the DB creates one).
+    """
+    out: List[Optional[Tuple[int, int]]] = []
+    for p in (db_path, Path(f"{db_path}-wal")):
+        try:
+            st = p.stat()
+        except OSError:
+            out.append(None)
+            continue
+        out.append((st.st_mtime_ns, st.st_size) if st.st_size or p == db_path else None)
+    return tuple(out)
+
+
+def _dumps(payload: object) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload)
+        except TypeError:  # e.g. int keys / big ints: fall back to json
+            pass
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+@dataclass
+class _Body:
+    """Encoded response; ``gz`` is filled in on the first gzip-accepting request."""
+
+    status: int
+    body: bytes
+    content_type: str = _JSON_TYPE
+    etag: str = ""
+    gz: Optional[bytes] = None
+
+
+def _json_body(status: int, payload: object, *, etag: bool = False) -> _Body:
+    body = _dumps(payload)
+    tag = f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"' if etag else ""
+    return _Body(status, body, etag=tag)
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header or not etag:
+        return False
+    tags = [t.strip() for t in header.split(",")]
+    return "*" in tags or etag in (t[2:] if t.startswith("W/") else t for t in tags)
+
+
+def _accepts_gzip(header: Optional[str]) -> bool:
+    for part in (header or "").split(","):
+        token, _, params = part.partition(";")
+        if token.strip().lower() not in ("gzip", "*"):
+            continue
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+def _next_block(chunks: Iterator[str]) -> bytes:
+    """Up to ~64 KiB of the next stream chunks (``b""`` once exhausted)."""
+    buf: List[bytes] = []
+    size = 0
+    for chunk in chunks:
+        raw = chunk.encode("utf-8")
+        buf.append(raw)
+        size += len(raw)
+        if size >= _STREAM_CHUNK_BYTES:
+            break
+    return b"".join(buf)
+
+
+class ResponseCache:
+    """LRU of encoded responses; only touched from the event loop thread."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[tuple, _Body]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: tuple) -> Optional[_Body]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._data.move_to_end(key)
+        return entry
+
+    def put(self, key: tuple, entry: _Body) -> None:
+        self._data[key] = entry
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+
+class ServicePool:
+    """Read-only :class:`HierarchyDbService` instances, opened lazily up to *size*."""
+
+    def __init__(self, db_path: str, size: int):
+        self.db_path = db_path
+        self._idle: asyncio.Queue = asyncio.Queue()
+        for _ in range(size):
+            self._idle.put_nowait(None)
+        self._open: List[HierarchyDbService] = []
+
+    async def acquire(self, run: Callable[..., "asyncio.Future[Any]"]) -> HierarchyDbService:
+        svc = await self._idle.get()
+        if svc is None:
+            try:
+                svc = await run(lambda: HierarchyDbService(self.db_path, read_only=True))
+            except BaseException:
+                self._idle.put_nowait(None)
+                raise
+            self._open.append(svc)
+        return svc
+
+    def release(self, svc: HierarchyDbService) -> None:
+        self._idle.put_nowait(svc)
+
+    def close(self) -> None:
+        for svc in self._open:
+            svc.close()
+        self._open.clear()
+
+
+@dataclass
+class _Request:
+    method: str
+    target: str
+    version: str
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def keep_alive(self) -> bool:
+        conn = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.1":
+            return "close" not in conn
+        return "keep-alive" in conn
+
+
+def _parse_head(head: bytes) -> Optional[_Request]:
+    lines = head.decode("latin-1").split("\r\n")
+    parts = lines[0].split(" ")
+    if len(parts) != 3 or not parts[2].startswith("HTTP/"):
+        return None
+    req = _Request(method=parts[0].upper(), target=parts[1], version=parts[2])
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, sep, value = line.partition(":")
+        if not sep:
+            return None
+        req.headers[name.strip().lower()] = value.strip()
+    return req
+
+
+class AsyncHierarchyServer:
+    """asyncio HTTP/1.1 server over one ``.hch.db`` (see module docstring)."""
+
+    def __init__(
+        self,
+        db_path: str,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        *,
+        web_dir: Optional[Path] = None,
+        pool_size: Optional[int] = None,
+        cache_entries: Optional[int] = None,
+    ):
+        self.db_path = str(db_path)
+        self._db_file = Path(db_path).resolve()
+        self.host = host
+        self.port = port
+        self.web_root = (web_dir or _WEB_DIR).resolve()
+        self.pool_size = pool_size or web_pool_size()
+        n = web_cache_entries() if cache_entries is None else cache_entries
+        self.cache: Optional[ResponseCache] = ResponseCache(n) if n > 0 else None
+        self.server_address: Tuple[str, int] = (host, port)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pool: Optional[ServicePool] = None
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+        self._connections: Dict["asyncio.Task[None]", asyncio.StreamWriter] = {}
+
+    async def start(self) -> None:
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.pool_size, thread_name_prefix="hch-web"
+        )
+        self._pool = ServicePool(self.db_path, self.pool_size)
+        self._server = await asyncio.start_server(
+            self._serve_connection, self.host, self.port, limit=_MAX_HEADER_BYTES
+        )
+        self.server_address = self._server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self) -> None:
+        assert self._server is not None
+        await self._server.serve_forever()
+
+    async def aclose(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._connections.values()):  # idle keep-alive clients
+                writer.close()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            with suppress(Exception):
+                await self._server.wait_closed()
+        if self._pool is not None:
+            self._pool.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    # -- plumbing -------------------------------------------------------------
+
+    def _run(self, fn: Callable[..., T], *args: Any) -> "asyncio.Future[T]":
+        return asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def _with_svc(self, fn: Callable[[HierarchyDbService], T]) -> T:
+        assert self._pool is not None
+        svc = await self._pool.acquire(self._run)
+        try:
+            return await self._run(fn, svc)
+        finally:
+            self._pool.release(svc)
+
+    async def _write(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        headers: List[Tuple[str, str]],
+        body: bytes,
+        keep_alive: bool,
+    ) -> None:
+        lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+        lines += [f"{k}: {v}" for k, v in headers]
+        if status not in (204, 304):
+            lines.append(f"Content-Length: {len(body)}")
+        if not keep_alive:
+            lines.append("Connection: close")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def _send(
+        self,
+        req: _Request,
+        writer: asyncio.StreamWriter,
+        entry: _Body,
+        keep_alive: bool,
+    ) -> None:
+        headers = [("Content-Type", entry.content_type), _CORS]
+        if entry.etag:
+            headers += [("ETag", entry.etag), ("Cache-Control", "no-cache")]
+            if entry.status == 200 and _etag_matches(req.headers.get("if-none-match"), entry.etag):
+                await self._write(writer, 304, headers, b"", keep_alive)
+                return
+        body = entry.body
+        if len(body) >= _GZIP_MIN_BYTES:
+            headers.append(("Vary", "Accept-Encoding"))
+            if _accepts_gzip(req.headers.get("accept-encoding")):
+                if entry.gz is None:
+                    entry.gz = await self._run(gzip.compress, entry.body, 6)
+                body = entry.gz
+                headers.append(("Content-Encoding", "gzip"))
+        await self._write(writer, entry.status, headers, body, keep_alive)
+
+    async def _cached(self, key: tuple, build: Callable[[], "asyncio.Future[_Body]"]) -> _Body:
+        """Cached entry for *key*; concurrent misses share one *build*."""
+        if self.cache is None:
+            return await build()
+        entry = self.cache.get(key)
+        if entry is not None:
+            return entry
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        pending = asyncio.get_running_loop().create_future()
+        self._inflight[key] = pending
+        try:
+            entry = await build()
+        except Exception as exc:
+            # Waiters get the same error; retrieve it here so an unawaited
+            # future does not log "exception was never retrieved".
+            pending.set_exception(exc)
+            pending.exception()
+            raise
+        except BaseException:
+            pending.cancel()
+            raise
+        finally:
+            del self._inflight[key]
+        if entry.status == 200:
+            self.cache.put(key, entry)
+        pending.set_result(entry)
+        return entry
+
+    # -- connection / routing --------------------------------------------------
+
+    async def _serve_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        task = asyncio.current_task()
+        assert task is not None
+        self._connections[task] = writer
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), _KEEPALIVE_S)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    await self._write(writer, 431, [_CORS], b"", keep_alive=False)
+                    return
+                req = _parse_head(head)
+                try:
+                    length = int(req.headers.get("content-length") or 0) if req else 0
+                except ValueError:
+                    req = None
+                if req is None or length < 0:
+                    await self._write(writer, 400, [_CORS], b"", keep_alive=False)
+                    return
+                body = await reader.readexactly(length) if length else b""
+                if not await self._dispatch(req, body, writer):
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.pop(task, None)
+            writer.close()
+            with suppress(Exception):
+                await writer.wait_closed()
+
+    async def _dispatch(
+        self, req: _Request, body: bytes, writer: asyncio.StreamWriter
+    ) -> bool:
+        """Answer one request; return whether the connection stays open."""
+        try:
+            return await self._route(req, body, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            raise
+        except Exception as e:
+            err = await self._run(_json_body, 500, {"error": str(e)})
+            await self._write(
+                writer, 500, [("Content-Type", _JSON_TYPE), _CORS], err.body, False
+            )
+            return False
+
+    async def _route(
+        self, req: _Request, body: bytes, writer: asyncio.StreamWriter
+    ) -> bool:
+        keep = req.keep_alive
+        parsed = urlparse(req.target)
+        path = parsed.path
+        if req.method == "OPTIONS":
+            headers = [
+                _CORS,
+                ("Access-Control-Allow-Methods", "GET, POST, OPTIONS"),
+                ("Access-Control-Allow-Headers", "Content-Type"),
+            ]
+            await self._write(writer, 204, headers, b"", keep)
+            return keep
+        if req.method == "POST":
+            result = await self._with_svc(lambda svc: api_post_json(lambda: svc, path, body))
+            status, payload = result or (404, {"error": "not found"})
+            await self._send(req, writer, await self._run(_json_body, status, payload), keep)
+            return keep
+        if req.method != "GET":
+            await self._write(writer, 501, [_CORS], b"", keep)
+            return keep
+        qs = parse_qs(parsed.query)
+        if path == "/api/query/text":
+            return await self._stream_query(qs, writer, keep)
+        if path.startswith("/api/"):
+            entry = await self._api_get(path, qs)
+        else:
+            entry = await self._static(path)
+        await self._send(req, writer, entry, keep)
+        return keep
+
+    async def _api_get(self, path: str, qs: Dict[str, List[str]]) -> _Body:
+        def build(svc: HierarchyDbService) -> _Body:
+            status, payload = api_get_json(lambda: svc, self.db_path, path, qs)
+            return _json_body(status, payload, etag=path in _CACHEABLE)
+
+        if path not in _CACHEABLE:
+            return await self._with_svc(build)
+        params = tuple(sorted((k, tuple(v)) for k, v in qs.items()))
+        key = (path, params, db_stamp(self._db_file))
+        return await self._cached(key, lambda: self._with_svc(build))
+
+    async def _static(self, path: str) -> _Body:
+        if path == "/favicon.ico":
+            return _Body(204, b"")
+        target = static_target(self.web_root, path)
+        if not isinstance(target, Path):
+            return _Body(target.value, target.phrase.encode(), "text/plain; charset=utf-8")
+        try:
+            st = target.stat()
+        except OSError:
+            return _Body(404, b"Not Found", "text/plain; charset=utf-8")
+
+        def build() -> _Body:
+            data = target.read_bytes()
+            tag = f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+            return _Body(200, data, static_content_type(target), etag=tag)
+
+        key = ("static", str(target), st.st_mtime_ns, st.st_size)
+        return await self._cached(key, lambda: self._run(build))
+
+    async def _stream_query(
+        self, qs: Dict[str, List[str]], writer: asyncio.StreamWriter, keep: bool
+    ) -> bool:
+        assert self._pool is not None
+        svc = await self._pool.acquire(self._run)
+        chunks: Optional[Iterator[str]] = None
+        try:
+            try:
+                q, fmt, limit, cursor = query_text_args(qs)
+                chunks = await self._run(
+                    lambda: svc.stream_dql(q, text_format=fmt, limit=limit, cursor=cursor)
+                )
+            except Exception as e:
+                body = await self._run(_json_body, 500, {"error": str(e)})
+                await self._write(
+                    writer, 500, [("Content-Type", _JSON_TYPE), _CORS], body.body, keep
+                )
+                return keep
+            head = [
+                "HTTP/1.1 200 OK",
+                f"Content-Type: {query_text_content_type(fmt)}",
+                "Transfer-Encoding: chunked",
+                "Access-Control-Allow-Origin: *",
+            ]
+            if not keep:
+                head.append("Connection: close")
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+            while True:
+                try:
+                    block = await self._run(_next_block, chunks)
+                except Exception:
+                    # Headers are out: drop the connection so the client sees a short body.
+                    return False
+                if not block:
+                    break
+                writer.write(f"{len(block):X}\r\n".encode("ascii") + block + b"\r\n")
+                await writer.drain()
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+            return keep
+        finally:
+            if chunks is not None:
+                with suppress(Exception):
+                    await self._run(chunks.close)
+            self._pool.release(svc)
+
+
+def serve_async(
+    db_path: str,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    *,
+    pool_size: Optional[int] = None,
+    web_dir: Optional[Path] = None,
+) -> None:
+    """Run :class:`AsyncHierarchyServer` until interrupted."""
+
+    async def _main() -> None:
+        server = AsyncHierarchyServer(
+            db_path, host, port, web_dir=web_dir, pool_size=pool_size
+        )
+        await server.start()
+        try:
+            await server.serve_forever()
+        finally:
+            await server.aclose()
+
+    asyncio.run(_main())
@@ -4,8 +4,9 @@ from __future__ import annotations
 
 import json
 import sqlite3
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
 from hch.apps.hierarchy_view import (
     fetch_db_depth_stats,
@@ -15,8 +16,16 @@ from hch.apps.hierarchy_view import (
     format_subtree_text,
     meta_map,
 )
-from hch.query.dql.planner import apply_post_filters, plan_dql
-from hch.query.dql.results import format_rows_plain, format_rows_text
+from hch.index.search_index import has_search_index
+from hch.index.tree_encoding import TREE_TABLE, has_tree_encoding
+from hch.query.dql.paging import CursorKey, encode_cursor, iter_dql_rows
+from hch.query.dql.planner import plan_dql
+from hch.query.dql.results import (
+    format_rows_plain,
+    format_rows_text,
+    iter_rows_plain,
+    iter_rows_text,
+)
 
 
 def _blackbox_files_from_meta(raw: Dict[str, str]) -> List[str]:
@@ -75,6 +84,19 @@ def _parse_tier(inst_tags_json: Optional[str]) -> str:
     return "full"
 
 
+def _api_row(r: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "full_path": r.get("full_path", ""),
+        "inst": r.get("inst_leaf_name", ""),
+        "module": r.get("module_name", ""),
+        "filepath": r.get("filepath") or "",
+        "depth": r.get("depth", 0),
+        "ports": _parse_ports(r.get("port_json")),
+        "parent_path": r.get("parent_path"),
+        "parse_tier": _parse_tier(r.get("inst_tags_json")),
+    }
+
+
 def _parse_ports(port_json: Optional[str]) -> List[str]:
     if not port_json:
         return []
@@ -94,11 +116,17 @@ def _parse_ports(port_json: Optional[str]) -> List[str]:
 
 
 class HierarchyDbService:
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, *, read_only: bool = False):
         self.db_path = Path(db_path).resolve()
         if not self.db_path.exists():
             raise FileNotFoundError(f"Database not found: {self.db_path}")
-        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        if read_only:
+            # Pooled readers (hch-web --async); deepen still writes via its own store.
+            self.conn = sqlite3.connect(
+                f"{self.db_path.as_uri()}?mode=ro", uri=True, check_same_thread=False
+            )
+        else:
+            self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
         self.conn.row_factory = sqlite3.Row
 
     def close(self) -> None:
@@ -199,6 +227,12 @@ class HierarchyDbService:
         return [str(t).strip() for t in loaded if str(t).strip()]
 
     def tree_children(self, parent_path: Optional[str] = None) -> List[Dict[str, Any]]:
+        if has_tree_encoding(self.conn):
+            tree_join = f"LEFT JOIN {TREE_TABLE} t ON t.id = i.id"
+            child_count = "COALESCE(t.child_count, 0)"
+        else:
+            tree_join = ""
+            child_count = "(SELECT COUNT(*) FROM instances c WHERE c.parent_path = i.full_path)"
         if not parent_path:
             tops = self._index_top_modules()
             if tops:
@@ -207,10 +241,11 @@ class HierarchyDbService:
                     f"""
                     SELECT i.full_path, i.inst_leaf_name, m.module_name, i.depth,
                            i.port_json, f.filepath, i.inst_tags_json,
-                           (SELECT COUNT(*) FROM instances c WHERE c.parent_path = i.full_path) AS child_count
+                           {child_count} AS child_count
                     FROM instances i
                     JOIN modules m ON m.id = i.module_id
                     LEFT JOIN files f ON f.id = i.filepath_id
+                    {tree_join}
                     WHERE i.full_path IN ({placeholders})
                     ORDER BY i.full_path
                     """,
@@ -218,26 +253,28 @@ class HierarchyDbService:
                 )
             else:
                 cur = self.conn.execute(
-                    """
+                    f"""
                     SELECT i.full_path, i.inst_leaf_name, m.module_name, i.depth,
                            i.port_json, f.filepath, i.inst_tags_json,
-                           (SELECT COUNT(*) FROM instances c WHERE c.parent_path = i.full_path) AS child_count
+                           {child_count} AS child_count
                     FROM instances i
                     JOIN modules m ON m.id = i.module_id
                     LEFT JOIN files f ON f.id = i.filepath_id
+                    {tree_join}
                     WHERE i.parent_path IS NULL OR i.parent_path = ''
                     ORDER BY i.full_path
                     """
                 )
         else:
             cur = self.conn.execute(
-                """
+                f"""
                 SELECT i.full_path, i.inst_leaf_name, m.module_name, i.depth,
                        i.port_json, f.filepath, i.inst_tags_json,
-                       (SELECT COUNT(*) FROM instances c WHERE c.parent_path = i.full_path) AS child_count
+                       {child_count} AS child_count
                 FROM instances i
                 JOIN modules m ON m.id = i.module_id
                 LEFT JOIN files f ON f.id = i.filepath_id
+                {tree_join}
                 WHERE i.parent_path = ?
                 ORDER BY i.full_path
                 """,
@@ -316,38 +353,41 @@ class HierarchyDbService:
         }
 
     def run_dql(
-        self, query: str, *, limit: int = 5000, text_format: Optional[str] = None
+        self,
+        query: str,
+        *,
+        limit: int = 5000,
+        text_format: Optional[str] = None,
+        cursor: Optional[str] = None,
     ) -> Dict[str, Any]:
+        """
+        One page of DQL hits (at most *limit*), starting after *cursor*.
+
+        ``next_cursor`` is set when more rows follow; pass it back to continue.
+        """
         q = query.strip()
         if not q:
-            return {"query": q, "rows": [], "count": 0}
-        plan = plan_dql(q)
-        rows = [dict(r) for r in self.conn.execute(plan.sql, plan.params).fetchall()]
-        rows = apply_post_filters(rows, plan)
-        if len(rows) > limit:
-            rows = rows[:limit]
-            truncated = True
-        else:
-            truncated = False
-        out_rows: List[Dict[str, Any]] = []
-        for r in rows:
-            out_rows.append(
-                {
-                    "full_path": r.get("full_path", ""),
-                    "inst": r.get("inst_leaf_name", ""),
-                    "module": r.get("module_name", ""),
-                    "filepath": r.get("filepath") or "",
-                    "depth": r.get("depth", 0),
-                    "ports": _parse_ports(r.get("port_json")),
-                    "parent_path": r.get("parent_path"),
-                    "parse_tier": _parse_tier(r.get("inst_tags_json")),
-                }
-            )
+            return {"query": q, "rows": [], "count": 0, "next_cursor": None}
+        plan = plan_dql(q, search_index=has_search_index(self.conn))
+        rows: List[Dict[str, Any]] = []
+        last_key: Optional[CursorKey] = None
+        truncated = False
+        hits = iter_dql_rows(self.conn, plan, cursor=cursor)
+        try:
+            for row, key in hits:
+                if len(rows) >= limit:
+                    truncated = True
+                    break
+                rows.append(row)
+                last_key = key
+        finally:
+            hits.close()
         payload: Dict[str, Any] = {
             "query": q,
-            "rows": out_rows,
-            "count": len(out_rows),
+            "rows": [_api_row(r) for r in rows],
+            "count": len(rows),
             "truncated": truncated,
+            "next_cursor": encode_cursor(*last_key) if truncated and last_key else None,
         }
         if text_format in ("text", "tsv"):
             payload["text"] = format_rows_text(rows, query=q)
@@ -355,6 +395,49 @@ class HierarchyDbService:
             payload["text"] = format_rows_plain(rows, query=q)
         return payload
 
+    def stream_dql(
+        self,
+        query: str,
+        *,
+        text_format: str = "text",
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Iterator[str]:
+        """
+        DQL hits as text chunks, read page by page (``/api/query/text``).
+
+        *text_format* is ``text``/``tsv``/``plain`` (same output as
+        :meth:`run_dql`) or ``ndjson``: one :meth:`run_dql` row per line plus
+        its resume ``cursor``.  The query is planned before the first chunk, so
+        DQL errors raise here rather than mid-stream.
+        """
+        q = query.strip()
+        plan = plan_dql(q, search_index=has_search_index(self.conn)) if q else None
+
+        def _hits() -> Iterator[Tuple[Dict[str, Any], Optional[CursorKey]]]:
+            if plan is None:
+                return
+            hits = iter_dql_rows(self.conn, plan, cursor=cursor)
+            try:
+                yield from islice(hits, limit) if limit is not None else hits
+            finally:
+                hits.close()
+
+        def _chunks() -> Iterator[str]:
+            if text_format == "ndjson":
+                for row, key in _hits():
+                    line = _api_row(row)
+                    line["cursor"] = encode_cursor(*key) if key else None
+                    yield json.dumps(line, ensure_ascii=False) + "\n"
+                return
+            rows = (row for row, _ in _hits())
+            if text_format == "plain":
+                yield from iter_rows_plain(rows, query=q)
+            else:
+                yield from iter_rows_text(rows, query=q)
+
+        return _chunks()
+
     def allowed_source(self, filepath: str) -> bool:
         from hch.platform_paths import path_to_db
 
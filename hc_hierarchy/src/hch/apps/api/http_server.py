@@ -8,7 +8,7 @@ import threading
 from http import HTTPStatus
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
 from urllib.parse import parse_qs, unquote, urlparse
 
 from hch.apps.api.db_service import HierarchyDbService
@@ -31,12 +31,188 @@ def _json_response(handler: BaseHTTPRequestHandler, status: int, payload: object
         pass
 
 
-def _read_json_body(handler: BaseHTTPRequestHandler) -> dict:
-    length = int(handler.headers.get("Content-Length", 0))
-    if length <= 0:
-        return {}
-    raw = handler.rfile.read(length)
-    return json.loads(raw.decode("utf-8"))
+_STREAM_CHUNK_BYTES = 64 * 1024
+
+
+def _stream_response(
+    handler: BaseHTTPRequestHandler, content_type: str, chunks: Iterable[str]
+) -> None:
+    """Chunked (HTTP/1.1) response from text *chunks*, coalesced to ~64 KiB writes."""
+    handler.send_response(HTTPStatus.OK)
+    handler.send_header("Content-Type", content_type)
+    handler.send_header("Transfer-Encoding", "chunked")
+    handler.send_header("Access-Control-Allow-Origin", "*")
+    handler.end_headers()
+    buf: List[bytes] = []
+    size = 0
+
+    def _flush() -> None:
+        nonlocal size
+        data = b"".join(buf)
+        handler.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        buf.clear()
+        size = 0
+
+    try:
+        for chunk in chunks:
+            raw = chunk.encode("utf-8")
+            if not raw:
+                continue
+            buf.append(raw)
+            size += len(raw)
+            if size >= _STREAM_CHUNK_BYTES:
+                _flush()
+        if buf:
+            _flush()
+        handler.wfile.write(b"0\r\n\r\n")
+    except (BrokenPipeError, ConnectionResetError):
+        handler.close_connection = True
+    except Exception:
+        # Headers are out: drop the connection so the client sees a short body.
+        handler.close_connection = True
+
+
+_POST_PATHS = ("/api/query", "/api/deepen", "/api/export/save")
+
+
+def api_get_json(
+    get_svc: Callable[[], HierarchyDbService],
+    db_path: str,
+    path: str,
+    qs: Dict[str, List[str]],
+) -> Tuple[int, object]:
+    """``(status, payload)`` for the JSON GET endpoints (all but ``/api/query/text``)."""
+    try:
+        if path == "/api/health":
+            return 200, {"ok": True}
+        if path == "/api/meta":
+            return 200, get_svc().meta()
+        if path == "/api/export/default-path":
+            return 200, {"path": default_export_path(db_path)}
+        if path == "/api/help":
+            svc = get_svc()
+            payload = web_help_payload()
+            meta = svc.meta()
+            top = meta.get("top_module") or ""
+            if not top and isinstance(meta.get("top_modules_all"), list):
+                tops = meta.get("top_modules_all") or []
+                top = tops[0] if tops else ""
+            if not top:
+                kids = svc.tree_children(None)
+                if kids:
+                    top = kids[0].get("full_path") or kids[0].get("leaf") or ""
+            payload["top_module"] = top
+            return 200, payload
+        if path == "/api/tree/children":
+            parent = qs.get("parent", [None])[0]
+            if parent == "":
+                parent = None
+            return 200, {"children": get_svc().tree_children(parent)}
+        if path == "/api/instance":
+            detail = get_svc().instance_detail(qs.get("path", [""])[0])
+            if not detail:
+                return 404, {"error": "instance not found"}
+            return 200, detail
+        if path == "/api/subtree":
+            view = get_svc().subtree_view(qs.get("path", [""])[0])
+            if not view:
+                return 404, {"error": "instance not found"}
+            return 200, view
+        if path == "/api/source":
+            fp = unquote(qs.get("file", [""])[0])
+            hl_raw = qs.get("highlight", [""])[0]
+            highlights = [
+                unquote(x.strip())
+                for x in hl_raw.split(",")
+                if x.strip()
+            ] if hl_raw else None
+            return 200, get_svc().read_source(fp, highlight=highlights)
+        return 404, {"error": "unknown api"}
+    except PermissionError as e:
+        return 403, {"error": str(e)}
+    except FileNotFoundError as e:
+        return 404, {"error": str(e)}
+    except Exception as e:
+        return 500, {"error": str(e)}
+
+
+def api_post_json(
+    get_svc: Callable[[], HierarchyDbService],
+    path: str,
+    raw_body: bytes,
+) -> Optional[Tuple[int, object]]:
+    """``(status, payload)`` for the POST endpoints; ``None`` for an unknown path."""
+    if path not in _POST_PATHS:
+        return None
+    try:
+        body = json.loads(raw_body.decode("utf-8")) if raw_body else {}
+        if path == "/api/query":
+            q = str(body.get("q", "")).strip()
+            limit = int(body.get("limit", 2000))
+            fmt = str(body.get("format", "")).strip().lower() or None
+            cursor = str(body.get("cursor") or "").strip() or None
+            return 200, get_svc().run_dql(q, limit=limit, text_format=fmt, cursor=cursor)
+        if path == "/api/deepen":
+            under = str(body.get("path", "")).strip()
+            if not under:
+                return 400, {"error": "path required"}
+            depth_raw = body.get("depth")
+            extra_depth = None
+            full_subtree = bool(body.get("full", True))
+            if depth_raw is not None and str(depth_raw).strip() != "":
+                extra_depth = int(depth_raw)
+                full_subtree = False
+            jobs = int(body.get("jobs", 0))
+            return 200, get_svc().deepen(
+                under,
+                extra_depth=extra_depth,
+                full_subtree=full_subtree,
+                jobs=jobs,
+            )
+        out_path = str(body.get("path", "")).strip()
+        return 200, save_export_text(out_path, str(body.get("text", "")))
+    except Exception as e:
+        return 400, {"error": str(e)}
+
+
+def query_text_args(qs: Dict[str, List[str]]) -> Tuple[str, str, Optional[int], Optional[str]]:
+    """``(q, format, limit, cursor)`` for ``/api/query/text``."""
+    fmt = qs.get("format", ["text"])[0]
+    if fmt not in ("text", "plain", "tsv", "ndjson"):
+        fmt = "text"
+    limit_raw = qs.get("limit", [""])[0].strip()
+    return (
+        qs.get("q", [""])[0],
+        fmt,
+        int(limit_raw) if limit_raw else None,
+        qs.get("cursor", [""])[0].strip() or None,
+    )
+
+
+def query_text_content_type(fmt: str) -> str:
+    if fmt == "ndjson":
+        return "application/x-ndjson; charset=utf-8"
+    return "text/plain; charset=utf-8"
+
+
+def static_target(web_root: Path, path: str) -> Union[Path, HTTPStatus]:
+    """File under *web_root* for a static URL *path*, or the error status to send."""
+    if path in ("/", ""):
+        path = "/index.html"
+    rel = path.lstrip("/")
+    if ".." in rel or rel.startswith("/"):
+        return HTTPStatus.FORBIDDEN
+    target = (web_root / rel).resolve()
+    if not str(target).startswith(str(web_root)):
+        return HTTPStatus.FORBIDDEN
+    if not target.is_file():
+        return HTTPStatus.NOT_FOUND
+    return target
+
+
+def static_content_type(target: Path) -> str:
+    ctype, _ = mimetypes.guess_type(str(target))
+    return ctype or "application/octet-stream"
 
 
 def make_handler(
@@ -47,6 +223,8 @@ def make_handler(
     svc_holder: dict[str, Optional[HierarchyDbService]] = {"svc": None}
 
     class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive + chunked /api/query/text
+
         def log_message(self, fmt: str, *args) -> None:
             return
 
@@ -87,177 +265,43 @@ def make_handler(
 
         def do_POST(self) -> None:
             parsed = urlparse(self.path)
-            if parsed.path == "/api/query":
-                try:
-                    body = _read_json_body(self)
-                    q = str(body.get("q", "")).strip()
-                    limit = int(body.get("limit", 2000))
-                    fmt = str(body.get("format", "")).strip().lower() or None
-                    result = self.svc.run_dql(q, limit=limit, text_format=fmt)
-                    _json_response(self, 200, result)
-                except BrokenPipeError:
-                    return
-                except Exception as e:
-                    try:
-                        _json_response(self, 400, {"error": str(e)})
-                    except BrokenPipeError:
-                        return
+            length = int(self.headers.get("Content-Length", 0))
+            known = parsed.path in _POST_PATHS
+            raw = self.rfile.read(length) if known and length > 0 else b""
+            result = api_post_json(lambda: self.svc, parsed.path, raw)
+            if result is None:
+                self.close_connection = True  # request body left unread
+                _json_response(self, 404, {"error": "not found"})
                 return
-            if parsed.path == "/api/deepen":
-                try:
-                    body = _read_json_body(self)
-                    path = str(body.get("path", "")).strip()
-                    if not path:
-                        _json_response(self, 400, {"error": "path required"})
-                        return
-                    depth_raw = body.get("depth")
-                    extra_depth = None
-                    full_subtree = bool(body.get("full", True))
-                    if depth_raw is not None and str(depth_raw).strip() != "":
-                        extra_depth = int(depth_raw)
-                        full_subtree = False
-                    jobs = int(body.get("jobs", 0))
-                    result = self.svc.deepen(
-                        path,
-                        extra_depth=extra_depth,
-                        full_subtree=full_subtree,
-                        jobs=jobs,
-                    )
-                    _json_response(self, 200, result)
-                except BrokenPipeError:
-                    return
-                except Exception as e:
-                    try:
-                        _json_response(self, 400, {"error": str(e)})
-                    except BrokenPipeError:
-                        return
-                return
-            if parsed.path == "/api/export/save":
-                try:
-                    body = _read_json_body(self)
-                    out_path = str(body.get("path", "")).strip()
-                    text = str(body.get("text", ""))
-                    result = save_export_text(out_path, text)
-                    _json_response(self, 200, result)
-                except BrokenPipeError:
-                    return
-                except Exception as e:
-                    try:
-                        _json_response(self, 400, {"error": str(e)})
-                    except BrokenPipeError:
-                        return
+            try:
+                _json_response(self, *result)
+            except BrokenPipeError:
                 return
-            _json_response(self, 404, {"error": "not found"})
 
         def _handle_api_get(self, path: str, qs: dict) -> None:
-            try:
-                if path == "/api/health":
-                    _json_response(self, 200, {"ok": True})
-                    return
-                if path == "/api/meta":
-                    _json_response(self, 200, self.svc.meta())
-                    return
-                if path == "/api/export/default-path":
-                    _json_response(
-                        self,
-                        200,
-                        {"path": default_export_path(db_path)},
-                    )
-                    return
-                if path == "/api/help":
-                    payload = web_help_payload()
-                    meta = self.svc.meta()
-                    top = meta.get("top_module") or ""
-                    if not top and isinstance(meta.get("top_modules_all"), list):
-                        tops = meta.get("top_modules_all") or []
-                        top = tops[0] if tops else ""
-                    if not top:
-                        kids = self.svc.tree_children(None)
-                        if kids:
-                            top = kids[0].get("full_path") or kids[0].get("leaf") or ""
-                    payload["top_module"] = top
-                    _json_response(self, 200, payload)
-                    return
-                if path == "/api/tree/children":
-                    parent = qs.get("parent", [None])[0]
-                    if parent == "":
-                        parent = None
-                    _json_response(self, 200, {"children": self.svc.tree_children(parent)})
-                    return
-                if path == "/api/instance":
-                    fp = qs.get("path", [""])[0]
-                    detail = self.svc.instance_detail(fp)
-                    if not detail:
-                        _json_response(self, 404, {"error": "instance not found"})
-                        return
-                    _json_response(self, 200, detail)
-                    return
-                if path == "/api/subtree":
-                    fp = qs.get("path", [""])[0]
-                    view = self.svc.subtree_view(fp)
-                    if not view:
-                        _json_response(self, 404, {"error": "instance not found"})
-                        return
-                    _json_response(self, 200, view)
-                    return
-                if path == "/api/query/text":
-                    q = qs.get("q", [""])[0]
-                    fmt = qs.get("format", ["text"])[0]
-                    result = self.svc.run_dql(
-                        q, text_format=fmt if fmt in ("text", "plain", "tsv") else "text"
+            if path == "/api/query/text":
+                try:
+                    q, fmt, limit, cursor = query_text_args(qs)
+                    chunks = self.svc.stream_dql(
+                        q, text_format=fmt, limit=limit, cursor=cursor
                     )
-                    body = result.get("text", "")
-                    raw = body.encode("utf-8")
-                    self.send_response(HTTPStatus.OK)
-                    self.send_header("Content-Type", "text/plain; charset=utf-8")
-                    self.send_header("Content-Length", str(len(raw)))
-                    self.send_header("Access-Control-Allow-Origin", "*")
-                    self.end_headers()
-                    try:
-                        self.wfile.write(raw)
-                    except BrokenPipeError:
-                        pass
-                    return
-                if path == "/api/source":
-                    fp = unquote(qs.get("file", [""])[0])
-                    hl_raw = qs.get("highlight", [""])[0]
-                    highlights = [
-                        unquote(x.strip())
-                        for x in hl_raw.split(",")
-                        if x.strip()
-                    ] if hl_raw else None
-                    data = self.svc.read_source(fp, highlight=highlights)
-                    _json_response(self, 200, data)
+                except Exception as e:
+                    _json_response(self, 500, {"error": str(e)})
                     return
-                _json_response(self, 404, {"error": "unknown api"})
-            except PermissionError as e:
-                _json_response(self, 403, {"error": str(e)})
-            except FileNotFoundError as e:
-                _json_response(self, 404, {"error": str(e)})
-            except Exception as e:
-                _json_response(self, 500, {"error": str(e)})
+                _stream_response(self, query_text_content_type(fmt), chunks)
+                return
+            _json_response(self, *api_get_json(lambda: self.svc, db_path, path, qs))
 
         def _serve_static(self, path: str) -> None:
             if path == "/favicon.ico":
                 self.send_response(HTTPStatus.NO_CONTENT)
                 self.end_headers()
                 return
-            if path in ("/", ""):
-                path = "/index.html"
-            rel = path.lstrip("/")
-            if ".." in rel or rel.startswith("/"):
-                self.send_error(HTTPStatus.FORBIDDEN)
-                return
-            target = (web_root / rel).resolve()
-            if not str(target).startswith(str(web_root)):
-                self.send_error(HTTPStatus.FORBIDDEN)
+            target = static_target(web_root, path)
+            if not isinstance(target, Path):
+                self.send_error(target)
                 return
-            if not target.is_file():
-                self.send_error(HTTPStatus.NOT_FOUND)
-                return
-            ctype, _ = mimetypes.guess_type(str(target))
-            if not ctype:
-                ctype = "application/octet-stream"
+            ctype = static_content_type(target)
             data = target.read_bytes()
             self.send_response(HTTPStatus.OK)
             self.send_header("Content-Type", ctype)
@@ -308,12 +352,16 @@ def serve_forever(
     port: int = 8765,
     *,
     open_browser: bool = True,
+    async_mode: bool = False,
+    pool_size: Optional[int] = None,
 ) -> None:
+    """Serve until Ctrl-C; ``async_mode`` uses :mod:`hch.apps.api.async_server`."""
     import os
 
-    server = run_server(db_path, host=host, port=port)
+    server = None if async_mode else run_server(db_path, host=host, port=port)
     url = f"http://{host}:{port}/"
-    print(f"hch-web: {url}  (db={db_path})")
+    mode = f", async, {pool_size or 'auto'} readers" if async_mode else ""
+    print(f"hch-web: {url}  (db={db_path}{mode})")
     if os.environ.get("HCH_WEB_NO_BROWSER", "").strip().lower() in (
         "1",
         "true",
@@ -328,6 +376,14 @@ def serve_forever(
             "(use --browser to force, or --no-browser / HCH_WEB_NO_BROWSER=1)",
             flush=True,
         )
+    if server is None:
+        from hch.apps.api.async_server import serve_async
+
+        try:
+            serve_async(db_path, host=host, port=port, pool_size=pool_size)
+        except KeyboardInterrupt:
+            print("\nStopped.")
+        return
     try:
         server.serve_forever()
     except KeyboardInterrupt:
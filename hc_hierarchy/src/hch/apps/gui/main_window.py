@@ -14,7 +14,10 @@ from hch.apps.hierarchy_view import (
     format_selection_depth_line,
     format_subtree_text,
 )
-from hch.query.dql.planner import apply_post_filters, plan_dql
+from hch.index.search_index import has_search_index
+from hch.index.tree_encoding import TREE_TABLE, has_tree_encoding
+from hch.query.dql.paging import iter_dql_rows
+from hch.query.dql.planner import plan_dql
 from hch.query.dql.results import format_rows_text
 
 # Re-export for tests that import from main_window.
@@ -43,35 +46,32 @@ def _parse_tier_from_tags(raw: Optional[str]) -> str:
 
 
 def _query_children(conn: sqlite3.Connection, parent_path: Optional[str]) -> List[Tuple]:
+    """``(full_path, leaf, module_name, depth, inst_tags_json, child_count)`` rows."""
+    if has_tree_encoding(conn):
+        tree_join = f"LEFT JOIN {TREE_TABLE} t ON t.id = i.id"
+        child_count = "COALESCE(t.child_count, 0)"
+    else:
+        tree_join = ""
+        child_count = "(SELECT COUNT(*) FROM instances c WHERE c.parent_path = i.full_path)"
     if parent_path is None:
-        cur = conn.execute(
-            """
-            SELECT full_path, inst_leaf_name, module_id, depth, inst_tags_json
-            FROM instances
-            WHERE parent_path IS NULL OR parent_path = ''
-            ORDER BY full_path
-            """
-        )
+        where, params = "i.parent_path IS NULL OR i.parent_path = ''", ()
     else:
-        cur = conn.execute(
-            """
-            SELECT full_path, inst_leaf_name, module_id, depth, inst_tags_json
-            FROM instances
-            WHERE parent_path = ?
-            ORDER BY full_path
-            """,
-            (parent_path,),
-        )
+        where, params = "i.parent_path = ?", (parent_path,)
+    cur = conn.execute(
+        f"""
+        SELECT i.full_path, i.inst_leaf_name, COALESCE(m.module_name, '?'), i.depth,
+               i.inst_tags_json, {child_count}
+        FROM instances i
+        LEFT JOIN modules m ON m.id = i.module_id
+        {tree_join}
+        WHERE {where}
+        ORDER BY i.full_path
+        """,
+        params,
+    )
     return cur.fetchall()
 
 
-def _module_name(conn: sqlite3.Connection, module_id: int) -> str:
-    row = conn.execute(
-        "SELECT module_name FROM modules WHERE id = ?", (module_id,)
-    ).fetchone()
-    return row[0] if row else "?"
-
-
 def run_gui(db_path: str) -> int:
     try:
         from PySide6.QtCore import Qt
@@ -283,7 +283,13 @@ def run_gui(db_path: str) -> int:
                 item.setForeground(1, QColor("#7a6eb8"))
 
         def _make_item(
-            self, full_path: str, leaf: str, mod: str, *, parse_tier: str = "full"
+            self,
+            full_path: str,
+            leaf: str,
+            mod: str,
+            *,
+            parse_tier: str = "full",
+            has_children: bool = True,
         ) -> QTreeWidgetItem:
             item = QTreeWidgetItem([leaf, mod])
             item.setData(0, Qt.ItemDataRole.UserRole, full_path)
@@ -296,7 +302,8 @@ def run_gui(db_path: str) -> int:
                 )
                 item.setToolTip(0, tip)
                 item.setToolTip(1, tip)
-            item.addChild(QTreeWidgetItem(["…", ""]))
+            if has_children:
+                item.addChild(QTreeWidgetItem(["…", ""]))
             return item
 
         def _selected_tree_item(self) -> Optional[QTreeWidgetItem]:
@@ -441,11 +448,15 @@ def run_gui(db_path: str) -> int:
                 return
             item.takeChildren()
             full_path = item.data(0, Qt.ItemDataRole.UserRole)
-            for row in _query_children(self.conn, full_path):
-                fp, leaf, mid, _depth, tags = row
-                mod = _module_name(self.conn, mid)
+            for fp, leaf, mod, _depth, tags, n_children in _query_children(
+                self.conn, full_path
+            ):
                 tier = _parse_tier_from_tags(tags)
-                item.addChild(self._make_item(fp, leaf, mod, parse_tier=tier))
+                item.addChild(
+                    self._make_item(
+                        fp, leaf, mod, parse_tier=tier, has_children=n_children > 0
+                    )
+                )
 
         def _reload_tree_expand(self, target_path: str) -> None:
             self._load_roots()
@@ -475,11 +486,13 @@ def run_gui(db_path: str) -> int:
 
         def _load_roots(self) -> None:
             self.tree.clear()
-            for row in _query_children(self.conn, None):
-                fp, leaf, mid, _depth, tags = row
-                mod = _module_name(self.conn, mid)
+            for fp, leaf, mod, _depth, tags, n_children in _query_children(self.conn, None):
                 tier = _parse_tier_from_tags(tags)
-                self.tree.addTopLevelItem(self._make_item(fp, leaf, mod, parse_tier=tier))
+                self.tree.addTopLevelItem(
+                    self._make_item(
+                        fp, leaf, mod, parse_tier=tier, has_children=n_children > 0
+                    )
+                )
 
         def _on_expand(self, item: QTreeWidgetItem) -> None:
             self._load_children(item)
@@ -514,12 +527,8 @@ def run_gui(db_path: str) -> int:
             q = self.qedit.text().strip()
             if not q:
                 return
-            plan = plan_dql(q)
-            rows = [
-                dict(r)
-                for r in self.conn.execute(plan.sql, plan.params).fetchall()
-            ]
-            rows = apply_post_filters(rows, plan)
+            plan = plan_dql(q, search_index=has_search_index(self.conn))
+            rows = [row for row, _ in iter_dql_rows(self.conn, plan)]
             self._last_query = q
             self._last_export_text = format_rows_text(rows, query=q)
             self.statusBar().showMessage(f"DQL: {len(rows)} rows — {q}")
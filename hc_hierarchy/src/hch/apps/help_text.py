@@ -141,9 +141,27 @@ INDEX_HELP = dedent(
 
     Performance (large filelists, Tier P):
       -j, --jobs N       Parallel parse workers (0=auto CPU count; default 0)
+      --parse-pool KIND  thread (default) | process — process workers avoid the GIL;
+                         batches sized by source bytes (~4 MiB). Env: HCH_PARSE_POOL
       --batch-size N     Sources per batch (0=all at once; enables checkpoint when >0)
       --resume           Continue from checkpoint (default on; use --no-resume to disable)
       --force            Ignore checkpoint and rebuild module/instance tables
+      --update           After RTL edits: re-parse only added / changed sources (content
+                         hash vs meta source_manifest_json) and patch instances in place;
+                         changed defines / incdirs / headers / -v files, depth limits,
+                         Tier E or --variant fall back to a --force rebuild.
+                         Env: HCH_SOURCE_MANIFEST=0 skips the manifest on full builds
+      --search-index    FTS5 trigram index for *substring* DQL (path/inst/module/module_ref);
+                         kept in sync on re-index / deepen; --no-search-index drops it
+      Tree table         instance_tree (child counts, pre-order subtree intervals) is
+                         rebuilt on every load; tree expand / copy hierarchy use it
+      --path-dict        Integer-keyed instances over interned paths / leaf names
+                         (instances becomes a view; ~11% smaller, scans up to ~2x slower);
+                         --no-path-dict converts back. Env: HCH_PATH_DICT=1|0 on open
+      Filelist cache     Expanded -f/-F trees are cached on disk (shared with hier-walk)
+                         and reused while nested .f contents, referenced $VARs and source
+                         existence are unchanged. Env: HCH_FILELIST_CACHE=0,
+                         HCH_FILELIST_CACHE_DIR (default ~/.cache/hch/filelists)
 
     Parse / hierarchy depth (requires --top):
       --max-depth N            Uniform cap: 0=top only, 1=children, 2=grandchildren, …
@@ -165,6 +183,8 @@ INDEX_HELP = dedent(
 
     Variants & diagnostics:
       --variant NAME=DEFINE,...       Repeatable; multiple ifdef variants in one DB
+                                      (only define-sensitive files re-parsed; rows common
+                                      to variants stored once, variant_mask bit per variant)
       --variant-compare A,B           Diff instance paths between variants
       --variant-dir DIR               Also write one .hch.db per variant
       --ifdef-compare                 Compare filelist defines vs --ifdef-alt
@@ -232,8 +252,15 @@ QUERY_HELP = dedent(
       --format tsv   tab table (default)
       --format text  TSV with # query header per block
       --format plain readable blocks
+      --format ndjson one JSON object per hit, with a resume "cursor"
       --text         shortcut for --format text
       --batch-summary TSV   per-query status (query, status, row_count)
+      Rows stream out page by page (HCH_DQL_PAGE_ROWS, default 2000);
+      status lines go to stderr when results go to stdout.
+
+    Paging:
+      hch-query -d design.hch.db -q 'path ~ "*u_core*"' --format ndjson --limit 1000
+      hch-query ... --cursor CURSOR   resume after that hit (last "cursor" printed)
     """
 ).strip()
 
@@ -253,6 +280,13 @@ WEB_HELP = dedent(
     Tree colors: gold=text-skim, orange=depth cap — click + to deepen branch
     Meta panel (ⓘ): tier, hierarchy_source, defines, blackbox counts, warnings
     DQL syntax matches hch-query.
+    API: POST /api/query {q, limit, cursor} returns a page plus next_cursor;
+      GET /api/query/text?q=...&format=text|tsv|plain|ndjson[&limit=&cursor=]
+      streams every hit (chunked)
+    Shared DB, many users: hch-web -d design.hch.db --async [--pool N]
+      asyncio server with N read-only SQLite readers (HCH_WEB_POOL), an LRU of
+      meta / tree / subtree / instance responses keyed by DB mtime
+      (HCH_WEB_CACHE_ENTRIES, 0=off), ETag → 304 and gzip for bodies >= 8 KiB
     Default browser open: on desktop; off in PRoot/chroot (use --browser / --no-browser)
     """
 ).strip()
@@ -3,14 +3,23 @@
 from __future__ import annotations
 
 import sqlite3
-from typing import List, Optional
+from typing import Any, List, Optional, Tuple
 
+from hch.index.tree_encoding import TREE_TABLE, has_tree_encoding, subtree_bounds
 
-def _module_name(conn: sqlite3.Connection, module_id: int) -> str:
-    row = conn.execute(
-        "SELECT module_name FROM modules WHERE id = ?", (module_id,)
-    ).fetchone()
-    return row[0] if row else "?"
+
+def _subtree_filter(
+    conn: sqlite3.Connection, root_path: str
+) -> Tuple[str, str, Tuple[Any, ...]]:
+    """``(join, where, params)`` selecting *root_path* and its descendants in ``i``."""
+    bounds = subtree_bounds(conn, root_path) if has_tree_encoding(conn) else None
+    if bounds is not None:
+        return (
+            f"JOIN {TREE_TABLE} t ON t.id = i.id",
+            "t.pre_start BETWEEN ? AND ?",
+            bounds,
+        )
+    return "", "i.full_path = ? OR i.full_path LIKE ?", (root_path, f"{root_path}.%")
 
 
 def fetch_db_depth_stats(conn: sqlite3.Connection) -> dict:
@@ -41,13 +50,14 @@ def fetch_subtree_depth_stats(
     if not root_row:
         return None
     base_depth = int(root_row[0])
+    join, where, params = _subtree_filter(conn, root_path)
     row = conn.execute(
-        """
-        SELECT COUNT(*), MIN(depth), MAX(depth)
-        FROM instances
-        WHERE full_path = ? OR full_path LIKE ?
+        f"""
+        SELECT COUNT(*), MIN(i.depth), MAX(i.depth)
+        FROM instances i {join}
+        WHERE {where}
         """,
-        (root_path, f"{root_path}.%"),
+        params,
     ).fetchone()
     count = int(row[0] or 0)
     max_depth = int(row[2]) if row[2] is not None else base_depth
@@ -102,21 +112,22 @@ def format_subtree_text(conn: sqlite3.Connection, root_path: str) -> str:
     root_path = root_path.strip()
     if not root_path:
         return ""
+    join, where, params = _subtree_filter(conn, root_path)
     rows = conn.execute(
-        """
-        SELECT full_path, inst_leaf_name, module_id, depth
-        FROM instances
-        WHERE full_path = ? OR full_path LIKE ?
-        ORDER BY full_path
+        f"""
+        SELECT i.full_path, i.inst_leaf_name, COALESCE(m.module_name, '?'), i.depth
+        FROM instances i {join}
+        LEFT JOIN modules m ON m.id = i.module_id
+        WHERE {where}
+        ORDER BY i.full_path
         """,
-        (root_path, f"{root_path}.%"),
+        params,
     ).fetchall()
     if not rows:
         return root_path
     base_depth = rows[0][3]
     lines: List[str] = []
-    for fp, leaf, mid, depth in rows:
-        mod = _module_name(conn, mid)
+    for fp, leaf, mod, depth in rows:
         indent = "  " * max(0, int(depth) - int(base_depth))
         lines.append(f"{indent}{fp}  ({mod})")
     return "\n".join(lines)
@@ -22,6 +22,35 @@ def _parse_tops(args):
     return None, None
 
 
+def _run_update(args, index_cwd, on_phase):
+    """``--update``: apply source changes in place; ``None`` means rebuild instead."""
+    from pathlib import Path
+
+    from hch.index.incremental import FullRebuildRequired, update_index
+    from hch.index.store import HierarchyStore
+
+    if not Path(args.output).is_file():
+        return None
+    try:
+        res = update_index(
+            args.filelist,
+            args.output,
+            index_cwd=index_cwd,
+            jobs=args.jobs,
+            parse_pool=args.parse_pool,
+            on_phase=on_phase,
+        )
+    except FullRebuildRequired as exc:
+        print(f"[hch-index] --update: {exc}; rebuilding from scratch", file=sys.stderr)
+        return None
+    if on_phase:
+        on_phase(
+            f"Updated: {res.files_parsed} sources re-parsed, "
+            f"{res.instances_deleted} instance rows removed, {res.instances_written} written"
+        )
+    return HierarchyStore(args.output)
+
+
 def main(argv=None) -> int:
     ap = argparse.ArgumentParser(
         description="Index Verilog/SystemVerilog hierarchy from a .f filelist into SQLite",
@@ -166,6 +195,33 @@ def main(argv=None) -> int:
         default=0,
         help="Parallel parse workers for batched Tier P (0=auto CPU count, 1=sequential)",
     )
+    perf.add_argument(
+        "--parse-pool",
+        choices=("thread", "process"),
+        default=None,
+        help=(
+            "Worker kind for -j: thread (default) or process (no GIL contention; "
+            "batches sized by source bytes). Default from HCH_PARSE_POOL"
+        ),
+    )
+    perf.add_argument(
+        "--search-index",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help=(
+            "Build the FTS5 trigram search index (faster *substring* DQL on path/inst/"
+            "module/module_ref; ~2-3x instance table size). --no-search-index drops it"
+        ),
+    )
+    perf.add_argument(
+        "--path-dict",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help=(
+            "Store instances integer-keyed over interned path strings (smaller DB, "
+            "slower scans); --no-path-dict converts back. Env: HCH_PATH_DICT"
+        ),
+    )
     perf.add_argument(
         "--resume",
         action=argparse.BooleanOptionalAction,
@@ -177,6 +233,15 @@ def main(argv=None) -> int:
         action="store_true",
         help="Ignore checkpoint and rebuild module/instance tables",
     )
+    perf.add_argument(
+        "--update",
+        action="store_true",
+        help=(
+            "Re-parse only sources added or changed (content hash) since the last "
+            "Tier P build and patch instances in place; tops / blackbox patterns come "
+            "from that build. Falls back to --force when an in-place update is not possible"
+        ),
+    )
 
     tier_e = ap.add_argument_group("Tier E elaboration")
     tier_e.add_argument(
@@ -274,40 +339,59 @@ def main(argv=None) -> int:
         reporter.phase(f"Output: {args.output}")
 
     with progress_stderr_guard(reporter):
-        store = build_index_from_filelist(
-            args.filelist,
-            args.output,
-            top_module=top,
-            top_modules=tops,
-            elaborate=args.elaborate,
-            batch_size=args.batch_size,
-            resume=args.resume,
-            force=args.force,
-            path_hierarchy_mode=args.path_hierarchy,
-            elab_instance_cap=args.elab_instance_cap,
-            elab_fast=not args.no_elab_fast,
-            elab_deep=args.elab_deep,
-            ifdef_compare=args.ifdef_compare,
-            ifdef_alt=args.ifdef_alt or None,
-            filelist_diff=args.filelist_diff,
-            variants=variants,
-            variant_compare=variant_compare,
-            variant_dir=args.variant_dir,
-            on_progress=on_progress,
-            on_phase=on_phase,
-            index_cwd=index_cwd,
-            jobs=args.jobs,
-            blackbox_paths=args.blackbox_path,
-            max_depth=args.max_depth,
-            depth_anchor_patterns=args.depth_anchor,
-            depth_anchor_inst_patterns=args.depth_anchor_inst,
-            depth_anchor_module_patterns=args.depth_anchor_module,
-            depth_shallow=args.depth_shallow,
-            depth_anchor_extra=args.depth_anchor_extra,
-            skim_parse=not args.no_skim_parse,
-        )
+        store = _run_update(args, index_cwd, on_phase) if args.update else None
+        if store is None:
+            store = build_index_from_filelist(
+                args.filelist,
+                args.output,
+                top_module=top,
+                top_modules=tops,
+                elaborate=args.elaborate,
+                batch_size=args.batch_size,
+                resume=args.resume,
+                force=args.force or args.update,
+                path_hierarchy_mode=args.path_hierarchy,
+                elab_instance_cap=args.elab_instance_cap,
+                elab_fast=not args.no_elab_fast,
+                elab_deep=args.elab_deep,
+                ifdef_compare=args.ifdef_compare,
+                ifdef_alt=args.ifdef_alt or None,
+                filelist_diff=args.filelist_diff,
+                variants=variants,
+                variant_compare=variant_compare,
+                variant_dir=args.variant_dir,
+                on_progress=on_progress,
+                on_phase=on_phase,
+                index_cwd=index_cwd,
+                jobs=args.jobs,
+                parse_pool=args.parse_pool,
+                blackbox_paths=args.blackbox_path,
+                max_depth=args.max_depth,
+                depth_anchor_patterns=args.depth_anchor,
+                depth_anchor_inst_patterns=args.depth_anchor_inst,
+                depth_anchor_module_patterns=args.depth_anchor_module,
+                depth_shallow=args.depth_shallow,
+                depth_anchor_extra=args.depth_anchor_extra,
+                skim_parse=not args.no_skim_parse,
+            )
     n = store.count_instances()
     m = store.count_modules()
+    if args.search_index:
+        from hch.index.search_index import build_search_index
+
+        if reporter:
+            reporter.phase("Building FTS5 trigram search index…")
+        build_search_index(store.conn)
+    elif args.search_index is False:
+        from hch.index.search_index import drop_search_index
+
+        drop_search_index(store.conn)
+    if args.path_dict is not None:
+        from hch.index.path_dict import set_path_dict
+
+        if reporter and args.path_dict:
+            reporter.phase("Converting instances to path dictionary…")
+        set_path_dict(store.conn, args.path_dict)
     if reporter:
         for key, val in reporter.meta().items():
             store.set_meta(key, val)
@@ -4,13 +4,41 @@
 from __future__ import annotations
 
 import argparse
+import json
 import sqlite3
 import sys
+from itertools import islice
 from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple
 
 from hch.apps.help_text import QUERY_HELP_EPILOG
-from hch.query.dql.planner import apply_post_filters, plan_dql
-from hch.query.dql.results import format_rows_plain, format_rows_text
+from hch.index.search_index import has_search_index
+from hch.query.dql.paging import CursorKey, encode_cursor, iter_dql_rows
+from hch.query.dql.planner import plan_dql
+from hch.query.dql.results import iter_rows_plain, iter_rows_text, normalize_row
+
+
+class _Counter:
+    """Pass-through iterator that counts the hits it yields."""
+
+    def __init__(self, hits: Iterable[Tuple[dict, Optional[CursorKey]]]) -> None:
+        self._hits = iter(hits)
+        self.count = 0
+
+    def __iter__(self) -> Iterator[Tuple[dict, Optional[CursorKey]]]:
+        for hit in self._hits:
+            self.count += 1
+            yield hit
+
+
+def _ndjson_lines(
+    hits: Iterable[Tuple[dict, Optional[CursorKey]]], query: str
+) -> Iterator[str]:
+    for row, key in hits:
+        rec = normalize_row(row)
+        rec["query"] = query
+        rec["cursor"] = encode_cursor(*key) if key else None
+        yield json.dumps(rec, ensure_ascii=False) + "\n"
 
 
 def main(argv=None) -> int:
@@ -37,15 +65,28 @@ def main(argv=None) -> int:
     )
     ap.add_argument(
         "--format",
-        choices=("tsv", "text", "plain"),
+        choices=("tsv", "text", "plain", "ndjson"),
         default="tsv",
-        help="tsv=tab table (default), text=TSV with # query header, plain=readable blocks",
+        help="tsv=tab table (default), text=TSV with # query header, plain=readable blocks, "
+        "ndjson=one JSON object per hit (with resume cursor)",
     )
     ap.add_argument(
         "--text",
         action="store_true",
         help="Shortcut for --format text (writes to -o or stdout)",
     )
+    ap.add_argument(
+        "--limit",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Stop each query after N hits (rows stream out as they are read)",
+    )
+    ap.add_argument(
+        "--cursor",
+        default=None,
+        help="Resume after this cursor (from --format ndjson output)",
+    )
     ap.add_argument(
         "--batch-summary",
         metavar="TSV",
@@ -72,31 +113,52 @@ def main(argv=None) -> int:
     fmt = "text" if args.text else args.format
 
     conn = sqlite3.connect(args.database)
-    conn.row_factory = sqlite3.Row
-    out_chunks: list[str] = []
+    fts = has_search_index(conn)
+    if args.output:
+        sink = open(args.output, "w", encoding="utf-8")
+    elif args.text or fmt in ("text", "plain", "ndjson"):
+        sink = sys.stdout
+    else:
+        sink = None
+    # Result text owns stdout when it streams there; status lines move to stderr.
+    status = sys.stderr if sink is sys.stdout else sys.stdout
     summary_rows: list[tuple[str, str, int]] = []
     rc = 0
-    for q in lines:
-        try:
-            plan = plan_dql(q)
-            cur = conn.execute(plan.sql, plan.params)
-            rows = [dict(r) for r in cur.fetchall()]
-            rows = apply_post_filters(rows, plan)
-            if fmt == "plain":
-                out_chunks.append(format_rows_plain(rows, query=q))
-            elif fmt in ("text", "tsv"):
-                out_chunks.append(
-                    format_rows_text(rows, query=q if fmt == "text" else "")
-                )
-            else:
-                out_chunks.append(format_rows_text(rows, query=""))
-            print(f"OK {q!r} -> {len(rows)} rows")
-            summary_rows.append((q, "OK", len(rows)))
-        except Exception as e:
-            print(f"FAIL {q!r}: {e}", file=sys.stderr)
-            summary_rows.append((q, f"FAIL: {e}", 0))
-            rc = 1
-    conn.close()
+    wrote_any = False
+    try:
+        for q in lines:
+            try:
+                plan = plan_dql(q, search_index=fts)
+                hits = iter_dql_rows(conn, plan, cursor=args.cursor)
+                if args.limit is not None:
+                    hits = islice(hits, args.limit)
+                counter = _Counter(hits)
+                rows = (row for row, _ in counter)
+                if fmt == "ndjson":
+                    chunks = _ndjson_lines(counter, q)
+                elif fmt == "plain":
+                    chunks = iter_rows_plain(rows, query=q)
+                else:
+                    chunks = iter_rows_text(rows, query=q if fmt == "text" else "")
+                first = True
+                for chunk in chunks:
+                    if sink is None:
+                        continue
+                    if first and wrote_any and fmt != "ndjson":
+                        sink.write("\n")
+                    first = False
+                    sink.write(chunk)
+                wrote_any = wrote_any or not first
+                print(f"OK {q!r} -> {counter.count} rows", file=status)
+                summary_rows.append((q, "OK", counter.count))
+            except Exception as e:
+                print(f"FAIL {q!r}: {e}", file=sys.stderr)
+                summary_rows.append((q, f"FAIL: {e}", 0))
+                rc = 1
+    finally:
+        conn.close()
+        if sink is not None and sink is not sys.stdout:
+            sink.close()
 
     if args.batch_summary and summary_rows:
         lines_out = ["query\tstatus\trow_count"]
@@ -106,11 +168,6 @@ def main(argv=None) -> int:
             "\n".join(lines_out) + "\n", encoding="utf-8"
         )
 
-    combined = "\n".join(s for s in out_chunks if s)
-    if args.output:
-        Path(args.output).write_text(combined, encoding="utf-8")
-    elif args.text or fmt in ("text", "plain"):
-        sys.stdout.write(combined)
     return rc
 
 
@@ -4,6 +4,7 @@
 from __future__ import annotations
 
 import argparse
+import os
 import sys
 
 from hch.apps.api.http_server import serve_forever
@@ -39,6 +40,19 @@ def main(argv=None) -> int:
         action="store_true",
         help="Do not open a browser tab automatically",
     )
+    ap.add_argument(
+        "--async",
+        dest="async_mode",
+        action="store_true",
+        help="asyncio server: pooled read-only connections, response cache, ETag, gzip "
+        "(for many concurrent users; env: HCH_WEB_ASYNC=1)",
+    )
+    ap.add_argument(
+        "--pool",
+        type=int,
+        default=0,
+        help="--async: read-only SQLite connections (0=auto; env: HCH_WEB_POOL)",
+    )
     args = ap.parse_args(argv)
     if args.browser and args.no_browser:
         ap.error("--browser and --no-browser are mutually exclusive")
@@ -54,6 +68,9 @@ def main(argv=None) -> int:
             host=args.host,
             port=args.port,
             open_browser=open_browser,
+            async_mode=args.async_mode
+            or os.environ.get("HCH_WEB_ASYNC", "").strip().lower() in ("1", "true", "yes"),
+            pool_size=args.pool or None,
         )
     except FileNotFoundError as e:
         print(e, file=sys.stderr)
@@ -10,11 +10,14 @@ from typing import Callable, Dict, List, Optional, Set, Tuple
 from hch.apps.index_progress import ProgressHeartbeat
 from hch.index.parallel_parse import (
     _CHECKPOINT_COMMIT_EVERY,
+    batches_by_bytes,
     resolve_index_jobs,
+    resolve_parse_pool,
     run_parallel_batches,
     run_skim_batches,
 )
-from hch.ingest.filelist import FilelistResult, parse_filelist_simple
+from hch.ingest.filelist import FilelistResult
+from hch.ingest.filelist_cache import parse_filelist_cached
 from hch.ingest.kit_blackbox import (
     kit_blackbox_meta,
     partition_sources,
@@ -65,11 +68,15 @@ def build_index_batched(
     max_depth: Optional[int] = None,
     depth_policy: Optional["ConditionalDepthPolicy"] = None,
     skim_parse: bool = True,
+    parse_pool: Optional[str] = None,
 ) -> HierarchyStore:
     """
     Ingest sources in batches; persist modules after each batch for resume.
+
+    ``parse_pool="process"`` parses in worker processes, with batches sized by
+    source bytes (``batch_size`` still caps files per batch).
     """
-    fl = parse_filelist_simple(filelist_path, index_cwd=index_cwd)
+    fl = parse_filelist_cached(filelist_path, index_cwd=index_cwd)
     if not fl.source_files:
         raise ValueError(f"No sources in filelist: {fl.errors}")
 
@@ -77,9 +84,8 @@ def build_index_batched(
     fl_key = str(Path(filelist_path).resolve())
 
     if force:
-        store.conn.execute("DELETE FROM instance_ports")
+        store.clear_instances()
         store.conn.execute("DELETE FROM modules")
-        store.conn.execute("DELETE FROM instances")
         store.conn.execute("DELETE FROM files WHERE filepath != ''")
         store.set_meta("checkpoint_files", "[]")
         store.set_meta("indexing_complete", "0")
@@ -165,9 +171,11 @@ def build_index_batched(
     store.set_meta("defines_json", json.dumps(defines), commit=False)
     store.set_meta("source_count", str(total), commit=False)
     worker_count = resolve_index_jobs(jobs)
+    pool_kind = resolve_parse_pool(parse_pool)
     store.set_meta("tier", "P", commit=False)
     store.set_meta("engine", "pyslang", commit=False)
     store.set_meta("index_jobs", str(worker_count), commit=False)
+    store.set_meta("index_parse_pool", pool_kind, commit=False)
     if max_depth is not None:
         store.set_meta("index_max_depth", str(max_depth), commit=False)
     if depth_policy is not None:
@@ -234,6 +242,8 @@ def build_index_batched(
     def _make_batches(paths: List[str]) -> List[Tuple[int, List[str]]]:
         if not paths:
             return []
+        if pool_kind == "process" and worker_count > 1:
+            return batches_by_bytes(paths, max_files=batch_size)
         return [
             (batch_idx, paths[i : i + batch_size])
             for batch_idx, i in enumerate(range(0, len(paths), batch_size), start=1)
@@ -293,6 +303,7 @@ def build_index_batched(
                 skim_batches,
                 defines=defines,
                 jobs=worker_count,
+                parse_pool=pool_kind,
                 on_batch_done=lambda idx, chunk, mods: _on_batch_done(
                     idx,
                     chunk,
@@ -308,7 +319,7 @@ def build_index_batched(
         if worker_count > 1:
             on_phase(
                 f"Parsing {len(pending_full)} anchor sources in {full_bs} batches "
-                f"({worker_count} workers)…"
+                f"({worker_count} {pool_kind} workers)…"
             )
         else:
             on_phase(f"Parsing {len(pending_full)} anchor sources in {full_bs} batches…")
@@ -327,6 +338,7 @@ def build_index_batched(
                 library_files=lib_files,
                 library_dirs=lib_dirs,
                 jobs=worker_count,
+                parse_pool=pool_kind,
                 on_batch_done=lambda idx, chunk, mods: _on_batch_done(
                     idx,
                     chunk,
@@ -346,32 +358,9 @@ def build_index_batched(
             f"Flattening hierarchy ({len(modules_acc)} modules, {total} sources)…"
         )
     store.clear_instances()
-    flatten_tops = list(top_modules) if top_modules else None
-    if top_module or top_modules:
-        primary = (top_modules[0] if top_modules else top_module) or top_module
-        store.set_meta("top_modules_json", json.dumps(top_modules or [top_module]))
-        store.set_meta("top_inference", "cli", commit=False)
-    else:
-        from hch.ingest.top_infer import resolve_index_tops
-
-        inferred = resolve_index_tops(modules_acc, fl, filelist_path)
-        primary = inferred.primary
-        flatten_tops = None
-        store.set_meta("top_modules_json", json.dumps([primary]), commit=False)
-        store.set_meta("top_modules_all_json", json.dumps(inferred.all_tops), commit=False)
-        store.set_meta("top_inference", inferred.method, commit=False)
-    from hch.ingest.kit_blackbox import flatten_roots_with_blackbox
-
-    bb_flatten_tops, bb_boundary = flatten_roots_with_blackbox(
-        modules_acc,
-        primary,
-        flatten_tops if flatten_tops else ([primary] if primary else None),
-        patterns,
+    primary, bb_flatten_tops, bb_boundary = resolve_flatten_roots(
+        store, modules_acc, fl, filelist_path, top_module, top_modules, patterns
     )
-    if bb_flatten_tops and bb_flatten_tops != (flatten_tops or []):
-        flatten_tops = bb_flatten_tops
-        store.set_meta("top_modules_json", json.dumps(bb_flatten_tops), commit=False)
-        store.set_meta("blackbox_orphan_roots_json", json.dumps(bb_flatten_tops[1:]), commit=False)
     with ProgressHeartbeat(hb, "Flattening hierarchy"):
         from hch.ingest.parse_depth import load_deepened_prefixes
 
@@ -398,4 +387,55 @@ def build_index_batched(
     store.set_meta("indexing_complete", "1")
     store.set_meta("instance_count", str(store.count_instances()))
     store.set_meta("module_count", str(store.count_modules()))
-    return store
\ No newline at end of file
+    from hch.index.incremental import record_source_manifest
+
+    record_source_manifest(
+        store,
+        fl,
+        tops=top_modules or ([top_module] if top_module else None),
+        blackbox_patterns=patterns,
+    )
+    return store
+
+
+def resolve_flatten_roots(
+    store: HierarchyStore,
+    modules_acc: Dict[str, ModuleRecord],
+    fl: FilelistResult,
+    filelist_path: str,
+    top_module: Optional[str],
+    top_modules: Optional[List[str]],
+    patterns: List[str],
+) -> Tuple[Optional[str], List[str], Optional[Set[str]]]:
+    """
+    ``(primary, flatten_tops, blackbox_boundary_roots)`` for the final flatten.
+
+    CLI tops win; otherwise tops are inferred.  Kit blackbox orphan roots are
+    appended.  Records ``top_modules_json`` / ``top_inference`` meta.
+    """
+    flatten_tops = list(top_modules) if top_modules else None
+    if top_module or top_modules:
+        primary = (top_modules[0] if top_modules else top_module) or top_module
+        store.set_meta("top_modules_json", json.dumps(top_modules or [top_module]))
+        store.set_meta("top_inference", "cli", commit=False)
+    else:
+        from hch.ingest.top_infer import resolve_index_tops
+
+        inferred = resolve_index_tops(modules_acc, fl, filelist_path)
+        primary = inferred.primary
+        flatten_tops = None
+        store.set_meta("top_modules_json", json.dumps([primary]), commit=False)
+        store.set_meta("top_modules_all_json", json.dumps(inferred.all_tops), commit=False)
+        store.set_meta("top_inference", inferred.method, commit=False)
+    from hch.ingest.kit_blackbox import flatten_roots_with_blackbox
+
+    bb_flatten_tops, bb_boundary = flatten_roots_with_blackbox(
+        modules_acc,
+        primary,
+        flatten_tops if flatten_tops else ([primary] if primary else None),
+        patterns,
+    )
+    if bb_flatten_tops and bb_flatten_tops != (flatten_tops or []):
+        store.set_meta("top_modules_json", json.dumps(bb_flatten_tops), commit=False)
+        store.set_meta("blackbox_orphan_roots_json", json.dumps(bb_flatten_tops[1:]), commit=False)
+    return primary, bb_flatten_tops, bb_boundary
\ No newline at end of file
@@ -9,7 +9,7 @@ from typing import Callable, Dict, List, Mapping, Optional, Sequence, Set, Tuple
 
 from hch.index.parallel_parse import resolve_index_jobs, run_parallel_batches
 from hch.index.store import HierarchyStore
-from hch.ingest.filelist import parse_filelist_simple
+from hch.ingest.filelist_cache import parse_filelist_cached
 from hch.ingest.hierarchy_build import elaborate_flat_with_sources
 from hch.ingest.merge import merge_module_records
 from hch.ingest.parse_depth import (
@@ -131,7 +131,7 @@ def deepen_branch(
 
         index_cwd = meta_rows.get("filelist_index_cwd") or None
         defines = json.loads(meta_rows.get("defines_json") or "{}")
-        fl = parse_filelist_simple(filelist, index_cwd=index_cwd)
+        fl = parse_filelist_cached(filelist, index_cwd=index_cwd)
         all_sources = [str(p.resolve()) for p in fl.source_files]
 
         depth_policy = _depth_policy_from_meta(meta_rows)
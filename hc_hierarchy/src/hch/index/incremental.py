@@ -0,0 +1,623 @@
+"""Incremental Tier P re-index: re-parse only sources whose content changed.
+
+Full Tier P builds record a source manifest in meta (``source_manifest_json``):
+size, mtime and content hash of every source and ``-v`` library file, of the
+include headers found in ``+incdir`` directories and of every file reached
+through an ``include`` directive, plus defines, tops and kit blackbox patterns.
+:func:`update_index` rehashes the current filelist (files whose size and mtime
+still match reuse the recorded hash), then
+
+* deletes the module records of changed / deleted sources and re-parses the
+  changed and added ones (with every other definition file of a module name
+  they touch, so multi-definition merges see all of them),
+* re-walks the module graph in memory (no parsing; the walk carries sibling
+  indices and top inference across subtrees, so it is not split per subtree),
+* and writes only the instance rows that differ: rows gone from the walk are
+  deleted, new or changed rows (including every row of a re-loaded module)
+  are replaced; untouched rows keep their ids.
+
+Anything that can change how *unchanged* sources parse — defines, incdirs,
+include headers, library files — and depth-limited, Tier E or ifdef-variant
+DBs raise :class:`FullRebuildRequired`; ``hch-index --update`` then rebuilds.
+
+Includes are found by scanning ``include`` directives (comments stripped,
+inactive ``ifdef`` branches included) in sources, library files and, in turn,
+the included files.  A name resolves like the parse resolves it: the including
+file's directory, then each ``+incdir``; failing both, every source directory
+that has it (batched parses add those as include dirs) is tracked.  Names that
+resolve nowhere are recorded so their later appearance is caught, and an
+include given by a macro (`` `include `HDR ``) cannot be tracked at all, so
+such a DB always rebuilds.
+
+``HCH_SOURCE_MANIFEST=0`` skips recording the manifest (and so hashing every
+source once more) on full builds.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+from hch.index.store import HierarchyStore
+from hch.ingest.filelist import FilelistResult
+from hch.ingest.flatten_tags import flat_inst_tags_dict
+from hch.ingest.text_instance_fallback import _strip_comments
+from hch.schema import FlatInstance, ModuleRecord
+
+SOURCE_MANIFEST_META = "source_manifest_json"
+MANIFEST_VERSION = 2
+HEADER_SUFFIXES = (".vh", ".svh", ".h", ".inc", ".svi")
+_INCLUDE_RE = re.compile(r'`\s*include\s*(?:"([^"]*)"|<([^>]*)>|`\s*(\w+))')
+UPDATE_BATCH_FILES = 32
+
+# size, mtime_ns, blake2b-128 hex
+FileStamp = Tuple[int, int, str]
+
+
+class FullRebuildRequired(ValueError):
+    """The DB cannot be updated in place; rebuild with ``hch-index --force``."""
+
+
+@dataclass(frozen=True)
+class UpdateResult:
+    files_added: int
+    files_changed: int
+    files_removed: int
+    files_parsed: int
+    modules_reloaded: int
+    instances_deleted: int
+    instances_written: int
+    instances_after: int
+
+
+def source_manifest_enabled() -> bool:
+    return os.environ.get("HCH_SOURCE_MANIFEST", "").strip().lower() not in (
+        "0",
+        "false",
+        "no",
+        "off",
+    )
+
+
+def _digest(path: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def stamp_files(
+    paths: Iterable[str],
+    previous: Optional[Mapping[str, Sequence]] = None,
+) -> Dict[str, FileStamp]:
+    """``{path: (size, mtime_ns, hash)}``; unchanged size + mtime reuse *previous*."""
+    prev = previous or {}
+    out: Dict[str, FileStamp] = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        old = prev.get(path)
+        if old and int(old[0]) == st.st_size and int(old[1]) == st.st_mtime_ns:
+            out[path] = (st.st_size, st.st_mtime_ns, str(old[2]))
+            continue
+        try:
+            out[path] = (st.st_size, st.st_mtime_ns, _digest(path))
+        except OSError:
+            continue
+    return out
+
+
+def _header_files(incdirs: Iterable[str], exclude: Set[str]) -> List[str]:
+    out: List[str] = []
+    for d in incdirs:
+        try:
+            entries = sorted(Path(d).iterdir())
+        except OSError:
+            continue
+        for p in entries:
+            if p.suffix.lower() in HEADER_SUFFIXES and p.is_file():
+                key = str(p.resolve())
+                if key not in exclude:
+                    out.append(key)
+    return out
+
+
+def _filelist_inputs(fl: FilelistResult) -> Tuple[List[str], List[str], List[str], List[str]]:
+    sources = [str(p.resolve()) for p in fl.source_files]
+    library = [str(p.resolve()) for p in fl.library_files]
+    incdirs = [str(p.resolve()) for p in fl.incdirs]
+    headers = _header_files(incdirs, set(sources) | set(library))
+    return sources, library, incdirs, headers
+
+
+def _include_specs(path: str) -> List[str]:
+    """``include`` names in *path*; a macro include comes back as `` `NAME``."""
+    try:
+        text = Path(path).read_text(encoding="utf-8", errors="ignore")
+    except OSError:
+        return []
+    if "include" not in text:
+        return []
+    return [
+        quoted or angled or f"`{macro}"
+        for quoted, angled, macro in _INCLUDE_RE.findall(_strip_comments(text))
+    ]
+
+
+def _resolve_include(
+    name: str,
+    from_file: str,
+    incdirs: Sequence[str],
+    source_dirs: Sequence[str],
+) -> List[str]:
+    for base in [str(Path(from_file).parent), *incdirs]:
+        cand = Path(base) / name
+        if cand.is_file():
+            return [str(cand.resolve())]
+    return sorted(
+        {str((Path(d) / name).resolve()) for d in source_dirs if (Path(d) / name).is_file()}
+    )
+
+
+def _include_closure(
+    roots: Mapping[str, FileStamp],
+    incdirs: Sequence[str],
+    headers: Dict[str, FileStamp],
+    previous: Mapping,
+) -> Tuple[Dict[str, list], List[str], List[str]]:
+    """
+    Follow ``include`` directives from *roots*, stamping reached files into *headers*.
+
+    Returns ``(specs, missing, untracked)``: per-file ``[hash, names]`` (reused
+    from *previous* while the hash matches), unresolved ``file: name`` pairs and
+    macro includes.
+    """
+    prev_specs = previous.get("include_specs") or {}
+    source_dirs = sorted({str(Path(p).parent) for p in roots})
+    specs: Dict[str, list] = {}
+    missing: List[str] = []
+    untracked: List[str] = []
+    stack = list(roots)
+    while stack:
+        path = stack.pop()
+        if path in specs:
+            continue
+        stamp = roots.get(path) or headers.get(path)
+        if stamp is None:
+            continue
+        old = prev_specs.get(path)
+        names = list(old[1]) if old and old[0] == stamp[2] else _include_specs(path)
+        specs[path] = [stamp[2], names]
+        for name in names:
+            if name.startswith("`"):
+                untracked.append(f"{path}: {name}")
+                continue
+            found = _resolve_include(name, path, incdirs, source_dirs)
+            if not found:
+                missing.append(f"{path}: {name}")
+            for inc in found:
+                if inc not in roots and inc not in headers:
+                    headers.update(stamp_files([inc], previous.get("headers")))
+                stack.append(inc)
+    return specs, sorted(set(missing)), sorted(set(untracked))
+
+
+def _build_manifest(
+    fl: FilelistResult,
+    *,
+    tops: Optional[Sequence[str]],
+    stubs: bool,
+    blackbox_patterns: Sequence[str],
+    previous: Optional[Mapping] = None,
+) -> dict:
+    sources, library, incdirs, headers = _filelist_inputs(fl)
+    prev = previous or {}
+    source_stamps = stamp_files(sources, prev.get("sources"))
+    library_stamps = stamp_files(library, prev.get("library"))
+    header_stamps = stamp_files(headers, prev.get("headers"))
+    include_specs, missing, untracked = _include_closure(
+        {**library_stamps, **source_stamps}, incdirs, header_stamps, prev
+    )
+    return {
+        "version": MANIFEST_VERSION,
+        "tops": list(tops) if tops else None,
+        "stubs": stubs,
+        "blackbox_patterns": list(blackbox_patterns),
+        "defines": dict(fl.defines),
+        "incdirs": incdirs,
+        "library_dirs": [str(p.resolve()) for p in fl.library_dirs],
+        "sources": source_stamps,
+        "library": library_stamps,
+        "headers": header_stamps,
+        "include_specs": include_specs,
+        "missing_includes": missing,
+        "untracked_includes": untracked,
+    }
+
+
+def record_source_manifest(
+    store: HierarchyStore,
+    fl: FilelistResult,
+    *,
+    tops: Optional[Sequence[str]] = None,
+    stubs: bool = False,
+    blackbox_patterns: Sequence[str] = (),
+) -> None:
+    """
+    Store the source manifest after a full Tier P build.
+
+    *tops* are the CLI tops (``None`` when inferred); *stubs* records whether
+    the build added ``unresolved`` module stubs (unbatched builds do).
+    """
+    if not source_manifest_enabled():
+        store.conn.execute("DELETE FROM meta WHERE key = ?", (SOURCE_MANIFEST_META,))
+        store.conn.commit()
+        return
+    manifest = _build_manifest(
+        fl, tops=tops, stubs=stubs, blackbox_patterns=blackbox_patterns
+    )
+    store.set_meta(SOURCE_MANIFEST_META, json.dumps(manifest))
+
+
+def load_source_manifest(store: HierarchyStore) -> Optional[dict]:
+    raw = store.get_meta(SOURCE_MANIFEST_META)
+    if not raw:
+        return None
+    try:
+        manifest = json.loads(raw)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def _check_updatable(meta: Mapping[str, str], manifest: Optional[dict], fl_key: str) -> None:
+    if meta.get("indexing_complete") != "1":
+        raise FullRebuildRequired("index incomplete")
+    if manifest is None:
+        raise FullRebuildRequired("no source manifest in DB meta")
+    if meta.get("tier") != "P" or meta.get("variants_json"):
+        raise FullRebuildRequired("only single-configuration Tier P indexes update in place")
+    if meta.get("filelist") != fl_key:
+        raise FullRebuildRequired(f"DB built from a different filelist ({meta.get('filelist')})")
+    depth_keys = (
+        "index_max_depth",
+        "depth_anchor_patterns_json",
+        "depth_anchor_inst_json",
+        "depth_anchor_module_json",
+    )
+    if any(meta.get(k) not in (None, "", "[]") for k in depth_keys):
+        raise FullRebuildRequired("depth-limited index (parse scope depends on the hierarchy)")
+
+
+def _changed_inputs(manifest: dict, current: dict) -> List[str]:
+    reasons = []
+    for key in ("defines", "incdirs", "library_dirs", "missing_includes"):
+        if manifest.get(key) != current.get(key):
+            reasons.append(key)
+    for key in ("library", "headers"):
+        old = {p: s[2] for p, s in (manifest.get(key) or {}).items()}
+        new = {p: s[2] for p, s in current[key].items()}
+        if old != new:
+            reasons.append(key)
+    return reasons
+
+
+def _modules_by_file(store: HierarchyStore) -> Dict[str, List[Tuple[int, str, str]]]:
+    """``{resolved definition file: [(modules.id, name, kind), ...]}``."""
+    out: Dict[str, List[Tuple[int, str, str]]] = {}
+    for mid, name, kind, fpath in store.conn.execute(
+        """
+        SELECT m.id, m.module_name, COALESCE(m.module_kind, 'module'), f.filepath
+        FROM modules m LEFT JOIN files f ON f.id = m.definition_file_id
+        """
+    ):
+        key = str(Path(fpath).resolve()) if fpath else ""
+        out.setdefault(key, []).append((int(mid), name, kind))
+    return out
+
+
+def _row_signature(inst: FlatInstance) -> tuple:
+    """Column values :meth:`HierarchyStore.load_instances` would write for *inst*."""
+    return (
+        inst.name,
+        inst.module,
+        inst.depth,
+        inst.parent_path,
+        inst.file or None,
+        json.dumps(inst.ports) if inst.ports else "[]",
+        json.dumps(inst.param_overrides) if inst.param_overrides else "{}",
+        int(getattr(inst, "variant_mask", 0) or 0),
+        json.dumps(flat_inst_tags_dict(inst)),
+        getattr(inst, "child_kind", "") or "module",
+    )
+
+
+def _diff_rows(
+    store: HierarchyStore,
+    flat: Sequence[FlatInstance],
+    stale_module_ids: Set[int],
+) -> Tuple[List[int], List[FlatInstance]]:
+    """
+    ``(ids to delete, rows to write)`` turning the stored rows into *flat*.
+
+    Rows that changed are deleted too and written as new rows, so a row whose
+    module no longer resolves disappears as it would in a full build.
+    """
+    new: Dict[Tuple[str, str], FlatInstance] = {}
+    for inst in flat:
+        new[(getattr(inst, "variant", "") or "", inst.full_path)] = inst
+    delete: List[int] = []
+    same: Set[Tuple[str, str]] = set()
+    for row in store.conn.execute(
+        """
+        SELECT i.id, i.variant, i.full_path, i.module_id, COALESCE(i.module_ref, ''),
+               i.inst_leaf_name, m.module_name, i.depth, i.parent_path, f.filepath,
+               i.port_json, i.param_json, i.variant_mask, i.inst_tags_json, i.child_kind
+        FROM instances i
+        LEFT JOIN modules m ON m.id = i.module_id
+        LEFT JOIN files f ON f.id = i.filepath_id
+        """
+    ):
+        iid, variant, path, module_id, ref = row[:5]
+        inst = new.get((variant, path))
+        new_ref = (getattr(inst, "module_ref", "") or "") if inst is not None else ""
+        if (
+            inst is not None
+            and int(module_id) not in stale_module_ids
+            and (not new_ref or new_ref == ref)
+            and tuple(row[5:]) == _row_signature(inst)
+        ):
+            same.add((variant, path))
+        else:
+            delete.append(int(iid))
+    write = [inst for key, inst in new.items() if key not in same]
+    return delete, write
+
+
+def update_index(
+    filelist_path: str,
+    db_path: str,
+    *,
+    index_cwd: Optional[str] = None,
+    jobs: int = 0,
+    parse_pool: Optional[str] = None,
+    on_phase: Optional[Callable[[str], None]] = None,
+) -> UpdateResult:
+    """
+    Bring a complete Tier P index up to date with the sources on disk.
+
+    Raises :class:`FullRebuildRequired` when the change cannot be applied in
+    place (see module docstring); the DB is left untouched in that case.
+    """
+    from hch.index.batched_loader import resolve_flatten_roots
+    from hch.index.parallel_parse import (
+        batches_by_bytes,
+        resolve_index_jobs,
+        resolve_parse_pool,
+        run_parallel_batches,
+    )
+    from hch.ingest.filelist_cache import parse_filelist_cached
+    from hch.ingest.hierarchy_build import elaborate_flat_with_sources
+    from hch.ingest.kit_blackbox import (
+        partition_sources,
+        reapply_kit_blackbox_overlay,
+        scan_kit_blackbox_modules,
+    )
+    from hch.ingest.merge import merge_module_records
+    from hch.ingest.multi_def import definition_paths_for_record
+    from hch.ingest.unresolved import ensure_unresolved_module_stubs
+
+    def _phase(msg: str) -> None:
+        if on_phase:
+            on_phase(msg)
+
+    fl_key = str(Path(filelist_path).resolve())
+    store = HierarchyStore(db_path)
+    try:
+        meta = {r[0]: r[1] for r in store.conn.execute("SELECT key, value FROM meta")}
+        manifest = load_source_manifest(store)
+        _check_updatable(meta, manifest, fl_key)
+        assert manifest is not None
+        cwd = index_cwd or meta.get("filelist_index_cwd") or None
+        fl = parse_filelist_cached(filelist_path, index_cwd=cwd)
+        if not fl.source_files:
+            raise FullRebuildRequired(f"No sources in filelist: {fl.errors}")
+        patterns = list(manifest.get("blackbox_patterns") or [])
+        current = _build_manifest(
+            fl,
+            tops=manifest.get("tops"),
+            stubs=bool(manifest.get("stubs")),
+            blackbox_patterns=patterns,
+            previous=manifest,
+        )
+        untracked = current["untracked_includes"]
+        if untracked:
+            raise FullRebuildRequired(
+                f"include given by a macro cannot be tracked ({untracked[0]})"
+            )
+        reasons = _changed_inputs(manifest, current)
+        if reasons:
+            raise FullRebuildRequired(f"changed: {', '.join(reasons)}")
+
+        old_src = {p: s[2] for p, s in manifest["sources"].items()}
+        new_src = {p: s[2] for p, s in current["sources"].items()}
+        added = [p for p in new_src if p not in old_src]
+        changed = [p for p in new_src if p in old_src and new_src[p] != old_src[p]]
+        removed = [p for p in old_src if p not in new_src]
+        _phase(
+            f"Sources: {len(added)} added, {len(changed)} changed, {len(removed)} removed"
+        )
+        order = {p: i for i, p in enumerate(new_src)}
+        rank = lambda p: order.get(p, len(order))  # noqa: E731
+        by_file = _modules_by_file(store)
+        files_by_name: Dict[str, Set[str]] = {}
+        for fpath, mods in by_file.items():
+            for _mid, name, kind in mods:
+                if kind != "unresolved" and fpath in new_src:
+                    files_by_name.setdefault(name, set()).add(fpath)
+
+        defines = dict(fl.defines)
+        kit_set = set(partition_sources(list(new_src), patterns)[1])
+        worker_count = resolve_index_jobs(jobs)
+        pool_kind = resolve_parse_pool(parse_pool)
+        parsed: Dict[str, Dict[str, ModuleRecord]] = {}
+        parsed_sources: List[str] = []
+
+        def _parse(paths: List[str]) -> None:
+            parsed_sources.extend(paths)
+            kit = [p for p in paths if p in kit_set]
+            rest = [p for p in paths if p not in kit_set]
+            for path, mods in _split_by_file(scan_kit_blackbox_modules(kit, defines=defines), kit):
+                parsed[path] = mods
+            if not rest:
+                return
+            run_parallel_batches(
+                batches_by_bytes(rest, max_files=UPDATE_BATCH_FILES),
+                include_dirs=current["incdirs"],
+                defines=defines,
+                library_files=list(current["library"]),
+                library_dirs=current["library_dirs"],
+                jobs=worker_count,
+                parse_pool=pool_kind,
+                on_batch_done=lambda _i, chunk, mods: parsed.update(
+                    _split_by_file(mods, chunk)
+                ),
+            )
+
+        # Files whose module rows are replaced: edited / deleted sources plus,
+        # transitively, every other definition file of a module name involved.
+        dirty: Set[str] = set(added) | set(changed) | set(removed)
+        pending = added + changed
+        while pending:
+            _phase(f"Parsing {len(pending)} sources (pyslang)…")
+            _parse(sorted(pending, key=rank))
+            names = {
+                n for p in dirty for _m, n, k in by_file.get(p, ()) if k != "unresolved"
+            }
+            for path, mods in parsed.items():
+                if path in dirty:  # not -v library records pulled in by the parse
+                    names.update(mods)
+            extra = {f for n in names for f in files_by_name.get(n, ())} - dirty
+            pending = list(extra)
+            dirty |= extra
+
+        stale: Set[int] = {mid for p in dirty for mid, _n, _k in by_file.get(p, ())}
+        store.conn.executemany(
+            "DELETE FROM modules WHERE id = ?", [(mid,) for mid in sorted(stale)]
+        )
+        modules_acc = store.load_all_modules()
+        fresh: Dict[str, ModuleRecord] = {}
+        for path in sorted(dirty & set(parsed), key=rank):
+            merge_module_records(fresh, parsed[path])
+        # Stubs of names that are now defined must not merge with the definition.
+        stub_names = {n for n, r in modules_acc.items() if r.module_kind == "unresolved"}
+        for name in stub_names & set(fresh):
+            del modules_acc[name]
+        merge_module_records(modules_acc, fresh)
+        if patterns:
+            reapply_kit_blackbox_overlay(
+                modules_acc,
+                {n: r for n, r in modules_acc.items() if r.is_blackbox},
+                sorted(kit_set),
+                patterns,
+            )
+        referenced = {e.child_module for r in modules_acc.values() for e in r.instances}
+        for name in stub_names - referenced:
+            modules_acc.pop(name, None)
+        dropped = {n for n in stub_names if n not in modules_acc or n in fresh}
+        stub_ids = [
+            mid
+            for mods in by_file.values()
+            for mid, name, kind in mods
+            if kind == "unresolved" and name in dropped and mid not in stale
+        ]
+        store.conn.executemany("DELETE FROM modules WHERE id = ?", [(m,) for m in stub_ids])
+        stale.update(stub_ids)
+        kept = (stub_names - dropped) | {
+            n for n in modules_acc if n not in fresh and n not in stub_names
+        }
+        if manifest.get("stubs"):
+            ensure_unresolved_module_stubs(modules_acc)
+        reload = {n: r for n, r in modules_acc.items() if n not in kept}
+        multi_paths = {
+            n: definition_paths_for_record(r)
+            for n, r in reload.items()
+            if len(definition_paths_for_record(r)) > 1
+        }
+        store.load_modules(reload.values(), commit=False, multi_def_paths_by_name=multi_paths)
+
+        _phase(f"Re-flattening hierarchy ({len(modules_acc)} modules)…")
+        tops = manifest.get("tops") or []
+        primary, flatten_tops, boundary = resolve_flatten_roots(
+            store,
+            modules_acc,
+            fl,
+            filelist_path,
+            tops[0] if tops else None,
+            tops or None,
+            patterns,
+        )
+        flat, hierarchy_source, path_augmented = elaborate_flat_with_sources(
+            modules_acc,
+            sources=list(new_src),
+            top_module=primary if len(flatten_tops) == 1 else None,
+            top_modules=flatten_tops if len(flatten_tops) != 1 else None,
+            path_hierarchy_mode=meta.get("path_hierarchy_mode", "auto"),
+            blackbox_boundary_roots=boundary,
+        )
+        delete, write = _diff_rows(store, flat, stale)
+        write = [inst for inst in write if inst.module in modules_acc]  # else never stored
+        _phase(f"Writing instances: {len(delete)} deleted, {len(write)} written")
+        with store.deferred_tree_encoding():
+            store.delete_instances(delete, commit=False)
+            store.load_instances(write, commit=False)
+
+        store.set_meta("hierarchy_source", hierarchy_source, commit=False)
+        store.set_meta(
+            "path_hierarchy_used", "1" if hierarchy_source == "path" else "0", commit=False
+        )
+        store.set_meta("path_augmented", path_augmented, commit=False)
+        store.set_meta("source_count", str(len(new_src)), commit=False)
+        store.set_meta("instance_count", str(store.count_instances()), commit=False)
+        store.set_meta("module_count", str(store.count_modules()), commit=False)
+        store.set_meta(
+            "update_count", str(int(meta.get("update_count") or "0") + 1), commit=False
+        )
+        store.set_meta(SOURCE_MANIFEST_META, json.dumps(current), commit=False)
+        store.conn.commit()
+        return UpdateResult(
+            files_added=len(added),
+            files_changed=len(changed),
+            files_removed=len(removed),
+            files_parsed=len(parsed_sources),
+            modules_reloaded=len(reload),
+            instances_deleted=len(delete),
+            instances_written=len(write),
+            instances_after=store.count_instances(),
+        )
+    except BaseException:
+        store.conn.rollback()
+        raise
+    finally:
+        store.close()
+
+
+def _split_by_file(
+    mods: Mapping[str, ModuleRecord], chunk: Sequence[str]
+) -> List[Tuple[str, Dict[str, ModuleRecord]]]:
+    """Group one batch's records by definition file (files with none map to ``{}``)."""
+    out: Dict[str, Dict[str, ModuleRecord]] = {p: {} for p in chunk}
+    for name, rec in mods.items():
+        key = str(Path(rec.file_path).resolve()) if rec.file_path else ""
+        out.setdefault(key, {})[name] = rec
+    return list(out.items())
@@ -64,6 +64,7 @@ def build_index_from_filelist(
     on_phase: Optional[Callable[[str], None]] = None,
     index_cwd: Optional[str] = None,
     jobs: int = 0,
+    parse_pool: Optional[str] = None,
     blackbox_paths: Optional[Sequence[str]] = None,
     max_depth: Optional[int] = None,
     depth_anchor_patterns: Optional[Sequence[str]] = None,
@@ -197,6 +198,7 @@ def build_index_from_filelist(
             index_cwd=str(cwd),
             slang_cache_path=slang_cache_path,
             jobs=jobs,
+            parse_pool=parse_pool,
             blackbox_path_patterns=bb_patterns,
             max_depth=max_depth,
             depth_policy=depth_policy,
@@ -387,7 +389,7 @@ def build_index_from_filelist(
     use_single_top = len(bb_flatten_tops) == 1
 
     _phase("Flattening hierarchy and writing SQLite…")
-    return build_index_from_modules(
+    store = build_index_from_modules(
         modules,
         db_path,
         top_module=bb_flatten_tops[0] if use_single_top else None,
@@ -399,6 +401,12 @@ def build_index_from_filelist(
         conditional_depth=depth_policy,
         blackbox_boundary_roots=bb_boundary,
     )
+    from hch.index.incremental import record_source_manifest
+
+    record_source_manifest(
+        store, fl, tops=user_tops, stubs=True, blackbox_patterns=bb_patterns
+    )
+    return store
 
 
 def _apply_flatten_meta(store: HierarchyStore) -> None:
@@ -1,15 +1,40 @@
-"""Ninja-style parallel batch parsing for Tier P indexing."""
+"""Ninja-style parallel batch parsing for Tier P indexing.
+
+Two pool kinds (``--parse-pool`` / ``HCH_PARSE_POOL``):
+
+* ``thread`` (default) — workers share the interpreter; pyslang's C++ parse
+  runs in parallel but the Python-side tree walk and text skim hold the GIL.
+* ``process`` — spawned workers parse a batch each and return only picklable
+  ``ModuleRecord`` dicts (never syntax trees).  Use :func:`batches_by_bytes` so
+  one batch of huge files does not stall the pool.
+
+Either way ``on_batch_done`` runs on the calling thread as batches finish, so
+the SQLite store is only ever touched from there.
+"""
 
 from __future__ import annotations
 
+import multiprocessing
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
 from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
 
 from hch.schema import ModuleRecord
 
 _CHECKPOINT_COMMIT_EVERY = 4
 
+PARSE_POOLS = ("thread", "process")
+DEFAULT_BATCH_BYTES = 4 << 20
+
+BatchDone = Callable[[int, List[str], Dict[str, ModuleRecord]], None]
+
 
 def resolve_index_jobs(jobs: int) -> int:
     """Map CLI --jobs to worker count (0 = auto, capped at 32)."""
@@ -20,6 +45,47 @@ def resolve_index_jobs(jobs: int) -> int:
     return jobs
 
 
+def resolve_parse_pool(pool: Optional[str] = None) -> str:
+    """CLI --parse-pool, else ``HCH_PARSE_POOL``, else ``thread``."""
+    raw = (pool or os.environ.get("HCH_PARSE_POOL") or "thread").strip().lower()
+    if raw not in PARSE_POOLS:
+        raise ValueError(f"--parse-pool must be one of {', '.join(PARSE_POOLS)} (got {raw!r})")
+    return raw
+
+
+def batches_by_bytes(
+    paths: Sequence[str],
+    *,
+    target_bytes: int = DEFAULT_BATCH_BYTES,
+    max_files: int = 0,
+    start: int = 1,
+) -> List[Tuple[int, List[str]]]:
+    """
+    Split *paths* (order kept) into batches of about *target_bytes* source text.
+
+    A file larger than the target gets a batch of its own; *max_files* > 0 also
+    caps files per batch.  Unreadable paths count as empty.
+    """
+    batches: List[Tuple[int, List[str]]] = []
+    chunk: List[str] = []
+    size = 0
+    for path in paths:
+        try:
+            nbytes = os.path.getsize(path)
+        except OSError:
+            nbytes = 0
+        if chunk and (
+            size + nbytes > target_bytes or (max_files > 0 and len(chunk) >= max_files)
+        ):
+            batches.append((start + len(batches), chunk))
+            chunk, size = [], 0
+        chunk.append(path)
+        size += nbytes
+    if chunk:
+        batches.append((start + len(batches), chunk))
+    return batches
+
+
 def _parse_source_batch(
     chunk: Sequence[str],
     include_dirs: Sequence[str],
@@ -38,6 +104,68 @@ def _parse_source_batch(
     )
 
 
+def _process_worker_init(max_generate_loop: int) -> None:
+    # Spawned workers start from module defaults; carry over the CLI cap.
+    from hch.ingest.generate_unroll import set_max_generate_loop
+
+    set_max_generate_loop(max_generate_loop)
+
+
+def _process_pool(jobs: int) -> ProcessPoolExecutor:
+    from hch.ingest import generate_unroll
+
+    return ProcessPoolExecutor(
+        max_workers=jobs,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_process_worker_init,
+        initargs=(generate_unroll._max_generate_loop,),
+    )
+
+
+def _run_batches(
+    worker: Callable[..., Dict[str, ModuleRecord]],
+    batches: List[Tuple[int, List[str]]],
+    args: Tuple[object, ...],
+    *,
+    jobs: int,
+    pool: str,
+    on_batch_done: BatchDone,
+) -> None:
+    if jobs <= 1 or len(batches) <= 1:
+        for batch_idx, chunk in batches:
+            on_batch_done(batch_idx, chunk, worker(chunk, *args))
+        return
+
+    executor: Executor
+    if resolve_parse_pool(pool) == "process":
+        executor = _process_pool(jobs)
+    else:
+        executor = ThreadPoolExecutor(max_workers=jobs)
+    # Keep a bounded window in flight so finished results (and, for processes,
+    # their unpickled records) do not pile up ahead of on_batch_done.
+    window = 2 * jobs
+    pending = iter(batches)
+    running: Dict[Future, Tuple[int, List[str]]] = {}
+    with executor:
+        try:
+            while True:
+                while len(running) < window:
+                    nxt = next(pending, None)
+                    if nxt is None:
+                        break
+                    running[executor.submit(worker, nxt[1], *args)] = nxt
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    batch_idx, chunk = running.pop(future)
+                    on_batch_done(batch_idx, chunk, future.result())
+        except BaseException:
+            for future in running:
+                future.cancel()
+            raise
+
+
 def run_parallel_batches(
     batches: List[Tuple[int, List[str]]],
     *,
@@ -46,32 +174,18 @@ def run_parallel_batches(
     library_files: List[str],
     library_dirs: List[str],
     jobs: int,
-    on_batch_done: Callable[[int, List[str], Dict[str, ModuleRecord]], None],
+    on_batch_done: BatchDone,
+    parse_pool: str = "thread",
 ) -> None:
     """Parse batches with a fixed worker pool; persist results on the main thread."""
-    if jobs <= 1 or len(batches) <= 1:
-        for batch_idx, chunk in batches:
-            mods = _parse_source_batch(
-                chunk, include_dirs, defines, library_files, library_dirs
-            )
-            on_batch_done(batch_idx, chunk, mods)
-        return
-
-    with ThreadPoolExecutor(max_workers=jobs) as pool:
-        future_map = {
-            pool.submit(
-                _parse_source_batch,
-                chunk,
-                include_dirs,
-                defines,
-                library_files,
-                library_dirs,
-            ): (batch_idx, chunk)
-            for batch_idx, chunk in batches
-        }
-        for future in as_completed(future_map):
-            batch_idx, chunk = future_map[future]
-            on_batch_done(batch_idx, chunk, future.result())
+    _run_batches(
+        _parse_source_batch,
+        batches,
+        (include_dirs, defines, library_files, library_dirs),
+        jobs=jobs,
+        pool=parse_pool,
+        on_batch_done=on_batch_done,
+    )
 
 
 def _skim_source_batch(
@@ -88,20 +202,15 @@ def run_skim_batches(
     *,
     defines: Optional[Mapping[str, str]] = None,
     jobs: int,
-    on_batch_done: Callable[[int, List[str], Dict[str, ModuleRecord]], None],
+    on_batch_done: BatchDone,
+    parse_pool: str = "thread",
 ) -> None:
     """Text-only skim ingest in parallel batches (no pyslang)."""
-    if jobs <= 1 or len(batches) <= 1:
-        for batch_idx, chunk in batches:
-            mods = _skim_source_batch(chunk, defines)
-            on_batch_done(batch_idx, chunk, mods)
-        return
-
-    with ThreadPoolExecutor(max_workers=jobs) as pool:
-        future_map = {
-            pool.submit(_skim_source_batch, chunk, defines): (batch_idx, chunk)
-            for batch_idx, chunk in batches
-        }
-        for future in as_completed(future_map):
-            batch_idx, chunk = future_map[future]
-            on_batch_done(batch_idx, chunk, future.result())
\ No newline at end of file
+    _run_batches(
+        _skim_source_batch,
+        batches,
+        (dict(defines) if defines is not None else None,),
+        jobs=jobs,
+        pool=parse_pool,
+        on_batch_done=on_batch_done,
+    )
@@ -0,0 +1,337 @@
+"""Path-dictionary instance schema: integer-keyed rows over interned path text.
+
+The flat ``instances`` table stores ``full_path``, ``parent_path`` and
+``inst_leaf_name`` as text on every row and again in four text indexes.  A
+path-dictionary DB keeps each string once:
+
+``inst_names``
+    interned leaf names
+``inst_paths``
+    one row per distinct path: ``parent_id``, ``name_id`` and ``path``, the
+    materialized full path (unique; the only full-path text in the DB)
+``instance_rows``
+    the per-instance columns with ``path_id`` in place of the three strings;
+    ``id`` is the old ``instances.id``, so ports, ``instance_tree`` and the
+    FTS index keep pointing at the same rows
+
+``instances`` becomes a view with the flat table's columns, so readers and
+compiled DQL run unchanged; :class:`~hch.index.store.HierarchyStore` writes the
+base tables through :class:`PathInterner`.  Parent lookups go
+``inst_paths.path`` -> ``parent_id`` index, so ``parent_path = ?`` stays an
+index search.  The planner needs ``ANALYZE`` statistics to drive path-ordered
+scans from ``inst_paths`` (otherwise paged DQL sorts the whole result), so
+every conversion and load refreshes them.
+
+Opt-in (smaller file, slower scans): ``hch-index --path-dict`` converts after
+indexing, ``HCH_PATH_DICT=1`` makes ``HierarchyStore._migrate`` convert on
+open and ``HCH_PATH_DICT=0`` converts back.  ``scripts/bench_path_dict.py``
+compares size and query latency of both layouts.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+from hch.index.schema_sql import INSTANCES_SQL
+
+PATH_DICT_META = "instance_schema"
+PATH_DICT_KIND = "path_dict_v1"
+
+# Column order of a fully migrated flat ``instances`` table.
+INSTANCE_COLUMNS = (
+    "id",
+    "full_path",
+    "inst_leaf_name",
+    "module_id",
+    "depth",
+    "parent_path",
+    "filepath_id",
+    "port_json",
+    "param_json",
+    "variant",
+    "variant_mask",
+    "module_ref",
+    "inst_tags_json",
+    "child_kind",
+)
+# instance_rows columns after (id, path_id).
+ROW_COLUMNS = (
+    "module_id",
+    "depth",
+    "filepath_id",
+    "port_json",
+    "param_json",
+    "variant",
+    "variant_mask",
+    "module_ref",
+    "inst_tags_json",
+    "child_kind",
+)
+
+PATH_DICT_TABLES_SQL = """
+CREATE TABLE IF NOT EXISTS inst_names (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS inst_paths (
+    id INTEGER PRIMARY KEY,
+    parent_id INTEGER,
+    name_id INTEGER,
+    path TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS instance_rows (
+    id INTEGER PRIMARY KEY,
+    path_id INTEGER NOT NULL,
+    module_id INTEGER NOT NULL,
+    depth INTEGER NOT NULL,
+    filepath_id INTEGER,
+    port_json TEXT,
+    param_json TEXT,
+    variant TEXT NOT NULL DEFAULT '',
+    variant_mask INTEGER NOT NULL DEFAULT 0,
+    module_ref TEXT,
+    inst_tags_json TEXT,
+    child_kind TEXT DEFAULT 'module',
+    FOREIGN KEY (path_id) REFERENCES inst_paths(id),
+    FOREIGN KEY (module_id) REFERENCES modules(id),
+    FOREIGN KEY (filepath_id) REFERENCES files(id)
+)
+"""
+
+PATH_DICT_INDEX_SQL = """
+CREATE UNIQUE INDEX IF NOT EXISTS idx_instance_rows_path ON instance_rows(path_id, variant);
+CREATE INDEX IF NOT EXISTS idx_instance_rows_module_id ON instance_rows(module_id);
+CREATE INDEX IF NOT EXISTS idx_instance_rows_depth ON instance_rows(depth);
+CREATE INDEX IF NOT EXISTS idx_instance_rows_module_ref ON instance_rows(module_ref);
+CREATE INDEX IF NOT EXISTS idx_inst_paths_parent ON inst_paths(parent_id);
+CREATE INDEX IF NOT EXISTS idx_inst_paths_name ON inst_paths(name_id)
+"""
+
+INSTANCES_VIEW_SQL = """
+CREATE VIEW instances AS
+SELECT r.id AS id, p.path AS full_path, n.name AS inst_leaf_name,
+       r.module_id AS module_id, r.depth AS depth, pp.path AS parent_path,
+       r.filepath_id AS filepath_id, r.port_json AS port_json,
+       r.param_json AS param_json, r.variant AS variant,
+       r.variant_mask AS variant_mask, r.module_ref AS module_ref,
+       r.inst_tags_json AS inst_tags_json, r.child_kind AS child_kind
+FROM instance_rows r
+JOIN inst_paths p ON p.id = r.path_id
+LEFT JOIN inst_names n ON n.id = p.name_id
+LEFT JOIN inst_paths pp ON pp.id = p.parent_id
+"""
+
+
+def _statements(script: str) -> List[str]:
+    return [s.strip() for s in script.split(";") if s.strip()]
+
+
+def is_path_dict(conn: sqlite3.Connection) -> bool:
+    """``instances`` is the path-dictionary view."""
+    return (
+        conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'view' AND name = 'instances'"
+        ).fetchone()
+        is not None
+    )
+
+
+def path_dict_wanted() -> Optional[bool]:
+    """``HCH_PATH_DICT``: ``1`` converts on open, ``0`` converts back, unset keeps the DB as is."""
+    raw = os.environ.get("HCH_PATH_DICT", "").strip().lower()
+    if raw in ("1", "true", "yes", "on"):
+        return True
+    if raw in ("0", "false", "no", "off"):
+        return False
+    return None
+
+
+def analyze_path_dict(conn: sqlite3.Connection) -> None:
+    """Refresh planner statistics for the dictionary tables (sampled)."""
+    conn.execute("PRAGMA analysis_limit=1000")
+    for table in ("inst_names", "inst_paths", "instance_rows"):
+        conn.execute(f"ANALYZE {table}")
+
+
+def clear_path_dict(conn: sqlite3.Connection) -> None:
+    for table in ("instance_rows", "inst_paths", "inst_names"):
+        conn.execute(f"DELETE FROM {table}")
+
+
+def convert_to_path_dict(conn: sqlite3.Connection, *, commit: bool = True) -> int:
+    """Move a flat ``instances`` table into the dictionary tables; returns rows moved."""
+    if is_path_dict(conn):
+        return 0
+    for stmt in _statements(PATH_DICT_TABLES_SQL):
+        conn.execute(stmt)
+    conn.execute(
+        "INSERT INTO inst_names (name) SELECT DISTINCT inst_leaf_name FROM instances"
+    )
+    conn.execute(
+        """
+        INSERT INTO inst_paths (path, name_id)
+        SELECT x.full_path, n.id
+        FROM (
+            SELECT full_path, MIN(inst_leaf_name) AS leaf, MIN(id) AS first_id
+            FROM instances GROUP BY full_path
+        ) x
+        JOIN inst_names n ON n.name = x.leaf
+        ORDER BY x.first_id
+        """
+    )
+    # Parents that are not instances themselves (partial hierarchies).
+    conn.execute(
+        """
+        INSERT OR IGNORE INTO inst_paths (path)
+        SELECT DISTINCT parent_path FROM instances
+        WHERE parent_path IS NOT NULL AND parent_path != ''
+        """
+    )
+    conn.execute(
+        """
+        UPDATE inst_paths SET parent_id = (
+            SELECT pp.id FROM instances i
+            JOIN inst_paths pp ON pp.path = i.parent_path
+            WHERE i.full_path = inst_paths.path
+            ORDER BY i.id LIMIT 1
+        )
+        WHERE name_id IS NOT NULL
+        """
+    )
+    cols = ", ".join(f"i.{c}" for c in ROW_COLUMNS)
+    moved = conn.execute(
+        f"""
+        INSERT INTO instance_rows (id, path_id, {", ".join(ROW_COLUMNS)})
+        SELECT i.id, p.id, {cols}
+        FROM instances i JOIN inst_paths p ON p.path = i.full_path
+        """
+    ).rowcount
+    conn.execute("DROP TABLE instances")
+    conn.execute(INSTANCES_VIEW_SQL)
+    for stmt in _statements(PATH_DICT_INDEX_SQL):
+        conn.execute(stmt)
+    conn.execute(
+        "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+        (PATH_DICT_META, PATH_DICT_KIND),
+    )
+    analyze_path_dict(conn)
+    if commit:
+        conn.commit()
+    return int(moved)
+
+
+def convert_from_path_dict(conn: sqlite3.Connection, *, commit: bool = True) -> int:
+    """Rebuild the flat ``instances`` table from the dictionary tables; returns rows moved."""
+    if not is_path_dict(conn):
+        return 0
+    cols = ", ".join(INSTANCE_COLUMNS)
+    conn.execute(f"CREATE TEMP TABLE _hch_flat_instances AS SELECT {cols} FROM instances")
+    conn.execute("DROP VIEW instances")
+    table_sql, *index_sql = _statements(INSTANCES_SQL)
+    conn.execute(table_sql)
+    conn.execute("ALTER TABLE instances ADD COLUMN inst_tags_json TEXT")
+    conn.execute("ALTER TABLE instances ADD COLUMN child_kind TEXT DEFAULT 'module'")
+    moved = conn.execute(
+        f"INSERT INTO instances ({cols}) SELECT {cols} FROM temp._hch_flat_instances"
+    ).rowcount
+    conn.execute("DROP TABLE temp._hch_flat_instances")
+    for stmt in index_sql:
+        conn.execute(stmt)
+    for table in ("instance_rows", "inst_paths", "inst_names"):
+        conn.execute(f"DROP TABLE {table}")
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone():
+        conn.execute(
+            "DELETE FROM sqlite_stat1 WHERE tbl IN ('instance_rows', 'inst_paths', 'inst_names')"
+        )
+    conn.execute("DELETE FROM meta WHERE key = ?", (PATH_DICT_META,))
+    if commit:
+        conn.commit()
+    return int(moved)
+
+
+def set_path_dict(conn: sqlite3.Connection, enabled: bool, *, commit: bool = True) -> int:
+    """Convert to (*enabled*) or from the path-dictionary layout; returns rows moved."""
+    if enabled:
+        return convert_to_path_dict(conn, commit=commit)
+    return convert_from_path_dict(conn, commit=commit)
+
+
+class PathInterner:
+    """
+    ``inst_paths`` / ``inst_names`` ids for one bulk load.
+
+    New strings get ids up front and are written by :meth:`flush` (before the
+    ``instance_rows`` that reference them).  A path first seen as some row's
+    ``parent_path`` is created without a parent / name and filled in when its
+    own instance arrives.
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.names: Dict[str, int] = {
+            name: int(nid) for nid, name in conn.execute("SELECT id, name FROM inst_names")
+        }
+        self.paths: Dict[str, Tuple[int, Optional[int], Optional[int]]] = {
+            path: (int(pid), parent_id, name_id)
+            for pid, parent_id, name_id, path in conn.execute(
+                "SELECT id, parent_id, name_id, path FROM inst_paths"
+            )
+        }
+        self._next_name = max(self.names.values(), default=0) + 1
+        self._next_path = max((v[0] for v in self.paths.values()), default=0) + 1
+        self._new_names: List[Tuple[int, str]] = []
+        self._new_paths: Dict[int, Tuple[int, Optional[int], Optional[int], str]] = {}
+        self._updates: Dict[int, Tuple[Optional[int], Optional[int], int]] = {}
+
+    def name_id(self, name: str) -> int:
+        hit = self.names.get(name)
+        if hit is None:
+            hit = self.names[name] = self._next_name
+            self._next_name += 1
+            self._new_names.append((hit, name))
+        return hit
+
+    def path_id(
+        self,
+        path: str,
+        leaf: Optional[str] = None,
+        parent_path: Optional[str] = None,
+    ) -> int:
+        """Id of *path*; with *leaf* it is an instance path and gets parent / name."""
+        parent_id = self.path_id(parent_path) if leaf is not None and parent_path else None
+        name_id = self.name_id(leaf) if leaf is not None else None
+        hit = self.paths.get(path)
+        if hit is None:
+            pid = self._next_path
+            self._next_path += 1
+            self.paths[path] = (pid, parent_id, name_id)
+            self._new_paths[pid] = (pid, parent_id, name_id, path)
+            return pid
+        pid, old_parent, old_name = hit
+        if leaf is not None and (old_parent, old_name) != (parent_id, name_id):
+            self.paths[path] = (pid, parent_id, name_id)
+            if pid in self._new_paths:
+                self._new_paths[pid] = (pid, parent_id, name_id, path)
+            else:
+                self._updates[pid] = (parent_id, name_id, pid)
+        return pid
+
+    def flush(self, conn: sqlite3.Connection) -> None:
+        if self._new_names:
+            conn.executemany("INSERT INTO inst_names (id, name) VALUES (?, ?)", self._new_names)
+            self._new_names.clear()
+        if self._new_paths:
+            conn.executemany(
+                "INSERT INTO inst_paths (id, parent_id, name_id, path) VALUES (?, ?, ?, ?)",
+                list(self._new_paths.values()),
+            )
+            self._new_paths.clear()
+        if self._updates:
+            conn.executemany(
+                "UPDATE inst_paths SET parent_id = ?, name_id = ? WHERE id = ?",
+                list(self._updates.values()),
+            )
+            self._updates.clear()
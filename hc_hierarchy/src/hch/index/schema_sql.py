@@ -1,6 +1,6 @@
 """SQLite schema for large-scale hierarchy index."""
 
-SCHEMA_SQL = """
+BASE_SCHEMA_SQL = """
 PRAGMA journal_mode=WAL;
 PRAGMA synchronous=NORMAL;
 
@@ -23,6 +23,42 @@ CREATE TABLE IF NOT EXISTS modules (
     FOREIGN KEY (definition_file_id) REFERENCES files(id)
 );
 
+CREATE TABLE IF NOT EXISTS instance_ports (
+    id INTEGER PRIMARY KEY,
+    instance_id INTEGER NOT NULL,
+    port_name TEXT NOT NULL,
+    FOREIGN KEY (instance_id) REFERENCES instances(id) ON DELETE CASCADE,
+    UNIQUE(instance_id, port_name)
+);
+
+CREATE INDEX IF NOT EXISTS idx_instance_ports_name ON instance_ports(port_name);
+CREATE INDEX IF NOT EXISTS idx_instance_ports_inst ON instance_ports(instance_id);
+
+CREATE TABLE IF NOT EXISTS instance_tree (
+    id INTEGER PRIMARY KEY,
+    parent_id INTEGER,
+    child_count INTEGER NOT NULL DEFAULT 0,
+    descendant_count INTEGER NOT NULL DEFAULT 0,
+    pre_start INTEGER NOT NULL,
+    pre_end INTEGER NOT NULL,
+    FOREIGN KEY (id) REFERENCES instances(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_instance_tree_parent ON instance_tree(parent_id);
+CREATE INDEX IF NOT EXISTS idx_instance_tree_pre ON instance_tree(pre_start);
+
+CREATE INDEX IF NOT EXISTS idx_modules_name ON modules(module_name);
+CREATE INDEX IF NOT EXISTS idx_files_filepath ON files(filepath);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Flat ``instances`` table; a path-dictionary DB (:mod:`hch.index.path_dict`)
+# replaces it with a view of the same name and columns.
+INSTANCES_SQL = """
 CREATE TABLE IF NOT EXISTS instances (
     id INTEGER PRIMARY KEY,
     full_path TEXT NOT NULL,
@@ -34,6 +70,7 @@ CREATE TABLE IF NOT EXISTS instances (
     port_json TEXT,
     param_json TEXT,
     variant TEXT NOT NULL DEFAULT '',
+    variant_mask INTEGER NOT NULL DEFAULT 0,
     module_ref TEXT,
     FOREIGN KEY (module_id) REFERENCES modules(id),
     FOREIGN KEY (filepath_id) REFERENCES files(id)
@@ -46,28 +83,14 @@ CREATE INDEX IF NOT EXISTS idx_instances_module_id ON instances(module_id);
 CREATE INDEX IF NOT EXISTS idx_instances_depth ON instances(depth);
 CREATE INDEX IF NOT EXISTS idx_instances_parent_path ON instances(parent_path);
 CREATE INDEX IF NOT EXISTS idx_instances_module_ref ON instances(module_ref);
-
-CREATE TABLE IF NOT EXISTS instance_ports (
-    id INTEGER PRIMARY KEY,
-    instance_id INTEGER NOT NULL,
-    port_name TEXT NOT NULL,
-    FOREIGN KEY (instance_id) REFERENCES instances(id) ON DELETE CASCADE,
-    UNIQUE(instance_id, port_name)
-);
-
-CREATE INDEX IF NOT EXISTS idx_instance_ports_name ON instance_ports(port_name);
-CREATE INDEX IF NOT EXISTS idx_instance_ports_inst ON instance_ports(instance_id);
-
-CREATE INDEX IF NOT EXISTS idx_modules_name ON modules(module_name);
-CREATE INDEX IF NOT EXISTS idx_files_filepath ON files(filepath);
-
-CREATE TABLE IF NOT EXISTS meta (
-    key TEXT PRIMARY KEY,
-    value TEXT
-);
 """
 
+SCHEMA_SQL = BASE_SCHEMA_SQL + INSTANCES_SQL
+
 
 def create_database(conn) -> None:
-    conn.executescript(SCHEMA_SQL)
+    is_view = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'view' AND name = 'instances'"
+    ).fetchone()
+    conn.executescript(BASE_SCHEMA_SQL if is_view else SCHEMA_SQL)
     conn.commit()
\ No newline at end of file
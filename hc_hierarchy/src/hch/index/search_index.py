@@ -0,0 +1,148 @@
+"""Optional FTS5 trigram side index for DQL glob / substring predicates.
+
+``LIKE '%foo%'`` on ``instances`` cannot use a B-tree index, so every
+``path ~ "*foo*"`` query scans the whole table.  ``instances_fts`` holds one
+trigram-tokenized row per instance (``rowid`` = ``instances.id``) over
+``full_path``, ``inst_leaf_name``, ``module_name`` and the effective
+``module_ref``.  The DQL compiler turns the literal runs of a glob into an FTS
+``MATCH`` pre-filter and keeps the original ``LIKE`` as the exact check, so
+results are identical with or without the index.
+
+Built with ``hch-index --search-index``; :class:`~hch.index.store.HierarchyStore`
+refreshes it whenever instances are reloaded.  The table is contentless
+(``content=''``): it stores only the trigram postings.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import Optional, Sequence
+
+SEARCH_TABLE = "instances_fts"
+SEARCH_COLUMNS = ("full_path", "inst_leaf_name", "module_name", "module_ref")
+SEARCH_INDEX_KIND = "fts5_trigram"
+MIN_LITERAL_RUN = 3  # trigram tokenizer: shorter runs cannot use the index
+
+
+def fts5_trigram_available(conn: sqlite3.Connection) -> bool:
+    """SQLite has FTS5 with the trigram tokenizer (3.34+)."""
+    try:
+        conn.execute(
+            "CREATE VIRTUAL TABLE temp._hch_fts_probe USING fts5(x, tokenize='trigram')"
+        )
+        conn.execute("DROP TABLE temp._hch_fts_probe")
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+def has_search_index(conn: sqlite3.Connection) -> bool:
+    return (
+        conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?",
+            (SEARCH_TABLE,),
+        ).fetchone()
+        is not None
+    )
+
+
+def clear_search_index(conn: sqlite3.Connection) -> None:
+    if has_search_index(conn):
+        conn.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('delete-all')")
+
+
+def _insert_rows(conn: sqlite3.Connection, min_id: int = 0) -> None:
+    conn.execute(
+        f"""
+        INSERT INTO {SEARCH_TABLE}(rowid, {", ".join(SEARCH_COLUMNS)})
+        SELECT i.id, i.full_path, i.inst_leaf_name, m.module_name,
+               COALESCE(i.module_ref, m.module_ref, '')
+        FROM instances i
+        JOIN modules m ON m.id = i.module_id
+        WHERE i.id >= ?
+        """,
+        (min_id,),
+    )
+
+
+def build_search_index(conn: sqlite3.Connection, *, commit: bool = True) -> int:
+    """
+    Create (or refill) ``instances_fts`` from ``instances``; returns rows indexed.
+
+    Raises ``RuntimeError`` when this SQLite lacks the FTS5 trigram tokenizer.
+    """
+    if not has_search_index(conn):
+        if not fts5_trigram_available(conn):
+            raise RuntimeError(
+                f"SQLite {sqlite3.sqlite_version} lacks FTS5 trigram (needs 3.34+)"
+            )
+        cols = ", ".join(SEARCH_COLUMNS)
+        conn.execute(
+            f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+            f"{cols}, tokenize='trigram', content='')"
+        )
+    else:
+        clear_search_index(conn)
+    _insert_rows(conn)
+    conn.execute(
+        "INSERT OR REPLACE INTO meta (key, value) VALUES ('search_index', ?)",
+        (SEARCH_INDEX_KIND,),
+    )
+    if commit:
+        conn.commit()
+    return int(conn.execute("SELECT COUNT(*) FROM instances").fetchone()[0])
+
+
+def append_search_index(conn: sqlite3.Connection, min_id: int) -> None:
+    """
+    Index instances with ``id >= min_id`` (rows just loaded).
+
+    Rows replaced by the load keep their old postings: a contentless table
+    cannot delete them without the original text, and the compiler's exact
+    ``LIKE`` check plus the ``instances.id`` join already ignore them.
+    """
+    if has_search_index(conn):
+        _insert_rows(conn, min_id)
+
+
+def drop_search_index(conn: sqlite3.Connection, *, commit: bool = True) -> None:
+    conn.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+    conn.execute("DELETE FROM meta WHERE key = 'search_index'")
+    if commit:
+        conn.commit()
+
+
+def like_literal_runs(pattern: str, escape: str = "\\") -> list[str]:
+    """Literal substrings of a ``LIKE`` pattern (split at ``%`` / ``_``)."""
+    runs: list[str] = []
+    cur: list[str] = []
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == escape and i + 1 < len(pattern):
+            cur.append(pattern[i + 1])
+            i += 2
+            continue
+        if ch in "%_":
+            if cur:
+                runs.append("".join(cur))
+                cur = []
+        else:
+            cur.append(ch)
+        i += 1
+    if cur:
+        runs.append("".join(cur))
+    return runs
+
+
+def trigram_match_query(like_pattern: str, columns: Sequence[str]) -> Optional[str]:
+    """
+    FTS5 ``MATCH`` expression that every row matching *like_pattern* satisfies.
+
+    ``None`` when the pattern has no literal run of at least three characters.
+    """
+    runs = [r for r in like_literal_runs(like_pattern) if len(r) >= MIN_LITERAL_RUN]
+    if not runs:
+        return None
+    phrases = " AND ".join('"' + r.replace('"', '""') + '"' for r in runs)
+    return f"{{{' '.join(columns)}}} : ({phrases})"
@@ -4,13 +4,181 @@ from __future__ import annotations
 
 import json
 import sqlite3
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sized, Tuple
 
+from hch.index.path_dict import (
+    PathInterner,
+    analyze_path_dict,
+    clear_path_dict,
+    convert_from_path_dict,
+    convert_to_path_dict,
+    is_path_dict,
+    path_dict_wanted,
+)
 from hch.index.schema_sql import create_database
+from hch.index.search_index import append_search_index, clear_search_index
+from hch.index.tree_encoding import (
+    TREE_TABLE,
+    TreeDelta,
+    has_tree_encoding,
+    rebuild_tree_encoding,
+    update_tree_encoding,
+)
 from hch.ingest.flatten_tags import apply_tags_dict_to_flat, flat_inst_tags_dict
 from hch.schema import FlatInstance, InstanceEdge, ModuleRecord, PortRecord
 
+BULK_BATCH_ROWS = 50_000
+BULK_INDEX_REBUILD_MIN = 100_000
+# Kept during bulk loads: the unique key the loader relies on.
+_BULK_KEEP_INDEXES = frozenset({"idx_instances_variant_path", "idx_instance_rows_path"})
+_INSTANCE_TABLES = ("instances", "instance_rows", "inst_paths", "instance_ports", "instance_tree")
+
+
+@contextmanager
+def _bulk_load_pragmas(conn: sqlite3.Connection) -> Iterator[None]:
+    """
+    Grow the page cache (256 MiB) for one bulk load and index rebuild, then restore.
+
+    ``synchronous`` stays as opened: it cannot change inside the caller's
+    transaction, and WAL + NORMAL already skips the fsync per commit.
+    """
+    cache = conn.execute("PRAGMA cache_size").fetchone()[0]
+    conn.execute("PRAGMA cache_size=-262144")
+    try:
+        yield
+    finally:
+        conn.execute(f"PRAGMA cache_size={int(cache)}")
+
+
+def _index_sql_for_rebuild(conn: sqlite3.Connection) -> List[Tuple[str, str]]:
+    """Secondary indexes on the instance tables that a bulk load may drop."""
+    marks = ", ".join("?" for _ in _INSTANCE_TABLES)
+    return [
+        (name, sql)
+        for name, sql in conn.execute(
+            f"""
+            SELECT name, sql FROM sqlite_master
+            WHERE type = 'index'
+              AND tbl_name IN ({marks})
+              AND sql IS NOT NULL
+            ORDER BY name
+            """,
+            _INSTANCE_TABLES,
+        ).fetchall()
+        if name not in _BULK_KEEP_INDEXES
+    ]
+
+
+class _BulkIdCache:
+    """
+    ``modules.id`` / ``files.id`` lookups for one bulk load.
+
+    Mirrors :func:`hch.ingest.instance_resolve.resolve_module_id`.  Its
+    multi-definition parent-directory heuristic reads the parent's instance
+    row; the bulk load may have dropped the ``full_path`` / leaf indexes, so
+    parent files come from maps filled as rows stream in (plus one scan of
+    rows already in the table) instead of a per-row query.
+    """
+
+    def __init__(self, store: "HierarchyStore") -> None:
+        self.store = store
+        self.by_ref: Dict[str, int] = {}
+        self.ref_by_id: Dict[int, str] = {}
+        self.by_name_file: Dict[Tuple[str, str], int] = {}
+        self.by_name: Dict[str, List[int]] = {}
+        self.file_by_id: Dict[int, str] = {}
+        self.files: Dict[str, int] = {}
+        self.paths: Optional[PathInterner] = (
+            PathInterner(store.conn) if is_path_dict(store.conn) else None
+        )
+        for mid, name, ref, fpath in store.conn.execute(
+            """
+            SELECT m.id, m.module_name, m.module_ref, f.filepath
+            FROM modules m
+            LEFT JOIN files f ON f.id = m.definition_file_id
+            ORDER BY m.id
+            """
+        ):
+            mid = int(mid)
+            self.by_ref.setdefault(ref, mid)
+            self.ref_by_id[mid] = ref
+            if fpath is None:
+                continue
+            self.by_name_file.setdefault((name, fpath), mid)
+            self.by_name.setdefault(name, []).append(mid)
+            self.file_by_id[mid] = fpath
+        # Parent files are only needed when some module name is multiply defined.
+        self.track_parents = any(len(c) > 1 for c in self.by_name.values())
+        self.parent_file: Dict[str, str] = {}
+        self.leaf_file: Dict[str, str] = {}
+        self._seeded = False
+
+    def note_row(self, full_path: str, leaf: str, inst_file: str) -> None:
+        if self.track_parents and inst_file:
+            self.parent_file.setdefault(full_path, inst_file)
+            self.leaf_file.setdefault(leaf, inst_file)
+
+    def _parent_file(self, parent_path: str) -> Optional[str]:
+        if not self._seeded:
+            self._seeded = True
+            for full_path, leaf, fpath in self.store.conn.execute(
+                """
+                SELECT i.full_path, i.inst_leaf_name, f.filepath FROM instances i
+                JOIN files f ON f.id = i.filepath_id
+                """
+            ):
+                if fpath:
+                    self.parent_file.setdefault(full_path, fpath)
+                    self.leaf_file.setdefault(leaf, fpath)
+        hit = self.parent_file.get(parent_path)
+        if hit is None:
+            hit = self.leaf_file.get(parent_path.split(".")[-1])
+        return hit
+
+    def module_id(
+        self,
+        module_name: str,
+        inst_file: str,
+        parent_path: Optional[str],
+        *,
+        module_ref_hint: str,
+    ) -> Optional[int]:
+        if module_ref_hint:
+            hit = self.by_ref.get(module_ref_hint)
+            if hit is not None:
+                return hit
+        if inst_file:
+            hit = self.by_name_file.get((module_name, inst_file))
+            if hit is not None:
+                return hit
+        cands = self.by_name.get(module_name)
+        if not cands:
+            return None
+        if len(cands) == 1 or not parent_path:
+            return cands[0]
+        pfile = self._parent_file(parent_path)
+        if not pfile:
+            return cands[0]
+        parent_dir = str(Path(pfile).parent)
+        return min(
+            cands,
+            key=lambda mid: (
+                0 if parent_dir in self.file_by_id[mid] else 1,
+                len(self.file_by_id[mid]),
+            ),
+        )
+
+    def module_ref(self, mod_id: int) -> str:
+        return self.ref_by_id.get(mod_id, "")
+
+    def file_id(self, filepath: str) -> int:
+        hit = self.files.get(filepath)
+        if hit is None:
+            hit = self.files[filepath] = self.store._upsert_file(filepath)
+        return hit
+
 
 class HierarchyStore:
     def __init__(self, db_path: str):
@@ -19,6 +187,7 @@ class HierarchyStore:
         self.conn.execute("PRAGMA journal_mode=WAL")
         self.conn.execute("PRAGMA synchronous=NORMAL")
         create_database(self.conn)
+        self._tree_delta: Optional[TreeDelta] = None
         self._migrate()
 
     def _migrate(self) -> None:
@@ -40,6 +209,10 @@ class HierarchyStore:
             self.conn.execute(
                 "ALTER TABLE instances ADD COLUMN variant TEXT NOT NULL DEFAULT ''"
             )
+        if "variant_mask" not in inst_cols:
+            self.conn.execute(
+                "ALTER TABLE instances ADD COLUMN variant_mask INTEGER NOT NULL DEFAULT 0"
+            )
         if "inst_tags_json" not in inst_cols:
             self.conn.execute("ALTER TABLE instances ADD COLUMN inst_tags_json TEXT")
         if "child_kind" not in inst_cols:
@@ -63,7 +236,9 @@ class HierarchyStore:
                 ON instances(module_ref)
                 """
             )
-        if not self.conn.execute(
+        if not has_tree_encoding(self.conn) and self.count_instances():
+            rebuild_tree_encoding(self.conn)
+        if not is_path_dict(self.conn) and not self.conn.execute(
             "SELECT name FROM sqlite_master WHERE type='index' AND name='idx_instances_variant_path'"
         ).fetchone():
             self.conn.execute(
@@ -88,6 +263,11 @@ class HierarchyStore:
                 CREATE INDEX idx_instance_ports_inst ON instance_ports(instance_id);
                 """
             )
+        want_path_dict = path_dict_wanted()
+        if want_path_dict and not is_path_dict(self.conn):
+            convert_to_path_dict(self.conn, commit=False)
+        elif want_path_dict is False and is_path_dict(self.conn):
+            convert_from_path_dict(self.conn, commit=False)
         self.conn.commit()
 
     def close(self) -> None:
@@ -196,12 +376,15 @@ class HierarchyStore:
             self.conn.commit()
 
     def load_all_modules(self) -> Dict[str, ModuleRecord]:
+        from hch.ingest.merge import merge_module_records
+
         out: Dict[str, ModuleRecord] = {}
         rows = self.conn.execute(
             """
             SELECT m.module_name, f.filepath, m.port_json, m.param_json, m.inst_json, m.module_kind
             FROM modules m
             LEFT JOIN files f ON f.id = m.definition_file_id
+            ORDER BY m.id
             """
         ).fetchall()
         for mname, fpath, port_json, param_json, inst_json, mkind in rows:
@@ -217,6 +400,8 @@ class HierarchyStore:
                         )
                     )
             params = json.loads(param_json) if param_json else {}
+            if mname in out and "primary_definition_file" in params:
+                continue  # alias row of a multi-definition module (no instances)
             parse_tier = str(params.pop("_parse_tier", "full") or "full")
             is_blackbox = str(params.pop("_is_blackbox", "0") or "0") == "1"
             instances = []
@@ -241,7 +426,7 @@ class HierarchyStore:
                             generate_branch=str(e.get("generate_branch") or ""),
                         )
                     )
-            out[mname] = ModuleRecord(
+            rec = ModuleRecord(
                 module_name=mname,
                 file_path=fpath or "",
                 ports=ports,
@@ -251,35 +436,150 @@ class HierarchyStore:
                 parse_tier=parse_tier,
                 is_blackbox=is_blackbox,
             )
+            if mname in out:
+                # Batched builds store one row per batch that defined the name;
+                # fold them back together the way the build accumulated them.
+                merge_module_records(out, {mname: rec})
+            else:
+                out[mname] = rec
         return out
 
     def clear_instances(self) -> None:
         self.conn.execute("DELETE FROM instance_ports")
-        self.conn.execute("DELETE FROM instances")
+        self.conn.execute(f"DELETE FROM {TREE_TABLE}")
+        if is_path_dict(self.conn):
+            clear_path_dict(self.conn)
+        else:
+            self.conn.execute("DELETE FROM instances")
+        clear_search_index(self.conn)
         self.conn.commit()
 
-    def _resolve_module_id(
+    @contextmanager
+    def deferred_tree_encoding(self) -> Iterator[None]:
+        """
+        Patch ``instance_tree`` once for every ``delete_instances`` /
+        ``load_instances`` in the block instead of once per call.
+        """
+        if self._tree_delta is not None:
+            yield
+            return
+        self._tree_delta = TreeDelta(self.conn)
+        try:
+            yield
+            update_tree_encoding(self.conn, self._tree_delta)
+        finally:
+            self._tree_delta = None
+
+    def delete_instances(self, ids: Iterable[int], *, commit: bool = True) -> int:
+        """
+        Delete instance rows (and their ports) by ``id``; returns rows deleted.
+
+        ``instance_tree`` is patched around the deleted paths; FTS postings of
+        deleted rows are left behind like those of replaced rows (see
+        ``append_search_index``).
+        """
+        id_list = [(int(i),) for i in ids]
+        if not id_list:
+            return 0
+        delta = self._tree_delta or TreeDelta(self.conn)
+        delta.capture_ids(self.conn, [i for (i,) in id_list])
+        table = self._rows_table()
+        self.conn.executemany("DELETE FROM instance_ports WHERE instance_id = ?", id_list)
+        self.conn.executemany(f"DELETE FROM {table} WHERE id = ?", id_list)
+        if table != "instances":
+            # Drop interned paths nothing refers to any more, leaves first.
+            while self.conn.execute(
+                """
+                DELETE FROM inst_paths
+                WHERE id NOT IN (SELECT path_id FROM instance_rows)
+                  AND id NOT IN (
+                      SELECT parent_id FROM inst_paths WHERE parent_id IS NOT NULL
+                  )
+                """
+            ).rowcount:
+                pass
+        if self._tree_delta is None:
+            update_tree_encoding(self.conn, delta)
+        if commit:
+            self.conn.commit()
+        return len(id_list)
+
+    def load_instances(
         self,
-        module_name: str,
-        inst_file: str,
-        parent_path: Optional[str],
+        instances: Iterable[FlatInstance],
         *,
-        module_ref_hint: str = "",
-    ) -> Optional[int]:
-        from hch.ingest.instance_resolve import resolve_module_id
-
-        return resolve_module_id(
-            self.conn,
-            module_name,
-            module_ref_hint=module_ref_hint,
-            inst_file=inst_file,
-            parent_path=parent_path,
+        commit: bool = True,
+        batch_rows: int = BULK_BATCH_ROWS,
+    ) -> None:
+        """
+        Bulk insert flat rows (replacing rows with the same variant + full_path).
+
+        Module / file ids come from in-memory caches, rows and ports go in with
+        ``executemany`` per *batch_rows* chunk, and large loads into a (nearly)
+        empty table drop the secondary instance indexes and rebuild them once
+        at the end.  Ports of replaced rows are swept once after the load, and
+        ``instance_tree`` (child counts, pre-order intervals) is patched for the
+        loaded paths (:func:`~hch.index.tree_encoding.update_tree_encoding`).
+        """
+        rows = instances if isinstance(instances, Sized) else list(instances)
+        total = len(rows)
+        if not total:
+            if commit:
+                self.conn.commit()
+            return
+        existing = self.count_instances()
+        rebuild = (
+            _index_sql_for_rebuild(self.conn)
+            if total >= BULK_INDEX_REBUILD_MIN and existing < total
+            else []
         )
+        delta = self._tree_delta or TreeDelta(self.conn)
+        delta.capture_paths(self.conn, (inst.full_path for inst in rows))
+        ids = _BulkIdCache(self)
+        first_id = int(
+            self.conn.execute(
+                f"SELECT COALESCE(MAX(id), 0) FROM {self._rows_table()}"
+            ).fetchone()[0]
+        ) + 1
+        next_id = first_id
+        with _bulk_load_pragmas(self.conn):
+            for name, _sql in rebuild:
+                self.conn.execute(f"DROP INDEX IF EXISTS {name}")
+            chunk: List[FlatInstance] = []
+            for inst in rows:
+                chunk.append(inst)
+                if len(chunk) >= batch_rows:
+                    next_id = self._insert_instance_chunk(chunk, ids, next_id)
+                    chunk = []
+            if chunk:
+                next_id = self._insert_instance_chunk(chunk, ids, next_id)
+            if self.count_instances() < existing + (next_id - first_id):
+                # INSERT OR REPLACE dropped older rows with the same key.
+                self.conn.execute(
+                    "DELETE FROM instance_ports "
+                    "WHERE instance_id NOT IN (SELECT id FROM instances)"
+                )
+            for _name, sql in rebuild:
+                self.conn.execute(sql)
+            if self._tree_delta is None:
+                update_tree_encoding(self.conn, delta)
+            if ids.paths is not None:
+                analyze_path_dict(self.conn)
+            append_search_index(self.conn, first_id)
+        if commit:
+            self.conn.commit()
 
-    def load_instances(self, instances: Iterable[FlatInstance], *, commit: bool = True) -> None:
-        for inst in instances:
+    def _insert_instance_chunk(
+        self,
+        chunk: List[FlatInstance],
+        ids: "_BulkIdCache",
+        next_id: int,
+    ) -> int:
+        inst_rows: List[tuple] = []
+        port_rows: List[Tuple[int, str]] = []
+        for inst in chunk:
             inst_ref = getattr(inst, "module_ref", None) or ""
-            mod_id = self._resolve_module_id(
+            mod_id = ids.module_id(
                 inst.module,
                 inst.file or "",
                 inst.parent_path,
@@ -287,56 +587,65 @@ class HierarchyStore:
             )
             if mod_id is None:
                 continue
+            ids.note_row(inst.full_path, inst.name, inst.file or "")
             if not inst_ref:
-                from hch.ingest.instance_resolve import module_ref_from_id
-
-                inst_ref = module_ref_from_id(self.conn, mod_id)
-            fid = self._upsert_file(inst.file) if inst.file else None
-            port_json = json.dumps(inst.ports) if inst.ports else "[]"
-            param_json = (
-                json.dumps(inst.param_overrides) if inst.param_overrides else "{}"
-            )
-            variant = getattr(inst, "variant", "") or ""
-            tags_json = json.dumps(flat_inst_tags_dict(inst))
-            child_kind = getattr(inst, "child_kind", "") or "module"
-            self.conn.execute(
-                """
-                INSERT OR REPLACE INTO instances
-                (full_path, inst_leaf_name, module_id, depth, parent_path, filepath_id,
-                 port_json, param_json, variant, inst_tags_json, child_kind, module_ref)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    inst.full_path,
-                    inst.name,
+                inst_ref = ids.module_ref(mod_id)
+            iid = next_id
+            next_id += 1
+            if ids.paths is not None:
+                path_id = ids.paths.path_id(inst.full_path, inst.name, inst.parent_path)
+                key: tuple = (iid, path_id)
+            else:
+                key = (iid, inst.full_path, inst.name, inst.parent_path)
+            inst_rows.append(
+                key
+                + (
                     mod_id,
                     inst.depth,
-                    inst.parent_path,
-                    fid,
-                    port_json,
-                    param_json,
-                    variant,
-                    tags_json,
-                    child_kind,
+                    ids.file_id(inst.file) if inst.file else None,
+                    json.dumps(inst.ports) if inst.ports else "[]",
+                    json.dumps(inst.param_overrides) if inst.param_overrides else "{}",
+                    getattr(inst, "variant", "") or "",
+                    int(getattr(inst, "variant_mask", 0) or 0),
+                    json.dumps(flat_inst_tags_dict(inst)),
+                    getattr(inst, "child_kind", "") or "module",
                     inst_ref,
-                ),
+                )
             )
-            iid = self.conn.execute(
-                "SELECT id FROM instances WHERE variant = ? AND full_path = ?",
-                (variant, inst.full_path),
-            ).fetchone()[0]
-            self.conn.execute(
-                "DELETE FROM instance_ports WHERE instance_id = ?",
-                (iid,),
+            port_rows.extend((iid, p) for p in inst.ports if p)
+        self._flush_instance_rows(inst_rows, port_rows, ids)
+        return next_id
+
+    def _flush_instance_rows(
+        self,
+        inst_rows: List[tuple],
+        port_rows: List[Tuple[int, str]],
+        ids: "_BulkIdCache",
+    ) -> None:
+        if ids.paths is not None:
+            ids.paths.flush(self.conn)
+        if inst_rows:
+            key_cols = (
+                "path_id"
+                if ids.paths is not None
+                else "full_path, inst_leaf_name, parent_path"
             )
-            for pname in inst.ports:
-                if pname:
-                    self.conn.execute(
-                        "INSERT OR IGNORE INTO instance_ports (instance_id, port_name) VALUES (?, ?)",
-                        (iid, pname),
-                    )
-        if commit:
-            self.conn.commit()
+            self.conn.executemany(
+                f"""
+                INSERT OR REPLACE INTO {self._rows_table()}
+                (id, {key_cols}, module_id, depth, filepath_id, port_json, param_json,
+                 variant, variant_mask, inst_tags_json, child_kind, module_ref)
+                VALUES ({", ".join("?" for _ in inst_rows[0])})
+                """,
+                inst_rows,
+            )
+            inst_rows.clear()
+        if port_rows:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO instance_ports (instance_id, port_name) VALUES (?, ?)",
+                port_rows,
+            )
+            port_rows.clear()
 
     def set_meta(self, key: str, value: str, *, commit: bool = True) -> None:
         self.conn.execute(
@@ -346,8 +655,14 @@ class HierarchyStore:
         if commit:
             self.conn.commit()
 
+    def _rows_table(self) -> str:
+        """Table holding one row per instance (``instances`` is a view in path-dict DBs)."""
+        return "instance_rows" if is_path_dict(self.conn) else "instances"
+
     def count_instances(self) -> int:
-        return self.conn.execute("SELECT COUNT(*) FROM instances").fetchone()[0]
+        return self.conn.execute(
+            f"SELECT COUNT(*) FROM {self._rows_table()}"
+        ).fetchone()[0]
 
     def count_modules(self) -> int:
         return self.conn.execute("SELECT COUNT(*) FROM modules").fetchone()[0]
@@ -412,7 +727,7 @@ class HierarchyStore:
             """
             SELECT i.full_path, i.inst_leaf_name, m.module_name, f.filepath,
                    i.depth, i.parent_path, i.port_json, i.param_json, i.variant,
-                   i.inst_tags_json, i.child_kind,
+                   i.variant_mask, i.inst_tags_json, i.child_kind,
                    COALESCE(i.module_ref, m.module_ref) AS module_ref
             FROM instances i
             JOIN modules m ON m.id = i.module_id
@@ -447,6 +762,7 @@ class HierarchyStore:
                 param_overrides=params,
                 child_kind=r["child_kind"] or "module",
                 variant=r["variant"] or "",
+                variant_mask=int(r["variant_mask"] or 0),
                 module_ref=r["module_ref"] or "",
             )
             if r["inst_tags_json"]:
@@ -0,0 +1,384 @@
+"""Materialized tree encoding of ``instances``: child counts and pre-order intervals.
+
+Tree navigation used to count children with a correlated
+``COUNT(*) ... WHERE c.parent_path = i.full_path`` per row and to select
+subtrees with ``full_path LIKE 'root.%'``.  :func:`rebuild_tree_encoding`
+fills ``instance_tree``, one row per instance ``id``:
+
+``parent_id``
+    ``instances.id`` of the parent row (same ``variant`` when there is one)
+``child_count`` / ``descendant_count``
+    rows whose ``parent_path`` is this path / rows anywhere below it
+``pre_start`` / ``pre_end``
+    pre-order number of the path and the last number inside its subtree
+
+Rows that share a ``full_path`` (ifdef variants) share one pre-order number.
+Paths are numbered in hierarchy order (``.`` sorts before every other
+character), so a subtree is exactly the rows the old ``LIKE 'root.%'`` matched:
+``pre_start BETWEEN root.pre_start AND root.pre_end``, an index range scan on
+``idx_instance_tree_pre``.  Ancestors follow ``parent_id``.  It is a side table
+like ``instance_ports`` so a rebuild inserts narrow rows instead of rewriting
+every instance.  Readers check :func:`has_tree_encoding` and fall back to the
+string queries on older DBs.
+
+Writes (``load_instances``, ``delete_instances``, so also ``deepen_branch`` and
+``hch-index --update``) keep it current with :func:`update_tree_encoding`: a
+:class:`TreeDelta` records the touched paths' rows before the write, then only
+the subtrees under the nearest surviving ancestor of each path that appeared or
+vanished are renumbered and later intervals are shifted in one ``UPDATE``.  A
+full rebuild is left for backfilling older DBs and for adding or removing a
+root path, which renumbers everything anyway.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from bisect import bisect_left
+from collections import Counter
+from itertools import accumulate
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+TREE_ENCODING_META = "tree_encoding"
+TREE_ENCODING_KIND = "preorder_v1"
+
+TREE_TABLE = "instance_tree"
+
+
+def has_tree_encoding(conn: sqlite3.Connection) -> bool:
+    try:
+        row = conn.execute(
+            "SELECT value FROM meta WHERE key = ?", (TREE_ENCODING_META,)
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return False
+    return bool(row) and row[0] == TREE_ENCODING_KIND
+
+
+def _encode_rows(
+    rows: List[Tuple[int, str, Optional[str], str]], base: int
+) -> Tuple[List[Tuple[Optional[int], int, int, int, int, int]], int]:
+    """
+    ``instance_tree`` values for *rows* (``id, full_path, parent_path, variant``
+    ordered by id) numbered from *base*, and how many distinct paths they hold.
+    Parents outside *rows* get ``parent_id`` ``None``.
+    """
+    weight = Counter(r[1] for r in rows)  # rows per full_path
+    children = Counter(r[2] for r in rows if r[2])  # rows per parent_path
+    first_id = {r[1]: r[0] for r in reversed(rows)}
+    variant_id: Dict[Tuple[str, str], int] = {(r[3], r[1]): r[0] for r in rows}
+
+    # '.' -> '\0' makes every "P.*" block contiguous and right after P, so the
+    # subtree of key k ends just before the first key >= k + '\1'.
+    keys = sorted(p.replace(".", "\0") for p in weight)
+    pre: Dict[str, int] = {}
+    end: Dict[str, int] = {}
+    for i, key in enumerate(keys):
+        path = key.replace("\0", ".")
+        pre[path] = i
+        end[path] = bisect_left(keys, key + "\1", i + 1) - 1
+    cum = list(accumulate((weight[k.replace("\0", ".")] for k in keys), initial=0))
+
+    tree_rows = []
+    for iid, path, parent, variant in rows:
+        parent_id: Optional[int] = None
+        if parent and parent != path and parent in first_id:
+            parent_id = variant_id.get((variant, parent)) or first_id[parent]
+        lo, hi = pre[path], end[path]
+        tree_rows.append(
+            (
+                parent_id,
+                children.get(path, 0),
+                cum[hi + 1] - cum[lo + 1],
+                base + lo,
+                base + hi,
+                iid,
+            )
+        )
+    return tree_rows, len(keys)
+
+
+def _insert_tree_rows(conn: sqlite3.Connection, tree_rows) -> None:
+    conn.executemany(
+        f"""
+        INSERT OR REPLACE INTO {TREE_TABLE}
+        (parent_id, child_count, descendant_count, pre_start, pre_end, id)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        tree_rows,
+    )
+
+
+def rebuild_tree_encoding(conn: sqlite3.Connection, *, commit: bool = False) -> int:
+    """Recompute ``instance_tree`` for every instance row; returns rows written."""
+    rows = conn.execute(
+        "SELECT id, full_path, parent_path, variant FROM instances ORDER BY id"
+    ).fetchall()
+    tree_rows, _ = _encode_rows(rows, 0)
+    conn.execute(f"DELETE FROM {TREE_TABLE}")
+    _insert_tree_rows(conn, tree_rows)
+    conn.execute(
+        "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+        (TREE_ENCODING_META, TREE_ENCODING_KIND),
+    )
+    if commit:
+        conn.commit()
+    return len(tree_rows)
+
+
+_CHUNK = 500  # bound variables per IN (...) query
+
+# Old tree row of a touched path: (id, pre_start, pre_end, child_count, descendant_count)
+_OldRow = Tuple[int, int, int, int, int]
+
+
+def _chunks(items: List, size: int = _CHUNK) -> Iterator[List]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def _prefixes(path: str) -> Iterator[str]:
+    """Proper ancestors of *path* by name, deepest first."""
+    while "." in path:
+        path = path.rpartition(".")[0]
+        yield path
+
+
+class TreeDelta:
+    """
+    ``instance_tree`` rows of the paths a write is about to touch, captured
+    before the write so :func:`update_tree_encoding` knows where they were.
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.before: Dict[str, List[_OldRow]] = {}
+        # Nothing to patch: backfill or first load (see update_tree_encoding).
+        self.full = (
+            not has_tree_encoding(conn)
+            or conn.execute(f"SELECT 1 FROM {TREE_TABLE} LIMIT 1").fetchone() is None
+        )
+
+    def capture_paths(self, conn: sqlite3.Connection, paths: Iterable[str]) -> None:
+        if self.full:
+            return
+        todo = sorted({p for p in paths if p not in self.before})
+        for p in todo:
+            self.before[p] = []
+        for part in _chunks(todo):
+            marks = ", ".join("?" for _ in part)
+            for row in conn.execute(
+                f"""
+                SELECT i.full_path, t.id, t.pre_start, t.pre_end,
+                       t.child_count, t.descendant_count
+                FROM instances i JOIN {TREE_TABLE} t ON t.id = i.id
+                WHERE i.full_path IN ({marks})
+                """,
+                part,
+            ):
+                self.before[row[0]].append(tuple(row[1:]))
+
+    def capture_ids(self, conn: sqlite3.Connection, ids: Iterable[int]) -> None:
+        if self.full:
+            return
+        paths: Set[str] = set()
+        for part in _chunks(list(ids)):
+            marks = ", ".join("?" for _ in part)
+            paths.update(
+                r[0]
+                for r in conn.execute(
+                    f"SELECT full_path FROM instances WHERE id IN ({marks})", part
+                )
+            )
+        self.capture_paths(conn, paths)
+
+
+def update_tree_encoding(conn: sqlite3.Connection, delta: TreeDelta) -> int:
+    """
+    Bring ``instance_tree`` up to date after a write captured in *delta*;
+    returns tree rows written.
+
+    A touched path whose rows merely changed keeps its pre-order number.  A
+    path that appeared or vanished renumbers the subtree of its deepest
+    ancestor that exists before and after the write; later intervals shift
+    by the change in path count and ancestors' counts by the change in rows.
+    """
+    if delta.full:
+        return rebuild_tree_encoding(conn)
+    before = delta.before
+    after: Dict[str, List[int]] = {p: [] for p in before}
+    for part in _chunks(list(before)):
+        marks = ", ".join("?" for _ in part)
+        for path, iid in conn.execute(
+            f"SELECT full_path, id FROM instances WHERE full_path IN ({marks})", part
+        ):
+            after[path].append(int(iid))
+
+    known: Dict[str, Optional[Tuple[int, int]]] = {}
+
+    def stable_interval(path: str) -> Optional[Tuple[int, int]]:
+        """Old ``(pre_start, pre_end)`` of *path* if it exists before and after."""
+        if path in before:
+            old = before[path]
+            return (old[0][1], old[0][2]) if old and after[path] else None
+        if path not in known:
+            row = conn.execute(
+                f"""
+                SELECT t.pre_start, t.pre_end FROM instances i
+                JOIN {TREE_TABLE} t ON t.id = i.id
+                WHERE i.full_path = ? LIMIT 1
+                """,
+                (path,),
+            ).fetchone()
+            known[path] = (int(row[0]), int(row[1])) if row else None
+        return known[path]
+
+    anchors: Dict[str, Tuple[int, int]] = {}
+    for path in before:
+        if bool(before[path]) == bool(after[path]):
+            continue
+        for anc in _prefixes(path):
+            bounds = stable_interval(anc)
+            if bounds is not None:
+                anchors[anc] = bounds
+                break
+        else:
+            return rebuild_tree_encoding(conn)  # a root path came or went
+
+    # Keep the outermost anchors: their subtrees are disjoint intervals.
+    regions: List[Tuple[str, int, int]] = []
+    for anc, (lo, hi) in sorted(anchors.items(), key=lambda kv: (kv[1][0], -kv[1][1])):
+        if not regions or lo > regions[-1][2]:
+            regions.append((anc, lo, hi))
+    region_roots = {r[0] for r in regions}
+
+    def in_region(path: str) -> bool:
+        return path in region_roots or any(a in region_roots for a in _prefixes(path))
+
+    written = 0
+    fix_parent: List[int] = []
+    count_delta: Dict[str, List[int]] = {}  # path -> [child_count, descendant_count]
+    for path, old in before.items():
+        new_ids = after[path]
+        rows_delta = len(new_ids) - len(old)
+        if rows_delta:
+            for i, anc in enumerate(_prefixes(path)):
+                if in_region(anc):
+                    continue  # renumbered below with its region
+                acc = count_delta.setdefault(anc, [0, 0])
+                acc[0] += rows_delta if i == 0 else 0
+                acc[1] += rows_delta
+        if not old or not new_ids or in_region(path):
+            continue
+        # Rows replaced in place: new ids take over the path's number and counts.
+        old_ids = {r[0] for r in old}
+        if old_ids == set(new_ids):
+            continue
+        gone = [(i,) for i in old_ids.difference(new_ids)]
+        conn.executemany(f"DELETE FROM {TREE_TABLE} WHERE id = ?", gone)
+        _, lo, hi, kids, desc = old[0]
+        added = [i for i in new_ids if i not in old_ids]
+        _insert_tree_rows(conn, [(None, kids, desc, lo, hi, i) for i in added])
+        written += len(added)
+        fix_parent.extend(added)
+        fix_parent.extend(
+            int(r[0])
+            for r in conn.execute("SELECT id FROM instances WHERE parent_path = ?", (path,))
+        )
+
+    encoded = []
+    shift = 0
+    shifts: List[Tuple[int, int, int]] = []  # (old pre_start, old pre_end, cumulative shift)
+    for anc, lo, hi in regions:
+        rows = conn.execute(
+            """
+            SELECT id, full_path, parent_path, variant FROM instances
+            WHERE full_path = ? OR (full_path > ? AND full_path < ?)
+            ORDER BY id
+            """,
+            (anc, anc + ".", anc + "/"),  # '/' follows '.'
+        ).fetchall()
+        tree_rows, n_paths = _encode_rows(rows, lo + shift)
+        encoded.append(tree_rows)
+        fix_parent.extend(r[-1] for r in tree_rows if r[0] is None and r[-1] is not None)
+        shift += n_paths - (hi - lo + 1)
+        shifts.append((lo, hi, shift))
+        conn.execute(f"DELETE FROM {TREE_TABLE} WHERE pre_start BETWEEN ? AND ?", (lo, hi))
+
+    if any(s[2] for s in shifts):
+        conn.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS _tree_shift (lo INTEGER, hi INTEGER, cum INTEGER)"
+        )
+        conn.execute("DELETE FROM _tree_shift")
+        conn.executemany("INSERT INTO _tree_shift VALUES (?, ?, ?)", shifts)
+        # Rows after a region move by the shifts before them; rows enclosing
+        # one also stretch their pre_end.
+        conn.execute(
+            f"""
+            UPDATE {TREE_TABLE} SET
+              pre_start = pre_start + COALESCE((
+                  SELECT cum FROM _tree_shift WHERE hi < {TREE_TABLE}.pre_start
+                  ORDER BY hi DESC LIMIT 1), 0),
+              pre_end = pre_end + COALESCE((
+                  SELECT cum FROM _tree_shift WHERE lo <= {TREE_TABLE}.pre_end
+                  ORDER BY lo DESC LIMIT 1), 0)
+            WHERE pre_end >= ?
+            """,
+            (shifts[0][0],),
+        )
+        conn.execute("DELETE FROM _tree_shift")
+
+    for tree_rows in encoded:
+        _insert_tree_rows(conn, tree_rows)
+        written += len(tree_rows)
+    conn.executemany(
+        f"""
+        UPDATE {TREE_TABLE}
+        SET child_count = child_count + ?, descendant_count = descendant_count + ?
+        WHERE id IN (SELECT id FROM instances WHERE full_path = ?)
+        """,
+        [(kids, desc, path) for path, (kids, desc) in count_delta.items()],
+    )
+    conn.executemany(
+        f"""
+        UPDATE {TREE_TABLE} SET parent_id = (
+            SELECT p.id FROM instances c JOIN instances p ON p.full_path = c.parent_path
+            WHERE c.id = {TREE_TABLE}.id AND c.parent_path != c.full_path
+            ORDER BY p.variant = c.variant DESC, p.id LIMIT 1
+        )
+        WHERE id = ?
+        """,
+        [(i,) for i in dict.fromkeys(fix_parent)],
+    )
+    return written
+
+
+def subtree_bounds(conn: sqlite3.Connection, root_path: str) -> Optional[Tuple[int, int]]:
+    """``(pre_start, pre_end)`` of *root_path*, or ``None`` when it is not indexed."""
+    row = conn.execute(
+        f"""
+        SELECT t.pre_start, t.pre_end FROM instances i
+        JOIN {TREE_TABLE} t ON t.id = i.id
+        WHERE i.full_path = ? LIMIT 1
+        """,
+        (root_path,),
+    ).fetchone()
+    if not row:
+        return None
+    return int(row[0]), int(row[1])
+
+
+def ancestor_paths(conn: sqlite3.Connection, full_path: str) -> List[str]:
+    """Ancestors of *full_path*, root first (``parent_id`` chain)."""
+    rows = conn.execute(
+        f"""
+        WITH RECURSIVE up(id, n) AS (
+            SELECT MIN(id), 0 FROM instances WHERE full_path = ?
+            UNION ALL
+            SELECT t.parent_id, up.n + 1 FROM {TREE_TABLE} t JOIN up ON t.id = up.id
+            WHERE t.parent_id IS NOT NULL AND up.n < 100000
+        )
+        SELECT i.full_path FROM up JOIN instances i ON i.id = up.id
+        WHERE up.n > 0 ORDER BY up.n DESC
+        """,
+        (full_path,),
+    ).fetchall()
+    return [r[0] for r in rows]
@@ -1,18 +1,31 @@
-"""Multi-preprocessor-variant indexing into one database."""
+"""Multi-preprocessor-variant indexing into one database (delta-parsed, shared rows)."""
 
 from __future__ import annotations
 
 import json
 from dataclasses import replace
 from pathlib import Path
-from typing import Dict, List, Optional, Sequence, Tuple
+from typing import Dict, List, Mapping, Optional, Sequence, Set, Tuple
 
-from hch.ingest.filelist import parse_filelist_simple
-from hch.ingest.hierarchy_build import elaborate_flat, elaborate_flat_with_sources
+from hch.ingest.filelist_cache import parse_filelist_cached
+from hch.ingest.hierarchy_build import (
+    elaborate_flat,
+    elaborate_flat_with_sources,
+    flatten_cycle_detected,
+)
 from hch.ingest.ingest import get_last_parse_meta, ingest_filelist_result
 from hch.index.store import HierarchyStore
-from hch.ingest.merge import merge_module_records
-from hch.schema import ModuleRecord
+from hch.index.variant_plan import (
+    MAX_VARIANTS,
+    MacroScanner,
+    VariantPlan,
+    apply_variant_records,
+    elaborate_variant_delta,
+    merge_variant_rows,
+    plan_variant,
+    plans_to_json,
+)
+from hch.schema import FlatInstance, ModuleRecord
 
 
 def parse_variant_spec(spec: str) -> Tuple[str, Dict[str, str]]:
@@ -33,25 +46,31 @@ def parse_variant_spec(spec: str) -> Tuple[str, Dict[str, str]]:
     return name.strip(), defines
 
 
+def variant_row_filter(store: HierarchyStore, variant: str) -> Tuple[str, Tuple[object, ...]]:
+    """SQL predicate (and params) selecting *variant*'s instance rows."""
+    if store.get_meta("variant_row_mode") == "mask":
+        names = json.loads(store.get_meta("variants_json", "[]") or "[]")
+        if variant in names:
+            return "(variant_mask & ?) != 0", (1 << names.index(variant),)
+    return "variant = ?", (variant,)
+
+
 def compare_variant_paths(
     store: HierarchyStore,
     variant_a: str,
     variant_b: str,
 ) -> Dict[str, object]:
-    a = {
-        r[0]
-        for r in store.conn.execute(
-            "SELECT full_path FROM instances WHERE variant = ?",
-            (variant_a,),
-        ).fetchall()
-    }
-    b = {
-        r[0]
-        for r in store.conn.execute(
-            "SELECT full_path FROM instances WHERE variant = ?",
-            (variant_b,),
-        ).fetchall()
-    }
+    def paths(variant: str) -> Set[str]:
+        where, params = variant_row_filter(store, variant)
+        return {
+            r[0]
+            for r in store.conn.execute(
+                f"SELECT full_path FROM instances WHERE {where}", params
+            ).fetchall()
+        }
+
+    a = paths(variant_a)
+    b = paths(variant_b)
     return {
         "variant_a": variant_a,
         "variant_b": variant_b,
@@ -61,6 +80,17 @@ def compare_variant_paths(
     }
 
 
+def _variant_defines(base: Mapping[str, str], extra: Mapping[str, str]) -> Dict[str, str]:
+    defs = dict(base)
+    for k, v in extra.items():
+        low = str(v).strip().lower()
+        if v == "" or low in ("0", "false"):
+            defs.pop(k, None)
+        else:
+            defs[k] = v
+    return defs
+
+
 def build_index_variants(
     filelist_path: str,
     db_path: str,
@@ -72,62 +102,97 @@ def build_index_variants(
     meta_extra: Optional[dict] = None,
     index_cwd: Optional[str] = None,
 ) -> HierarchyStore:
+    """
+    Index every variant into one DB, parsing and elaborating only the deltas.
+
+    The first variant is parsed and flattened in full.  Each further variant
+    re-parses just the sources its defines can affect (:func:`plan_variant`)
+    and re-walks just the affected subtrees.  Rows identical across variants
+    are stored once; ``variant_mask`` bit *i* marks membership in
+    ``variants_json[i]`` and ``variant`` lists the member names.
+    """
     if not variants:
         raise ValueError("variants must not be empty")
+    if len(variants) > MAX_VARIANTS:
+        raise ValueError(
+            f"at most {MAX_VARIANTS} variants per DB (variant_mask bits), got {len(variants)}"
+        )
 
     store = HierarchyStore(db_path)
     store.clear_instances()
-    merged_all: Dict[str, ModuleRecord] = {}
     tops = list(top_modules or ([top_module] if top_module else []))
     primary = tops[0] if tops else top_module
-    fl0 = parse_filelist_simple(filelist_path, index_cwd=index_cwd)
+    fl0 = parse_filelist_cached(filelist_path, index_cwd=index_cwd)
     sources = [str(p) for p in fl0.source_files]
+    scanner = MacroScanner([str(p) for p in fl0.incdirs])
 
-    for vname, extra in variants:
-        fl = parse_filelist_simple(filelist_path, index_cwd=index_cwd)
-        defs = dict(fl.defines)
-        for k, v in extra.items():
-            low = str(v).strip().lower()
-            if v == "" or low in ("0", "false"):
-                defs.pop(k, None)
-            else:
-                defs[k] = v
-        fl = replace(fl, defines=defs)
-        mods = ingest_filelist_result(
-            fl,
-            index_cwd=index_cwd,
-            slang_cache_path=db_path,
-        )
-        if not merged_all:
-            store.load_modules(mods.values())
-            merged_all = dict(mods)
-        else:
-            merge_module_records(merged_all, mods)
-            store.load_modules(mods.values())
-
+    def elaborate(mods: Dict[str, ModuleRecord]) -> Tuple[List[FlatInstance], str]:
         if sources and primary and not (tops and len(tops) > 1):
-            flat, _, _ = elaborate_flat_with_sources(
-                merged_all,
+            flat, source, _ = elaborate_flat_with_sources(
+                mods,
                 sources=sources,
                 top_module=primary,
                 path_hierarchy_mode=path_hierarchy_mode,
             )
-        else:
-            flat = elaborate_flat(merged_all, top_module=primary, top_modules=tops)
-        for row in flat:
-            row.variant = vname
-        store.load_instances(flat)
+            return flat, source
+        return elaborate_flat(mods, top_module=primary, top_modules=tops), "ast"
+
+    base_name, base_extra = variants[0]
+    base_defs = _variant_defines(fl0.defines, base_extra)
+    base_mods = ingest_filelist_result(
+        replace(fl0, defines=base_defs),
+        index_cwd=index_cwd,
+        slang_cache_path=db_path,
+    )
+    parse_meta = get_last_parse_meta()
+    store.load_modules(base_mods.values())
+    base_flat, hierarchy_source = elaborate(base_mods)
+    delta_ok = hierarchy_source == "ast" and not flatten_cycle_detected()
+
+    flats: List[List[FlatInstance]] = [base_flat]
+    plans: List[VariantPlan] = []
+    for vname, extra in variants[1:]:
+        defs = _variant_defines(fl0.defines, extra)
+        plan = plan_variant(vname, sources, base_defs, defs, base_mods, scanner=scanner)
+        plans.append(plan)
+        reparsed: Dict[str, ModuleRecord] = {}
+        if plan.sensitive_files:
+            reparsed = ingest_filelist_result(
+                replace(fl0, defines=defs),
+                index_cwd=index_cwd,
+                slang_cache_path=db_path,
+                parse_source_paths=plan.sensitive_files,
+            )
+            store.load_modules(reparsed.values())
+        mods = apply_variant_records(base_mods, plan, reparsed)
+        flat: Optional[List[FlatInstance]] = None
+        if delta_ok:
+            flat = elaborate_variant_delta(
+                base_mods,
+                base_flat,
+                mods,
+                top_module=primary,
+                top_modules=tops if len(tops) > 1 else None,
+            )
+        if flat is None:
+            flat, _ = elaborate(mods)
+        flats.append(flat)
+
+    names = [n for n, _ in variants]
+    store.load_instances(merge_variant_rows(names, flats))
 
     from hch.index.meta_contract import apply_tier_contract_meta
 
     meta = dict(meta_extra or {})
     apply_tier_contract_meta(meta)
-    meta.update(get_last_parse_meta())
-    meta["variants_json"] = json.dumps([n for n, _ in variants])
+    meta.update(parse_meta)
+    meta["variants_json"] = json.dumps(names)
     meta["ifdef_variant_mode"] = "multi_row"
+    meta["variant_row_mode"] = "mask"
+    meta["variant_plan_json"] = plans_to_json(plans)
     meta["tier"] = "P"
     meta["indexing_complete"] = "1"
     store.set_meta("instance_count", str(store.count_instances()))
     for k, v in meta.items():
         store.set_meta(k, v)
-    return store
\ No newline at end of file
+    return store
@@ -0,0 +1,383 @@
+"""Delta planning for multi-variant (``--variant``) indexing.
+
+A variant differs from the base only in a few preprocessor defines, and most
+sources never mention them.  :func:`plan_variant` finds the sources whose text
+(or ``include`` closure) refers to a changed macro — in
+``ifdef``/``ifndef``/``elsif``, a backtick use, or a ``define``/``undef`` — and
+the modules they define; only those files are re-parsed.
+:func:`elaborate_variant_delta` then re-walks just the modules whose records
+changed and their instantiating ancestors, splicing the untouched subtrees in
+from the base hierarchy.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import re
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+from hch.ingest.hierarchy_build import elaborate_flat, find_top_modules, flatten_cycle_detected
+from hch.ingest.multi_def import definition_paths_for_record
+from hch.ingest.text_instance_fallback import _strip_comments
+from hch.platform_paths import path_to_db
+from hch.schema import FlatInstance, ModuleRecord
+
+_DIRECTIVE_RE = re.compile(r"`\s*(ifdef|ifndef|elsif|define|undef)\s+([A-Za-z_]\w*)")
+_MACRO_USE_RE = re.compile(r"`([A-Za-z_]\w*)")
+_INCLUDE_RE = re.compile(r'`\s*include\s+["<]([^">]+)[">]')
+# ``variant_mask`` is a signed 64-bit SQLite INTEGER: bits 0..62.
+MAX_VARIANTS = 63
+_KEYWORDS = frozenset(
+    {
+        "define", "undef", "undefineall", "ifdef", "ifndef", "elsif", "else", "endif",
+        "include", "timescale", "resetall", "celldefine", "endcelldefine",
+        "default_nettype", "line", "pragma", "begin_keywords", "end_keywords",
+        "unconnected_drive", "nounconnected_drive", "__FILE__", "__LINE__",
+    }
+)
+
+
+@dataclass
+class _FileMacros:
+    referenced: Set[str] = field(default_factory=set)
+    defined: Set[str] = field(default_factory=set)
+    includes: List[str] = field(default_factory=list)
+
+
+@dataclass
+class VariantPlan:
+    """Which sources / modules one variant must re-parse relative to the base."""
+
+    name: str
+    changed_macros: Set[str]
+    sensitive_files: List[str]
+    sensitive_modules: Set[str]
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "variant": self.name,
+            "changed_macros": sorted(self.changed_macros),
+            "reparse_files": len(self.sensitive_files),
+            "reparse_modules": len(self.sensitive_modules),
+        }
+
+
+def changed_define_keys(base: Mapping[str, str], other: Mapping[str, str]) -> Set[str]:
+    """Macros added, removed or redefined between two define maps."""
+    return {k for k in set(base) | set(other) if base.get(k) != other.get(k)}
+
+
+def _scan_macros(path: str) -> _FileMacros:
+    try:
+        text = Path(path).read_text(encoding="utf-8", errors="ignore")
+    except OSError:
+        return _FileMacros()
+    text = _strip_comments(text)
+    out = _FileMacros()
+    for kind, name in _DIRECTIVE_RE.findall(text):
+        out.referenced.add(name)
+        if kind == "define":
+            out.defined.add(name)
+    for name in _MACRO_USE_RE.findall(text):
+        if name not in _KEYWORDS:
+            out.referenced.add(name)
+    out.includes = _INCLUDE_RE.findall(text)
+    return out
+
+
+class MacroScanner:
+    """Per-file macro scan with ``include`` resolution (cached across variants)."""
+
+    def __init__(self, include_dirs: Sequence[str]) -> None:
+        self.include_dirs = [Path(d) for d in include_dirs]
+        self._files: Dict[str, _FileMacros] = {}
+        self._closure: Dict[str, Tuple[Set[str], Set[str]]] = {}
+
+    def _scan(self, path: str) -> _FileMacros:
+        hit = self._files.get(path)
+        if hit is None:
+            hit = self._files[path] = _scan_macros(path)
+        return hit
+
+    def _resolve_include(self, name: str, from_file: str) -> Optional[str]:
+        for base in [Path(from_file).parent, *self.include_dirs]:
+            cand = base / name
+            if cand.is_file():
+                return str(cand.resolve())
+        return None
+
+    def macros(self, path: str) -> Tuple[Set[str], Set[str]]:
+        """``(referenced, defined)`` macro names for *path* plus its include closure."""
+        hit = self._closure.get(path)
+        if hit is not None:
+            return hit
+        referenced: Set[str] = set()
+        defined: Set[str] = set()
+        seen: Set[str] = set()
+        stack = [path]
+        while stack:
+            cur = stack.pop()
+            if cur in seen:
+                continue
+            seen.add(cur)
+            info = self._scan(cur)
+            referenced |= info.referenced
+            defined |= info.defined
+            for inc in info.includes:
+                resolved = self._resolve_include(inc, cur)
+                if resolved:
+                    stack.append(resolved)
+        self._closure[path] = (referenced, defined)
+        return referenced, defined
+
+
+def _files_by_module(modules: Mapping[str, ModuleRecord]) -> Dict[str, List[str]]:
+    out: Dict[str, List[str]] = {}
+    for name, rec in modules.items():
+        out[name] = definition_paths_for_record(rec)
+    return out
+
+
+def plan_variant(
+    name: str,
+    sources: Sequence[str],
+    base_defines: Mapping[str, str],
+    variant_defines: Mapping[str, str],
+    base_modules: Mapping[str, ModuleRecord],
+    *,
+    scanner: MacroScanner,
+) -> VariantPlan:
+    """
+    Sources to re-parse for *variant_defines* relative to the base parse.
+
+    Macros defined inside a sensitive file join the changed set (they may
+    expand differently), and every definition of a module defined in a
+    sensitive file is re-parsed too, so the variant's record for that module
+    can replace the base record outright.
+    """
+    changed = changed_define_keys(base_defines, variant_defines)
+    if not changed:
+        return VariantPlan(name, changed, [], set())
+    watched = set(changed)
+    sensitive: Set[str] = set()
+    grew = True
+    while grew:
+        grew = False
+        for src in sources:
+            if src in sensitive:
+                continue
+            referenced, defined = scanner.macros(src)
+            if referenced & watched:
+                sensitive.add(src)
+                if not defined <= watched:
+                    watched |= defined
+                    grew = True
+    by_db = {path_to_db(s): s for s in sources}
+    sensitive_db = {path_to_db(s) for s in sensitive}
+    mod_files = _files_by_module(base_modules)
+    modules: Set[str] = set()
+    grew = True
+    while grew:
+        grew = False
+        for mod, files in mod_files.items():
+            if mod in modules or not sensitive_db.intersection(files):
+                continue
+            modules.add(mod)
+            for f in files:
+                if f not in sensitive_db and f in by_db:
+                    sensitive_db.add(f)
+                    sensitive.add(by_db[f])
+                    grew = True
+    ordered = [s for s in sources if s in sensitive]
+    return VariantPlan(name, changed, ordered, modules)
+
+
+def apply_variant_records(
+    base_modules: Mapping[str, ModuleRecord],
+    plan: VariantPlan,
+    reparsed: Mapping[str, ModuleRecord],
+) -> Dict[str, ModuleRecord]:
+    """Base records with the plan's modules replaced by their re-parsed records."""
+    out = {k: v for k, v in base_modules.items() if k not in plan.sensitive_modules}
+    sensitive_db = {path_to_db(s) for s in plan.sensitive_files}
+    for mod, rec in reparsed.items():
+        # Library stubs for names the subset parse could not see stay with the base.
+        if mod in out and not sensitive_db.intersection(definition_paths_for_record(rec)):
+            continue
+        out[mod] = rec
+    return out
+
+
+def changed_modules(
+    base_modules: Mapping[str, ModuleRecord],
+    variant_modules: Mapping[str, ModuleRecord],
+) -> Set[str]:
+    names = set(base_modules) | set(variant_modules)
+    return {n for n in names if base_modules.get(n) != variant_modules.get(n)}
+
+
+def _dirty_modules(
+    changed: Set[str],
+    graphs: Iterable[Mapping[str, ModuleRecord]],
+) -> Set[str]:
+    """*changed* plus every module that (transitively) instantiates one of them."""
+    parents: Dict[str, Set[str]] = {}
+    for modules in graphs:
+        for name, rec in modules.items():
+            for edge in rec.instances:
+                parents.setdefault(edge.child_module, set()).add(name)
+    dirty = set(changed)
+    stack = list(changed)
+    while stack:
+        for parent in parents.get(stack.pop(), ()):
+            if parent not in dirty:
+                dirty.add(parent)
+                stack.append(parent)
+    return dirty
+
+
+def _reroot(rows: Sequence[FlatInstance], old: str, old_depth: int, new: FlatInstance) -> List[FlatInstance]:
+    out: List[FlatInstance] = []
+    cut = len(old)
+    for row in rows:
+        parent = row.parent_path
+        out.append(
+            replace(
+                row,
+                full_path=new.full_path + row.full_path[cut:],
+                parent_path=new.full_path + parent[cut:] if parent else parent,
+                depth=row.depth - old_depth + new.depth,
+                variant="",
+            )
+        )
+    return out
+
+
+def elaborate_variant_delta(
+    base_modules: Mapping[str, ModuleRecord],
+    base_flat: Sequence[FlatInstance],
+    variant_modules: Mapping[str, ModuleRecord],
+    *,
+    top_module: Optional[str] = None,
+    top_modules: Optional[Sequence[str]] = None,
+) -> Optional[List[FlatInstance]]:
+    """
+    Variant flat rows, re-walking only modules affected by the variant.
+
+    Returns ``None`` when a delta is unsafe (bind edges with hierarchical
+    targets, flatten cycles, unresolvable tops) and the caller should
+    elaborate the variant in full.
+    """
+    changed = changed_modules(base_modules, variant_modules)
+    if not changed:
+        return [replace(r, variant="") for r in base_flat]
+    if any(
+        e.via_bind and e.bind_target_hier
+        for rec in variant_modules.values()
+        for e in rec.instances
+    ):
+        return None
+    mod_map = dict(variant_modules)
+    if top_modules:
+        tops = [t for t in top_modules if t in mod_map]
+    elif top_module and top_module in mod_map:
+        tops = [top_module]
+    else:
+        tops = find_top_modules(mod_map)
+    if not tops:
+        return None
+    dirty = _dirty_modules(changed, (base_modules, variant_modules))
+    pruned: Dict[str, ModuleRecord] = {}
+    for name, rec in mod_map.items():
+        if name in dirty or not rec.instances:
+            pruned[name] = rec
+        else:
+            leaf = copy.copy(rec)
+            leaf.instances = []
+            pruned[name] = leaf
+    spine = elaborate_flat(pruned, top_modules=tops)
+    if flatten_cycle_detected():
+        return None
+
+    # Base subtree below the first fully expanded occurrence of each clean module.
+    first_at: Dict[str, int] = {}
+    for i, row in enumerate(base_flat):
+        if row.module not in dirty and not row.is_unresolved:
+            first_at.setdefault(row.module, i)
+
+    templates: Dict[str, Tuple[str, int, List[FlatInstance]]] = {}
+
+    def template(mod: str) -> Optional[Tuple[str, int, List[FlatInstance]]]:
+        hit = templates.get(mod)
+        if hit is not None:
+            return hit
+        idx = first_at.get(mod)
+        if idx is not None:
+            root = base_flat[idx]
+            prefix = root.full_path + "."
+            end = idx + 1
+            while end < len(base_flat) and base_flat[end].full_path.startswith(prefix):
+                end += 1
+            hit = (root.full_path, root.depth, list(base_flat[idx + 1 : end]))
+        else:
+            rows = elaborate_flat(mod_map, top_modules=[mod])
+            if flatten_cycle_detected() or not rows:
+                return None
+            hit = (rows[0].full_path, rows[0].depth, rows[1:])
+        templates[mod] = hit
+        return hit
+
+    out: List[FlatInstance] = []
+    for row in spine:
+        out.append(row)
+        rec = mod_map.get(row.module)
+        if row.module in dirty or rec is None or not rec.instances or row.is_unresolved:
+            continue
+        tpl = template(row.module)
+        if tpl is None:
+            return None
+        old_path, old_depth, rows = tpl
+        out.extend(_reroot(rows, old_path, old_depth, row))
+    return out
+
+
+def merge_variant_rows(
+    names: Sequence[str],
+    flats: Sequence[Sequence[FlatInstance]],
+) -> List[FlatInstance]:
+    """
+    One row per distinct ``(full_path, content)`` across variants.
+
+    ``variant_mask`` has bit *i* set for ``names[i]``; ``variant`` is the
+    comma-joined names, so a row unique to one variant keeps that name.
+    """
+    if len(flats) > MAX_VARIANTS:
+        raise ValueError(f"at most {MAX_VARIANTS} variants fit variant_mask, got {len(flats)}")
+    groups: Dict[str, List[Tuple[FlatInstance, int]]] = {}
+    for bit, rows in enumerate(flats):
+        last: Dict[str, FlatInstance] = {}
+        for row in rows:
+            last[row.full_path] = row
+        for path, row in last.items():
+            entries = groups.setdefault(path, [])
+            plain = replace(row, variant="", variant_mask=0)
+            for i, (seen, mask) in enumerate(entries):
+                if seen == plain:
+                    entries[i] = (seen, mask | (1 << bit))
+                    break
+            else:
+                entries.append((plain, 1 << bit))
+    out: List[FlatInstance] = []
+    for entries in groups.values():
+        for row, mask in entries:
+            row.variant_mask = mask
+            row.variant = ",".join(n for i, n in enumerate(names) if mask >> i & 1)
+            out.append(row)
+    return out
+
+
+def plans_to_json(plans: Sequence[VariantPlan]) -> str:
+    return json.dumps([p.summary() for p in plans])
@@ -7,7 +7,7 @@ from dataclasses import replace
 from pathlib import Path
 from typing import Dict, List, Optional, Sequence, Tuple
 
-from hch.ingest.filelist import parse_filelist_simple
+from hch.ingest.filelist_cache import parse_filelist_cached
 from hch.ingest.ingest import get_last_parse_meta, ingest_filelist_result
 from hch.index.loader import build_index_from_modules
 from hch.ingest.filelist import FilelistResult
@@ -32,7 +32,7 @@ def build_variant_split_databases(
         raise ValueError("variants must not be empty")
     root = Path(out_dir)
     root.mkdir(parents=True, exist_ok=True)
-    fl_base = parse_filelist_simple(filelist_path, index_cwd=index_cwd)
+    fl_base = parse_filelist_cached(filelist_path, index_cwd=index_cwd)
     paths: Dict[str, str] = {}
 
     for vname, extra in variants:
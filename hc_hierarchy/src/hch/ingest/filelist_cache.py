@@ -1,4 +1,8 @@
-"""Cache parsed filelists by (path, index_cwd, mtime) to avoid repeated nested -f expansion."""
+"""Cache parsed filelists by (path, index_cwd, env, mtime) to avoid repeated nested -f expansion.
+
+Two tiers: a per-process dict, then the on-disk cache in
+:mod:`hch.ingest.filelist_disk_cache` (shared across runs and with hierwalk).
+"""
 
 from __future__ import annotations
 
@@ -10,13 +14,14 @@ from typing import Dict, Optional, Set
 
 from hch.ingest.filelist import FilelistResult, parse_filelist_simple
 from hch.ingest.filelist_cwd import resolve_index_cwd
+from hch.ingest.filelist_disk_cache import expand_filelist_cached
 from hch.platform_paths import path_to_db
 
 
 @dataclass
 class _CacheEntry:
     result: FilelistResult
-    filelist_mtimes: Dict[str, float]
+    filelist_mtimes: Dict[str, Optional[float]]
     index_cwd: str
 
 
@@ -27,8 +32,9 @@ def clear_filelist_cache() -> None:
     _cache.clear()
 
 
-def _cache_key(top: Path, index_cwd: Path) -> str:
-    return f"{top}\0{index_cwd}"
+def _cache_key(top: Path, index_cwd: Path, env: Optional[Dict[str, str]]) -> str:
+    env_part = "\0".join(f"{k}={v}" for k, v in sorted((env or {}).items()))
+    return f"{top}\0{index_cwd}\0{env_part}"
 
 
 def collect_filelist_mtimes(
@@ -78,16 +84,25 @@ def collect_filelist_mtimes(
     return out
 
 
+def _filelist_mtimes(fl: FilelistResult) -> Dict[str, Optional[float]]:
+    """Mtimes of every filelist the expansion read (``None``: it was missing)."""
+    out: Dict[str, Optional[float]] = {}
+    for p in fl.filelists:
+        try:
+            out[path_to_db(p)] = p.stat().st_mtime
+        except OSError:
+            out[path_to_db(p)] = None
+    return out
+
+
 def _entry_stale(entry: _CacheEntry) -> bool:
     for path, mt in entry.filelist_mtimes.items():
-        p = Path(path)
-        if not p.exists():
-            return True
         try:
-            if p.stat().st_mtime != mt:
+            if Path(path).stat().st_mtime != mt:
                 return True
         except OSError:
-            return True
+            if mt is not None:
+                return True
     return False
 
 
@@ -102,11 +117,17 @@ def parse_filelist_cached(
         _cache.clear()
     top = Path(top_filelist).resolve()
     cwd = resolve_index_cwd(top, index_cwd, env)
-    key = _cache_key(top, cwd)
+    key = _cache_key(top, cwd, env)
     entry = _cache.get(key)
     if entry is not None and not _entry_stale(entry):
         return entry.result
-    fl = parse_filelist_simple(str(top), env=env, index_cwd=str(cwd))
-    mtimes = collect_filelist_mtimes(top, index_cwd=cwd)
+    fl = expand_filelist_cached(
+        top,
+        cwd,
+        env,
+        lambda: parse_filelist_simple(str(top), env=env, index_cwd=str(cwd)),
+        result_type=FilelistResult,
+    )
+    mtimes = _filelist_mtimes(fl)
     _cache[key] = _CacheEntry(result=fl, filelist_mtimes=mtimes, index_cwd=str(cwd))
     return fl
\ No newline at end of file
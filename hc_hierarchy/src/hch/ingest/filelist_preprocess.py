@@ -37,6 +37,7 @@ class FilelistResult:
     work_library: str = ""
     errors: List[str] = field(default_factory=list)
     index_cwd_used: Optional[Path] = None
+    filelists: List[Path] = field(default_factory=list)  # every .f read (or missing)
 
 
 def _strip_comments(line: str) -> str:
@@ -97,6 +98,7 @@ def expand_filelist(
         if fpath in seen_fl:
             return
         seen_fl.add(fpath)
+        result.filelists.append(fpath)
         if not fpath.exists():
             result.errors.append(f"Filelist not found: {fpath}")
             return
@@ -4,8 +4,9 @@ from __future__ import annotations
 
 import json
 import re
+from collections import deque
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
 
 
 @dataclass
@@ -48,6 +49,44 @@ def apply_lastnode(rows: list) -> list:
     return kept
 
 
+def iter_lastnode(rows: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming :func:`apply_lastnode` for rows sorted by ``full_path``.
+
+    A row is held back only until a later row proves it has no descendant in
+    the result (``full_path + "."`` sorts before ``full_path + "/"``), so
+    memory stays bounded by the rows of one open branch, not the result set.
+    """
+    pending: Deque[List[Any]] = deque()  # [row, closes_at, alive]
+    open_by_path: Dict[str, List[List[Any]]] = {}
+    for r in rows:
+        fp = r["full_path"]
+        dot = fp.find(".")
+        while dot != -1:
+            for entry in open_by_path.get(fp[:dot], ()):
+                entry[2] = False
+            dot = fp.find(".", dot + 1)
+        while pending and (not pending[0][2] or fp >= pending[0][1]):
+            row, _, alive = pending.popleft()
+            _forget_open(open_by_path, row["full_path"])
+            if alive:
+                yield row
+        entry = [r, fp + "/", True]
+        pending.append(entry)
+        open_by_path.setdefault(fp, []).append(entry)
+    for row, _, alive in pending:
+        if alive:
+            yield row
+
+
+def _forget_open(open_by_path: Dict[str, List[List[Any]]], path: str) -> None:
+    entries = open_by_path.get(path)
+    if entries:
+        entries.pop(0)
+        if not entries:
+            del open_by_path[path]
+
+
 def _port_names(row: Dict[str, Any]) -> List[str]:
     pj = row.get("port_json")
     if pj:
@@ -106,6 +145,27 @@ def apply_expand_ports(
     return out
 
 
+def iter_post_filters(
+    rows: Iterable[Dict[str, Any]],
+    *,
+    lastnode: bool = False,
+    expand_ports: bool = False,
+    port_path_filter: Optional[str] = None,
+    port_path_filter_op: Optional[str] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Generator form of :func:`apply_post_filters` (rows sorted by ``full_path``)."""
+    it: Iterable[Dict[str, Any]] = iter_lastnode(rows) if lastnode else rows
+    for r in it:
+        if expand_ports:
+            yield from apply_expand_ports(
+                [r],
+                port_path_filter=port_path_filter,
+                port_path_filter_op=port_path_filter_op,
+            )
+        else:
+            yield r
+
+
 def apply_post_filters(
     rows: list,
     *,
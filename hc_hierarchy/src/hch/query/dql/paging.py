@@ -0,0 +1,124 @@
+"""Keyset-paginated, streaming DQL execution.
+
+``plan.sql`` returns the whole result in one statement, and callers used to
+``fetchall()`` it, post-filter in Python and then truncate.  :func:`iter_dql_rows`
+instead reads the plan's ``WHERE`` in pages ordered by ``(full_path, id)``
+(``HCH_DQL_PAGE_ROWS`` rows per short statement), runs ``lastnode`` /
+``expand_ports`` as generators, and pairs every output row with its
+:data:`CursorKey`.  ``encode_cursor(*key)`` is an opaque token; passing it back
+resumes right after the row, so callers can stop at a limit and page on
+without holding earlier rows.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import os
+import sqlite3
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from hch.query.dql.planner import SqlPlan, iter_post_filters
+
+DEFAULT_PAGE_ROWS = 2000
+
+CursorKey = Tuple[str, int, int]  # (full_path, instances.id, rows emitted)
+
+
+def default_page_rows() -> int:
+    raw = os.environ.get("HCH_DQL_PAGE_ROWS", "").strip()
+    try:
+        return max(1, int(raw)) if raw else DEFAULT_PAGE_ROWS
+    except ValueError:
+        return DEFAULT_PAGE_ROWS
+
+
+def encode_cursor(full_path: str, row_id: int, emitted: int = 0) -> str:
+    """
+    Cursor after instance ``(full_path, row_id)``.
+
+    *emitted* > 0 means that many output rows of the instance were already
+    returned (``expand_ports`` splits one instance into one row per port).
+    """
+    raw = json.dumps([full_path, int(row_id), int(emitted)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[str, int, int]:
+    try:
+        pad = "=" * (-len(token) % 4)
+        full_path, row_id, emitted = json.loads(
+            base64.urlsafe_b64decode(token + pad).decode("utf-8")
+        )
+        return str(full_path), int(row_id), int(emitted)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"invalid DQL cursor: {token!r}") from e
+
+
+def _source_rows(
+    conn: sqlite3.Connection,
+    plan: SqlPlan,
+    after: Optional[Tuple[str, int]],
+    page_rows: int,
+) -> Iterator[Dict[str, Any]]:
+    cap = plan.row_limit
+    seen = 0
+    while True:
+        size = page_rows if cap is None else min(page_rows, cap - seen)
+        if size <= 0:
+            return
+        sql, params = plan.page_sql(after, size)
+        cur = conn.execute(sql, params)
+        names = [d[0] for d in cur.description]
+        page = cur.fetchall()
+        for raw in page:
+            yield dict(zip(names, raw))
+        seen += len(page)
+        if len(page) < size:
+            return
+        last = page[-1]
+        after = (last[0], last[-1])  # full_path, _row_id
+
+
+def iter_dql_rows(
+    conn: sqlite3.Connection,
+    plan: SqlPlan,
+    *,
+    cursor: Optional[str] = None,
+    page_rows: Optional[int] = None,
+) -> Iterator[Tuple[Dict[str, Any], Optional[CursorKey]]]:
+    """
+    Post-filtered result rows of *plan*, each with the key that resumes after it.
+
+    Rows come in ``(full_path, id)`` order; ``plan.row_limit`` still caps the
+    instances read per call.  Plans built without a ``where`` (hand-made
+    :class:`SqlPlan`) run ``plan.sql`` unpaged and yield ``None`` keys.
+    """
+    if plan.where is None:
+        cur = conn.execute(plan.sql, plan.params)
+        names = [d[0] for d in cur.description]
+        for row in iter_post_filters((dict(zip(names, r)) for r in cur), plan):
+            yield row, None
+        return
+    after: Optional[Tuple[str, int]] = None
+    skip = 0
+    if cursor:
+        path, row_id, skip = decode_cursor(cursor)
+        # Re-read the cursor instance itself when some of its rows are still due.
+        after = (path, row_id - 1) if skip else (path, row_id)
+    rows = _source_rows(conn, plan, after, page_rows or default_page_rows())
+    split = plan.post_filter_expand_ports
+    key: Optional[Tuple[str, int]] = None
+    emitted = 0
+    for row in iter_post_filters(rows, plan):
+        row_id = row.pop("_row_id")
+        this = (row["full_path"], row_id)
+        if this == key:
+            emitted += 1
+        else:
+            key, emitted = this, 1
+        if skip:
+            if after is not None and this == (after[0], after[1] + 1) and emitted <= skip:
+                continue
+            skip = 0
+        yield row, (this[0], row_id, emitted if split else 0)
@@ -3,8 +3,8 @@
 from __future__ import annotations
 
 import re
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 
 @dataclass
@@ -16,6 +16,39 @@ class SqlPlan:
     port_path_filter: Optional[str] = None
     port_path_filter_op: Optional[str] = None
     row_limit: Optional[int] = None
+    where: Optional[str] = None  # WHERE of ``sql``; enables keyset paging
+    where_params: List[Any] = field(default_factory=list)
+
+    def page_sql(
+        self, after: Optional[Tuple[str, int]], page_rows: int
+    ) -> Tuple[str, List[Any]]:
+        """
+        Keyset page: rows ordered by ``(full_path, id)`` strictly after *after*.
+
+        Adds ``i.id AS _row_id`` so the caller can build the next cursor.
+        """
+        clauses = [f"({self.where})"]
+        params = list(self.where_params)
+        if after is not None:
+            clauses.append("i.full_path >= ? AND (i.full_path > ? OR i.id > ?)")
+            params.extend([after[0], after[0], after[1]])
+        sql = (
+            f"SELECT {RESULT_COLUMNS}, i.id AS _row_id {RESULT_FROM}"
+            f" WHERE {' AND '.join(clauses)} ORDER BY i.full_path, i.id LIMIT ?"
+        )
+        params.append(page_rows)
+        return sql, params
+
+
+RESULT_COLUMNS = (
+    "i.full_path, i.inst_leaf_name, m.module_name, f.filepath, "
+    "i.depth, i.parent_path, i.port_json"
+)
+RESULT_FROM = """
+    FROM instances i
+    JOIN modules m ON m.id = i.module_id
+    LEFT JOIN files f ON f.id = i.filepath_id
+"""
 
 
 def _glob_to_like(pattern: str) -> str:
@@ -94,29 +127,27 @@ def plan_simple_dql(expr: str) -> SqlPlan:
             raise ValueError(f"Unknown DQL field: {field}")
 
     where = " AND ".join(clauses) if clauses else "1=1"
-    sql = f"""
-        SELECT i.full_path, i.inst_leaf_name, m.module_name, f.filepath,
-               i.depth, i.parent_path, i.port_json
-        FROM instances i
-        JOIN modules m ON m.id = i.module_id
-        LEFT JOIN files f ON f.id = i.filepath_id
-        WHERE {where}
-        ORDER BY i.full_path
-    """
+    sql = f"SELECT {RESULT_COLUMNS} {RESULT_FROM} WHERE {where} ORDER BY i.full_path"
     return SqlPlan(
         sql=sql,
         params=params,
         post_filter_lastnode=lastnode,
         post_filter_expand_ports=qmods.expand_ports,
+        where=where,
+        where_params=list(params),
     )
 
 
-def plan_dql(expr: str) -> SqlPlan:
-    """Lark AST → SQL (OR, ^=, port index). Falls back to plan_simple_dql on parse errors."""
+def plan_dql(expr: str, *, search_index: bool = False) -> SqlPlan:
+    """
+    Lark AST → SQL (OR, ^=, port index). Falls back to plan_simple_dql on parse errors.
+
+    Pass ``search_index=has_search_index(conn)`` to use the FTS trigram index.
+    """
     try:
         from hch.query.dql.sql_compiler import plan_dql as _compile
 
-        return _compile(expr)
+        return _compile(expr, search_index=search_index)
     except Exception:
         return plan_simple_dql(expr)
 
@@ -139,3 +170,16 @@ def apply_post_filters(rows: List[Dict[str, Any]], plan: SqlPlan) -> List[Dict[s
     )
 
 
+def iter_post_filters(rows: Iterable[Dict[str, Any]], plan: SqlPlan) -> Iterator[Dict[str, Any]]:
+    """Streaming :func:`apply_post_filters` for rows ordered by ``full_path``."""
+    from hch.query.dql.modifiers import iter_post_filters as _iter
+
+    return _iter(
+        rows,
+        lastnode=plan.post_filter_lastnode,
+        expand_ports=plan.post_filter_expand_ports,
+        port_path_filter=plan.port_path_filter,
+        port_path_filter_op=plan.port_path_filter_op,
+    )
+
+
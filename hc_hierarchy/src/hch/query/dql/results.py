@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import json
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 
 def _ports_cell(row: Dict[str, Any]) -> str:
@@ -46,60 +46,103 @@ def normalize_row(row: Dict[str, Any]) -> Dict[str, Any]:
     return out
 
 
+_TEXT_HEADER = "full_path\tinst\tmodule\tfile\tdepth\tparent\tports"
+_TEXT_HEADER_PORTS = "port_path\tfull_path\tinst\tmodule\tfile\tdepth\tparent\tport_name"
+
+
+def _text_line(raw: Dict[str, Any], expanded: bool) -> str:
+    r = normalize_row(raw)
+    if expanded:
+        return (
+            f"{r.get('port_path','')}\t{r['full_path']}\t{r['inst']}\t{r['module']}"
+            f"\t{r['file']}\t{r['depth']}\t{r.get('parent','')}\t{r.get('port_name','')}"
+        )
+    return (
+        f"{r['full_path']}\t{r['inst']}\t{r['module']}\t{r['file']}"
+        f"\t{r['depth']}\t{r.get('parent','')}\t{r['ports']}"
+    )
+
+
+def iter_rows_text(
+    rows: Iterable[Dict[str, Any]],
+    *,
+    query: str = "",
+    include_header: bool = True,
+) -> Iterator[str]:
+    """
+    :func:`format_rows_text` one ``\\n``-terminated line at a time.
+
+    The port-expanded header is chosen from the first row (``expand_ports``
+    gives every row a ``port_path``), so *rows* is read only once.
+    """
+    if query:
+        yield f"# {query}\n"
+    it = iter(rows)
+    first = next(it, None)
+    expanded = isinstance(first, dict) and "port_path" in first
+    if include_header:
+        yield (_TEXT_HEADER_PORTS if expanded else _TEXT_HEADER) + "\n"
+    if first is None:
+        return
+    yield _text_line(first, expanded) + "\n"
+    for raw in it:
+        yield _text_line(raw, expanded) + "\n"
+
+
 def format_rows_text(
     rows: Iterable[Dict[str, Any]],
     *,
     query: str = "",
     include_header: bool = True,
 ) -> str:
+    rows = list(rows)
+    expanded = any("port_path" in (raw if isinstance(raw, dict) else {}) for raw in rows)
     lines: List[str] = []
     if query:
         lines.append(f"# {query}")
-    expanded = any("port_path" in (raw if isinstance(raw, dict) else {}) for raw in rows)
     if include_header:
-        if expanded:
-            lines.append(
-                "port_path\tfull_path\tinst\tmodule\tfile\tdepth\tparent\tport_name"
-            )
-        else:
-            lines.append("full_path\tinst\tmodule\tfile\tdepth\tparent\tports")
-    for raw in rows:
-        r = normalize_row(raw)
-        if expanded:
-            lines.append(
-                f"{r.get('port_path','')}\t{r['full_path']}\t{r['inst']}\t{r['module']}"
-                f"\t{r['file']}\t{r['depth']}\t{r.get('parent','')}\t{r.get('port_name','')}"
-            )
-        else:
-            lines.append(
-                f"{r['full_path']}\t{r['inst']}\t{r['module']}\t{r['file']}"
-                f"\t{r['depth']}\t{r.get('parent','')}\t{r['ports']}"
-            )
+        lines.append(_TEXT_HEADER_PORTS if expanded else _TEXT_HEADER)
+    lines.extend(_text_line(raw, expanded) for raw in rows)
     return "\n".join(lines) + ("\n" if lines else "")
 
 
+def _plain_block(index: int, raw: Dict[str, Any]) -> str:
+    r = normalize_row(raw)
+    extra = ""
+    if r.get("port_path"):
+        extra = f"    port_path: {r['port_path']}\n    port:      {r.get('port_name','')}\n"
+    return (
+        f"[{index}] {r['full_path']}\n"
+        f"    inst:   {r['inst']}\n"
+        f"    module: {r['module']}\n"
+        f"    file:   {r['file']}\n"
+        f"    depth:  {r['depth']}\n"
+        f"    parent: {r.get('parent') or '-'}\n"
+        f"{extra}"
+        f"    ports:  {r['ports'] or '-'}\n"
+    )
+
+
+def iter_rows_plain(
+    rows: Iterable[Dict[str, Any]],
+    *,
+    query: str = "",
+    start: int = 1,
+) -> Iterator[str]:
+    """:func:`format_rows_plain` one block at a time; *start* numbers the first hit."""
+    sep = ""
+    if query:
+        yield f"# Query: {query}\n"
+        sep = "\n"
+    for i, raw in enumerate(rows, start):
+        yield sep + _plain_block(i, raw)
+        sep = "\n"
+
+
 def format_rows_plain(
     rows: Iterable[Dict[str, Any]],
     *,
     query: str = "",
 ) -> str:
     """Human-readable multi-line text (one block per hit)."""
-    blocks: List[str] = []
-    if query:
-        blocks.append(f"# Query: {query}\n")
-    for i, raw in enumerate(rows, 1):
-        r = normalize_row(raw)
-        extra = ""
-        if r.get("port_path"):
-            extra = f"    port_path: {r['port_path']}\n    port:      {r.get('port_name','')}\n"
-        blocks.append(
-            f"[{i}] {r['full_path']}\n"
-            f"    inst:   {r['inst']}\n"
-            f"    module: {r['module']}\n"
-            f"    file:   {r['file']}\n"
-            f"    depth:  {r['depth']}\n"
-            f"    parent: {r.get('parent') or '-'}\n"
-            f"{extra}"
-            f"    ports:  {r['ports'] or '-'}\n"
-        )
-    return "\n".join(blocks)
\ No newline at end of file
+    return "".join(iter_rows_plain(rows, query=query))
@@ -5,6 +5,7 @@ from __future__ import annotations
 import re
 from typing import Any, List, Optional, Tuple
 
+from hch.index.search_index import SEARCH_TABLE, trigram_match_query
 from hch.query.dql.parser import (
     And,
     BarePattern,
@@ -44,7 +45,7 @@ def _flatten_or_branches(expr: Expr) -> List[Expr]:
     return [expr]
 
 
-def _try_compile_or_union(expr: Or) -> Optional[Tuple[str, List[Any]]]:
+def _try_compile_or_union(expr: Or, fts: bool = False) -> Optional[Tuple[str, List[Any]]]:
     """Wide OR of simple comparisons → UNION (better index use per branch)."""
     branches = _flatten_or_branches(expr)
     if len(branches) < 3:
@@ -53,10 +54,10 @@ def _try_compile_or_union(expr: Or) -> Optional[Tuple[str, List[Any]]]:
     params: List[Any] = []
     for branch in branches:
         if isinstance(branch, Comparison):
-            sql, p = _compile_comparison(branch)
+            sql, p = _compile_comparison(branch, fts)
         elif isinstance(branch, BarePattern):
             sql, p = _compile_comparison(
-                Comparison(field="inst", op="~", value=branch.pattern)
+                Comparison(field="inst", op="~", value=branch.pattern), fts
             )
         else:
             return None
@@ -70,32 +71,52 @@ def _try_compile_or_union(expr: Or) -> Optional[Tuple[str, List[Any]]]:
     return f"i.id IN ({union})", params
 
 
-def _compile_expr(expr: Expr) -> Tuple[str, List[Any]]:
+def _compile_expr(expr: Expr, fts: bool = False) -> Tuple[str, List[Any]]:
     if isinstance(expr, Or):
-        union_sql = _try_compile_or_union(expr)
+        union_sql = _try_compile_or_union(expr, fts)
         if union_sql is not None:
             return union_sql
-        l_sql, l_p = _compile_expr(expr.left)
-        r_sql, r_p = _compile_expr(expr.right)
+        l_sql, l_p = _compile_expr(expr.left, fts)
+        r_sql, r_p = _compile_expr(expr.right, fts)
         return f"({l_sql}) OR ({r_sql})", l_p + r_p
     if isinstance(expr, And):
-        l_sql, l_p = _compile_expr(expr.left)
-        r_sql, r_p = _compile_expr(expr.right)
+        l_sql, l_p = _compile_expr(expr.left, fts)
+        r_sql, r_p = _compile_expr(expr.right, fts)
         return f"({l_sql}) AND ({r_sql})", l_p + r_p
     if isinstance(expr, Not):
-        inner, params = _compile_expr(expr.expr)
+        inner, params = _compile_expr(expr.expr, fts)
         return f"NOT ({inner})", params
     if isinstance(expr, BarePattern):
         return _compile_comparison(
-            Comparison(field="inst", op="~", value=expr.pattern)
+            Comparison(field="inst", op="~", value=expr.pattern), fts
         )
     if isinstance(expr, Comparison):
-        return _compile_comparison(expr)
+        return _compile_comparison(expr, fts)
     if isinstance(expr, InExpr):
         return _compile_in(expr)
     raise TypeError(f"Unsupported expr: {type(expr)}")
 
 
+def _with_search_index(
+    compiled: Tuple[str, List[Any]],
+    like: str,
+    columns: Tuple[str, ...],
+    fts: bool,
+) -> Tuple[str, List[Any]]:
+    """Prefix a ``LIKE`` predicate with an FTS trigram pre-filter (exact check kept)."""
+    if not fts:
+        return compiled
+    match = trigram_match_query(like, columns)
+    if match is None:
+        return compiled
+    sql, params = compiled
+    return (
+        f"(i.id IN (SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH ?) "
+        f"AND {sql})",
+        [match, *params],
+    )
+
+
 def _path_column() -> str:
     return "i.full_path"
 
@@ -125,7 +146,8 @@ def _compile_int_field(col: str, op: str, val: str, field_name: str) -> Tuple[st
     raise ValueError(f"Unsupported {field_name} operator: {op}")
 
 
-def _compile_comparison(c: Comparison) -> Tuple[str, List[Any]]:
+def _compile_comparison(c: Comparison, fts: bool = False) -> Tuple[str, List[Any]]:
+    """One DQL comparison; *fts* routes glob / prefix matches through ``instances_fts``."""
     field = c.field.lower()
     op = c.op
     val = c.value
@@ -134,13 +156,20 @@ def _compile_comparison(c: Comparison) -> Tuple[str, List[Any]]:
         col = "i.inst_leaf_name"
         mod_col = "m.module_name"
         if op == "^=":
-            prefix = _escape_like(val.rstrip("*"))
-            return f"{col} LIKE ? ESCAPE '\\'", [prefix + "%"]
+            prefix = _escape_like(val.rstrip("*")) + "%"
+            return _with_search_index(
+                (f"{col} LIKE ? ESCAPE '\\'", [prefix]), prefix, ("inst_leaf_name",), fts
+            )
         if op == "~":
             like = _glob_to_like(val)
-            return (
-                f"({col} LIKE ? ESCAPE '\\' OR {mod_col} LIKE ? ESCAPE '\\')",
-                [like, like],
+            return _with_search_index(
+                (
+                    f"({col} LIKE ? ESCAPE '\\' OR {mod_col} LIKE ? ESCAPE '\\')",
+                    [like, like],
+                ),
+                like,
+                ("inst_leaf_name", "module_name"),
+                fts,
             )
         if op == "!~":
             like = _glob_to_like(val)
@@ -168,10 +197,15 @@ def _compile_comparison(c: Comparison) -> Tuple[str, List[Any]]:
     if field in ("path", "hierarchy", "name"):
         col = _path_column()
         if op == "^=":
-            prefix = _escape_like(val.rstrip("*"))
-            return f"{col} LIKE ? ESCAPE '\\'", [prefix + "%"]
+            prefix = _escape_like(val.rstrip("*")) + "%"
+            return _with_search_index(
+                (f"{col} LIKE ? ESCAPE '\\'", [prefix]), prefix, ("full_path",), fts
+            )
         if op == "~":
-            return f"{col} LIKE ? ESCAPE '\\'", [_glob_to_like(val)]
+            like = _glob_to_like(val)
+            return _with_search_index(
+                (f"{col} LIKE ? ESCAPE '\\'", [like]), like, ("full_path",), fts
+            )
         if op == "!~":
             return f"{col} NOT LIKE ? ESCAPE '\\'", [_glob_to_like(val)]
         if op == "=":
@@ -185,9 +219,15 @@ def _compile_comparison(c: Comparison) -> Tuple[str, List[Any]]:
         val = normalize_dql_path_pattern(val)
         col = "COALESCE(i.module_ref, m.module_ref)"
         if op == "^=":
-            return f"{col} LIKE ? ESCAPE '\\'", [_escape_like(val.rstrip("*")) + "%"]
+            prefix = _escape_like(val.rstrip("*")) + "%"
+            return _with_search_index(
+                (f"{col} LIKE ? ESCAPE '\\'", [prefix]), prefix, ("module_ref",), fts
+            )
         if op == "~":
-            return f"{col} LIKE ? ESCAPE '\\'", [_glob_to_like(val)]
+            like = _glob_to_like(val)
+            return _with_search_index(
+                (f"{col} LIKE ? ESCAPE '\\'", [like]), like, ("module_ref",), fts
+            )
         if op == "=":
             return f"{col} = ?", [val]
         if op == "!=":
@@ -196,9 +236,15 @@ def _compile_comparison(c: Comparison) -> Tuple[str, List[Any]]:
     if field == "module":
         col = "m.module_name"
         if op == "^=":
-            return f"{col} LIKE ? ESCAPE '\\'", [_escape_like(val.rstrip("*")) + "%"]
+            prefix = _escape_like(val.rstrip("*")) + "%"
+            return _with_search_index(
+                (f"{col} LIKE ? ESCAPE '\\'", [prefix]), prefix, ("module_name",), fts
+            )
         if op == "~":
-            return f"{col} LIKE ? ESCAPE '\\'", [_glob_to_like(val)]
+            like = _glob_to_like(val)
+            return _with_search_index(
+                (f"{col} LIKE ? ESCAPE '\\'", [like]), like, ("module_name",), fts
+            )
         if op == "!~":
             return f"{col} NOT LIKE ? ESCAPE '\\'", [_glob_to_like(val)]
         if op == "=":
@@ -381,8 +427,41 @@ def _extract_port_path_filter(expr: str) -> tuple[Optional[str], Optional[str]]:
     return None, None
 
 
-def plan_dql(expr: str) -> SqlPlan:
-    """Parse DQL with Lark and compile to SQL (preferred entry)."""
+def _port_path_prefilter(pattern: str, op: str) -> Optional[Tuple[str, List[Any]]]:
+    """
+    SQL condition every instance with a matching ``port_path`` satisfies.
+
+    ``port_path`` is ``full_path`` or ``full_path.port``, so the instance path is
+    either a dotted prefix of the pattern's literal head or starts with it.
+    """
+    if op == "~":
+        head = re.split(r"[*?\[]", pattern, maxsplit=1)[0]
+        if head == pattern:
+            op = "="
+    else:
+        head = pattern
+    if not head:
+        return None
+    prefixes = [head[:k] for k, ch in enumerate(head) if ch == "."]
+    if op == "=":
+        prefixes.append(head)
+        placeholders = ",".join("?" for _ in prefixes)
+        return f"i.full_path IN ({placeholders})", prefixes
+    sql = f"i.full_path LIKE ? ESCAPE '\\'"
+    params: List[Any] = [_escape_like(head) + "%"]
+    if prefixes:
+        placeholders = ",".join("?" for _ in prefixes)
+        sql = f"({sql} OR i.full_path IN ({placeholders}))"
+        params.extend(prefixes)
+    return sql, params
+
+
+def plan_dql(expr: str, *, search_index: bool = False) -> SqlPlan:
+    """
+    Parse DQL with Lark and compile to SQL (preferred entry).
+
+    *search_index*: the DB has ``instances_fts`` (see :mod:`hch.index.search_index`).
+    """
     cleaned, qmods = extract_query_modifiers(expr)
     row_limit: int | None = None
     port_path_filter: Optional[str] = None
@@ -391,11 +470,17 @@ def plan_dql(expr: str) -> SqlPlan:
         where, params = "1=1", []
     else:
         ast = parse_dql(cleaned)
-        where, params = _compile_expr(ast.expr)
+        where, params = _compile_expr(ast.expr, search_index)
         if _count_or_nodes(ast.expr) >= 4:
             row_limit = 8000
         if qmods.expand_ports:
             port_path_filter, port_path_filter_op = _extract_port_path_filter(cleaned)
+            if port_path_filter is not None:
+                pre = _port_path_prefilter(port_path_filter, port_path_filter_op or "=")
+                if pre is not None:
+                    where = f"({where}) AND {pre[0]}"
+                    params = list(params) + pre[1]
+    where_params = list(params)
     sql = f"{_BASE_SELECT} WHERE {where} ORDER BY i.full_path"
     if row_limit is not None:
         sql += " LIMIT ?"
@@ -408,4 +493,6 @@ def plan_dql(expr: str) -> SqlPlan:
         port_path_filter=port_path_filter,
         port_path_filter_op=port_path_filter_op,
         row_limit=row_limit,
+        where=where,
+        where_params=where_params,
     )
\ No newline at end of file
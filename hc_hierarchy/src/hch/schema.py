@@ -74,6 +74,7 @@ class FlatInstance:
     param_overrides: Dict[str, str] = field(default_factory=dict)
     child_kind: str = "module"
     variant: str = ""
+    variant_mask: int = 0  # bit i = variants_json[i]; 0 = single-variant index
     in_generate: bool = False
     via_bind: bool = False
     generate_path: str = ""
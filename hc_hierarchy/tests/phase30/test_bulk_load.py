@@ -0,0 +1,119 @@
+"""Bulk instance loader: id caches, replace semantics, deferred index rebuild."""
+
+from __future__ import annotations
+
+from hch.index import store as store_mod
+from hch.index.store import HierarchyStore
+from hch.schema import FlatInstance, ModuleRecord
+
+
+def _modules():
+    return [
+        ModuleRecord(module_name="top", file_path="/rtl/top.v"),
+        ModuleRecord(module_name="leaf", file_path="/rtl/a/leaf.v"),
+        ModuleRecord(module_name="leaf", file_path="/rtl/b/leaf.v"),
+    ]
+
+
+def _row(path: str, module: str, *, file: str = "", ports=(), variant: str = "", ref: str = ""):
+    parent, _, leaf = path.rpartition(".")
+    return FlatInstance(
+        full_path=path,
+        name=leaf or path,
+        module=module,
+        file=file,
+        ports=list(ports),
+        depth=path.count("."),
+        parent_path=parent or None,
+        variant=variant,
+        module_ref=ref,
+    )
+
+
+def _index_names(store: HierarchyStore) -> set[str]:
+    return {
+        r[0]
+        for r in store.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='index' AND tbl_name='instances'"
+        )
+    }
+
+
+def test_bulk_load_resolves_ids_and_replaces_rows(tmp_path, monkeypatch):
+    store = HierarchyStore(str(tmp_path / "bulk.db"))
+    store.load_modules(_modules())
+    indexes = _index_names(store)
+    monkeypatch.setattr(store_mod, "BULK_INDEX_REBUILD_MIN", 2)
+    store.load_instances(
+        [
+            _row("top", "top", file="/rtl/top.v"),
+            _row("top.u_a", "leaf", file="/rtl/a/leaf.v", ports=["clk", "d"]),
+            _row("top.u_b", "leaf", ref="/rtl/b/leaf.v::leaf", ports=["clk"]),
+            _row("top.u_x", "missing"),
+            _row("top.u_a", "leaf", file="/rtl/a/leaf.v", ports=["q"]),
+            _row("top.u_a", "leaf", variant="v2", ports=["clk"]),
+        ],
+        batch_rows=2,
+    )
+    assert _index_names(store) == indexes
+    rows = {
+        (r[0], r[1]): r[2]
+        for r in store.conn.execute(
+            "SELECT variant, full_path, module_ref FROM instances"
+        )
+    }
+    assert rows == {
+        ("", "top"): "/rtl/top.v::top",
+        ("", "top.u_a"): "/rtl/a/leaf.v::leaf",
+        ("", "top.u_b"): "/rtl/b/leaf.v::leaf",
+        ("v2", "top.u_a"): "/rtl/a/leaf.v::leaf",
+    }
+    ports = store.conn.execute(
+        """
+        SELECT i.variant, i.full_path, p.port_name FROM instance_ports p
+        LEFT JOIN instances i ON i.id = p.instance_id ORDER BY 1, 2, 3
+        """
+    ).fetchall()
+    assert ports == [
+        ("", "top.u_a", "q"),
+        ("", "top.u_b", "clk"),
+        ("v2", "top.u_a", "clk"),
+    ]
+
+    store.load_instances([_row("top.u_b", "leaf", file="/rtl/b/leaf.v", ports=["rst"])])
+    assert store.count_instances() == 4
+    assert ("", "top.u_b", "rst") in store.conn.execute(
+        """
+        SELECT i.variant, i.full_path, p.port_name FROM instance_ports p
+        JOIN instances i ON i.id = p.instance_id
+        """
+    ).fetchall()
+    assert store.conn.execute(
+        "SELECT COUNT(*) FROM instance_ports WHERE instance_id NOT IN (SELECT id FROM instances)"
+    ).fetchone()[0] == 0
+    store.close()
+
+
+def test_bulk_load_multi_def_uses_parent_dir_without_row_queries(tmp_path, monkeypatch):
+    store = HierarchyStore(str(tmp_path / "bulk.db"))
+    store.load_modules(_modules() + [ModuleRecord(module_name="mid", file_path="/rtl/b/mid.v")])
+    store.load_instances([_row("top.u_old", "mid", file="/rtl/b/mid.v")])
+    monkeypatch.setattr(store_mod, "BULK_INDEX_REBUILD_MIN", 2)
+    queries: list[str] = []
+    store.conn.set_trace_callback(queries.append)
+    store.load_instances(
+        [
+            _row("top", "top", file="/rtl/top.v"),
+            _row("top.u_m", "mid", file="/rtl/b/mid.v"),
+            _row("top.u_m.u_l", "leaf"),
+            _row("top.u_old.u_l", "leaf"),  # parent loaded by an earlier call
+            _row("top.u_l", "leaf"),
+        ],
+        batch_rows=2,
+    )
+    store.conn.set_trace_callback(None)
+    refs = dict(store.conn.execute("SELECT full_path, module_ref FROM instances"))
+    assert refs["top.u_m.u_l"] == refs["top.u_old.u_l"] == "/rtl/b/leaf.v::leaf"
+    assert refs["top.u_l"] == "/rtl/a/leaf.v::leaf"  # parent top.v: first definition
+    assert sum("inst_leaf_name" in q and "JOIN files" in q for q in queries) == 1
+    store.close()
@@ -0,0 +1,140 @@
+"""Keyset-paged DQL: streamed post-filters, cursors, run_dql pages, chunked /api/query/text."""
+
+from __future__ import annotations
+
+import json
+import threading
+import urllib.request
+from itertools import islice
+
+from hch.apps.api.db_service import HierarchyDbService
+from hch.apps.api.http_server import run_server
+from hch.index.store import HierarchyStore
+from hch.query.dql.paging import decode_cursor, encode_cursor, iter_dql_rows
+from hch.query.dql.planner import apply_post_filters, plan_dql
+from hch.query.dql.results import format_rows_plain, format_rows_text, iter_rows_text
+from hch.schema import FlatInstance, ModuleRecord
+
+
+def _db(tmp_path) -> str:
+    path = str(tmp_path / "page.db")
+    store = HierarchyStore(path)
+    store.load_modules(
+        [
+            ModuleRecord(module_name="top", file_path="/rtl/top.v"),
+            ModuleRecord(module_name="blk", file_path="/rtl/blk.v"),
+        ]
+    )
+    rows = [FlatInstance(full_path="top", name="top", module="top", file="/rtl/top.v")]
+    for a in ("u_a", "u_a-x", "u_b"):
+        rows.append(
+            FlatInstance(
+                full_path=f"top.{a}",
+                name=a,
+                module="blk",
+                file="/rtl/blk.v",
+                depth=1,
+                parent_path="top",
+                ports=["clk", "d", "q"],
+            )
+        )
+        for k in range(3):
+            rows.append(
+                FlatInstance(
+                    full_path=f"top.{a}.u_leaf{k}",
+                    name=f"u_leaf{k}",
+                    module="blk",
+                    file="/rtl/blk.v",
+                    depth=2,
+                    parent_path=f"top.{a}",
+                    ports=["clk"] if k else [],
+                )
+            )
+    store.load_instances(rows)
+    store.close()
+    return path
+
+
+def _old(conn, query):
+    plan = plan_dql(query)
+    cur = conn.execute(plan.sql, plan.params)
+    names = [d[0] for d in cur.description]
+    return apply_post_filters([dict(zip(names, r)) for r in cur], plan)
+
+
+QUERIES = [
+    'path ~ "*"',
+    "lastnode",
+    'path ^= "top.u_a" lastnode',
+    'depth >= 1 expand_ports',
+    'port_path ^= "top.u_a.u" expand_ports',
+    'port_path = "top.u_b.q" expand_ports',
+    'port_path ~ "top.u_a*.clk" expand_ports',
+]
+
+
+def test_paged_rows_match_fetchall(tmp_path):
+    svc = HierarchyDbService(_db(tmp_path))
+    for q in QUERIES:
+        want = _old(svc.conn, q)
+        plan = plan_dql(q)
+        assert [r for r, _ in iter_dql_rows(svc.conn, plan, page_rows=2)] == want, q
+        # Resume from every position, one row at a time.
+        got, token = [], None
+        while True:
+            page = list(islice(iter_dql_rows(svc.conn, plan, cursor=token, page_rows=3), 2))
+            if not page:
+                break
+            got.append(page[0][0])
+            token = encode_cursor(*page[0][1])
+        assert got == want, q
+    assert decode_cursor(encode_cursor("top.u_a", 7, 2)) == ("top.u_a", 7, 2)
+    svc.close()
+
+
+def test_run_dql_pages_and_stream_formats(tmp_path):
+    svc = HierarchyDbService(_db(tmp_path))
+    full = svc.run_dql("depth >= 1 expand_ports", limit=1000, text_format="text")
+    assert not full["truncated"] and full["next_cursor"] is None
+    seen, cursor = [], None
+    while True:
+        page = svc.run_dql("depth >= 1 expand_ports", limit=4, cursor=cursor)
+        seen.extend(page["rows"])
+        if not page["next_cursor"]:
+            break
+        assert page["truncated"] and page["count"] == 4
+        cursor = page["next_cursor"]
+    assert seen == full["rows"]
+
+    rows = _old(svc.conn, "lastnode")
+    assert "".join(svc.stream_dql("lastnode")) == format_rows_text(rows, query="lastnode")
+    assert "".join(svc.stream_dql("lastnode", text_format="plain")) == format_rows_plain(
+        rows, query="lastnode"
+    )
+    assert "".join(iter_rows_text([])) == format_rows_text([])
+    lines = [json.loads(x) for x in svc.stream_dql("lastnode", text_format="ndjson", limit=2)]
+    assert [x["full_path"] for x in lines] == [r["full_path"] for r in rows[:2]]
+    rest = svc.run_dql("lastnode", cursor=lines[-1]["cursor"])
+    assert [x["full_path"] for x in rest["rows"]] == [r["full_path"] for r in rows[2:]]
+    svc.close()
+
+
+def test_query_text_streams_chunked(tmp_path):
+    server = run_server(_db(tmp_path), host="127.0.0.1", port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with urllib.request.urlopen(
+            f"{base}/api/query/text?q=lastnode&format=ndjson", timeout=30
+        ) as resp:
+            assert resp.headers["Transfer-Encoding"] == "chunked"
+            assert resp.headers["Content-Type"].startswith("application/x-ndjson")
+            hits = [json.loads(x) for x in resp.read().decode().splitlines()]
+        assert len(hits) == 9 and all(h["cursor"] for h in hits)
+        with urllib.request.urlopen(f"{base}/api/query/text?q=top&limit=1", timeout=30) as resp:
+            text = resp.read().decode()
+        assert text.splitlines()[0] == "# top" and len(text.splitlines()) == 3
+    finally:
+        server.shutdown()
+        server.server_close()
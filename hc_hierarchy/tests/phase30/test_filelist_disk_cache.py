@@ -0,0 +1,71 @@
+"""On-disk filelist expansion cache: reused across processes, invalidated by real changes."""
+
+from __future__ import annotations
+
+import os
+
+from hch.ingest.filelist import FilelistResult, parse_filelist_simple
+from hch.ingest.filelist_cache import clear_filelist_cache, parse_filelist_cached
+from hch.ingest.filelist_disk_cache import expand_filelist_cached
+
+
+def _tree(root):
+    (root / "rtl").mkdir()
+    for name in ("a.v", "b.v", "c.v"):
+        (root / "rtl" / name).write_text(f"module {name[0]}; endmodule\n")
+    (root / "sub.f").write_text("${RTL_DIR}/b.v\n-f opt.f\n")  # opt.f starts out missing
+    top = root / "top.f"
+    top.write_text("+define+X=1\nrtl/a.v\n-f sub.f\n")
+    return top
+
+
+def test_disk_cache_hits_and_invalidates(tmp_path, monkeypatch):
+    monkeypatch.setenv("HCH_FILELIST_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setenv("RTL_DIR", str(tmp_path / "rtl"))
+    top = _tree(tmp_path)
+    calls = []
+
+    def parse():
+        calls.append(1)
+        return parse_filelist_simple(str(top))
+
+    def cached():
+        return expand_filelist_cached(top, tmp_path, None, parse, result_type=FilelistResult)
+
+    first = cached()
+    assert first.filelists == [top, tmp_path / "sub.f", tmp_path / "opt.f"]
+    assert cached() == first and len(calls) == 1
+
+    sub = tmp_path / "sub.f"
+    os.utime(sub, ns=(1, 1))  # touched, same content: digest still matches
+    assert cached() == first and len(calls) == 1
+
+    def changed(edit) -> bool:
+        n = len(calls)
+        edit()
+        cached()
+        return len(calls) == n + 1
+
+    assert changed(lambda: monkeypatch.setenv("RTL_DIR", str(tmp_path)))  # $VAR value
+    assert changed(lambda: monkeypatch.setenv("RTL_DIR", str(tmp_path / "rtl")))
+    assert changed(lambda: (tmp_path / "opt.f").write_text("rtl/c.v\n"))  # appeared
+    assert cached().source_files[-1] == tmp_path / "rtl" / "c.v"
+    assert changed(lambda: (tmp_path / "rtl" / "c.v").unlink())  # source removed
+    assert changed(lambda: (tmp_path / "rtl" / "c.v").write_text(""))  # ...and back
+
+    monkeypatch.setenv("HCH_FILELIST_CACHE", "0")
+    assert changed(lambda: None)
+
+
+def test_parse_filelist_cached_uses_disk_tier(tmp_path, monkeypatch):
+    monkeypatch.setenv("HCH_FILELIST_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setenv("RTL_DIR", str(tmp_path / "rtl"))
+    top = _tree(tmp_path)
+    first = parse_filelist_cached(str(top))
+    assert len(list((tmp_path / "cache").glob("*.json"))) == 1
+
+    clear_filelist_cache()  # a new process: only the disk entry is left
+    import hch.ingest.filelist_cache as fc
+
+    monkeypatch.setattr(fc, "parse_filelist_simple", None)  # must not re-expand
+    assert parse_filelist_cached(str(top)) == first
@@ -0,0 +1,197 @@
+"""hch-index --update: in-place re-index of changed sources matches a fresh build."""
+
+from __future__ import annotations
+
+import sqlite3
+
+import pytest
+
+from hch.apps.index_cli import main as index_main
+from hch.index.incremental import FullRebuildRequired, update_index
+from hch.index.loader import build_index_from_filelist
+
+TOP = """module top(input clk);
+  blk_a u_a(.clk(clk));
+  blk_b u_b();
+  blk_b u_b2();
+  dup u_d();
+endmodule
+"""
+
+
+def _write(root, files: dict, order: list) -> str:
+    for name, text in files.items():
+        (root / name).write_text(text)
+    fl = root / "design.f"
+    fl.write_text("".join(f"{name}\n" for name in order))
+    return str(fl)
+
+
+def _design(root) -> str:
+    return _write(
+        root,
+        {
+            "top.v": TOP,
+            "a.v": "module blk_a(input clk);\n  leaf u_l0();\nendmodule\n",
+            "b.v": "module blk_b;\n  leaf u_x();\nendmodule\n",
+            "leaf.v": "module leaf(input d);\nendmodule\n",
+            # same module name in two files: instances merge across both
+            "dup1.v": "module dup;\n  leaf u_d1();\nendmodule\n",
+            "dup2.v": "module dup;\n  leaf u_d2();\nendmodule\n",
+        },
+        ["top.v", "a.v", "b.v", "leaf.v", "dup1.v", "dup2.v"],
+    )
+
+
+def _edit(root) -> str:
+    (root / "b.v").unlink()
+    return _write(
+        root,
+        {
+            "top.v": TOP.replace("blk_b u_b2();", "blk_c u_c();"),
+            "a.v": "module blk_a(input clk, input rst);\n  leaf u_l0();\n  leaf u_l1();\nendmodule\n",
+            "c.v": "module blk_c;\n  blk_a u_ca(.clk(1'b0));\nendmodule\n",
+            "dup2.v": "module dup;\n  leaf u_d3();\nendmodule\n",
+        },
+        ["top.v", "a.v", "c.v", "leaf.v", "dup1.v", "dup2.v"],
+    )
+
+
+def _snapshot(db: str):
+    conn = sqlite3.connect(db)
+    rows = conn.execute(
+        """
+        SELECT i.variant, i.full_path, i.inst_leaf_name, m.module_name, i.depth,
+               i.parent_path, i.port_json, i.param_json, i.inst_tags_json,
+               i.child_kind, i.module_ref
+        FROM instances i JOIN modules m ON m.id = i.module_id ORDER BY 1, 2
+        """
+    ).fetchall()
+    ports = conn.execute(
+        """
+        SELECT i.full_path, p.port_name FROM instance_ports p
+        JOIN instances i ON i.id = p.instance_id ORDER BY 1, 2
+        """
+    ).fetchall()
+    tree = conn.execute(
+        """
+        SELECT i.full_path, t.child_count, t.descendant_count, t.pre_start, t.pre_end
+        FROM instance_tree t JOIN instances i ON i.id = t.id ORDER BY 1
+        """
+    ).fetchall()
+    conn.close()
+    return rows, ports, tree
+
+
+def _ids(db: str) -> dict:
+    conn = sqlite3.connect(db)
+    out = dict(conn.execute("SELECT full_path, id FROM instances"))
+    conn.close()
+    return out
+
+
+@pytest.mark.parametrize("batch_size", [2, 0])
+@pytest.mark.parametrize("path_dict", ["0", "1"])
+def test_update_matches_fresh_build(tmp_path, monkeypatch, batch_size, path_dict):
+    monkeypatch.setenv("HCH_PATH_DICT", path_dict)
+    work = tmp_path / "rtl"
+    work.mkdir()
+    fl = _design(work)
+    db = str(tmp_path / "inc.db")
+    build_index_from_filelist(fl, db, top_module="top", batch_size=batch_size).close()
+    before = _ids(db)
+    assert {"top.u_d.u_d1", "top.u_d.u_d2"} <= set(before)
+
+    fl = _edit(work)
+    res = update_index(fl, db)
+    assert (res.files_added, res.files_changed, res.files_removed) == (1, 3, 1)
+    assert res.files_parsed == 5  # + dup1.v, the other definition of dup
+
+    fresh = str(tmp_path / "fresh.db")
+    build_index_from_filelist(fl, fresh, top_module="top", batch_size=batch_size).close()
+    assert _snapshot(db) == _snapshot(fresh)
+    after = _ids(db)
+    assert after["top.u_a.u_l0"] == before["top.u_a.u_l0"]  # untouched rows stay
+    assert "top.u_b.u_x" not in after and "top.u_c.u_ca.u_l1" in after
+
+    noop = update_index(fl, db)
+    assert noop.files_parsed == noop.instances_deleted == noop.instances_written == 0
+    assert _ids(db) == after
+
+
+def test_unsafe_changes_need_full_rebuild(tmp_path):
+    fl = _design(tmp_path)
+    db = str(tmp_path / "inc.db")
+    build_index_from_filelist(fl, db, top_module="top").close()
+
+    (tmp_path / "design.f").write_text(
+        (tmp_path / "design.f").read_text() + "+define+W=8\n"
+    )
+    with pytest.raises(FullRebuildRequired, match="defines"):
+        update_index(fl, db)
+
+    (tmp_path / "defs.vh").write_text("`define W 8\n")  # filelist dir is an incdir
+    (tmp_path / "a.v").write_text("module blk_a(input clk);\nendmodule\n")
+    assert index_main([fl, "-o", db, "--update", "--quiet"]) == 0  # falls back
+    assert "top.u_a.u_l0" not in _ids(db)
+    # The rebuild recorded the header; editing it now is caught, too.
+    (tmp_path / "defs.vh").write_text("`define W 16\n")
+    with pytest.raises(FullRebuildRequired, match="headers"):
+        update_index(fl, db)
+
+
+def test_include_closure_is_tracked(tmp_path):
+    src = tmp_path / "src"
+    (src / "sub").mkdir(parents=True)
+    (src / "top.v").write_text(
+        '`include "sub/cfg.svh"\n'
+        '`include "params.v"\n'
+        "`ifdef NEVER\n"
+        '`include "later.vh"\n'
+        "`endif\n"
+        "module top;\n"
+        "`ifdef USE_B\n  blk_b u_b();\n`endif\n"
+        "`ifdef USE_C\n  blk_c u_c();\n`endif\n"
+        "endmodule\n"
+    )
+    (src / "sub" / "cfg.svh").write_text("`define USE_B\n")
+    (src / "params.v").write_text("`define USE_C\n")
+    (src / "blk.v").write_text("module blk_b;\nendmodule\nmodule blk_c;\nendmodule\n")
+    fl = tmp_path / "design.f"
+    fl.write_text("src/top.v\nsrc/blk.v\n")
+    db = str(tmp_path / "inc.db")
+    build_index_from_filelist(str(fl), db, top_module="top").close()
+    assert {"top.u_b", "top.u_c"} <= set(_ids(db))
+    assert update_index(str(fl), db).files_parsed == 0
+
+    # nested include, resolved relative to the including file
+    (src / "sub" / "cfg.svh").write_text("// USE_B off\n")
+    with pytest.raises(FullRebuildRequired, match="headers"):
+        update_index(str(fl), db)
+    assert index_main([str(fl), "-o", db, "--update", "--quiet"]) == 0
+    assert "top.u_b" not in _ids(db)
+
+    # an include with a .v suffix is not a filelist source but still tracked
+    (src / "params.v").write_text("// USE_C off\n")
+    with pytest.raises(FullRebuildRequired, match="headers"):
+        update_index(str(fl), db)
+    assert index_main([str(fl), "-o", db, "--update", "--quiet"]) == 0
+    assert "top.u_c" not in _ids(db)
+
+    # an include that resolved nowhere appearing later is caught, too
+    (src / "later.vh").write_text("`define LATER\n")
+    with pytest.raises(FullRebuildRequired, match="missing_includes"):
+        update_index(str(fl), db)
+
+
+def test_macro_include_needs_full_rebuild(tmp_path):
+    (tmp_path / "top.v").write_text(
+        '`define HDR "cfg.vh"\n`include `HDR\nmodule top;\nendmodule\n'
+    )
+    (tmp_path / "cfg.vh").write_text("`define W 8\n")
+    fl = tmp_path / "design.f"
+    fl.write_text("top.v\n")
+    db = str(tmp_path / "inc.db")
+    build_index_from_filelist(str(fl), db, top_module="top").close()
+    with pytest.raises(FullRebuildRequired, match="macro"):
+        update_index(str(fl), db)
@@ -0,0 +1,84 @@
+"""Process-pool batch parsing (--parse-pool process) and byte-sized batches."""
+
+from __future__ import annotations
+
+import pytest
+
+from hch.index.parallel_parse import (
+    batches_by_bytes,
+    resolve_parse_pool,
+    run_parallel_batches,
+    run_skim_batches,
+)
+
+
+def _write(tmp_path, name, text):
+    p = tmp_path / name
+    p.write_text(text, encoding="utf-8")
+    return str(p)
+
+
+def test_batches_by_bytes(tmp_path):
+    small = [_write(tmp_path, f"s{i}.v", "x" * 100) for i in range(4)]
+    big = _write(tmp_path, "big.v", "x" * 1000)
+    paths = small[:2] + [big] + small[2:]
+    got = batches_by_bytes(paths, target_bytes=250)
+    assert got == [(1, small[:2]), (2, [big]), (3, small[2:])]
+    assert [len(c) for _, c in batches_by_bytes(small, target_bytes=10**6, max_files=3)] == [3, 1]
+    assert batches_by_bytes([], target_bytes=1) == []
+
+
+def test_resolve_parse_pool(monkeypatch):
+    monkeypatch.delenv("HCH_PARSE_POOL", raising=False)
+    assert resolve_parse_pool(None) == "thread"
+    monkeypatch.setenv("HCH_PARSE_POOL", "process")
+    assert resolve_parse_pool(None) == "process"
+    assert resolve_parse_pool("thread") == "thread"
+    with pytest.raises(ValueError):
+        resolve_parse_pool("fork")
+
+
+def test_skim_process_pool_matches_thread(tmp_path):
+    paths = [
+        _write(
+            tmp_path,
+            f"m{i}.v",
+            f"module m{i}(input a);\n  m{i + 1} u_next (.a(a));\nendmodule\n",
+        )
+        for i in range(6)
+    ]
+    batches = batches_by_bytes(paths, target_bytes=1, max_files=2)
+    assert len(batches) == 6
+
+    def collect(pool):
+        seen = {}
+
+        def on_done(idx, chunk, mods):
+            seen[idx] = (list(chunk), {k: v.instances[0].child_module for k, v in mods.items()})
+
+        run_skim_batches(batches, defines={}, jobs=2, parse_pool=pool, on_batch_done=on_done)
+        return seen
+
+    threaded = collect("thread")
+    assert collect("process") == threaded
+    assert threaded[3][1] == {"m2": "m3"}
+
+
+@pytest.mark.requires_engine
+def test_parse_process_pool_returns_records(tmp_path):
+    pytest.importorskip("pyslang")
+    a = _write(tmp_path, "a.sv", "module a; b u_b(); endmodule\n")
+    b = _write(tmp_path, "b.sv", "module b; endmodule\n")
+    done = {}
+    run_parallel_batches(
+        [(1, [a]), (2, [b])],
+        include_dirs=[],
+        defines={},
+        library_files=[],
+        library_dirs=[],
+        jobs=2,
+        parse_pool="process",
+        on_batch_done=lambda idx, chunk, mods: done.update(mods),
+    )
+    assert set(done) == {"a", "b"}
+    assert [e.child_module for e in done["a"].instances] == ["b"]
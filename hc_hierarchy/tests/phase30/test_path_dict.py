@@ -0,0 +1,127 @@
+"""Path-dictionary instance schema: same rows and DQL results as the flat table."""
+
+from __future__ import annotations
+
+from hch.apps.api.db_service import HierarchyDbService
+from hch.index.path_dict import convert_to_path_dict, is_path_dict
+from hch.index.store import HierarchyStore
+from hch.query.dql.planner import plan_dql
+from hch.schema import FlatInstance, ModuleRecord
+
+
+def _row(path: str, *, variant: str = "", parent: str | None = "", ports=()) -> FlatInstance:
+    up, _, leaf = path.rpartition(".")
+    return FlatInstance(
+        full_path=path,
+        name=leaf or path,
+        module="top" if path == "top" else "blk",
+        file="/rtl/x.v",
+        depth=path.count("."),
+        parent_path=(up or None) if parent == "" else parent,
+        variant=variant,
+        ports=list(ports),
+    )
+
+
+FIRST = [
+    _row("top"),
+    _row("top.u_a", ports=["clk"]),
+    _row("top.u_a.u_x"),
+    _row("top.u_b"),
+    _row("top.u_b", variant="v2", ports=["d"]),
+    _row("top.u_gap.u_z"),  # parent top.u_gap is not an instance yet
+    _row("other", parent=None),
+]
+SECOND = [
+    _row("top.u_gap"),
+    _row("top.u_a", ports=["clk", "rst"]),  # replaces the first top.u_a
+    _row("top.u_c.u_y"),
+]
+
+QUERIES = [
+    'path ~ "*"',
+    'path = "top.u_a"',
+    'inst = "u_z"',
+    'parent = "top.u_gap"',
+    'path ^= "top.u_b"',
+    "lastnode",
+    'depth >= 1 expand_ports',
+]
+
+
+def _store(path, *, path_dict: bool) -> HierarchyStore:
+    store = HierarchyStore(str(path))
+    store.load_modules(
+        [
+            ModuleRecord(module_name="top", file_path="/rtl/x.v"),
+            ModuleRecord(module_name="blk", file_path="/rtl/x.v"),
+        ]
+    )
+    if path_dict:
+        convert_to_path_dict(store.conn)
+    return store
+
+
+def _snapshot(store: HierarchyStore):
+    rows = store.conn.execute("SELECT * FROM instances ORDER BY id").fetchall()
+    dql = {}
+    for q in QUERIES:
+        plan = plan_dql(q)
+        dql[q] = store.conn.execute(plan.sql, plan.params).fetchall()
+    return rows, dql
+
+
+def test_loads_match_flat_table(tmp_path):
+    flat = _store(tmp_path / "flat.db", path_dict=False)
+    pdict = _store(tmp_path / "pdict.db", path_dict=True)
+    assert is_path_dict(pdict.conn) and not is_path_dict(flat.conn)
+    for batch in (FIRST, SECOND):
+        flat.load_instances(batch)
+        pdict.load_instances(batch)
+        assert _snapshot(pdict) == _snapshot(flat)
+    assert pdict.count_instances() == flat.count_instances() == 9
+    gap = pdict.conn.execute(
+        "SELECT parent_id, name_id FROM inst_paths WHERE path = 'top.u_gap'"
+    ).fetchone()
+    assert None not in gap
+    paths = pdict.conn.execute("SELECT COUNT(*) FROM inst_paths").fetchone()[0]
+    assert paths == 9  # top.u_c has no row of its own but is a parent
+
+    # Loads refresh the planner statistics that path-ordered paging relies on.
+    stats = {r[0] for r in pdict.conn.execute("SELECT tbl FROM sqlite_stat1")}
+    assert {"inst_paths", "instance_rows"} <= stats
+
+    pdict.clear_instances()
+    for table in ("instances", "instance_rows", "inst_paths", "inst_names"):
+        assert pdict.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] == 0
+    flat.close()
+    pdict.close()
+
+
+def test_migrate_converts_both_ways(tmp_path, monkeypatch):
+    store = _store(tmp_path / "mig.db", path_dict=False)
+    store.load_instances(FIRST + SECOND)
+    before = _snapshot(store)
+    svc = HierarchyDbService(str(store.db_path))
+    children = svc.tree_children("top")
+    svc.close()
+    store.close()
+
+    monkeypatch.setenv("HCH_PATH_DICT", "1")
+    store = HierarchyStore(str(tmp_path / "mig.db"))
+    assert is_path_dict(store.conn)
+    assert _snapshot(store) == before
+    store.close()
+    svc = HierarchyDbService(str(tmp_path / "mig.db"))
+    assert svc.tree_children("top") == children
+    svc.close()
+
+    monkeypatch.setenv("HCH_PATH_DICT", "0")
+    store = HierarchyStore(str(tmp_path / "mig.db"))
+    assert not is_path_dict(store.conn)
+    assert _snapshot(store) == before
+    assert store.conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master "
+        "WHERE name IN ('inst_names', 'inst_paths', 'instance_rows')"
+    ).fetchone()[0] == 0
+    store.close()
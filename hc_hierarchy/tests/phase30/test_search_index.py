@@ -0,0 +1,108 @@
+"""FTS5 trigram search index: glob pre-filter gives the same rows as plain LIKE."""
+
+from __future__ import annotations
+
+import pytest
+
+from hch.index.search_index import (
+    SEARCH_TABLE,
+    build_search_index,
+    drop_search_index,
+    fts5_trigram_available,
+    has_search_index,
+    like_literal_runs,
+    trigram_match_query,
+)
+from hch.index.store import HierarchyStore
+from hch.query.dql.sql_compiler import plan_dql
+from hch.schema import FlatInstance, ModuleRecord
+
+
+def _row(path: str, module: str, file: str) -> FlatInstance:
+    parent, _, leaf = path.rpartition(".")
+    return FlatInstance(
+        full_path=path,
+        name=leaf or path,
+        module=module,
+        file=file,
+        depth=path.count("."),
+        parent_path=parent or None,
+    )
+
+
+def _store(tmp_path) -> HierarchyStore:
+    store = HierarchyStore(str(tmp_path / "fts.db"))
+    if not fts5_trigram_available(store.conn):
+        store.close()
+        pytest.skip("SQLite without FTS5 trigram")
+    store.load_modules(
+        [
+            ModuleRecord(module_name="soc_top", file_path="/rtl/soc_top.v"),
+            ModuleRecord(module_name="cpu_core", file_path="/rtl/cpu_core.v"),
+            ModuleRecord(module_name="dma_engine", file_path="/rtl/dma_engine.v"),
+        ]
+    )
+    store.load_instances(
+        [
+            _row("soc_top", "soc_top", "/rtl/soc_top.v"),
+            _row("soc_top.u_cpu0", "cpu_core", "/rtl/cpu_core.v"),
+            _row("soc_top.u_cpu1", "cpu_core", "/rtl/cpu_core.v"),
+            _row("soc_top.u_dma", "dma_engine", "/rtl/dma_engine.v"),
+            _row("soc_top.u_cpu0.u_dma_lite", "dma_engine", "/rtl/dma_engine.v"),
+        ]
+    )
+    return store
+
+
+QUERIES = [
+    'path ~ "*cpu*"',
+    'path ~ "*u_cpu?.u_dma*"',
+    'inst ~ "*dma*"',
+    'inst ^= "u_cp"',
+    'module ~ "*engine"',
+    'module ^= "cpu_"',
+    'module_ref ~ "*dma_engine.v*"',
+    'path ~ "*cp*"',  # no 3-char run: plain LIKE
+    'path ~ "*cpu*" AND depth >= 2',
+    'NOT path ~ "*dma*"',
+]
+
+
+def _rows(store: HierarchyStore, query: str, *, search_index: bool):
+    plan = plan_dql(query, search_index=search_index)
+    return plan.sql, sorted(store.conn.execute(plan.sql, plan.params).fetchall())
+
+
+def test_match_query_from_like_runs():
+    assert like_literal_runs("%u\\_cpu%core_") == ["u_cpu", "core"]
+    assert trigram_match_query("%ab%", ["full_path"]) is None
+    assert trigram_match_query('%a"bc%x%', ["full_path", "module_name"]) == (
+        '{full_path module_name} : ("a""bc")'
+    )
+
+
+def test_search_index_rows_match_plain_like(tmp_path):
+    store = _store(tmp_path)
+    expected = {q: _rows(store, q, search_index=False)[1] for q in QUERIES}
+    assert build_search_index(store.conn) == 5
+    assert has_search_index(store.conn)
+    for q in QUERIES:
+        sql, rows = _rows(store, q, search_index=True)
+        assert rows == expected[q], q
+    assert SEARCH_TABLE in _rows(store, 'path ~ "*cpu*"', search_index=True)[0]
+    assert SEARCH_TABLE not in _rows(store, 'path ~ "*cp*"', search_index=True)[0]
+
+    # Reloads keep the index in step with instances.
+    store.load_instances([_row("soc_top.u_gpu", "cpu_core", "/rtl/cpu_core.v")])
+    assert len(_rows(store, 'inst ~ "*gpu*"', search_index=True)[1]) == 1
+    store.clear_instances()
+    store.load_instances([_row("soc_top", "soc_top", "/rtl/soc_top.v")])
+    plan = plan_dql('path ~ "*cpu*"', search_index=True)
+    assert store.conn.execute(plan.sql, plan.params).fetchall() == []
+    assert store.conn.execute(
+        f"SELECT COUNT(*) FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH '\"cpu\"'"
+    ).fetchone()[0] == 0
+
+    drop_search_index(store.conn)
+    assert not has_search_index(store.conn)
+    store.close()
@@ -0,0 +1,181 @@
+"""instance_tree: child counts and pre-order intervals agree with the string queries."""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from hch.apps.api.db_service import HierarchyDbService
+from hch.apps.hierarchy_view import fetch_subtree_depth_stats, format_subtree_text
+from hch.index.store import HierarchyStore
+from hch.index.tree_encoding import (
+    TREE_ENCODING_META,
+    ancestor_paths,
+    has_tree_encoding,
+    rebuild_tree_encoding,
+    subtree_bounds,
+)
+from hch.schema import FlatInstance, ModuleRecord
+
+PATHS = [
+    "top",
+    "top.u_a",
+    "top.u_a.u_x",
+    "top.u_a.u_x.u_deep",
+    "top.u_a.u_y",
+    "top.u_a-b",  # '-' < '.' in plain string order
+    "top.u_a-b.u_z",
+    "top.u_ab",
+    "top.u_b",
+]
+
+
+def _row(path: str, variant: str = "") -> FlatInstance:
+    parent, _, leaf = path.rpartition(".")
+    return FlatInstance(
+        full_path=path,
+        name=leaf or path,
+        module="top" if path == "top" else "blk",
+        file="/rtl/x.v",
+        depth=path.count("."),
+        parent_path=parent or None,
+        variant=variant,
+    )
+
+
+def _store(tmp_path) -> HierarchyStore:
+    store = HierarchyStore(str(tmp_path / "tree.db"))
+    store.load_modules(
+        [
+            ModuleRecord(module_name="top", file_path="/rtl/x.v"),
+            ModuleRecord(module_name="blk", file_path="/rtl/x.v"),
+        ]
+    )
+    store.load_instances([_row(p) for p in PATHS])
+    return store
+
+
+def _tree(store: HierarchyStore, path: str):
+    return store.conn.execute(
+        """
+        SELECT t.child_count, t.descendant_count, t.pre_start, t.pre_end
+        FROM instances i JOIN instance_tree t ON t.id = i.id
+        WHERE i.full_path = ?
+        """,
+        (path,),
+    ).fetchall()
+
+
+def _like_subtree(store: HierarchyStore, root: str):
+    return sorted(
+        r[0]
+        for r in store.conn.execute(
+            "SELECT full_path FROM instances WHERE full_path = ? OR full_path LIKE ?",
+            (root, f"{root}.%"),
+        )
+    )
+
+
+def _interval_subtree(store: HierarchyStore, root: str):
+    lo, hi = subtree_bounds(store.conn, root)
+    return sorted(
+        r[0]
+        for r in store.conn.execute(
+            """
+            SELECT i.full_path FROM instances i JOIN instance_tree t ON t.id = i.id
+            WHERE t.pre_start BETWEEN ? AND ?
+            """,
+            (lo, hi),
+        )
+    )
+
+
+def test_counts_intervals_and_ancestors(tmp_path):
+    store = _store(tmp_path)
+    assert has_tree_encoding(store.conn)
+    assert _tree(store, "top") == [(4, 8, 0, 8)]
+    assert [r[:2] for r in _tree(store, "top.u_a")] == [(2, 3)]
+    assert [r[:2] for r in _tree(store, "top.u_a-b")] == [(1, 1)]
+    for path in PATHS:
+        assert _interval_subtree(store, path) == _like_subtree(store, path), path
+    assert ancestor_paths(store.conn, "top.u_a.u_x.u_deep") == [
+        "top",
+        "top.u_a",
+        "top.u_a.u_x",
+    ]
+    assert ancestor_paths(store.conn, "top") == []
+    assert subtree_bounds(store.conn, "top.nope") is None
+
+    # Variant rows share a path's number and count once per row.
+    store.load_instances([_row("top.u_b.u_v", "v2"), _row("top.u_b", "v2")])
+    assert [r[:2] for r in _tree(store, "top.u_b")] == [(1, 1), (1, 1)]
+    assert _tree(store, "top")[0][:2] == (5, 10)
+    assert ancestor_paths(store.conn, "top.u_b.u_v") == ["top", "top.u_b"]
+    store.close()
+
+
+def test_readers_and_migration_backfill(tmp_path):
+    store = _store(tmp_path)
+    path = store.db_path
+    text = format_subtree_text(store.conn, "top.u_a")
+    stats = fetch_subtree_depth_stats(store.conn, "top.u_a")
+    # Simulate a DB written before instance_tree existed.
+    store.conn.execute("DELETE FROM instance_tree")
+    store.conn.execute("DELETE FROM meta WHERE key = ?", (TREE_ENCODING_META,))
+    store.conn.commit()
+    assert format_subtree_text(store.conn, "top.u_a") == text
+    assert fetch_subtree_depth_stats(store.conn, "top.u_a") == stats
+    assert stats["count"] == 4 and "top.u_a-b" not in text
+    store.close()
+
+    svc = HierarchyDbService(path)
+    assert not has_tree_encoding(svc.conn)
+    legacy = svc.tree_children("top")
+    svc.close()
+    store = HierarchyStore(path)  # _migrate backfills
+    assert has_tree_encoding(store.conn)
+    assert _tree(store, "top") == [(4, 8, 0, 8)]
+    store.close()
+    svc = HierarchyDbService(path)
+    kids = svc.tree_children("top")
+    assert kids == legacy
+    assert {k["full_path"]: k["has_children"] for k in kids}["top.u_ab"] is False
+    svc.close()
+
+    store = HierarchyStore(path)
+    store.clear_instances()
+    assert store.conn.execute("SELECT COUNT(*) FROM instance_tree").fetchone()[0] == 0
+    store.close()
+
+
+def _tree_rows(store: HierarchyStore):
+    return store.conn.execute(
+        "SELECT id, parent_id, child_count, descendant_count, pre_start, pre_end "
+        "FROM instance_tree ORDER BY id"
+    ).fetchall()
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_incremental_updates_match_rebuild(tmp_path, seed):
+    rng = random.Random(seed)
+    store = _store(tmp_path)
+    pool = PATHS + [
+        f"top.{a}.{b}" for a in ("u_a", "u_ab", "u_c", "u_a-b") for b in ("u_p", "u_q")
+    ] + ["top.u_c", "top.u_gap.u_z", "top.u_a.u_x.u_e", "top.u_ab.u_p.u_r"]
+    for step in range(12):
+        existing = store.conn.execute("SELECT id, full_path FROM instances").fetchall()
+        with store.deferred_tree_encoding():
+            if existing and rng.random() < 0.5:
+                picked = rng.sample(existing, rng.randint(1, min(3, len(existing))))
+                store.delete_instances(
+                    [r[0] for r in picked if r[1] != "top"], commit=False
+                )
+            picks = rng.sample(pool[1:], rng.randint(0, 4))
+            store.load_instances(
+                [_row(p, rng.choice(["", "", "v2"])) for p in picks], commit=False
+            )
+        got = _tree_rows(store)
+        rebuild_tree_encoding(store.conn)
+        assert got == _tree_rows(store), (seed, step)
+    store.close()
@@ -0,0 +1,114 @@
+"""Delta-driven multi-variant indexing: sensitive-file planning and shared mask rows."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from hch.index.variant_plan import MAX_VARIANTS, MacroScanner, merge_variant_rows, plan_variant
+from hch.schema import FlatInstance, ModuleRecord
+
+FILES = {
+    "inc/cfg.vh": "`ifdef WIDE\n`define W 8\n`else\n`define W 4\n`endif\n",
+    "rtl/leaf.v": "module leaf(input a); endmodule\n",
+    "rtl/mid.v": "module mid(input a);\n  leaf u_l0 (.a(a));\n  leaf u_l1 (.a(a));\nendmodule\n",
+    "rtl/cfgmod.v": (
+        '`include "cfg.vh"\n'
+        "module cfgmod #(parameter P = `W) (input a);\n  mid u_mid (.a(a));\nendmodule\n"
+    ),
+    "rtl/uses_w.v": "module uses_w; wire [`W-1:0] x; endmodule\n",
+    "rtl/top.v": (
+        "module top(input a);\n"
+        "  mid u_mid0 (.a(a));\n"
+        "  cfgmod u_cfg (.a(a));\n"
+        "`ifdef HAS_OPT\n  mid u_opt (.a(a));\n`else\n  leaf u_plain (.a(a));\n`endif\n"
+        "endmodule\n"
+    ),
+}
+
+
+def _design(tmp_path):
+    for rel, text in FILES.items():
+        p = tmp_path / rel
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(text, encoding="utf-8")
+    srcs = [str(tmp_path / r) for r in FILES if r.startswith("rtl/")]
+    fl = tmp_path / "fl.f"
+    fl.write_text("+incdir+./inc\n" + "\n".join(srcs) + "\n", encoding="utf-8")
+    return fl, srcs
+
+
+def test_plan_variant_follows_includes_and_derived_macros(tmp_path):
+    _, srcs = _design(tmp_path)
+    mods = {
+        "cfgmod": ModuleRecord(module_name="cfgmod", file_path=srcs[2]),
+        "top": ModuleRecord(module_name="top", file_path=srcs[4]),
+    }
+    scanner = MacroScanner([str(tmp_path / "inc")])
+    wide = plan_variant("wide", srcs, {}, {"WIDE": "1"}, mods, scanner=scanner)
+    # cfg.vh (included) tests WIDE and defines W, so uses_w.v is affected too.
+    assert [p.rsplit("/", 1)[-1] for p in wide.sensitive_files] == ["cfgmod.v", "uses_w.v"]
+    assert wide.sensitive_modules == {"cfgmod"}
+    opt = plan_variant("opt", srcs, {}, {"HAS_OPT": "1"}, mods, scanner=scanner)
+    assert opt.sensitive_modules == {"top"}
+    same = plan_variant("same", srcs, {"X": "1"}, {"X": "1"}, mods, scanner=scanner)
+    assert not same.sensitive_files and not same.changed_macros
+
+
+def test_merge_variant_rows_shares_identical_rows():
+    top = FlatInstance(full_path="top", name="top", module="top", file="t.v")
+    a = FlatInstance(full_path="top.u", name="u", module="a", file="t.v", depth=1, parent_path="top")
+    b = FlatInstance(full_path="top.u", name="u", module="b", file="t.v", depth=1, parent_path="top")
+    rows = merge_variant_rows(["x", "y", "z"], [[top, a], [top, b], [top, a]])
+    got = {(r.full_path, r.module): (r.variant, r.variant_mask) for r in rows}
+    assert got == {
+        ("top", "top"): ("x,y,z", 0b111),
+        ("top.u", "a"): ("x,z", 0b101),
+        ("top.u", "b"): ("y", 0b010),
+    }
+
+
+@pytest.mark.requires_engine
+def test_variant_rows_match_single_variant_builds(tmp_path):
+    pytest.importorskip("pyslang")
+    from hch.index.variant_index import build_index_variants, compare_variant_paths
+
+    fl, _ = _design(tmp_path)
+    variants = [("base", {}), ("opt", {"HAS_OPT": "1"}), ("wide", {"WIDE": "1"})]
+    store = build_index_variants(str(fl), str(tmp_path / "v.db"), "top", variants)
+    rows = store.load_flat_instances()
+    plans = json.loads(store.get_meta("variant_plan_json"))
+    assert [p["reparse_files"] for p in plans] == [1, 2]
+    assert store.get_meta("variant_row_mode") == "mask"
+    shared = [r for r in rows if r.variant_mask == 0b111]
+    assert {r.full_path for r in shared} >= {"top", "top.u_mid0", "top.u_mid0.u_l0"}
+    assert len(rows) < sum(1 for r in rows for i in range(3) if r.variant_mask >> i & 1)
+
+    def strip(r):
+        return (r.full_path, r.module, r.depth, r.parent_path, tuple(r.ports), r.module_ref)
+
+    for bit, (name, extra) in enumerate(variants):
+        ref = build_index_variants(str(fl), str(tmp_path / f"{name}.db"), "top", [(name, extra)])
+        expect = {strip(r) for r in ref.load_flat_instances()}
+        ref.close()
+        assert {strip(r) for r in rows if r.variant_mask >> bit & 1} == expect
+
+    diff = compare_variant_paths(store, "base", "opt")
+    assert diff["only_a"] == ["top.u_plain"]
+    assert "top.u_opt.u_l1" in diff["only_b"]
+    store.close()
+
+
+def test_variant_count_fits_mask(tmp_path):
+    from hch.index.variant_index import build_index_variants
+
+    too_many = [(f"v{i}", {f"D{i}": "1"}) for i in range(MAX_VARIANTS + 1)]
+    with pytest.raises(ValueError, match="at most 63 variants"):
+        build_index_variants(str(tmp_path / "none.f"), str(tmp_path / "v.db"), "top", too_many)
+    assert not (tmp_path / "v.db").exists()
+    top = FlatInstance(full_path="top", name="top", module="top", file="t.v")
+    rows = merge_variant_rows([str(i) for i in range(MAX_VARIANTS)], [[top]] * MAX_VARIANTS)
+    assert rows[0].variant_mask == (1 << MAX_VARIANTS) - 1
+    with pytest.raises(ValueError, match="variant_mask"):
+        merge_variant_rows([str(i) for i in range(64)], [[top]] * 64)
@@ -0,0 +1,187 @@
+"""hch-web --async: same payloads as the threaded server, plus cache / ETag / gzip."""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import http.client
+import json
+import sqlite3
+import threading
+
+import pytest
+
+from hch.apps.api.async_server import AsyncHierarchyServer
+from hch.apps.api.http_server import run_server
+from hch.index.store import HierarchyStore
+from hch.schema import FlatInstance, ModuleRecord
+
+
+def _db(tmp_path) -> str:
+    path = str(tmp_path / "web.db")
+    store = HierarchyStore(path)
+    store.load_modules(
+        [
+            ModuleRecord(module_name="top", file_path="/rtl/top.v"),
+            ModuleRecord(module_name="blk", file_path="/rtl/blk.v"),
+        ]
+    )
+    rows = [FlatInstance(full_path="top", name="top", module="top", file="/rtl/top.v")]
+    for a in range(60):
+        rows.append(
+            FlatInstance(
+                full_path=f"top.u_blk{a}", name=f"u_blk{a}", module="blk",
+                file="/rtl/blk.v", depth=1, parent_path="top", ports=["clk", "d"],
+            )
+        )
+        for k in range(5):
+            rows.append(
+                FlatInstance(
+                    full_path=f"top.u_blk{a}.u_leaf{k}", name=f"u_leaf{k}", module="blk",
+                    file="/rtl/blk.v", depth=2, parent_path=f"top.u_blk{a}",
+                )
+            )
+    store.load_instances(rows)
+    store.set_meta("top_module", "top")
+    store.close()
+    return path
+
+
+@pytest.fixture
+def servers(tmp_path):
+    db = _db(tmp_path)
+    threaded = run_server(db, host="127.0.0.1", port=0)
+    threading.Thread(target=threaded.serve_forever, daemon=True).start()
+
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    srv = AsyncHierarchyServer(db, host="127.0.0.1", port=0, pool_size=2)
+    asyncio.run_coroutine_threadsafe(srv.start(), loop).result(10)
+    try:
+        yield db, threaded.server_address[1], srv
+    finally:
+        asyncio.run_coroutine_threadsafe(srv.aclose(), loop).result(10)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(10)
+        loop.close()
+        threaded.shutdown()
+        threaded.server_close()
+
+
+def _request(conn, method, url, body=None, headers=None):
+    hdrs = dict(headers or {})
+    data = None
+    if body is not None:
+        data = json.dumps(body).encode()
+        hdrs["Content-Type"] = "application/json"
+    conn.request(method, url, body=data, headers=hdrs)
+    resp = conn.getresponse()
+    raw = resp.read()
+    if resp.getheader("Content-Encoding") == "gzip":
+        raw = gzip.decompress(raw)
+    return resp, raw
+
+
+URLS = [
+    "/api/meta",
+    "/api/help",
+    "/api/tree/children",
+    "/api/tree/children?parent=top.u_blk3",
+    "/api/subtree?path=top",
+    "/api/instance?path=top.u_blk1.u_leaf2",
+    "/api/instance?path=top.nope",
+    "/api/nope",
+    "/api/query/text?q=lastnode&format=ndjson",
+    "/api/query/text?q=top&limit=3",
+]
+
+
+def test_async_matches_threaded(servers):
+    _, port, srv = servers
+    ref = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    conn = http.client.HTTPConnection("127.0.0.1", srv.server_address[1], timeout=30)
+    for url in URLS:  # one keep-alive connection for all of them
+        want, want_body = _request(ref, "GET", url)
+        got, got_body = _request(conn, "GET", url)
+        assert got.status == want.status, url
+        if url.startswith("/api/query/text"):
+            assert got.getheader("Transfer-Encoding") == "chunked"
+            assert got_body == want_body, url
+        else:
+            assert json.loads(got_body) == json.loads(want_body), url
+    for body in ({"q": 'path ^= "top.u_blk1"', "limit": 4}, {"q": "path ~ ("}):
+        want, want_body = _request(ref, "POST", "/api/query", body)
+        got, got_body = _request(conn, "POST", "/api/query", body)
+        assert (got.status, json.loads(got_body)) == (want.status, json.loads(want_body))
+    got, _ = _request(conn, "POST", "/api/nope", {})
+    assert got.status == 404
+    got, page = _request(conn, "GET", "/")
+    assert got.status == 200 and b"<html" in page.lower()
+
+
+def test_cache_etag_and_gzip(servers):
+    db, _, srv = servers
+    conn = http.client.HTTPConnection("127.0.0.1", srv.server_address[1], timeout=30)
+
+    url = "/api/subtree?path=top"
+    first, body = _request(conn, "GET", url, headers={"Accept-Encoding": "gzip"})
+    assert first.getheader("Content-Encoding") == "gzip" and len(body) >= 8 * 1024
+    etag = first.getheader("ETag")
+    assert etag and first.getheader("Vary") == "Accept-Encoding"
+    plain, plain_body = _request(conn, "GET", url)
+    assert plain.getheader("Content-Encoding") is None and plain_body == body
+    assert srv.cache.hits == 1
+
+    again, empty = _request(conn, "GET", url, headers={"If-None-Match": etag})
+    assert again.status == 304 and empty == b""
+
+    meta = json.loads(_request(conn, "GET", "/api/meta")[1])
+    assert "web_note" not in meta
+    writer = sqlite3.connect(db)  # e.g. deepen / re-index commits: DB stamp moves
+    writer.execute("INSERT INTO meta (key, value) VALUES ('web_note', 'x')")
+    writer.commit()
+    writer.close()
+    meta = json.loads(_request(conn, "GET", "/api/meta")[1])
+    assert meta["web_note"] == "x"
+    misses = srv.cache.misses
+    same, _ = _request(conn, "GET", url, headers={"If-None-Match": etag})
+    assert same.status == 304 and srv.cache.misses == misses + 1  # recomputed, unchanged
+
+
+def test_cached_build_error_reaches_every_waiter(tmp_path):
+    srv = AsyncHierarchyServer(_db(tmp_path), host="127.0.0.1", port=0)
+
+    async def main():
+        gate = asyncio.Event()
+
+        async def build():
+            await gate.wait()
+            raise RuntimeError("boom")
+
+        waiters = [asyncio.ensure_future(srv._cached(("k",), build)) for _ in range(2)]
+        await asyncio.sleep(0)
+        gate.set()
+        return await asyncio.gather(*waiters, return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert [type(r) for r in results] == [RuntimeError, RuntimeError]
+    assert srv._inflight == {}
+
+
+def test_unexpected_error_is_500(servers, monkeypatch):
+    from hch.apps.api import async_server
+
+    _, _, srv = servers
+
+    def _fail(*_a, **_k):
+        raise RuntimeError("db went away")
+
+    monkeypatch.setattr(async_server, "api_get_json", _fail)
+    conn = http.client.HTTPConnection("127.0.0.1", srv.server_address[1], timeout=30)
+    resp, body = _request(conn, "GET", "/api/meta")
+    assert resp.status == 500 and json.loads(body) == {"error": "db went away"}
+    monkeypatch.undo()
+    conn = http.client.HTTPConnection("127.0.0.1", srv.server_address[1], timeout=30)
+    resp, _ = _request(conn, "GET", "/api/meta")
+    assert resp.status == 200
@@ -0,0 +1,250 @@
+"""Content-addressed preprocessed-text blobs for O(1) module body fetch.
+
+At index time :func:`hierwalk.index.scan_preprocessed` writes each file's
+preprocessed text once to ``<blob dir>/<sha256>.body`` (see
+:func:`hierwalk.perf.body_blob_dir`) and records every module body as a
+:data:`BodyRef` ``(blob path, byte offset, byte length)`` on its
+``ModuleRecord``.  ``DesignIndex.module_body`` then slices the ``mmap`` of that
+blob instead of re-running preprocess and ``iter_module_blocks`` on the whole
+file.  Decoded bodies live in a byte-bounded :class:`BodyLru` so they can be
+evicted and re-sliced on demand.
+
+Blobs are named by content digest, so a ref can never point at stale text;
+a missing or truncated blob just falls back to the source-text path.  That
+also makes :func:`prune_body_blobs` safe: blobs no saved index references
+are deleted once they are older than a grace period.  The blob dir is shared
+by every cache saved into it (other filelists, define sets), so each cache
+records its refs under ``<blob dir>/refs`` (:func:`record_blob_refs`) and
+pruning keeps the union (:func:`referenced_blobs`).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+# (blob path, byte offset, byte length); ("", 0, 0) = no blob.
+BodyRef = Tuple[str, int, int]
+
+NO_BODY_REF: BodyRef = ("", 0, 0)
+
+# Open blob maps per reader; least recently used maps are closed beyond this.
+DEFAULT_MAX_MAPS = 64
+
+# Unreferenced blobs younger than this may belong to an index still being built.
+PRUNE_MIN_AGE_S = 3600.0
+
+
+_REFS_DIR = "refs"
+
+
+def blob_path_for(root: Path, digest: str) -> Path:
+    return root / digest[:2] / f"{digest}.body"
+
+
+def record_blob_refs(root: Path, owner: Path, refs: Iterable[str]) -> None:
+    """Record the blobs saved index *owner* references (replacing its last list)."""
+    owner_s = str(owner.resolve())
+    name = hashlib.sha256(owner_s.encode("utf-8", errors="surrogatepass")).hexdigest()
+    path = root / _REFS_DIR / f"{name[:24]}.refs"
+    lines = [owner_s, *sorted({r for r in refs if r})]
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(("\n".join(lines) + "\n").encode("utf-8", errors="surrogatepass"))
+        tmp.replace(path)
+    except OSError:
+        pass
+
+
+def referenced_blobs(root: Path) -> Set[str]:
+    """Blobs referenced by any saved index recorded under *root*.
+
+    Lists whose owner is gone are deleted (their blobs become prunable).
+    """
+    out: Set[str] = set()
+    refs_dir = root / _REFS_DIR
+    if not refs_dir.is_dir():
+        return out
+    for path in refs_dir.glob("*.refs"):
+        try:
+            lines = path.read_text(encoding="utf-8", errors="surrogatepass").splitlines()
+            if not lines or not os.path.exists(lines[0]):
+                path.unlink()
+                continue
+        except OSError:
+            continue
+        out.update(lines[1:])
+    return out
+
+
+def write_body_blob(data: bytes, root: Path) -> Optional[Path]:
+    """Write *data* under its digest (no-op when present); ``None`` on I/O error."""
+    path = blob_path_for(root, hashlib.sha256(data).hexdigest())
+    try:
+        if path.is_file() and path.stat().st_size == len(data):
+            os.utime(path)  # referenced again: keep it out of prune_body_blobs
+            return path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        tmp.replace(path)
+    except OSError:
+        return None
+    return path
+
+
+def byte_spans(
+    text: str,
+    spans: Sequence[Tuple[int, int]],
+) -> List[Tuple[int, int]]:
+    """Map ``(char_start, char_end)`` spans of *text* to ``(byte_offset, byte_length)``."""
+    if text.isascii():
+        return [(start, end - start) for start, end in spans]
+    points = sorted({p for span in spans for p in span})
+    offsets: Dict[int, int] = {}
+    char_pos = 0
+    byte_pos = 0
+    for p in points:
+        byte_pos += len(text[char_pos:p].encode("utf-8", errors="surrogatepass"))
+        char_pos = p
+        offsets[p] = byte_pos
+    return [(offsets[start], offsets[end] - offsets[start]) for start, end in spans]
+
+
+class BodyBlobReader:
+    """Lazily ``mmap`` blobs and slice :data:`BodyRef` ranges (thread-safe).
+
+    At most *max_maps* blobs stay mapped; the least recently read is closed.
+    """
+
+    def __init__(self, max_maps: int = DEFAULT_MAX_MAPS) -> None:
+        self.max_maps = max(1, max_maps)
+        self._maps: "OrderedDict[str, mmap.mmap]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _map(self, path: str) -> Optional[mmap.mmap]:
+        # Caller holds self._lock.
+        hit = self._maps.get(path)
+        if hit is not None:
+            self._maps.move_to_end(path)
+            return hit
+        try:
+            with open(path, "rb") as fh:
+                hit = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        self._maps[path] = hit
+        while len(self._maps) > self.max_maps:
+            _old_path, old = self._maps.popitem(last=False)
+            old.close()
+        return hit
+
+    def read(self, ref: BodyRef) -> Optional[str]:
+        path, offset, length = ref
+        if not path:
+            return None
+        if length == 0:
+            return ""
+        # Slice under the lock so an eviction cannot close the map mid-copy.
+        with self._lock:
+            blob = self._map(path)
+            if blob is None or offset + length > len(blob):
+                return None
+            data = blob[offset : offset + length]
+        return data.decode("utf-8", errors="surrogatepass")
+
+    def close(self) -> None:
+        with self._lock:
+            for blob in self._maps.values():
+                blob.close()
+            self._maps.clear()
+
+    def __len__(self) -> int:
+        return len(self._maps)
+
+
+def prune_body_blobs(
+    root: Path,
+    keep: Iterable[str],
+    *,
+    min_age_s: float = PRUNE_MIN_AGE_S,
+) -> int:
+    """
+    Delete blobs (and stale temp files) under *root* not in *keep*.
+
+    Files touched within *min_age_s* are kept: another run may be indexing into
+    the same directory.  Returns the number of files removed.
+    """
+    if not root.is_dir():
+        return 0
+    keep_real = {os.path.realpath(p) for p in keep if p}
+    cutoff = time.time() - min_age_s
+    removed = 0
+    for path in root.glob("*/*"):
+        if path.suffix not in (".body", ".tmp"):
+            continue
+        try:
+            if path.stat().st_mtime > cutoff:
+                continue
+            if path.suffix == ".body" and os.path.realpath(path) in keep_real:
+                continue
+            path.unlink()
+        except OSError:
+            continue
+        removed += 1
+    for sub in root.iterdir():
+        try:
+            sub.rmdir()  # only succeeds once the digest bucket is empty
+        except OSError:
+            pass
+    return removed
+
+
+class BodyLru:
+    """Decoded bodies keyed by :data:`BodyRef`, evicted beyond *max_bytes*."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._bodies: "OrderedDict[BodyRef, str]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, ref: BodyRef) -> Optional[str]:
+        with self._lock:
+            hit = self._bodies.get(ref)
+            if hit is not None:
+                self._bodies.move_to_end(ref)
+            return hit
+
+    def put(self, ref: BodyRef, body: str) -> None:
+        size = ref[2]
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if ref in self._bodies:
+                self._bodies.move_to_end(ref)
+                return
+            self._bodies[ref] = body
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._bodies:
+                old_ref, _old = self._bodies.popitem(last=False)
+                self._bytes -= old_ref[2]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._bodies.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._bodies)
+
+    @property
+    def cached_bytes(self) -> int:
+        return self._bytes
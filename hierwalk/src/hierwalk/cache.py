@@ -10,6 +10,7 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
 
+from hierwalk.body_blob import prune_body_blobs, record_blob_refs, referenced_blobs
 from hierwalk.filelist import FilelistResult, filelist_provenance_maps
 from hierwalk.index import DesignIndex
 from hierwalk.manifest import (
@@ -23,6 +24,7 @@ from hierwalk.manifest import (
     manifest_is_current,
 )
 from hierwalk.models import ElabNode, FlatRow
+from hierwalk.perf import body_blob_dir
 
 CACHE_VERSION = 8
 
@@ -135,6 +137,11 @@ def elab_cache_dir(cache_dir: Path, config_key: str) -> Path:
     return cache_dir / config_key / "elab"
 
 
+def coverage_state_path(cache_dir: Path, config_key: str) -> Path:
+    """Previous coverage-audit state for incremental reruns."""
+    return cache_dir / config_key / "coverage.pkl"
+
+
 def _elab_sidecar_path(cache_dir: Path, config_key: str, elab_key: str) -> Path:
     digest = hashlib.sha256(elab_key.encode("utf-8")).hexdigest()[:16]
     return elab_cache_dir(cache_dir, config_key) / f"{digest}.elab.pkl"
@@ -204,6 +211,8 @@ def load_cache(path: Path, *, cache_dir: Optional[Path] = None) -> Optional[Scan
 
 def save_cache(path: Path, bundle: ScanInstCacheBundle) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
+    # Persist the instantiation graph (only new/re-parsed modules are folded).
+    bundle.index.instantiation_graph()
     tmp = path.with_suffix(path.suffix + ".tmp")
     slim = ScanInstCacheBundle(
         version=bundle.version,
@@ -215,6 +224,16 @@ def save_cache(path: Path, bundle: ScanInstCacheBundle) -> None:
     with tmp.open("wb") as fh:
         pickle.dump(slim, fh, protocol=pickle.HIGHEST_PROTOCOL)
     tmp.replace(path)
+    blob_root = body_blob_dir()
+    if blob_root is not None:
+        # Blobs of files that were re-indexed or dropped are no longer referenced
+        # by this cache; other caches sharing the blob dir keep theirs.
+        record_blob_refs(
+            blob_root,
+            path,
+            (rec.body_ref[0] for rec in bundle.index.modules.values()),
+        )
+        prune_body_blobs(blob_root, referenced_blobs(blob_root))
 
 
 def build_design_index(
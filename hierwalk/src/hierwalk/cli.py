@@ -91,6 +91,7 @@ from hierwalk.verification_timing import (
     verification_step_label,
 )
 from hierwalk.cli_execute import execute_run
+from hierwalk.suite_schedule import StepResult, run_suite_dag, suite_parallel_workers
 from hierwalk.config_env_audit import emit_config_env_audit
 from hierwalk.cone import (
     fanin_cone,
@@ -714,7 +715,11 @@ def main(argv=None) -> int:
 
     exit_code = 0
     clear_path_walk_suite_session()
-    for test_entry, run_cfg in test_plan:
+
+    def run_plan_step(test_entry: Optional[RunTestEntry], run_cfg) -> StepResult:
+        # Flags travel back with the exit code: under run_suite_dag this runs in
+        # a forked worker, where updating the enclosing scope would be lost.
+        flags: set[str] = set()
         if test_document is not None and test_entry is None:
             connect_req = resolve_connectivity_request(run_cfg)
             eff = resolve_effective_run_mode(run_cfg, connect_req)
@@ -765,7 +770,7 @@ def main(argv=None) -> int:
                 )
         if test_entry is not None:
             if test_entry.kind == RUN_ON_FULL_INDEX:
-                saw_full_index_step = True
+                flags.add("full_index_step")
         if test_entry is not None and not run_cfg.quiet:
             label = test_entry.name or f"{test_entry.kind}[{test_entry.index}]"
             index_note = run_cfg.index_strategy
@@ -803,9 +808,25 @@ def main(argv=None) -> int:
             eff = resolve_effective_run_mode(run_cfg, connect_req)
             index_note = normalize_run_mode(run_cfg.index_strategy or "full-index")
             if eff == "hierarchy" and index_note == "full-index":
-                saw_hierarchy_execute = True
+                flags.add("hierarchy_execute")
+        return step_rc, frozenset(flags)
+
+    parallel = suite_parallel_workers()
+    if parallel > 1 and parsed_suite is not None and len(test_plan) > 1:
+        step_results = run_suite_dag(
+            test_plan,
+            run_plan_step,
+            workers=parallel,
+            jobs_budget=cfg.jobs,
+            quiet=cfg.quiet,
+        )
+    else:
+        step_results = [run_plan_step(entry, run_cfg) for entry, run_cfg in test_plan]
+    for step_rc, step_flags in step_results:
         if step_rc != 0:
             exit_code = step_rc
+        saw_full_index_step |= "full_index_step" in step_flags
+        saw_hierarchy_execute |= "hierarchy_execute" in step_flags
     if timing_rec is not None:
         timing_rec.emit_summary()
     bind_suite_recorder(None)
@@ -5,11 +5,12 @@ from __future__ import annotations
 import sys
 import time
 from pathlib import Path
-from typing import Optional
+from typing import Mapping, Optional, Sequence
 
 import hierwalk
 from hierwalk.coverage_audit import compute_coverage_audit
 from hierwalk.cache import (
+    coverage_state_path,
     get_cached_elab,
     load_or_build_index,
     resolve_run_work_dir,
@@ -21,6 +22,7 @@ from hierwalk.cache import (
 from hierwalk.elab import elaborate_tops_parallel
 from hierwalk.lazy_scope import (
     elab_scope_paths,
+    lazy_cone_view,
     endpoint_specs_from_request,
     lazy_filelist_defer_exists,
     lazy_index_ifdef,
@@ -30,8 +32,14 @@ from hierwalk.lazy_scope import (
 from hierwalk.perf import effective_low_memory
 from hierwalk.filelist import parse_filelist
 from hierwalk.progress import ProgressHeartbeat, ProgressReporter, progress_callback
-from hierwalk.hierarchy_log import emit_hierarchy_rows_log, emit_path_provenance_log, rows_lookup
+from hierwalk.hierarchy_log import (
+    emit_hierarchy_rows_log,
+    emit_path_provenance_log,
+    open_trace_log,
+    rows_lookup,
+)
 from hierwalk.report import RunReport, default_log_path, emit_run_report
+from hierwalk.rtl_profile import begin_rtl_profile_session
 from hierwalk.path_chain import attach_path_chains, format_path_chain_compact
 from hierwalk.search_spec import effective_search_spec, execute_search_spec
 from hierwalk.connect_request import ConnectivityCheck, ConnectivityRequest
@@ -49,18 +57,20 @@ from hierwalk.run_request import (
     resolve_effective_run_mode,
 )
 from hierwalk.cone import (
+    ConeCache,
     fanin_cone,
     fanout_cone,
     format_cone_tsv,
     print_cone_report,
     write_cone_dot,
 )
+from hierwalk.index import DesignIndex
 from hierwalk.inst_trace import (
     format_inst_trace_tsv,
     print_inst_trace_report,
-    run_inst_trace,
+    run_inst_trace_batch,
 )
-
+from hierwalk.models import FlatRow
 from hierwalk.top_find import find_top_modules, resolve_top_modules
 from hierwalk.run_request import RunConfig
 from hierwalk.verification_timing import (
@@ -70,6 +80,59 @@ from hierwalk.verification_timing import (
 )
 
 
+def _run_inst_traces(
+    cfg: RunConfig,
+    *,
+    rows: Sequence[FlatRow],
+    index: DesignIndex,
+    top_name: str,
+    compile_defines: Mapping[str, str],
+    log_path: Optional[Path],
+) -> str:
+    """Trace every ``inst_trace`` request in one batch; report each, return the TSV body."""
+    requests = cfg.inst_trace_requests
+    _item_t0 = time.perf_counter()
+    results = run_inst_trace_batch(
+        requests,
+        rows=rows,
+        index=index,
+        top=top_name,
+        defines=compile_defines,
+        jobs=cfg.jobs,
+    )
+    record_verification_item(
+        ", ".join(req.instance for req in requests),
+        time.perf_counter() - _item_t0,
+    )
+    trace_rows = rows_lookup(rows)
+    term_stream = sys.stderr if cfg.output == "-" else sys.stdout
+    for trace_result in results:
+        if not cfg.quiet:
+            emit_path_provenance_log(
+                trace_result.instance,
+                trace_rows,
+                stream=sys.stderr,
+                label="instance",
+                prefix="[hier-walk inst-trace]",
+            )
+        print_inst_trace_report(
+            trace_result,
+            stream=term_stream,
+            rows_by_path=trace_rows,
+        )
+        if log_path is not None:
+            with open(log_path, "a", encoding="utf-8") as fh:
+                print_inst_trace_report(
+                    trace_result,
+                    stream=fh,
+                    rows_by_path=trace_rows,
+                )
+    return "".join(
+        format_inst_trace_tsv(trace_result, rows_by_path=trace_rows)
+        for trace_result in results
+    )
+
+
 def execute_run(cfg: RunConfig, ap) -> int:
     connect_request: Optional[ConnectivityRequest] = None
     if cfg.check_connect_batch or cfg.connect_inline:
@@ -126,6 +189,7 @@ def execute_run(cfg: RunConfig, ap) -> int:
             )
 
     t0 = time.perf_counter()
+    begin_rtl_profile_session()
     extra_defines = dict(cfg.defines_map)
     if connect_request is not None:
         extra_defines.update(connect_request.defines)
@@ -149,6 +213,7 @@ def execute_run(cfg: RunConfig, ap) -> int:
         on_progress=on_progress,
         ignore_filelists=list(cfg.ignore_filelist),
         defer_source_exists=lazy_filelist_defer_exists(),
+        use_cache=use_cache,
     )
     if not fl.source_files:
         print("No sources in filelist", file=sys.stderr)
@@ -235,7 +300,7 @@ def execute_run(cfg: RunConfig, ap) -> int:
             try:
                 index, pw_state, top_name = run_path_walk_index(
                     fl,
-                    [cfg.inst_trace.instance],
+                    [req.instance for req in cfg.inst_trace_requests],
                     top=top_for_walk,
                     extra_defines=extra_defines,
                     reuse_suite_session=cfg.flat_suite_step,
@@ -245,46 +310,16 @@ def execute_run(cfg: RunConfig, ap) -> int:
             except ValueError as exc:
                 print(str(exc), file=sys.stderr)
                 return 2
-            _item_t0 = time.perf_counter()
-            trace_result = run_inst_trace(
-                cfg.inst_trace,
+            body = _run_inst_traces(
+                cfg,
                 rows=pw_state.rows(),
                 index=index,
-                top=top_name,
-                defines=compile_defines,
-            )
-            record_verification_item(
-                cfg.inst_trace.instance,
-                time.perf_counter() - _item_t0,
-            )
-            if not cfg.quiet:
-                emit_path_provenance_log(
-                    trace_result.instance,
-                    rows_lookup(pw_state.rows()),
-                    stream=sys.stderr,
-                    label="instance",
-                    prefix="[hier-walk inst-trace]",
-                )
-            trace_rows = rows_lookup(pw_state.rows())
-            term_stream = sys.stderr if cfg.output == "-" else sys.stdout
-            print_inst_trace_report(
-                trace_result,
-                stream=term_stream,
-                rows_by_path=trace_rows,
-            )
-            if log_path is not None:
-                with open(log_path, "a", encoding="utf-8") as fh:
-                    print_inst_trace_report(
-                        trace_result,
-                        stream=fh,
-                        rows_by_path=trace_rows,
-                    )
-            body = format_inst_trace_tsv(
-                trace_result,
-                rows_by_path=trace_rows,
+                top_name=top_name,
+                compile_defines=compile_defines,
+                log_path=log_path,
             )
             report_mode = "inst-trace"
-            search_pattern = cfg.inst_trace.instance
+            search_pattern = ", ".join(r.instance for r in cfg.inst_trace_requests)
         elif cone_mode:
             cone_label = cfg.fanout_cone or cfg.fanin_cone or ""
             try:
@@ -610,22 +645,44 @@ def execute_run(cfg: RunConfig, ap) -> int:
             use_cache=use_cache,
         )
 
-    roots, rows, elab_cache_hits = elaborate_tops_parallel(
-        index,
-        tops,
-        max_depth=cfg.max_depth,
-        scope_paths=elab_scope,
-        jobs=cfg.jobs,
-        get_cached=_get_cached_elab,
-        store_cached=_store_cached_elab,
-        on_progress=on_progress,
-    )
+    # A cone only needs the scopes it reaches: expand those on demand.
+    cone_view = None
+    if cone_mode and lazy_cone_view() and len(tops) == 1 and cfg.max_depth is None:
+        from hierwalk.lazy_elab import LazyElabView
+
+        cone_view = LazyElabView(index, tops[0])
+        rows, elab_cache_hits = [], 0
+        if on_progress:
+            on_progress(f"elab: on demand for cone under {tops[0]}")
+    else:
+        _roots, rows, elab_cache_hits = elaborate_tops_parallel(
+            index,
+            tops,
+            max_depth=cfg.max_depth,
+            scope_paths=elab_scope,
+            jobs=cfg.jobs,
+            get_cached=_get_cached_elab,
+            store_cached=_store_cached_elab,
+            on_progress=on_progress,
+        )
     if elab_cache_hits and on_progress:
         on_progress(f"cache hit: elab ({elab_cache_hits}/{len(tops)} tops)")
     rows.sort(key=lambda r: (r.full_path.count("."), r.full_path))
     elapsed = time.perf_counter() - t0
+    # Depth/scope-cut rows miss deeper RTL: audit those runs from the module graph.
+    truncated = cfg.max_depth is not None or bool(elab_scope) or cone_view is not None
     coverage = (
-        compute_coverage_audit(index, fl, rows, tops=tops) if rows and tops else None
+        compute_coverage_audit(
+            index,
+            fl,
+            None if truncated else rows,
+            tops=tops,
+            state_path=(
+                coverage_state_path(cache_dir, bundle.config_key) if use_cache else None
+            ),
+        )
+        if (rows or cone_view is not None) and tops
+        else None
     )
     if not cfg.quiet and effective_mode == "hierarchy" and rows:
         emit_hierarchy_rows_log(rows, stream=sys.stderr)
@@ -639,43 +696,13 @@ def execute_run(cfg: RunConfig, ap) -> int:
         )
         compile_defines = dict(fl.defines)
         compile_defines.update(extra_defines)
-        _item_t0 = time.perf_counter()
-        trace_result = run_inst_trace(
-            cfg.inst_trace,
+        body = _run_inst_traces(
+            cfg,
             rows=rows,
             index=index,
-            top=top_name,
-            defines=compile_defines,
-        )
-        record_verification_item(
-            cfg.inst_trace.instance,
-            time.perf_counter() - _item_t0,
-        )
-        if not cfg.quiet:
-            emit_path_provenance_log(
-                trace_result.instance,
-                rows_lookup(rows),
-                stream=sys.stderr,
-                label="instance",
-                prefix="[hier-walk inst-trace]",
-            )
-        trace_rows = rows_lookup(rows)
-        term_stream = sys.stderr if cfg.output == "-" else sys.stdout
-        print_inst_trace_report(
-            trace_result,
-            stream=term_stream,
-            rows_by_path=trace_rows,
-        )
-        if log_path is not None:
-            with open(log_path, "a", encoding="utf-8") as fh:
-                print_inst_trace_report(
-                    trace_result,
-                    stream=fh,
-                    rows_by_path=trace_rows,
-                )
-        body = format_inst_trace_tsv(
-            trace_result,
-            rows_by_path=trace_rows,
+            top_name=top_name,
+            compile_defines=compile_defines,
+            log_path=log_path,
         )
         if cfg.output == "-":
             sys.stdout.write(body)
@@ -699,7 +726,7 @@ def execute_run(cfg: RunConfig, ap) -> int:
                 mode="inst-trace",
                 output_path=cfg.output,
                 filelist_warnings=len(fl.errors),
-                search_pattern=cfg.inst_trace.instance,
+                search_pattern=", ".join(r.instance for r in cfg.inst_trace_requests),
                 coverage=coverage,
             ),
             log_path=log_path,
@@ -714,6 +741,8 @@ def execute_run(cfg: RunConfig, ap) -> int:
             else True
         )
         cone_label = cfg.fanout_cone or cfg.fanin_cone or ""
+        cone_cache = ConeCache.from_view(cone_view) if cone_view is not None else None
+        cone_rows = cone_view if cone_view is not None else rows_lookup(rows)
         _item_t0 = time.perf_counter()
         if cfg.fanout_cone:
             cone_result = fanout_cone(
@@ -723,6 +752,7 @@ def execute_run(cfg: RunConfig, ap) -> int:
                 top=top_name,
                 defines=compile_defines,
                 over_approximate_if=over_approx,
+                cache=cone_cache,
             )
             mode_name = "fanout-cone"
         else:
@@ -734,18 +764,18 @@ def execute_run(cfg: RunConfig, ap) -> int:
                 top=top_name,
                 defines=compile_defines,
                 over_approximate_if=over_approx,
+                cache=cone_cache,
             )
             mode_name = "fanin-cone"
         record_verification_item(cone_label, time.perf_counter() - _item_t0)
         if not cfg.quiet:
             emit_path_provenance_log(
                 cone_result.origin_scope,
-                rows_lookup(rows),
+                cone_rows,
                 stream=sys.stderr,
                 label="origin",
                 prefix="[hier-walk cone]",
             )
-        cone_rows = rows_lookup(rows)
         term_stream = sys.stderr if cfg.output == "-" else sys.stdout
         print_cone_report(
             cone_result,
@@ -783,7 +813,9 @@ def execute_run(cfg: RunConfig, ap) -> int:
                 index_incremental=index_incremental,
                 elab_tops=tops,
                 elab_cache_hits=elab_cache_hits,
-                instance_rows=len(rows),
+                instance_rows=(
+                    cone_view.materialized if cone_view is not None else len(rows)
+                ),
                 mode=mode_name,
                 output_path=cfg.output,
                 filelist_warnings=len(fl.errors),
@@ -876,7 +908,7 @@ def execute_run(cfg: RunConfig, ap) -> int:
                 rows_by_path=endpoint_rows,
             )
             if log_path is not None:
-                with open(log_path, "a", encoding="utf-8") as fh:
+                with open_trace_log(log_path) as fh:
                     print_connect_trace_reports(
                         connect_results,
                         stream=fh,
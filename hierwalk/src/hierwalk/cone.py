@@ -5,7 +5,7 @@ from __future__ import annotations
 import sys
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, FrozenSet, IO, List, Mapping, Optional, Sequence, Set, Tuple
+from typing import TYPE_CHECKING, Dict, FrozenSet, IO, List, Mapping, Optional, Sequence, Set, Tuple
 
 from hierwalk.connect_endpoints import _mod_cache_lock
 from hierwalk.connect_scan import (
@@ -20,6 +20,10 @@ from hierwalk.models import FlatRow
 from hierwalk.params import resolve_param_map
 from hierwalk.path_refine import refine_param_ctx_for_path
 from hierwalk.port_scan import scan_ports_detail_from_module_text
+from hierwalk.rtl_profile import attribute_rtl
+
+if TYPE_CHECKING:
+    from hierwalk.lazy_elab import LazyElabView
 
 NetState = Tuple[str, str]
 
@@ -82,8 +86,8 @@ class ConeModuleIndex:
 
 @dataclass
 class _ConeCtx:
-    rows_by_path: Dict[str, FlatRow]
-    child_by_parent_leaf: Dict[Tuple[str, str], str]
+    rows_by_path: Mapping[str, FlatRow]
+    child_by_parent_leaf: Mapping[Tuple[str, str], str]
     index: DesignIndex
     top: str
     mod_cache: Dict[Tuple[str, str], ConeModuleIndex]
@@ -94,6 +98,36 @@ class _ConeCtx:
     comb_cache: Optional[Dict[Tuple[str, "ModuleConnectIndex"]]] = None
 
 
+@dataclass
+class ConeCache:
+    """Row lookups and per-(module, param ctx) cone indexes shared by many cones.
+
+    Only valid for one ``(rows, defines, over_approximate_if)`` combination.
+    Safe to share across threads: index builds take a per-key lock.
+    """
+
+    rows_by_path: Mapping[str, FlatRow]
+    child_by_parent_leaf: Mapping[Tuple[str, str], str]
+    mod_cache: Dict[Tuple[str, str], ConeModuleIndex] = field(default_factory=dict)
+    comb_cache: Dict[Tuple[str, str], ModuleConnectIndex] = field(default_factory=dict)
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[FlatRow]) -> "ConeCache":
+        return cls(
+            rows_by_path={r.full_path: r for r in rows},
+            child_by_parent_leaf={
+                (r.parent_path, r.inst_leaf): r.full_path
+                for r in rows
+                if r.parent_path
+            },
+        )
+
+    @classmethod
+    def from_view(cls, view: LazyElabView) -> "ConeCache":
+        """Cone lookups over a lazy view; only scopes the cone reaches get elaborated."""
+        return cls(rows_by_path=view, child_by_parent_leaf=view.child_by_parent_leaf)
+
+
 def _net_label(scope: str, net: str) -> str:
     return f"{scope}:{net}" if net else scope
 
@@ -139,18 +173,43 @@ def _build_cone_module_index(
     hit = cache.get(key)
     if hit is not None:
         return hit
+    # Threads of one inst-trace batch share *cache*: build each key once.
+    with _mod_cache_lock(cache, key):
+        hit = cache.get(key)
+        if hit is None:
+            hit = _index_cone_module(
+                index,
+                mod_name,
+                param_ctx,
+                key,
+                defines=defines,
+                over_approximate_if=over_approximate_if,
+                comb_cache=comb_cache,
+            )
+            cache[key] = hit
+    return hit
+
+
+def _index_cone_module(
+    index: DesignIndex,
+    mod_name: str,
+    param_ctx: Mapping[str, str],
+    key: Tuple[str, str],
+    *,
+    defines: Mapping[str, str] | None,
+    over_approximate_if: bool,
+    comb_cache: Optional[Dict[Tuple[str, str], ModuleConnectIndex]],
+) -> ConeModuleIndex:
     rec = index.get_module(mod_name)
     body = index.module_body(mod_name) if rec else ""
     if not body.strip():
-        empty = ConeModuleIndex(
+        return ConeModuleIndex(
             comb=ModuleConnectIndex(),
             ff_d_reps=frozenset(),
             ff_q_reps=frozenset(),
             input_reps=frozenset(),
             output_reps=frozenset(),
         )
-        cache[key] = empty
-        return empty
     pmap = dict(param_ctx)
     if comb_cache is not None:
         comb_hit = comb_cache.get(key)
@@ -162,36 +221,38 @@ def _build_cone_module_index(
                 if comb_hit is not None:
                     comb = comb_hit
                 else:
-                    text = prepare_connect_body(
-                        body,
-                        param_map=pmap,
-                        defines=defines,
-                        over_approximate_if=over_approximate_if,
-                    )
-                    comb = build_module_connect_index(
-                        body,
-                        param_map=pmap,
-                        defines=defines,
-                        over_approximate_if=over_approximate_if,
-                        ff_barrier=True,
-                        prepared_body=text,
-                    )
+                    with attribute_rtl(rec.file_path if rec else "", mod_name):
+                        text = prepare_connect_body(
+                            body,
+                            param_map=pmap,
+                            defines=defines,
+                            over_approximate_if=over_approximate_if,
+                        )
+                        comb = build_module_connect_index(
+                            body,
+                            param_map=pmap,
+                            defines=defines,
+                            over_approximate_if=over_approximate_if,
+                            ff_barrier=True,
+                            prepared_body=text,
+                        )
                     comb_cache[key] = comb
     else:
-        text = prepare_connect_body(
-            body,
-            param_map=pmap,
-            defines=defines,
-            over_approximate_if=over_approximate_if,
-        )
-        comb = build_module_connect_index(
-            body,
-            param_map=pmap,
-            defines=defines,
-            over_approximate_if=over_approximate_if,
-            ff_barrier=True,
-            prepared_body=text,
-        )
+        with attribute_rtl(rec.file_path if rec else "", mod_name):
+            text = prepare_connect_body(
+                body,
+                param_map=pmap,
+                defines=defines,
+                over_approximate_if=over_approximate_if,
+            )
+            comb = build_module_connect_index(
+                body,
+                param_map=pmap,
+                defines=defines,
+                over_approximate_if=over_approximate_if,
+                ff_barrier=True,
+                prepared_body=text,
+            )
     ff_d_reps = frozenset(
         {comb.net_rep.get(n, n) for n in comb.ff_d_roots}
     )
@@ -204,15 +265,13 @@ def _build_cone_module_index(
         comb,
         pmap,
     )
-    built = ConeModuleIndex(
+    return ConeModuleIndex(
         comb=comb,
         ff_d_reps=ff_d_reps,
         ff_q_reps=ff_q_reps,
         input_reps=frozenset(in_reps),
         output_reps=frozenset(out_reps),
     )
-    cache[key] = built
-    return built
 
 
 def _param_ctx_for_row(
@@ -587,8 +646,16 @@ def _run_cone(
     defines: Mapping[str, str] | None = None,
     over_approximate_if: bool = True,
     path_kind: str = "comb",
+    cache: Optional[ConeCache] = None,
 ) -> ConeResult:
-    ep, errs = resolve_endpoint(endpoint, rows, index, top=top, require_port=False)
+    ep, errs = resolve_endpoint(
+        endpoint,
+        rows,
+        index,
+        top=top,
+        require_port=False,
+        rows_by_path=cache.rows_by_path if cache is not None else None,
+    )
     if errs:
         return ConeResult(
             origin_spec=endpoint,
@@ -597,22 +664,20 @@ def _run_cone(
             direction=direction,
             errors=list(errs),
         )
-    rows_by_path = {r.full_path: r for r in rows}
-    child_by_parent_leaf = {
-        (r.parent_path, r.inst_leaf): r.full_path
-        for r in rows
-        if r.parent_path
-    }
+    if cache is None:
+        cache = ConeCache.from_rows(rows)
+    rows_by_path = cache.rows_by_path
     ctx = _ConeCtx(
         rows_by_path=rows_by_path,
-        child_by_parent_leaf=child_by_parent_leaf,
+        child_by_parent_leaf=cache.child_by_parent_leaf,
         index=index,
         top=top,
-        mod_cache={},
+        mod_cache=cache.mod_cache,
         defines=dict(defines or {}),
         over_approximate_if=over_approximate_if,
         direction=direction,
         path_kind=path_kind,
+        comb_cache=cache.comb_cache,
     )
     row = rows_by_path.get(ep.inst_path)
     if row is None:
@@ -690,6 +755,7 @@ def fanout_cone(
     defines: Mapping[str, str] | None = None,
     over_approximate_if: bool = True,
     path_kind: str = "comb",
+    cache: Optional[ConeCache] = None,
 ) -> ConeResult:
     return _run_cone(
         endpoint,
@@ -700,6 +766,7 @@ def fanout_cone(
         defines=defines,
         over_approximate_if=over_approximate_if,
         path_kind=path_kind,
+        cache=cache,
     )
 
 
@@ -712,6 +779,7 @@ def fanin_cone(
     defines: Mapping[str, str] | None = None,
     over_approximate_if: bool = True,
     path_kind: str = "comb",
+    cache: Optional[ConeCache] = None,
 ) -> ConeResult:
     return _run_cone(
         endpoint,
@@ -722,6 +790,7 @@ def fanin_cone(
         defines=defines,
         over_approximate_if=over_approximate_if,
         path_kind=path_kind,
+        cache=cache,
     )
 
 
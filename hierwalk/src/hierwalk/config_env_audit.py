@@ -111,6 +111,66 @@ _BEHAVIOR_ENV_VARS: Sequence[tuple[str, str, str]] = (
         "0",
         "stderr when large modules skip body param collection",
     ),
+    (
+        "HIERWALK_SUITE_PARALLEL",
+        "0",
+        "run independent flat-suite verification steps in N fork workers",
+    ),
+    (
+        "HIERWALK_PROFILE_RTL",
+        "0",
+        "per-(file, module) hot RTL report beside run log (1=time, alloc)",
+    ),
+    (
+        "HIERWALK_PORT_CACHE",
+        "(work dir)/ports",
+        "disk port-index cache keyed by source digest + param ctx (0=off, or dir)",
+    ),
+    (
+        "HIERWALK_BODY_BLOB",
+        "(work dir)/bodies",
+        "mmap blobs of preprocessed text; module bodies are byte-range slices (0=off)",
+    ),
+    (
+        "HIERWALK_BODY_CACHE_MB",
+        "256",
+        "LRU budget for decoded blob-backed module bodies",
+    ),
+    (
+        "HIERWALK_INDEX_SHARDS",
+        "0",
+        "sharded index scan: N shards (auto = 1 per 2000 files) claimed via lock files",
+    ),
+    (
+        "HIERWALK_INDEX_SHARD_DIR",
+        "(work dir)/shards",
+        "shard queue root shared with worker hosts (python -m hierwalk.index_shard)",
+    ),
+    (
+        "HIERWALK_INDEX_SHARD_STALE_SEC",
+        "1800",
+        "age after which an unfinished shard claim is reclaimed",
+    ),
+    (
+        "HIERWALK_GENERATE_UNROLL_MAX",
+        "64",
+        "max for-generate trip count unrolled for instance scan and connectivity",
+    ),
+    (
+        "HIERWALK_TRACE_SINK",
+        "text",
+        "binary = buffered gzip path-walk / connect trace (<run>.hier-walk.trace.gz)",
+    ),
+    (
+        "HIERWALK_TRACE_LEVEL",
+        "info",
+        "binary trace sink: lowest level kept (debug keeps path-walk search steps)",
+    ),
+    (
+        "HIERWALK_TRACE_RATE",
+        "0",
+        "binary trace sink: max lines per category per second (0 = no limit)",
+    ),
     (
         "HCH_INDEX_CWD",
         "(unset)",
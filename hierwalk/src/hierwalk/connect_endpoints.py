@@ -49,6 +49,7 @@ from hierwalk.index import DesignIndex
 from hierwalk.models import ConnectEndpoint, FlatRow
 from hierwalk.params import resolve_param_map
 from hierwalk.path_refine import refine_param_ctx_for_path
+from hierwalk.rtl_profile import attribute_rtl
 from hierwalk.port_scan import (
     matching_ports,
     port_index_for_design_module,
@@ -219,6 +220,11 @@ def _child_instances(
     *,
     limit: int = 12,
 ) -> List[str]:
+    from hierwalk.lazy_elab import LazyElabView
+
+    if isinstance(rows_by_path, LazyElabView):
+        kids = sorted(r.inst_leaf for r in rows_by_path.children(parent_path))
+        return kids[:limit]
     kids = sorted(
         r.inst_leaf
         for r in rows_by_path.values()
@@ -254,7 +260,12 @@ def _explain_hierarchy_miss(
     nearest, row = _nearest_hierarchy_row(text, rows_by_path)
 
     if row is None:
-        roots = sorted({p.split(".", 1)[0] for p in rows_by_path})
+        from hierwalk.lazy_elab import LazyElabView
+
+        if isinstance(rows_by_path, LazyElabView):
+            roots = [rows_by_path.top]
+        else:
+            roots = sorted({p.split(".", 1)[0] for p in rows_by_path})
         errors.append(f"hierarchy not found: '{text}' — no matching instance path")
         if broken_prefix:
             errors.append(f"missing instance prefix: '{broken_prefix}'")
@@ -699,27 +710,28 @@ def _build_module_index_entry(
         if passthrough:
             apply_empty_module_passthrough(built, passthrough[0], passthrough[1])
     else:
-        built = build_module_connect_index(
-            body,
-            param_map=param_ctx,
-            defines=defines,
-            fold_generate=True,
-            over_approximate_if=over_approximate_if,
-            ff_barrier=ff_barrier,
-            port_decl_widths=_port_decl_bit_indices(index, mod_name, param_ctx),
-            port_decl_md_suffixes=_port_decl_md_suffixes(
-                index, mod_name, param_ctx
-            ),
-        )
-        binds = collect_bind_records_for_module(index, mod_name)
-        if binds:
-            apply_bind_connectivity(
-                built,
-                binds,
-                index,
+        with attribute_rtl(rec.file_path if rec else "", mod_name):
+            built = build_module_connect_index(
+                body,
                 param_map=param_ctx,
                 defines=defines,
+                fold_generate=True,
                 over_approximate_if=over_approximate_if,
+                ff_barrier=ff_barrier,
+                port_decl_widths=_port_decl_bit_indices(index, mod_name, param_ctx),
+                port_decl_md_suffixes=_port_decl_md_suffixes(
+                    index, mod_name, param_ctx
+                ),
             )
+            binds = collect_bind_records_for_module(index, mod_name)
+            if binds:
+                apply_bind_connectivity(
+                    built,
+                    binds,
+                    index,
+                    param_map=param_ctx,
+                    defines=defines,
+                    over_approximate_if=over_approximate_if,
+                )
     cache[key] = built
     return built
@@ -14,6 +14,7 @@ from hierwalk.params import (
     resolve_param_expr,
     resolve_param_map,
 )
+from hierwalk.rtl_profile import profiled_rtl
 from hierwalk.inst_scan import (
     _ATTR_RE,
     _BIND_LINE_RE,
@@ -3264,9 +3265,12 @@ def _array_bundle_port_expr(inst_leaf: str, port_expr: str) -> str:
     expr = port_expr.strip()
     if not expr or "[" in expr:
         return expr
-    lb = inst_leaf.find("[")
+    # Only the last segment is the array; ``g_row[0].u_ip`` is a generate scope.
+    leaf = inst_leaf.rsplit(".", 1)[-1]
+    lb = leaf.find("[")
     if lb < 0:
         return expr
+    inst_leaf = leaf
     if expr in ("clk", "rst_n", "probe_in"):
         return expr
     return expr + inst_leaf[lb:]
@@ -3623,6 +3627,7 @@ def _interface_inst_names_from_scan(
     }
 
 
+@profiled_rtl("build_module_connect_index")
 def build_module_connect_index(
     body: str,
     *,
@@ -395,7 +395,9 @@ class ConnectivitySession:
 
     ``mod_cache`` and ``param_ctx_cache`` persist across ``check`` / ``check_many``
     so repeated queries through the same RTL modules (e.g. array fan-out) avoid
-    rebuilding ``ModuleConnectIndex`` graphs.
+    rebuilding ``ModuleConnectIndex`` graphs.  ``fanout_cache`` does the same for
+    waypoint-fanout checks that share origins (see
+    :class:`hierwalk.waypoint_fanout.FanoutCache`).
     """
 
     rows: Sequence[FlatRow]
@@ -408,6 +410,7 @@ class ConnectivitySession:
     mod_cache: Dict[Tuple[str, str], ModuleConnectIndex] = field(default_factory=dict)
     param_ctx_cache: Dict[str, Mapping[str, str]] = field(default_factory=dict)
     elab_index: Optional[ElabIndex] = None
+    fanout_cache: Optional[Any] = None
 
     def __post_init__(self) -> None:
         if self.elab_index is None and self.rows:
@@ -429,6 +432,15 @@ class ConnectivitySession:
     def clear_cache(self) -> None:
         self.mod_cache.clear()
         self.param_ctx_cache.clear()
+        if self.fanout_cache is not None:
+            self.fanout_cache.clear()
+
+    def _fanout_cache(self) -> Any:
+        if self.fanout_cache is None:
+            from hierwalk.waypoint_fanout import FanoutCache
+
+            self.fanout_cache = FanoutCache()
+        return self.fanout_cache
 
     def check(
         self,
@@ -438,7 +450,13 @@ class ConnectivitySession:
         trace: bool = False,
         check_id: str = "",
         expand: Optional[Any] = None,
+        fanout_jobs: int = 1,
     ) -> ConnectResult:
+        """
+        Check one endpoint pair (or expanded check).
+
+        *fanout_jobs* parallelizes waypoint-fanout origins (0 = CPU count).
+        """
         t0 = time.perf_counter()
         if expand is not None and expand.map_kind == "waypoint-fanout":
             from hierwalk.waypoint_fanout import run_waypoint_fanout_check
@@ -463,6 +481,8 @@ class ConnectivitySession:
                 full_path_kinds=getattr(expand, "full_path_kinds", False),
                 elab_index=self.elab_index,
                 comb_cache=self.mod_cache if self.ff_barrier else None,
+                fanout_cache=self._fanout_cache(),
+                jobs=fanout_jobs,
             )
             from hierwalk.verification_timing import record_connect_check
 
@@ -543,6 +563,7 @@ class ConnectivitySession:
         chk: ConnectivityCheck,
         *,
         trace: bool = False,
+        fanout_jobs: int = 1,
     ) -> ConnectResult:
         return self.check(
             chk.endpoint_a,
@@ -550,6 +571,7 @@ class ConnectivitySession:
             trace=trace,
             check_id=chk.check_id,
             expand=chk.expand,
+            fanout_jobs=fanout_jobs,
         )
 
     def check_many(
@@ -573,6 +595,8 @@ class ConnectivitySession:
             for i in range(0, len(pair_list), chunk_size)
         ]
 
+        fanout_cache = self._fanout_cache()
+
         def _run_chunk(chunk: Sequence[Tuple[str, str]]) -> List[ConnectResult]:
             local = ConnectivitySession(
                 rows=self.rows,
@@ -585,6 +609,7 @@ class ConnectivitySession:
                 mod_cache=self.mod_cache,
                 param_ctx_cache=self.param_ctx_cache,
                 elab_index=self.elab_index,
+                fanout_cache=fanout_cache,
             )
             return [local.check(a, b, trace=trace) for a, b in chunk]
 
@@ -612,8 +637,10 @@ class ConnectivitySession:
         checks = list(request.checks)
         workers = _resolve_connect_jobs(jobs, len(checks))
         if workers == 1 or len(checks) < 4:
+            # Few checks: spend the jobs budget on waypoint-fanout origins instead.
             results = tuple(
-                self.check_entry(chk, trace=use_trace) for chk in checks
+                self.check_entry(chk, trace=use_trace, fanout_jobs=jobs)
+                for chk in checks
             )
             return ConnectivityBatchResult(
                 results=results,
@@ -627,6 +654,8 @@ class ConnectivitySession:
             checks[i : i + chunk_size] for i in range(0, len(checks), chunk_size)
         ]
 
+        fanout_cache = self._fanout_cache()
+
         def _run_chunk(chunk: Sequence[Any]) -> List[ConnectResult]:
             local = ConnectivitySession(
                 rows=self.rows,
@@ -639,6 +668,7 @@ class ConnectivitySession:
                 mod_cache=self.mod_cache,
                 param_ctx_cache=self.param_ctx_cache,
                 elab_index=self.elab_index,
+                fanout_cache=fanout_cache,
             )
             return [local.check_entry(chk, trace=use_trace) for chk in chunk]
 
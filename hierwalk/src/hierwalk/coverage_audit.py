@@ -2,20 +2,91 @@
 
 from __future__ import annotations
 
+import os
+import pickle
+import tempfile
 from collections import defaultdict
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Sequence, Set
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Set
 
 from hierwalk.filelist import FilelistResult
 from hierwalk.index import DesignIndex
 from hierwalk.models import FlatRow
 
 
+@lru_cache(maxsize=1 << 18)
 def _norm_file(path: str | Path) -> str:
     return str(Path(path).resolve())
 
 
+def _ancestor_dirs(paths: Iterable[str]) -> Set[str]:
+    """Every path in *paths* plus all of its parent directories."""
+    out: Set[str] = set()
+    for raw in paths:
+        cur = Path(raw)
+        out.add(str(cur))
+        for parent in cur.parents:
+            key = str(parent)
+            if key in out:
+                break  # its ancestors were added with it
+            out.add(key)
+    return out
+
+
+def _unused_root(raw: str, used_dirs: Set[str]) -> Optional[str]:
+    """Shallowest directory holding *raw* with no elaborated file below it."""
+    path = Path(_norm_file(raw))
+    d = path.parent if path.is_file() else path
+    chosen: Optional[Path] = None
+    while True:
+        if str(d) in used_dirs:
+            break
+        chosen = d
+        if d.parent == d:
+            break
+        parent = d.parent
+        if str(parent) in used_dirs:
+            break
+        d = parent
+    return str(chosen) if chosen is not None else None
+
+
+def _unused_file_roots(
+    unused_files: Iterable[str],
+    used: Set[str],
+    *,
+    previous: Optional["CoverageAuditState"] = None,
+) -> Dict[str, Optional[str]]:
+    """
+    Unused file -> its untouched dir root.
+
+    With *previous*, a file keeps its old root unless a newly elaborated file
+    landed under that root, or a no-longer-elaborated one sat under its parent.
+    """
+    if not used:
+        return {f: str(Path(f).resolve().parent) for f in unused_files if f}
+    used_dirs = _ancestor_dirs(used)
+    reuse = previous is not None and bool(previous.reachable)
+    added_dirs = _ancestor_dirs(used - previous.reachable) if reuse else set()
+    removed_dirs = _ancestor_dirs(previous.reachable - used) if reuse else set()
+    out: Dict[str, Optional[str]] = {}
+    for raw in unused_files:
+        if not raw:
+            continue
+        old = previous.file_roots.get(raw) if reuse else None
+        if (
+            old is not None
+            and old not in added_dirs
+            and str(Path(old).parent) not in removed_dirs
+        ):
+            out[raw] = old
+        else:
+            out[raw] = _unused_root(raw, used_dirs)
+    return out
+
+
 def minimal_unused_dir_roots(
     unused_files: Sequence[str],
     used_files: Sequence[str],
@@ -29,37 +100,18 @@ def minimal_unused_dir_roots(
     if not unused_files:
         return []
     used = {_norm_file(f) for f in used_files if f}
-    if not used:
-        return _collapse_dir_roots(str(Path(f).resolve().parent) for f in unused_files if f)
+    roots = _unused_file_roots(unused_files, used)
+    return _collapse_dir_roots([r for r in roots.values() if r])
 
-    roots: Set[str] = set()
-    for raw in unused_files:
-        if not raw:
-            continue
-        path = Path(raw).resolve()
-        d = path.parent if path.is_file() else path
-        chosen: Optional[Path] = None
-        while True:
-            if any(Path(u).is_relative_to(d) for u in used):
-                break
-            chosen = d
-            if d.parent == d:
-                break
-            parent = d.parent
-            if any(Path(u).is_relative_to(parent) for u in used):
-                break
-            d = parent
-        if chosen is not None:
-            roots.add(str(chosen))
-    return _collapse_dir_roots(roots)
-
-
-def _collapse_dir_roots(roots: Sequence[str]) -> List[str]:
+
+def _collapse_dir_roots(roots: Iterable[str]) -> List[str]:
     items = sorted({_norm_file(r) for r in roots if r})
+    kept: Set[str] = set()
     out: List[str] = []
     for r in items:
-        if any(r != m and Path(r).is_relative_to(Path(m)) for m in out):
+        if any(str(p) in kept for p in Path(r).parents):
             continue
+        kept.add(r)
         out.append(r)
     return out
 
@@ -99,16 +151,67 @@ class CoverageAuditResult:
         return out
 
 
+COVERAGE_STATE_VERSION = 1
+
+
+@dataclass
+class CoverageAuditState:
+    """Reachability and per-file dir roots from the previous audit (pickled)."""
+
+    version: int
+    reachable: FrozenSet[str]
+    file_roots: Dict[str, Optional[str]] = field(default_factory=dict)
+
+
+def load_coverage_state(path: Path) -> Optional[CoverageAuditState]:
+    try:
+        with path.open("rb") as fh:
+            obj = pickle.load(fh)
+    except (OSError, pickle.PickleError, EOFError, ValueError, AttributeError):
+        return None
+    if not isinstance(obj, CoverageAuditState) or obj.version != COVERAGE_STATE_VERSION:
+        return None
+    return obj
+
+
+def save_coverage_state(path: Path, state: CoverageAuditState) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Unique temp name: concurrent runs sharing a work dir must not interleave.
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            pickle.dump(state, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
 def compute_coverage_audit(
     index: DesignIndex,
     fl: FilelistResult,
-    rows: Sequence[FlatRow],
+    rows: Optional[Sequence[FlatRow]],
     *,
     tops: Sequence[str],
+    state_path: Optional[Path] = None,
 ) -> CoverageAuditResult:
-    """Compare filelist-listed RTL against elaboration rows from *tops*."""
+    """
+    Compare filelist-listed RTL against elaboration rows from *tops*.
+
+    With ``rows=None`` (elaboration cut by depth or scope) reachability comes
+    from the index instantiation graph instead.  With *state_path* the audit
+    reuses the previous run's per-file dir roots wherever the set of
+    elaborated files around them is unchanged, then saves the new state.
+    """
     listed = {_norm_file(p) for p in fl.source_files}
-    reachable = {_norm_file(r.file) for r in rows if r.file}
+    if rows is None:
+        files = (index.modules[m].file_path for m in index.reachable_modules(tops))
+    else:
+        files = (r.file for r in rows)
+    reachable = {_norm_file(f) for f in files if f}
     reachable &= listed
     untouched = listed - reachable
 
@@ -127,7 +230,21 @@ def compute_coverage_audit(
         elif not (sources & reachable):
             unused_filelists.append(norm_fl)
 
-    dir_roots = minimal_unused_dir_roots(sorted(untouched), sorted(reachable))
+    previous = load_coverage_state(state_path) if state_path is not None else None
+    file_roots = _unused_file_roots(sorted(untouched), reachable, previous=previous)
+    dir_roots = _collapse_dir_roots([r for r in file_roots.values() if r])
+    if state_path is not None:
+        try:
+            save_coverage_state(
+                state_path,
+                CoverageAuditState(
+                    version=COVERAGE_STATE_VERSION,
+                    reachable=frozenset(reachable),
+                    file_roots=file_roots,
+                ),
+            )
+        except OSError:
+            pass
 
     return CoverageAuditResult(
         tops=tuple(tops),
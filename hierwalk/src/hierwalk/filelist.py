@@ -7,6 +7,8 @@ from pathlib import Path
 from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
 from hierwalk.hch_compat.filelist_preprocess import FilelistResult as HchFilelistResult
+from hierwalk.hch_compat.filelist_cwd import resolve_index_cwd
+from hierwalk.hch_compat.filelist_disk_cache import expand_filelist_cached
 from hierwalk.hch_compat.filelist_preprocess import expand_filelist
 from hierwalk.models import FilelistLinkInfo
 
@@ -115,15 +117,43 @@ def parse_filelist(
     on_progress: Optional[Callable[[str], None]] = None,
     ignore_filelists: Optional[Sequence[str]] = None,
     defer_source_exists: bool = False,
+    use_cache: bool = True,
 ) -> FilelistResult:
-    fl = expand_filelist(
-        top_filelist,
-        env,
-        index_cwd=index_cwd,
-        on_progress=on_progress,
-        ignore_filelist_patterns=ignore_filelists,
-        defer_source_exists=defer_source_exists,
-    )
+    """Expand *top_filelist*, reusing the on-disk filelist cache unless ``use_cache=False``."""
+    top = Path(top_filelist).resolve()
+    cwd = resolve_index_cwd(top, index_cwd, env)
+    ignore = sorted(ignore_filelists or ())
+    expanded: List[bool] = []
+
+    def expand() -> HchFilelistResult:
+        expanded.append(True)
+        return expand_filelist(
+            top,
+            env,
+            index_cwd=cwd,
+            on_progress=on_progress,
+            ignore_filelist_patterns=ignore,
+            defer_source_exists=defer_source_exists,
+        )
+
+    if not use_cache:
+        fl = expand()
+    else:
+        fl = expand_filelist_cached(
+            top,
+            cwd,
+            env,
+            expand,
+            result_type=HchFilelistResult,
+            producer="hierwalk",
+            options={"ignore_filelists": ignore, "defer_source_exists": defer_source_exists},
+            check_sources=not defer_source_exists,
+        )
+    if on_progress and not expanded:
+        on_progress(
+            f"filelist: cached {top.name} — {len(fl.source_files)} sources, "
+            f"{len(fl.filelists)} .f files"
+        )
     if extra_defines:
         fl.defines.update(extra_defines)
     return _adapt(fl)
\ No newline at end of file
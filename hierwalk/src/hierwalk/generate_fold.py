@@ -5,9 +5,11 @@ from __future__ import annotations
 import re
 from dataclasses import dataclass
 from functools import lru_cache
-from typing import List, Mapping, Optional, Tuple
+from typing import Iterator, List, Mapping, Optional, Tuple, Union
 
 from hierwalk.params import expr_is_true, parse_bound_token
+from hierwalk.perf import generate_unroll_max
+from hierwalk.rtl_profile import profiled_rtl
 
 _IDENT = r"[A-Za-z_]\w*"
 _KEYWORDS = frozenset(
@@ -45,6 +47,10 @@ _IF_STMT_RE = re.compile(
 )
 _BEGIN_END_KW = re.compile(r"\b(begin|end)\b", re.IGNORECASE)
 _GENERATE_FOLD_HINT = re.compile(r"\bgenerate\b|\bgenvar\b", re.IGNORECASE)
+# Left in a loop body after inner folding: outer rounds still need the text.
+_FOLD_RESIDUE_RE = re.compile(r"\b(?:for|if)\b", re.IGNORECASE)
+_LOOP_SLOT_RE = re.compile(r"\x00GEN(\d+)\x00")
+_SCAN_BATCH_CHARS = 256 * 1024
 
 
 def body_without_generate_regions(body: str) -> str:
@@ -205,10 +211,6 @@ def _find_if_begin_block(chunk: str) -> Optional[_FoldMatch]:
     )
 
 
-def _subst_index(text: str, var: str, index: int) -> str:
-    return re.sub(rf"\b{re.escape(var)}\b", str(index), text)
-
-
 def _read_ident(text: str, i: int) -> Tuple[str, int]:
     m = re.match(_IDENT, text[i:])
     if not m:
@@ -225,18 +227,13 @@ def _looks_like_instance_tail(text: str, pos: int) -> bool:
     return k < len(text) and text[k] in "(;"
 
 
-def _prefix_instance_names(body: str, prefix: str) -> str:
-    """Prefix instance leaves in a folded generate fragment (``scope.u_cell``)."""
+def _instance_name_spans(body: str) -> List[Tuple[int, int, str]]:
+    """``(start, end, leaf)`` of each instance leaf in a generate fragment."""
     from hierwalk.inst_scan import _read_hier_inst_path
 
-    if not prefix:
-        return body
-
-    pieces: List[str] = []
+    spans: List[Tuple[int, int, str]] = []
     n = len(body)
     i = 0
-    last = 0
-
     while i < n:
         cell, j = _read_ident(body, i)
         if not cell or cell.lower() in _KEYWORDS:
@@ -256,20 +253,200 @@ def _prefix_instance_names(body: str, prefix: str) -> str:
             i += 1
             continue
 
-        pieces.append(body[last:i])
-        pieces.append(body[i:inst_start])
-        if inst.startswith(prefix):
-            pieces.append(inst)
-        else:
-            pieces.append(prefix)
-            pieces.append(inst)
-        last = inst_end
+        spans.append((inst_start, inst_end, inst))
         i = inst_end
+    return spans
+
+
+def _prefix_instance_names(body: str, prefix: str) -> str:
+    """Prefix instance leaves in a folded generate fragment (``scope.u_cell``)."""
+    if not prefix:
+        return body
 
+    pieces: List[str] = []
+    last = 0
+    for start, end, inst in _instance_name_spans(body):
+        pieces.append(body[last:start])
+        if not inst.startswith(prefix):
+            pieces.append(prefix)
+        pieces.append(inst)
+        last = end
     pieces.append(body[last:])
     return "".join(pieces)
 
 
+# Template piece: literal text, ``None`` (loop index slot), or a tuple of
+# literal/slot pieces forming one instance leaf (gets the iteration prefix).
+_Piece = Union[str, None, Tuple[Optional[str], ...]]
+
+
+@dataclass(frozen=True)
+class _LoopTemplate:
+    """For-generate body compiled once; :meth:`render` is a join per iteration."""
+
+    pieces: Tuple[_Piece, ...]
+
+    @classmethod
+    def compile(cls, body: str, var: str, *, prefix_names: bool) -> "_LoopTemplate":
+        literals = re.split(rf"\b{re.escape(var)}\b", body)
+        # Any digit stands in for the index: digits never start an identifier,
+        # so instance leaves sit at the same places for every iteration.
+        text = "0".join(literals)
+        slots: List[int] = []
+        pos = 0
+        for lit in literals[:-1]:
+            pos += len(lit)
+            slots.append(pos)
+            pos += 1
+        spans = _instance_name_spans(text) if prefix_names else []
+
+        def _split(start: int, end: int, slot_i: int) -> Tuple[List[_Piece], int]:
+            out: List[_Piece] = []
+            pos = start
+            while slot_i < len(slots) and slots[slot_i] < end:
+                if slots[slot_i] > pos:
+                    out.append(text[pos : slots[slot_i]])
+                out.append(None)
+                pos = slots[slot_i] + 1
+                slot_i += 1
+            if pos < end:
+                out.append(text[pos:end])
+            return out, slot_i
+
+        def _leaf(start: int, leaf: str, slot_set: set) -> Tuple[Optional[str], ...]:
+            # ``leaf`` is the span with whitespace around ``[``/``.`` dropped;
+            # walk both to find which of its characters are index slots.
+            out: List[Optional[str]] = []
+            lit: List[str] = []
+            pos = start
+            for ch in leaf:
+                while text[pos] != ch:
+                    pos += 1
+                if pos in slot_set:
+                    if lit:
+                        out.append("".join(lit))
+                        lit = []
+                    out.append(None)
+                else:
+                    lit.append(ch)
+                pos += 1
+            if lit:
+                out.append("".join(lit))
+            return tuple(out)
+
+        slot_set = set(slots)
+        pieces: List[_Piece] = []
+        pos = 0
+        slot_i = 0
+        for start, end, leaf in spans:
+            head, slot_i = _split(pos, start, slot_i)
+            pieces.extend(head)
+            pieces.append(_leaf(start, leaf, slot_set))
+            while slot_i < len(slots) and slots[slot_i] < end:
+                slot_i += 1
+            pos = end
+        tail, _ = _split(pos, len(text), slot_i)
+        pieces.extend(tail)
+        return cls(tuple(pieces))
+
+    def render(self, index: int, prefix: str = "") -> str:
+        idx = str(index)
+        out: List[str] = []
+        for piece in self.pieces:
+            if piece is None:
+                out.append(idx)
+            elif isinstance(piece, str):
+                out.append(piece)
+            else:
+                inst = "".join(idx if p is None else p for p in piece)
+                if prefix and not inst.startswith(prefix):
+                    out.append(prefix)
+                out.append(inst)
+        return "".join(out)
+
+
+@dataclass(frozen=True)
+class GenerateLoop:
+    """An unrolled for-generate region kept symbolic: body template over ``lo..hi``."""
+
+    lo: int
+    hi: int
+    label: str
+    scope_prefix: str
+    template: _LoopTemplate
+
+    def __len__(self) -> int:
+        return self.hi - self.lo + 1
+
+    def iteration_prefix(self, index: int) -> str:
+        if self.label:
+            return f"{self.scope_prefix}{self.label}[{index}]."
+        return self.scope_prefix
+
+    def render(self, index: int) -> str:
+        """Body of one iteration, index substituted and instance leaves scoped."""
+        return self.template.render(index, self.iteration_prefix(index))
+
+    def iter_bodies(self) -> Iterator[str]:
+        for index in range(self.lo, self.hi + 1):
+            yield self.render(index)
+
+    def text(self) -> str:
+        return "\n".join(self.iter_bodies())
+
+
+@dataclass(frozen=True)
+class FoldedBody:
+    """
+    Generate-folded module body with top-level for-generate loops left symbolic.
+
+    ``chunks`` alternates plain text and :class:`GenerateLoop` regions in body
+    order; :meth:`text` is exactly what :func:`fold_generate_regions` returns.
+    """
+
+    chunks: Tuple[Union[str, GenerateLoop], ...]
+
+    @property
+    def loops(self) -> Tuple[GenerateLoop, ...]:
+        return tuple(c for c in self.chunks if isinstance(c, GenerateLoop))
+
+    def text(self) -> str:
+        if len(self.chunks) == 1 and isinstance(self.chunks[0], str):
+            return self.chunks[0]
+        return "".join(c if isinstance(c, str) else c.text() for c in self.chunks)
+
+    def iter_text(self, batch_chars: int = _SCAN_BATCH_CHARS) -> Iterator[str]:
+        """
+        :meth:`text` in pieces of about *batch_chars*, split only at line starts.
+
+        Peak memory is one batch plus one loop iteration, whatever the trip count.
+        """
+        buf: List[str] = []
+        size = 0
+
+        def _pieces() -> Iterator[str]:
+            for chunk in self.chunks:
+                if isinstance(chunk, str):
+                    yield chunk
+                    continue
+                for index in range(chunk.lo, chunk.hi + 1):
+                    if index > chunk.lo:
+                        yield "\n"
+                    yield chunk.render(index)
+
+        for piece in _pieces():
+            if not piece:
+                continue
+            buf.append(piece)
+            size += len(piece)
+            if size >= batch_chars and piece.endswith("\n"):
+                yield "".join(buf)
+                buf = []
+                size = 0
+        if buf:
+            yield "".join(buf)
+
+
 def _for_loop_match(chunk: str) -> Optional[_FoldMatch | re.Match[str]]:
     block = _find_for_begin_block(chunk)
     if block:
@@ -281,9 +458,18 @@ def _unroll_for_loops(
     chunk: str,
     param_map: Mapping[str, str],
     *,
-    max_unroll: int = 64,
+    max_unroll: Optional[int] = None,
     scope_prefix: str = "",
+    loops: Optional[List[GenerateLoop]] = None,
 ) -> str:
+    """
+    Unroll literal/param-bounded for-generate loops (at most *max_unroll* trips).
+
+    With a *loops* sink, loops whose folded body needs no further rounds are
+    appended there and left in the text as a slot marker instead of unrolled.
+    """
+    if max_unroll is None:
+        max_unroll = generate_unroll_max()
     out = chunk
     for _ in range(16):
         m = _for_loop_match(out)
@@ -322,17 +508,20 @@ def _unroll_for_loops(
             break
         # Unroll nested generate (inner for/if) before substituting this loop index.
         body = _fold_generate_inner(body, param_map, scope_prefix=scope_prefix)
-        parts: List[str] = []
-        for i in range(lo, hi + 1):
-            part = _subst_index(body, var, i)
-            if block_label:
-                part = _prefix_instance_names(
-                    part, f"{scope_prefix}{block_label}[{i}]."
-                )
-            elif scope_prefix:
-                part = _prefix_instance_names(part, scope_prefix)
-            parts.append(part)
-        repl = "\n".join(parts)
+        loop = GenerateLoop(
+            lo,
+            hi,
+            block_label,
+            scope_prefix,
+            _LoopTemplate.compile(
+                body, var, prefix_names=bool(block_label or scope_prefix)
+            ),
+        )
+        if loops is not None and not _FOLD_RESIDUE_RE.search(body):
+            loops.append(loop)
+            repl = f"\x00GEN{len(loops) - 1}\x00"
+        else:
+            repl = loop.text()
         out = out[:span_start] + repl + out[span_end:]
     return out
 
@@ -413,6 +602,7 @@ def _fold_generate_inner(
     *,
     over_approximate_if: bool = False,
     scope_prefix: str = "",
+    loops: Optional[List[GenerateLoop]] = None,
 ) -> str:
     for _ in range(16):
         prev = inner
@@ -423,7 +613,9 @@ def _fold_generate_inner(
             block_only=True,
             scope_prefix=scope_prefix,
         )
-        inner = _unroll_for_loops(inner, param_map, scope_prefix=scope_prefix)
+        inner = _unroll_for_loops(
+            inner, param_map, scope_prefix=scope_prefix, loops=loops
+        )
         inner = _fold_if_generate(
             inner,
             param_map,
@@ -436,39 +628,93 @@ def _fold_generate_inner(
     return inner
 
 
-def fold_generate_regions(
+def _fold_regions(
     body: str,
     param_map: Mapping[str, str],
-    *,
-    over_approximate_if: bool = False,
+    over_approximate_if: bool,
+    loops: Optional[List[GenerateLoop]],
 ) -> str:
-    """Inline generate blocks with literal/param for-loops and folded if-generate."""
-    if not needs_generate_fold(body):
-        return body
-
     def repl(m: re.Match[str]) -> str:
         return _fold_generate_inner(
             m.group(1),
             param_map,
             over_approximate_if=over_approximate_if,
+            loops=loops,
         )
 
     return _GEN_BLOCK_RE.sub(repl, body)
 
 
+@profiled_rtl("fold_generate_regions")
+def fold_generate_regions(
+    body: str,
+    param_map: Mapping[str, str],
+    *,
+    over_approximate_if: bool = False,
+) -> str:
+    """Inline generate blocks with literal/param for-loops and folded if-generate."""
+    if not needs_generate_fold(body):
+        return body
+    return _fold_regions(body, param_map, over_approximate_if, None)
+
+
+@profiled_rtl("fold_generate_symbolic")
+def fold_generate_symbolic(
+    body: str,
+    param_map: Mapping[str, str],
+    *,
+    over_approximate_if: bool = False,
+) -> FoldedBody:
+    """
+    :func:`fold_generate_regions` with top-level for-generate loops kept symbolic.
+
+    Falls back to a single text chunk when a later fold round rewrote a loop slot.
+    """
+    if not needs_generate_fold(body):
+        return FoldedBody((body,))
+    if "\x00" not in body:
+        loops: List[GenerateLoop] = []
+        text = _fold_regions(body, param_map, over_approximate_if, loops)
+        parts = _LOOP_SLOT_RE.split(text)
+        slots = [int(p) for p in parts[1::2]]
+        if slots == list(range(len(loops))):
+            chunks: List[Union[str, GenerateLoop]] = []
+            for k, part in enumerate(parts):
+                if k % 2:
+                    chunks.append(loops[int(part)])
+                elif part:
+                    chunks.append(part)
+            return FoldedBody(tuple(chunks))
+    return FoldedBody((_fold_regions(body, param_map, over_approximate_if, None),))
+
+
 @lru_cache(maxsize=4096)
 def _fold_body_cached(
     body: str,
     param_items: Tuple[Tuple[str, str], ...],
     over_approximate_if: bool,
-) -> str:
-    return fold_generate_regions(
+    max_unroll: int,
+) -> FoldedBody:
+    return fold_generate_symbolic(
         body,
         dict(param_items),
         over_approximate_if=over_approximate_if,
     )
 
 
+def prepare_folded_for_instance_scan(
+    body: str,
+    param_map: Mapping[str, str],
+    *,
+    over_approximate_if: bool = False,
+) -> FoldedBody:
+    """Cached symbolic generate fold; scan with ``folded.iter_text()``."""
+    if not needs_generate_fold(body):
+        return FoldedBody((body,))
+    items = tuple(sorted(param_map.items()))
+    return _fold_body_cached(body, items, over_approximate_if, generate_unroll_max())
+
+
 def prepare_body_for_instance_scan(
     body: str,
     param_map: Mapping[str, str],
@@ -476,7 +722,6 @@ def prepare_body_for_instance_scan(
     over_approximate_if: bool = False,
 ) -> str:
     """Lazy generate fold before instance scan (skip + cache when no generate)."""
-    if not needs_generate_fold(body):
-        return body
-    items = tuple(sorted(param_map.items()))
-    return _fold_body_cached(body, items, over_approximate_if)
\ No newline at end of file
+    return prepare_folded_for_instance_scan(
+        body, param_map, over_approximate_if=over_approximate_if
+    ).text()
@@ -0,0 +1,243 @@
+"""On-disk cache of expanded filelists, shared across processes (and with hierwalk).
+
+Entries live under ``$HCH_FILELIST_CACHE_DIR`` (default ``$XDG_CACHE_HOME/hch/filelists``),
+one JSON file per (producer, top .f, index cwd, options). An entry is reused only while:
+
+- every filelist read during expansion has the same size and mtime, or failing that the
+  same content digest (a missing nested .f must still be missing);
+- the ``$VAR`` references in those filelists resolve to the same values;
+- unless existence checks were deferred, listed sources still exist and sources reported
+  missing are still missing.
+
+``HCH_FILELIST_CACHE=0`` disables the cache. hierwalk vendors an identical copy
+(``hierwalk.hch_compat.filelist_disk_cache``), so both packages share the directory;
+entries are keyed by producer because their results carry different fields.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Type,
+    TypeVar,
+    Union,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
+
+FORMAT_VERSION = 1
+_VAR_RE = re.compile(r"\$(?:\{(\w+)\}|(\w+))")
+_MISSING_PREFIX = "Source not found: "
+
+R = TypeVar("R")
+
+
+def filelist_cache_dir() -> Optional[Path]:
+    """Cache directory, or ``None`` when ``HCH_FILELIST_CACHE`` is off."""
+    if os.environ.get("HCH_FILELIST_CACHE", "").strip().lower() in ("0", "false", "no", "off"):
+        return None
+    explicit = os.environ.get("HCH_FILELIST_CACHE_DIR")
+    if explicit:
+        return Path(explicit).expanduser()
+    xdg = os.environ.get("XDG_CACHE_HOME")
+    root = Path(xdg) if xdg else Path.home() / ".cache"
+    return root / "hch" / "filelists"
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _entry_path(
+    cache_dir: Path,
+    producer: str,
+    top: Path,
+    cwd: Path,
+    options: Mapping[str, Any],
+) -> Path:
+    blob = json.dumps(
+        [FORMAT_VERSION, producer, str(top), str(cwd), dict(sorted(options.items()))],
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return cache_dir / f"{hashlib.sha256(blob.encode()).hexdigest()[:32]}.json"
+
+
+def _env_value(name: str, env: Mapping[str, str]) -> List[Optional[str]]:
+    # expand_filelist substitutes ``env`` first, then os.environ via expandvars.
+    return [env.get(name), os.environ.get(name)]
+
+
+def _stamp_filelists(
+    filelists: List[Path],
+    env: Mapping[str, str],
+) -> tuple[Dict[str, Optional[List[Any]]], Dict[str, List[Optional[str]]]]:
+    stamps: Dict[str, Optional[List[Any]]] = {}
+    names: set[str] = set()
+    for path in filelists:
+        try:
+            st = path.stat()
+            data = path.read_bytes()
+        except OSError:
+            stamps[str(path)] = None
+            continue
+        stamps[str(path)] = [st.st_size, st.st_mtime_ns, _digest(data)]
+        for m in _VAR_RE.finditer(data.decode("utf-8", errors="ignore")):
+            names.add(m.group(1) or m.group(2))
+    return stamps, {name: _env_value(name, env) for name in sorted(names)}
+
+
+def _stamp_matches(path: Path, stamp: Optional[List[Any]]) -> bool:
+    try:
+        st = path.stat()
+    except OSError:
+        return stamp is None
+    if stamp is None:
+        return False
+    size, mtime_ns, digest = stamp
+    if st.st_size != size:
+        return False
+    if st.st_mtime_ns == mtime_ns:
+        return True
+    try:
+        return _digest(path.read_bytes()) == digest
+    except OSError:
+        return False
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, Path):
+        return str(value)
+    if isinstance(value, dict):
+        return [[_encode(k), _encode(v)] for k, v in value.items()]
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    return value
+
+
+def _decode(tp: Any, value: Any) -> Any:
+    if value is None:
+        return None
+    if tp is Path:
+        return Path(value)
+    origin, args = get_origin(tp), get_args(tp)
+    if origin is Union:
+        return _decode(next(a for a in args if a is not type(None)), value)
+    if origin is list:
+        return [_decode(args[0], v) for v in value]
+    if origin is tuple:
+        return tuple(_decode(a, v) for a, v in zip(args, value))
+    if origin is dict:
+        return {_decode(args[0], k): _decode(args[1], v) for k, v in value}
+    return value
+
+
+def _load(
+    path: Path,
+    env: Mapping[str, str],
+    result_type: Type[R],
+    check_sources: bool,
+) -> Optional[R]:
+    try:
+        entry = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    try:
+        if entry.get("version") != FORMAT_VERSION:
+            return None
+        for name, value in entry["env"].items():
+            if _env_value(name, env) != value:
+                return None
+        for fl, stamp in entry["filelists"].items():
+            if not _stamp_matches(Path(fl), stamp):
+                return None
+        raw = entry["result"]
+        if check_sources:
+            if not all(os.path.exists(p) for p in raw["source_files"]):
+                return None
+            if any(os.path.exists(p) for p in entry["missing_sources"]):
+                return None
+        hints = get_type_hints(result_type)
+        kwargs = {
+            f.name: _decode(hints[f.name], raw[f.name])
+            for f in dataclasses.fields(result_type)
+            if f.name in raw
+        }
+        return result_type(**kwargs)
+    except (KeyError, TypeError, ValueError, StopIteration):
+        return None
+
+
+def _store(
+    path: Path,
+    result: Any,
+    env: Mapping[str, str],
+    started_ns: int,
+) -> None:
+    stamps, env_refs = _stamp_filelists(list(result.filelists), env)
+    if any(s is not None and s[1] >= started_ns for s in stamps.values()):
+        return  # edited during expansion: the stamp may not match what was read
+    entry = {
+        "version": FORMAT_VERSION,
+        "top": str(result.top_path),
+        "env": env_refs,
+        "filelists": stamps,
+        "missing_sources": [
+            e[len(_MISSING_PREFIX) :] for e in result.errors if e.startswith(_MISSING_PREFIX)
+        ],
+        "result": {
+            f.name: _encode(getattr(result, f.name)) for f in dataclasses.fields(result)
+        },
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp_", suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(entry, fh, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError:
+        pass  # read-only or full cache dir: expansion already succeeded
+
+
+def expand_filelist_cached(
+    top: Path,
+    cwd: Path,
+    env: Optional[Mapping[str, str]],
+    expand: Callable[[], R],
+    *,
+    result_type: Type[R],
+    producer: str = "hch",
+    options: Optional[Mapping[str, Any]] = None,
+    check_sources: bool = True,
+) -> R:
+    """Return a cached expansion of *top* under *cwd*, or run *expand* and store it.
+
+    *result_type* is the producer's ``FilelistResult`` dataclass (it must carry
+    ``filelists``); *options* are any expansion knobs that change the result.
+    """
+    cache_dir = filelist_cache_dir()
+    if cache_dir is None:
+        return expand()
+    env = env or {}
+    path = _entry_path(cache_dir, producer, top, cwd, options or {})
+    hit = _load(path, env, result_type, check_sources)
+    if hit is not None:
+        return hit
+    started_ns = time.time_ns()
+    result = expand()
+    _store(path, result, env, started_ns)
+    return result
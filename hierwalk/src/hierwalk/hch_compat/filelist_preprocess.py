@@ -44,6 +44,7 @@ class FilelistResult:
     filelist_info: Dict[Path, Dict[str, str]] = field(default_factory=dict)
     filelist_children: Dict[Path, List[Path]] = field(default_factory=dict)
     filelist_edges: List[tuple[Path, Path, str]] = field(default_factory=list)
+    filelists: List[Path] = field(default_factory=list)  # every .f read (or missing)
 
 
 def _strip_comments(line: str) -> str:
@@ -166,6 +167,7 @@ def expand_filelist(
         if fpath in seen_fl:
             return
         seen_fl.add(fpath)
+        result.filelists.append(fpath)
         if on_progress:
             kind = include_kind or "top"
             parent_note = ""
@@ -39,6 +39,8 @@ environment:
                               elab, lazy filelist; macro/ifdef/body on connect/elab
                               (HIERWALK_LAZY=0 for eager/full index)
   HIERWALK_LAZY_IFDEF        when lazy: run ifdef during index (default off)
+  HIERWALK_LAZY_CONE         when lazy: single-top cone runs expand only the
+                              instances they reach (default on; 0 = full elab)
   HIERWALK_CACHE_DIR         override per-top work dir (.db_{TOP}); default is local .db_{TOP}
   HIERWALK_IGNORE_PATH       default --ignore-path patterns (comma-separated)
   HIERWALK_IGNORE_MODULE     default --ignore-module names (comma-separated)
@@ -52,6 +54,23 @@ environment:
   HIERWALK_PW_DB_PREFETCH_MAX   cap post-verify DB files per run (0 = no limit)
   HIERWALK_LOG_SLOW_FILES    log per-file preprocess/scan timing (1=10s, or seconds)
   HIERWALK_LOW_MEMORY_AUTO   auto fused index above N sources (default 1500; 0=off)
+  HIERWALK_SUITE_PARALLEL    flat suite: run independent verification steps in N workers
+                              (auto = CPU count; jobs budget split across workers)
+  HIERWALK_PROFILE_RTL       hot RTL report per (file, module): 1=time, alloc=+tracemalloc
+                              (written to <run>.hier-walk.hot-rtl.log beside the run log)
+  HIERWALK_PORT_CACHE        disk port-index cache (default <work dir>/ports; 0=off, or dir)
+  HIERWALK_BODY_BLOB         preprocessed-text blobs for O(1) module bodies
+                              (default <work dir>/bodies; 0=off, or dir)
+  HIERWALK_BODY_CACHE_MB     LRU budget for blob-backed module bodies (default 256)
+  HIERWALK_INDEX_SHARDS      sharded index scan over a file-lock queue (N shards, auto, 0=off);
+                              other hosts join: python -m hierwalk.index_shard QUEUE_DIR
+  HIERWALK_INDEX_SHARD_DIR   shared shard queue root (default <work dir>/shards)
+  HIERWALK_INDEX_SHARD_STALE_SEC  take over unfinished shard claims older than this (1800)
+  HIERWALK_GENERATE_UNROLL_MAX  unroll for-generate loops up to this many trips (64)
+  HIERWALK_TRACE_SINK        text | binary: buffered gzip trace beside the run log
+                              (<run>.hier-walk.trace.gz; view: python -m hierwalk.trace_sink)
+  HIERWALK_TRACE_LEVEL       binary trace: lowest level kept (debug, info, warn; default info)
+  HIERWALK_TRACE_RATE        binary trace: max lines per category per second (0 = no limit)
   HCH_INDEX_CWD               default --index-cwd for -F filelists"""
 
 CONFIG_HELP = """\
@@ -176,6 +195,10 @@ Inst-trace mode (instance drivers / sinkers)
     direction (string)        driver | in | sinker | out | both  (default: both)
     path_kind (string)        ff | comb  (default: ff; aliases: ff_comb, ff/comb)
     top, defines              Optional overrides
+    instances (array)         Several paths sharing the fields above; inst_trace
+                              may also be an array of strings/objects.  All are
+                              traced in one batch (port lists and connect
+                              indexes shared; -j threads across modules).
 
   driver/in  — fanin from input (and inout) ports; collect port-in, ff-driver, …
   sinker/out — fanout from output (and inout) ports; collect port-out, ff-sink, …
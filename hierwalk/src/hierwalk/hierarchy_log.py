@@ -5,10 +5,12 @@ from __future__ import annotations
 import os
 from datetime import datetime
 from pathlib import Path
-from typing import IO, List, Mapping, Optional, Sequence, TextIO
+from typing import IO, Iterable, List, Mapping, Optional, Sequence, TextIO, cast
 
 from hierwalk.models import ConnectEndpoint, ConnectHop, FlatRow, InstanceEdge, ModuleRecord, PathChainLink
+from hierwalk.perf import trace_rate_limit, trace_sink_binary, trace_sink_level
 from hierwalk.progress import format_hierwalk_log
+from hierwalk.trace_sink import DEBUG, INFO, WARN, TraceSink, trace_sink_path
 
 _PREFIX = "[hier-walk hierarchy]"
 _PATH_WALK_PREFIX = "[hier-walk path-walk]"
@@ -532,37 +534,78 @@ def format_signal_tail_line(
     )
 
 
-def path_walk_trace_show_message(message: str) -> bool:
+def path_walk_trace_level(message: str) -> int:
     """
-    Whether a path-walk trace line should be emitted.
+    Trace level of a path-walk line.
 
-    Search steps (tier0/tier1 scans, candidate tries, expands) are suppressed;
-    resolved nodes and pw-db hits are kept. Miss lines are kept on failure.
+    Search steps (tier0/tier1 scans, candidate tries, expands) are ``DEBUG``;
+    misses and pw-db load failures ``WARN``; resolved nodes, pw-db hits and
+    the rest ``INFO``.
     """
     msg = message.strip()
     if not msg:
-        return False
+        return DEBUG
     if msg.startswith("signal-tail "):
-        return True
+        return INFO
     if msg.startswith("confident-miss "):
-        return True
+        return INFO
     if msg.startswith("recovery-pass "):
-        return True
+        return INFO
     if msg.startswith("walk target="):
-        return False
+        return DEBUG
     if msg.startswith("pw-db v"):
-        return False
+        return DEBUG
     if msg.startswith("pw-db "):
         if " load failed " in msg:
-            return True
-        return " edge hit " in msg or msg.startswith("pw-db   hit ")
-    return True
+            return WARN
+        if " edge hit " in msg or msg.startswith("pw-db   hit "):
+            return INFO
+        return DEBUG
+    if msg.startswith("miss "):
+        return WARN
+    return INFO
 
 
-def open_path_walk_trace_log(log_path: Path) -> TextIO:
-    """Append path-walk trace section to the run log file."""
+def path_walk_trace_show_message(message: str) -> bool:
+    """
+    Whether a path-walk trace line should be emitted to a text stream.
+
+    Search steps (tier0/tier1 scans, candidate tries, expands) are suppressed;
+    resolved nodes and pw-db hits are kept. Miss lines are kept on failure.
+    """
+    return bool(message.strip()) and path_walk_trace_level(message) >= INFO
+
+
+def path_walk_trace_category(message: str) -> str:
+    """Trace-sink category (rate-limit bucket): ``path-walk.<first word>``."""
+    head = message.lstrip().split(" ", 1)[0]
+    return f"path-walk.{head}" if head else "path-walk"
+
+
+def open_trace_log(log_path: Path) -> TextIO:
+    """
+    Append handle for trace output belonging to the run log.
+
+    With ``HIERWALK_TRACE_SINK=binary`` this is a buffered :class:`TraceSink`
+    on ``<run>.hier-walk.trace.gz`` instead of the text log itself.
+    """
     log_path.parent.mkdir(parents=True, exist_ok=True)
-    fh = log_path.open("a", encoding="utf-8")
+    if trace_sink_binary():
+        sink_path = trace_sink_path(log_path)
+        with log_path.open("a", encoding="utf-8") as fh:
+            fh.write(f"# trace sink: {sink_path} (python -m hierwalk.trace_sink)\n")
+        sink = TraceSink(
+            sink_path,
+            level=trace_sink_level(),
+            rate_per_sec=trace_rate_limit(),
+        )
+        return cast(TextIO, sink)
+    return log_path.open("a", encoding="utf-8")
+
+
+def open_path_walk_trace_log(log_path: Path) -> TextIO:
+    """Append path-walk trace section to the run log file (or its trace sink)."""
+    fh = open_trace_log(log_path)
     stamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     fh.write(f"\n# path-walk trace {stamp}\n")
     fh.flush()
@@ -575,9 +618,25 @@ def emit_path_walk_log(
     stream: TextIO,
     prefix: str = _PATH_WALK_PREFIX,
     color_miss: Optional[bool] = None,
+    level: Optional[int] = None,
 ) -> None:
+    """
+    One path-walk trace line.
+
+    A :class:`TraceSink` gets the raw message with its level and category (no
+    formatting); text streams drop *level* below ``INFO``.
+    """
     if not message:
         return
+    if isinstance(stream, TraceSink):
+        stream.emit(
+            path_walk_trace_category(message),
+            message,
+            path_walk_trace_level(message) if level is None else level,
+        )
+        return
+    if level is not None and level < INFO:
+        return
     text = message
     if color_miss is None:
         color_miss = path_walk_stream_color_enabled(stream)
@@ -586,6 +645,15 @@ def emit_path_walk_log(
     print(format_hierwalk_log(text, prefix=prefix), file=stream, flush=True)
 
 
+def _emit_path_walk_spine_lines(lines: Iterable[str], *, stream: TextIO, prefix: str) -> None:
+    if isinstance(stream, TraceSink):
+        for line in lines:
+            stream.emit("path-walk.spine", line)
+        return
+    for line in lines:
+        print(format_hierwalk_log(line, prefix=prefix), file=stream, flush=True)
+
+
 def emit_path_walk_node_log(
     path: str,
     row: FlatRow,
@@ -615,8 +683,11 @@ def emit_path_walk_miss_log(
         stream=stream,
         prefix=prefix,
     )
-    for line in format_path_walk_spine_lines(parent_path, {parent_path: parent_row}):
-        print(format_hierwalk_log(line, prefix=prefix), file=stream, flush=True)
+    _emit_path_walk_spine_lines(
+        format_path_walk_spine_lines(parent_path, {parent_path: parent_row}),
+        stream=stream,
+        prefix=prefix,
+    )
 
 
 def emit_path_walk_spine_log(
@@ -630,8 +701,11 @@ def emit_path_walk_spine_log(
     if not path:
         return
     emit_path_walk_log(f"{title} -> {path}", stream=stream, prefix=prefix)
-    for line in format_path_walk_spine_lines(path, rows_by_path):
-        print(format_hierwalk_log(line, prefix=prefix), file=stream, flush=True)
+    _emit_path_walk_spine_lines(
+        format_path_walk_spine_lines(path, rows_by_path),
+        stream=stream,
+        prefix=prefix,
+    )
 
 
 def format_path_link_provenance(link: PathChainLink) -> str:
@@ -10,16 +10,18 @@ import time
 from collections import defaultdict
 from pathlib import Path
 from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
-from typing import Callable, Dict, List, Literal, Mapping, Optional, Sequence, Tuple
+from typing import Callable, Dict, List, Literal, Mapping, Optional, Sequence, Set, Tuple
 
+from hierwalk.body_blob import BodyBlobReader, BodyLru, byte_spans, write_body_blob
 from hierwalk.generate_fold import (
     body_without_generate_regions,
     needs_generate_fold,
-    prepare_body_for_instance_scan,
+    prepare_folded_for_instance_scan,
 )
 from hierwalk.inst_scan import (
     iter_module_blocks,
     scan_hierarchy_instances,
+    scan_hierarchy_instances_chunks,
     slim_body_for_instance_scan,
 )
 from hierwalk.ignore_path import (
@@ -42,10 +44,13 @@ from hierwalk.params import (
     strip_body_param_declarations,
 )
 from hierwalk.perf import (
+    body_blob_dir,
+    body_cache_bytes,
     body_param_scan_max,
     log_large_module_skips,
     slow_file_log_threshold_sec,
 )
+from hierwalk.rtl_profile import attribute_rtl, profile_rtl
 
 
 def _scan_module_body(
@@ -59,8 +64,8 @@ def _scan_module_body(
     pmap = resolve_param_map(raw_params, overrides=overrides, parent=parent_ctx)
     fold_ctx = dict(compile_defines or {})
     fold_ctx.update(pmap)
-    folded = prepare_body_for_instance_scan(body, fold_ctx)
-    return scan_hierarchy_instances(folded, param_map=fold_ctx)
+    folded = prepare_folded_for_instance_scan(body, fold_ctx)
+    return scan_hierarchy_instances_chunks(folded.iter_text(), param_map=fold_ctx)
 
 
 def _ctx_key(pmap: Mapping[str, str]) -> str:
@@ -243,6 +248,24 @@ def _build_merged_from_sources(
 ) -> Dict[str, ModuleRecord]:
     """Default: parallel preprocess then in-memory scan (preprocessed map discarded)."""
     merged: Dict[str, ModuleRecord] = {}
+    from hierwalk.perf import index_shard_count
+
+    shards = index_shard_count(len(parse_sources))
+    if shards:
+        from hierwalk.index_shard import build_sharded_scan
+
+        sharded = build_sharded_scan(
+            parse_sources,
+            shards,
+            include_dirs=include_dirs,
+            defines=defines,
+            jobs=jobs,
+            skip_path_patterns=skip_path_patterns,
+            on_progress=on_progress,
+        )
+        if sharded is not None:
+            _merge_file_scans(merged, sharded)
+            return merged
     if low_memory:
         if parse_sources:
             _merge_file_scans(
@@ -556,24 +579,59 @@ def _instances_for_index(
     return raw_params, edges, defer_fold
 
 
+def _attach_body_refs(
+    text: str,
+    out: Mapping[str, ModuleRecord],
+    spans: Mapping[str, Tuple[int, int]],
+) -> None:
+    """Write *text* to the body blob store and point each record at its body."""
+    root = body_blob_dir()
+    if root is None or not spans:
+        return
+    try:
+        data = text.encode("utf-8", errors="surrogatepass")
+    except UnicodeEncodeError:
+        return
+    blob = write_body_blob(data, root)
+    if blob is None:
+        return
+    names = list(spans)
+    for name, (offset, length) in zip(
+        names, byte_spans(text, [spans[n] for n in names])
+    ):
+        out[name].body_ref = (str(blob), offset, length)
+
+
 def scan_preprocessed(text: str, file_path: str) -> Dict[str, ModuleRecord]:
     out: Dict[str, ModuleRecord] = {}
+    # name -> char span of the longest body (same pick as DesignIndex.module_body)
+    spans: Dict[str, Tuple[int, int]] = {}
     param_limit = body_param_scan_max()
     for block in iter_module_blocks(text):
         name = block["name"]
-        header, body = split_module_header(block["chunk"])
-        if body_param_scan_skipped(body, max_body_bytes=param_limit) and log_large_module_skips():
-            import sys
-
-            print(
-                f"index: instance-first params ({len(body)} B) {file_path} :: {name}",
-                file=sys.stderr,
+        with profile_rtl("scan_preprocessed", file_path=file_path, module=name):
+            header, body = split_module_header(block["chunk"])
+            chunk_end = block["chunk_start"] + len(block["chunk"])
+            prev = spans.get(name)
+            if prev is None or len(body.strip()) > len(
+                text[prev[0] : prev[1]].strip()
+            ):
+                spans[name] = (chunk_end - len(body), chunk_end)
+            if (
+                body_param_scan_skipped(body, max_body_bytes=param_limit)
+                and log_large_module_skips()
+            ):
+                import sys
+
+                print(
+                    f"index: instance-first params ({len(body)} B) {file_path} :: {name}",
+                    file=sys.stderr,
+                )
+            raw_params, edges, defer_fold = _instances_for_index(
+                header,
+                body,
+                max_body_bytes=param_limit,
             )
-        raw_params, edges, defer_fold = _instances_for_index(
-            header,
-            body,
-            max_body_bytes=param_limit,
-        )
         is_interface = block["kind"] == "interface"
         out[name] = ModuleRecord(
             module_name=name,
@@ -584,6 +642,7 @@ def scan_preprocessed(text: str, file_path: str) -> Dict[str, ModuleRecord]:
             needs_generate_fold=defer_fold,
             is_interface=is_interface,
         )
+    _attach_body_refs(text, out, spans)
     return out
 
 
@@ -640,8 +699,17 @@ class DesignIndex:
         self._default_ctx: Dict[str, str] = {}
         self._instance_cache: Dict[Tuple[str, str], List[InstanceEdge]] = {}
         self._instance_cache_lock = threading.Lock()
+        # Module instantiation graph (generate-folded, default param ctx); pickled
+        # with the index so top inference and "who instantiates X" skip the fold.
+        self._child_modules: Dict[str, Tuple[str, ...]] = {}
+        self._parent_modules: Dict[str, Set[str]] = {}
+        self._init_body_blobs()
         self._rebuild_default_ctx()
 
+    def _init_body_blobs(self) -> None:
+        self._body_blobs = BodyBlobReader()
+        self._body_lru = BodyLru(body_cache_bytes())
+
     def _rebuild_default_ctx(self) -> None:
         self._default_ctx = {}
         for name, rec in self.modules.items():
@@ -654,13 +722,18 @@ class DesignIndex:
         """Pickle slim index: drop ephemeral caches; do not mutate the live index."""
         state = self.__dict__.copy()
         state.pop("_instance_cache_lock", None)
+        state.pop("_body_blobs", None)
+        state.pop("_body_lru", None)
         state["_preprocessed_sources"] = {}
         state["_instance_cache"] = {}
         return state
 
     def __setstate__(self, state: dict) -> None:
         self.__dict__.update(state)
+        self.__dict__.setdefault("_child_modules", {})
+        self.__dict__.setdefault("_parent_modules", {})
         self._instance_cache_lock = threading.Lock()
+        self._init_body_blobs()
 
     def _rebuild_file_modules(self) -> None:
         self.file_modules = defaultdict(list)
@@ -698,6 +771,20 @@ class DesignIndex:
             return ""
         if rec.body:
             return rec.body
+        ref = rec.body_ref
+        if ref[0] and (
+            self._preprocessed_sources
+            or self._preprocess_include_dirs
+            or self._preprocess_defines
+        ):
+            # Blob holds the index-time preprocessed text: O(1) slice, no reparse.
+            hit = self._body_lru.get(ref)
+            if hit is not None:
+                return hit
+            body = self._body_blobs.read(ref)
+            if body is not None:
+                self._body_lru.put(ref, body)
+                return body
         text = self._source_text(rec.file_path)
         if not text:
             return ""
@@ -719,6 +806,7 @@ class DesignIndex:
             rec.body = ""
         self._preprocessed_sources.clear()
         self._instance_cache.clear()
+        self._body_lru.clear()
 
     def invalidate_instance_cache_for_modules(self, mod_names: Sequence[str]) -> None:
         """Drop cached instance edges for *mod_names* after incremental index updates."""
@@ -730,6 +818,61 @@ class DesignIndex:
             for key in stale:
                 del self._instance_cache[key]
 
+    def _module_children(self, rec: ModuleRecord) -> Tuple[str, ...]:
+        if rec.needs_generate_fold:
+            edges = self.instances_for(rec.module_name, {}, {})
+        else:
+            edges = rec.instances
+        return tuple(sorted({edge.child_module for edge in edges}))
+
+    def instantiation_graph(self) -> Mapping[str, Set[str]]:
+        """
+        ``child module -> parent modules`` over every indexed module.
+
+        Edges include generate-folded instances (default param context).  Only
+        modules added or re-parsed since the last call are rescanned; the graph
+        is saved with the index cache.
+        """
+        for name, rec in self.modules.items():
+            if name in self._child_modules:
+                continue
+            children = self._module_children(rec)
+            self._child_modules[name] = children
+            for child in children:
+                self._parent_modules.setdefault(child, set()).add(name)
+        return self._parent_modules
+
+    def invalidate_instantiation_graph(self, mod_names: Sequence[str]) -> None:
+        """Forget the child edges of *mod_names* (rebuilt on the next graph query)."""
+        for name in mod_names:
+            for child in self._child_modules.pop(name, ()):
+                parents = self._parent_modules.get(child)
+                if parents is not None:
+                    parents.discard(name)
+                    if not parents:
+                        del self._parent_modules[child]
+
+    def module_parents(self, mod_name: str) -> List[str]:
+        """Modules that instantiate *mod_name* ("who instantiates X")."""
+        return sorted(self.instantiation_graph().get(mod_name, ()))
+
+    def module_children(self, mod_name: str) -> Tuple[str, ...]:
+        """Distinct child module names of *mod_name* from the instantiation graph."""
+        self.instantiation_graph()
+        return self._child_modules.get(mod_name, ())
+
+    def reachable_modules(self, tops: Sequence[str]) -> Set[str]:
+        """Modules reachable from *tops* in the instantiation graph (tops included)."""
+        self.instantiation_graph()
+        seen = {t for t in tops if t in self.modules}
+        stack = list(seen)
+        while stack:
+            for child in self._child_modules.get(stack.pop(), ()):
+                if child in self.modules and child not in seen:
+                    seen.add(child)
+                    stack.append(child)
+        return seen
+
     def patch_files(
         self,
         changed_files: Sequence[str],
@@ -742,13 +885,18 @@ class DesignIndex:
     ) -> None:
         if include_dirs:
             self._preprocess_include_dirs = [str(Path(p)) for p in include_dirs]
+        if defines is not None and dict(defines) != self._preprocess_defines:
+            # Generate folds depend on compile defines: rebuild every edge list.
+            self._child_modules.clear()
+            self._parent_modules.clear()
         if defines is not None:
             self._preprocess_defines = dict(defines)
         removed = set(removed_files)
         touched = set(changed_files) | removed
-        for name in list(self.modules):
-            if self.modules[name].file_path in touched:
-                del self.modules[name]
+        stale = [n for n, rec in self.modules.items() if rec.file_path in touched]
+        self.invalidate_instantiation_graph(stale)
+        for name in stale:
+            del self.modules[name]
         parse_sources, _ = partition_sources(
             list(changed_files),
             self.ignore_path_patterns,
@@ -768,6 +916,7 @@ class DesignIndex:
                 on_progress=on_progress,
                 file_via_filelist=self.file_via_filelist,
             )
+            self.invalidate_instantiation_graph(list(merged))
             for name, rec in merged.items():
                 self.modules[name] = rec
         self._rebuild_file_modules()
@@ -1100,13 +1249,14 @@ class DesignIndex:
             if cached is not None:
                 return cached
 
-        edges = _scan_module_body(
-            body,
-            raw_params,
-            parent_ctx=parent_ctx,
-            overrides=overrides,
-            compile_defines=self._preprocess_defines,
-        )
+        with attribute_rtl(rec.file_path, mod_name):
+            edges = _scan_module_body(
+                body,
+                raw_params,
+                parent_ctx=parent_ctx,
+                overrides=overrides,
+                compile_defines=self._preprocess_defines,
+            )
         with self._instance_cache_lock:
             hit = self._instance_cache.get(cache_key)
             if hit is not None:
@@ -0,0 +1,497 @@
+"""Sharded DesignIndex scan over a file-lock work queue (``HIERWALK_INDEX_SHARDS``).
+
+The fused index scan (:func:`hierwalk.index._scan_sources_fused`) parallelizes
+inside one host.  Sharded mode splits the parse sources into deterministic,
+contiguous shards and publishes them as a queue directory under the run work
+dir (``<work dir>/shards/<plan digest>``)::
+
+    plan.pkl                 sources per shard + include dirs / defines / skip rules
+    shard-00007.lock.0       claim (O_CREAT|O_EXCL; "host pid time")
+    shard-00007.lock.1       takeover of a stale generation-0 claim (also O_EXCL)
+    shard-00007.pkl          partial index: {module: ModuleRecord} for that shard
+    worker-<host>-*.active   one per worker currently in the queue
+    merged                   written by the coordinator once partials are merged
+
+Any number of workers — local processes started by the coordinator, or
+``python -m hierwalk.index_shard <queue dir>`` on other hosts sharing the
+filesystem — claim unfinished shards, preprocess + scan each file like the
+fused path, and write the partial atomically.  The coordinator merges partials
+in shard order with ``_merge_file_scans`` (first definition in source order
+wins), so the result matches a fused single-host scan.
+
+Shard results survive an interrupted build: rerunning with the same plan
+(same sources, sizes, mtimes and preprocess config) only scans missing shards.
+Claims older than ``HIERWALK_INDEX_SHARD_STALE_SEC`` are treated as abandoned;
+taking one over creates the next claim generation exclusively, so exactly one
+worker wins.  While a worker scans a shard it refreshes the claim and its
+``.active`` file from a heartbeat thread, so long scans keep their claims; the
+claim is removed once the partial is written.  The queue dir is removed by
+whoever leaves last after ``merged`` is written — never while a live worker or a
+fresh claim on an unfinished shard is left in it — and a worker that still finds
+it gone drops its partial.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import pickle
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from hierwalk.models import ModuleRecord
+from hierwalk.perf import index_shard_root, index_shard_stale_sec
+
+_PLAN_NAME = "plan.pkl"
+_MERGED_NAME = "merged"
+_ACTIVE_SUFFIX = ".active"
+_PLAN_VERSION = 1
+
+
+@dataclass(frozen=True)
+class ShardPlan:
+    """Everything a worker needs to scan its shards (pickled as ``plan.pkl``)."""
+
+    digest: str
+    shards: Tuple[Tuple[str, ...], ...]
+    include_dirs: Tuple[str, ...]
+    define_items: Tuple[Tuple[str, str], ...]
+    skip_path_patterns: Tuple[str, ...]
+    env: Tuple[Tuple[str, str], ...]
+    version: int = _PLAN_VERSION
+
+
+def partition_shards(sources: Sequence[str], count: int) -> List[Tuple[str, ...]]:
+    """Contiguous, balanced split of *sources* (order preserved)."""
+    count = max(1, min(count, len(sources)))
+    base, extra = divmod(len(sources), count)
+    out: List[Tuple[str, ...]] = []
+    start = 0
+    for i in range(count):
+        end = start + base + (1 if i < extra else 0)
+        out.append(tuple(sources[start:end]))
+        start = end
+    return out
+
+
+def _plan_env() -> Tuple[Tuple[str, str], ...]:
+    """``HIERWALK_LAZY*`` switches that change what preprocess emits."""
+    return tuple(
+        sorted((k, v) for k, v in os.environ.items() if k.startswith("HIERWALK_LAZY"))
+    )
+
+
+def _source_stamp(path: str) -> str:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return f"{path}\x00missing"
+    return f"{path}\x00{st.st_size}\x00{st.st_mtime_ns}"
+
+
+def make_shard_plan(
+    parse_sources: Sequence[str],
+    count: int,
+    *,
+    include_dirs: Sequence[str],
+    defines: Mapping[str, str],
+    skip_path_patterns: Sequence[str] = (),
+) -> ShardPlan:
+    shards = tuple(partition_shards(list(parse_sources), count))
+    inc = tuple(str(Path(p)) for p in include_dirs)
+    define_items = tuple(sorted((str(k), str(v)) for k, v in defines.items()))
+    skip = tuple(skip_path_patterns)
+    env = _plan_env()
+    h = hashlib.sha256()
+    h.update(repr((_PLAN_VERSION, len(shards), inc, define_items, skip, env)).encode())
+    for shard in shards:
+        h.update(b"\x01")
+        for path in shard:
+            h.update(_source_stamp(path).encode("utf-8", errors="surrogatepass"))
+            h.update(b"\x00")
+    return ShardPlan(
+        digest=h.hexdigest()[:24],
+        shards=shards,
+        include_dirs=inc,
+        define_items=define_items,
+        skip_path_patterns=skip,
+        env=env,
+    )
+
+
+def _shard_stem(i: int) -> str:
+    return f"shard-{i:05d}"
+
+
+def _result_path(queue: Path, i: int) -> Path:
+    return queue / f"{_shard_stem(i)}.pkl"
+
+
+def _lock_path(queue: Path, i: int, gen: int = 0) -> Path:
+    return queue / f"{_shard_stem(i)}.lock.{gen}"
+
+
+def _latest_claim(queue: Path, i: int) -> Optional[Tuple[int, Path]]:
+    prefix = f"{_shard_stem(i)}.lock."
+    latest: Optional[Tuple[int, Path]] = None
+    for path in queue.glob(f"{prefix}*"):
+        gen = path.name[len(prefix) :]
+        if gen.isdigit() and (latest is None or int(gen) > latest[0]):
+            latest = (int(gen), path)
+    return latest
+
+
+def publish_plan(queue: Path, plan: ShardPlan) -> None:
+    """Write ``plan.pkl`` unless an identical plan is already published."""
+    queue.mkdir(parents=True, exist_ok=True)
+    existing = load_plan(queue)
+    if existing is not None and existing.digest == plan.digest:
+        return
+    tmp = queue / f"{_PLAN_NAME}.{os.getpid()}.tmp"
+    with tmp.open("wb") as fh:
+        pickle.dump(plan, fh, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp.replace(queue / _PLAN_NAME)
+
+
+def load_plan(queue: Path) -> Optional[ShardPlan]:
+    try:
+        with (queue / _PLAN_NAME).open("rb") as fh:
+            plan = pickle.load(fh)
+    except (OSError, pickle.PickleError, EOFError, ValueError, AttributeError):
+        return None
+    if not isinstance(plan, ShardPlan) or plan.version != _PLAN_VERSION:
+        return None
+    return plan
+
+
+def _worker_tag() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _claim_token() -> str:
+    return f"{socket.gethostname()} {os.getpid()} {time.time():.3f}"
+
+
+def _try_claim(queue: Path, i: int, *, stale_sec: float) -> Optional[Path]:
+    """Claim shard *i*; the claim file, or ``None`` when done or held elsewhere."""
+    if _result_path(queue, i).is_file():
+        return None
+    gen = 0
+    latest = _latest_claim(queue, i)
+    if latest is not None:
+        try:
+            age = time.time() - latest[1].stat().st_mtime
+        except OSError:
+            return None
+        if age < stale_sec:
+            return None
+        # Abandoned claim: racing takers all try the same next generation.
+        gen = latest[0] + 1
+    claim = _lock_path(queue, i, gen)
+    try:
+        fd = os.open(str(claim), os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+    except OSError:
+        return None
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        fh.write(_claim_token())
+    return claim
+
+
+class _Heartbeat:
+    """Touch *paths* every *interval* seconds until the ``with`` block exits."""
+
+    def __init__(self, paths: Sequence[Path], interval: float) -> None:
+        self._paths = list(paths)
+        self._interval = max(0.05, interval)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self._interval):
+            for path in self._paths:
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+
+    def __enter__(self) -> "_Heartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def _is_fresh(path: Path, stale_sec: float) -> bool:
+    try:
+        return time.time() - path.stat().st_mtime < stale_sec
+    except OSError:
+        return False
+
+
+def _enter_queue(queue: Path) -> Optional[Path]:
+    """Register this worker; ``None`` when the queue is already merged."""
+    try:
+        fd, name = tempfile.mkstemp(
+            dir=queue, prefix=f"worker-{_worker_tag()}-", suffix=_ACTIVE_SUFFIX
+        )
+    except OSError:
+        return None
+    os.close(fd)
+    active = Path(name)
+    # Register first, then check: the coordinator writes ``merged`` first, then
+    # checks for workers, so one of the two always sees the other.
+    if (queue / _MERGED_NAME).exists():
+        _leave_queue(queue, active)
+        return None
+    return active
+
+
+def _leave_queue(queue: Path, active: Path) -> None:
+    try:
+        active.unlink()
+    except OSError:
+        pass
+    _remove_if_idle(queue)
+
+
+def _remove_if_idle(queue: Path) -> None:
+    """Remove a merged queue dir once no live worker is registered in it."""
+    if not (queue / _MERGED_NAME).exists():
+        return
+    stale = index_shard_stale_sec()
+    if any(_is_fresh(p, stale) for p in queue.glob(f"*{_ACTIVE_SUFFIX}")):
+        return
+    # A fresh claim without a partial is a shard still being scanned (its
+    # worker heartbeats it, e.g. after losing the claim to a takeover).
+    for claim in queue.glob("shard-*.lock.*"):
+        stem = claim.name.split(".", 1)[0]
+        if not (queue / f"{stem}.pkl").is_file() and _is_fresh(claim, stale):
+            return
+    shutil.rmtree(queue, ignore_errors=True)
+
+
+def scan_shard(plan: ShardPlan, i: int) -> Dict[str, ModuleRecord]:
+    """Preprocess + scan one shard in source order (first definition wins)."""
+    from hierwalk.index import _merge_file_scans, _preprocess_scan_file_task
+
+    merged: Dict[str, ModuleRecord] = {}
+    for fpath in plan.shards[i]:
+        _merge_file_scans(
+            merged,
+            _preprocess_scan_file_task(
+                (
+                    fpath,
+                    plan.include_dirs,
+                    plan.define_items,
+                    "parse",
+                    plan.skip_path_patterns,
+                )
+            ),
+        )
+    return merged
+
+
+def _write_result(queue: Path, i: int, records: Dict[str, ModuleRecord]) -> bool:
+    """Publish shard *i*; ``False`` when the queue dir is gone (result dropped)."""
+    tmp = queue / f"{_shard_stem(i)}.{_worker_tag()}.tmp"
+    try:
+        with tmp.open("wb") as fh:
+            pickle.dump(records, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(_result_path(queue, i))
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def run_shard_worker(
+    queue: Path | str,
+    *,
+    on_progress: Optional[Callable[[str], None]] = None,
+) -> int:
+    """Claim and scan shards until none are left; return shards scanned here."""
+    queue = Path(queue)
+    plan = load_plan(queue)
+    if plan is None:
+        return 0
+    active = _enter_queue(queue)
+    if active is None:
+        return 0
+    stale = index_shard_stale_sec()
+    done = 0
+    try:
+        for i in range(len(plan.shards)):
+            claim = _try_claim(queue, i, stale_sec=stale)
+            if claim is None:
+                continue
+            t0 = time.perf_counter()
+            try:
+                with _Heartbeat([claim, active], stale / 4):
+                    records = scan_shard(plan, i)
+                written = _write_result(queue, i, records)
+            finally:
+                try:
+                    claim.unlink()
+                except OSError:
+                    pass
+            if not written:
+                if on_progress:
+                    on_progress(
+                        f"index: queue {queue} is gone; dropped shard {i + 1} result"
+                    )
+                break
+            done += 1
+            if on_progress:
+                on_progress(
+                    f"index: shard {i + 1}/{len(plan.shards)} "
+                    f"({len(plan.shards[i])} files) in {time.perf_counter() - t0:.1f}s"
+                )
+    finally:
+        _leave_queue(queue, active)
+    return done
+
+
+def _local_worker(queue: str) -> int:
+    return run_shard_worker(queue)
+
+
+def _pending_shards(queue: Path, plan: ShardPlan) -> List[int]:
+    return [i for i in range(len(plan.shards)) if not _result_path(queue, i).is_file()]
+
+
+def merge_shard_results(queue: Path, plan: ShardPlan) -> Dict[str, ModuleRecord]:
+    from hierwalk.index import _merge_file_scans
+
+    merged: Dict[str, ModuleRecord] = {}
+    for i in range(len(plan.shards)):
+        with _result_path(queue, i).open("rb") as fh:
+            _merge_file_scans(merged, pickle.load(fh))
+    return merged
+
+
+def shard_queue_dir(plan: ShardPlan) -> Optional[Path]:
+    root = index_shard_root()
+    return root / plan.digest if root is not None else None
+
+
+def build_sharded_scan(
+    parse_sources: Sequence[str],
+    count: int,
+    *,
+    include_dirs: Sequence[str],
+    defines: Mapping[str, str],
+    jobs: int = 0,
+    skip_path_patterns: Sequence[str] = (),
+    on_progress: Optional[Callable[[str], None]] = None,
+    queue: Optional[Path] = None,
+    poll_sec: float = 1.0,
+) -> Optional[Dict[str, ModuleRecord]]:
+    """
+    Coordinate a sharded scan; ``None`` when no queue dir is available.
+
+    Starts *jobs* local workers (0 = CPU count), then waits for shards claimed
+    by other hosts and merges partials.  The queue dir is removed once no
+    worker is left in it (possibly by the last remote worker).
+    """
+    from hierwalk.index import _resolve_jobs
+
+    plan = make_shard_plan(
+        parse_sources,
+        count,
+        include_dirs=include_dirs,
+        defines=defines,
+        skip_path_patterns=skip_path_patterns,
+    )
+    queue = queue or shard_queue_dir(plan)
+    if queue is None:
+        return None
+    publish_plan(queue, plan)
+    try:
+        (queue / _MERGED_NAME).unlink()  # rerun over a queue kept by a late worker
+    except OSError:
+        pass
+    total = len(plan.shards)
+    t0 = time.perf_counter()
+    pending = _pending_shards(queue, plan)
+    if on_progress:
+        on_progress(
+            f"index: sharded scan {len(parse_sources)} files in {total} shards "
+            f"({total - len(pending)} reused) — queue {queue}"
+        )
+    workers = _resolve_jobs(jobs, len(pending)) if pending else 0
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(_local_worker, [str(queue)] * workers))
+        except (OSError, PermissionError, RuntimeError):
+            pass
+    stale = index_shard_stale_sec()
+    while True:
+        run_shard_worker(queue, on_progress=on_progress)
+        pending = _pending_shards(queue, plan)
+        if not pending:
+            break
+        if on_progress:
+            on_progress(
+                f"index: waiting for {len(pending)} shard(s) claimed by other workers"
+            )
+        time.sleep(min(poll_sec, stale))
+    merged = merge_shard_results(queue, plan)
+    (queue / _MERGED_NAME).write_text(_claim_token(), encoding="utf-8")
+    _remove_if_idle(queue)
+    if on_progress:
+        on_progress(
+            f"index: sharded scan merged {total} shards, {len(merged)} modules "
+            f"in {time.perf_counter() - t0:.1f}s"
+        )
+    return merged
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Join a sharded hier-walk index build as a worker",
+    )
+    parser.add_argument("queue", help="shard queue dir (printed by the coordinator)")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="worker processes on this host (default 1; 0 = CPU count)",
+    )
+    args = parser.parse_args(argv)
+    queue = Path(args.queue)
+    plan = load_plan(queue)
+    if plan is None:
+        print(f"index-shard: no plan in {queue}", file=sys.stderr)
+        return 2
+    # Preprocess like the coordinator did, whatever this shell exports.
+    for key in [k for k in os.environ if k.startswith("HIERWALK_LAZY")]:
+        del os.environ[key]
+    os.environ.update(dict(plan.env))
+
+    def on_progress(msg: str) -> None:
+        print(msg, file=sys.stderr, flush=True)
+
+    workers = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    if workers <= 1:
+        done = run_shard_worker(queue, on_progress=on_progress)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            done = sum(pool.map(_local_worker, [str(queue)] * workers))
+    print(f"index-shard: scanned {done} shard(s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
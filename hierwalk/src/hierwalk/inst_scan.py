@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import re
-from typing import Dict, Iterator, List, Mapping, Optional, Set, Tuple, TypedDict
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple, TypedDict
 
 _IDENT = r"[A-Za-z_]\w*"
 _ESC_IDENT = r"\\(?:[A-Za-z_]\w*|\S+)"
@@ -276,6 +276,7 @@ class ModuleBlock(TypedDict):
     chunk: str
     kind: str
     start: int
+    chunk_start: int
 
 
 def iter_module_blocks(text: str) -> Iterator[ModuleBlock]:
@@ -294,6 +295,7 @@ def iter_module_blocks(text: str) -> Iterator[ModuleBlock]:
             "chunk": text[m.end() : end_m.start()],
             "kind": kind,
             "start": m.start(),
+            "chunk_start": m.end(),
         }
 
 
@@ -357,6 +359,28 @@ def scan_hierarchy_instances(
     return list(_iter_hierarchy_instance_edges(body, param_map=param_map))
 
 
+def scan_hierarchy_instances_chunks(
+    chunks: Iterable[str],
+    *,
+    param_map: Optional[Mapping[str, str]] = None,
+) -> List[InstanceEdge]:
+    """
+    :func:`scan_hierarchy_instances` over a body streamed in line-aligned chunks.
+
+    Used with ``FoldedBody.iter_text()`` so unrolled generate arrays are scanned
+    without materializing the whole unrolled body.
+    """
+    seen: Set[Tuple[str, str]] = set()
+    edges: List[InstanceEdge] = []
+    for chunk in chunks:
+        for edge in _iter_hierarchy_instance_edges(chunk, param_map=param_map):
+            key = (edge.inst_name, edge.child_module)
+            if key not in seen:
+                seen.add(key)
+                edges.append(edge)
+    return edges
+
+
 def _iter_hierarchy_instance_edges(
     body: str,
     *,
@@ -4,12 +4,15 @@ from __future__ import annotations
 
 import re
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Dict, IO, List, Mapping, Optional, Sequence, Set, Tuple
 
-from hierwalk.cone import ConeBoundary, ConeResult, fanin_cone, fanout_cone
+from hierwalk.cone import ConeBoundary, ConeCache, ConeResult, fanin_cone, fanout_cone
 from hierwalk.connect_endpoints import resolve_endpoint
+from hierwalk.connectivity import _resolve_connect_jobs
 from hierwalk.index import DesignIndex
 from hierwalk.models import FlatRow, PortInfo
 from hierwalk.params import resolve_param_map
@@ -172,6 +175,31 @@ def parse_inst_trace_json(
     )
 
 
+def parse_inst_trace_requests(
+    data: object,
+    *,
+    top: str = "",
+    defines: Optional[Mapping[str, str]] = None,
+) -> List[InstTraceRequest]:
+    """
+    One request per instance: *data* is a single ``inst_trace`` value, a list of
+    them, or an object whose ``instances`` list shares its other fields.
+    """
+    if isinstance(data, (list, tuple)):
+        items = list(data)
+    elif isinstance(data, Mapping) and isinstance(data.get("instances"), (list, tuple)):
+        shared = {k: v for k, v in data.items() if k != "instances"}
+        items = [
+            {**shared, **inst} if isinstance(inst, Mapping) else {**shared, "instance": inst}
+            for inst in data["instances"]
+        ]
+    else:
+        items = [data]
+    if not items:
+        raise ValueError("inst_trace list must be non-empty")
+    return [parse_inst_trace_json(item, top=top, defines=defines) for item in items]
+
+
 def _param_ctx_for_row(
     index: DesignIndex,
     row: FlatRow,
@@ -209,7 +237,15 @@ def _ports_for_instance(
     top: str,
 ) -> List[Tuple[str, str]]:
     ctx = _param_ctx_for_row(index, row, top)
-    port_index = port_index_for_design_module(index, row.module, ctx)
+    return _ports_for_module(index, row.module, ctx)
+
+
+def _ports_for_module(
+    index: DesignIndex,
+    module: str,
+    ctx: Mapping[str, str],
+) -> List[Tuple[str, str]]:
+    port_index = port_index_for_design_module(index, module, ctx)
     if port_index:
         out: List[Tuple[str, str]] = []
         seen: Set[str] = set()
@@ -221,7 +257,7 @@ def _ports_for_instance(
                 seen.add(name)
                 out.append((name, direction))
         return sorted(out, key=lambda x: x[0])
-    rec = index.get_module(row.module)
+    rec = index.get_module(module)
     if not rec or not rec.file_path:
         return []
     try:
@@ -232,7 +268,7 @@ def _ports_for_instance(
     seen: Set[str] = set()
     for info in scan_ports_detail_from_module_text(
         text,
-        row.module,
+        module,
         param_ctx=ctx,
     ):
         direction = _port_decl_direction(info)
@@ -258,23 +294,30 @@ def _seed_ports(
     return seeds
 
 
-def run_inst_trace(
-    request: InstTraceRequest,
-    *,
-    rows: Sequence[FlatRow],
-    index: DesignIndex,
-    top: str,
-    defines: Optional[Mapping[str, str]] = None,
-) -> InstTraceResult:
-    top_name = (request.top or top or "").strip()
-    compile_defines = dict(defines or {})
-    compile_defines.update(request.defines)
-    over_approx = (
+def _over_approximate(request: InstTraceRequest) -> bool:
+    return (
         request.over_approximate_if
         if request.over_approximate_if is not None
         else True
     )
 
+
+def _compile_defines(
+    request: InstTraceRequest,
+    defines: Optional[Mapping[str, str]],
+) -> Dict[str, str]:
+    compile_defines = dict(defines or {})
+    compile_defines.update(request.defines)
+    return compile_defines
+
+
+def _resolve_request(
+    request: InstTraceRequest,
+    rows: Sequence[FlatRow],
+    rows_by_path: Mapping[str, FlatRow],
+    index: DesignIndex,
+    top_name: str,
+) -> Tuple[InstTraceResult, Optional[FlatRow]]:
     ep, ep_errs = resolve_endpoint(
         request.instance,
         rows,
@@ -290,49 +333,53 @@ def run_inst_trace(
         errors=list(ep_errs),
     )
     if ep_errs:
-        return result
-
-    row = next((r for r in rows if r.full_path == ep.inst_path), None)
+        return result, None
+    row = rows_by_path.get(ep.inst_path)
     if row is None:
         result.errors.append(f"hierarchy not found: {ep.inst_path}")
-        return result
+    return result, row
+
 
-    ports = _ports_for_instance(index, row, top_name)
+def _trace_ports(
+    request: InstTraceRequest,
+    result: InstTraceResult,
+    row: FlatRow,
+    ports: Sequence[Tuple[str, str]],
+    *,
+    rows: Sequence[FlatRow],
+    index: DesignIndex,
+    top_name: str,
+    compile_defines: Mapping[str, str],
+    cache: ConeCache,
+) -> InstTraceResult:
+    inst_path = row.full_path
     if not ports:
         result.errors.append(
-            f"no ports parsed for instance {ep.inst_path} (module {row.module})"
+            f"no ports parsed for instance {inst_path} (module {row.module})"
         )
         return result
 
     seeds = _seed_ports(ports, request.direction)
     if not seeds:
         result.errors.append(
-            f"no ports match direction={request.direction!r} on {ep.inst_path}"
+            f"no ports match direction={request.direction!r} on {inst_path}"
         )
         return result
 
+    over_approx = _over_approximate(request)
     for port_name, port_dir, trace_dir in seeds:
-        endpoint = f"{ep.inst_path}.{port_name}"
-        if trace_dir == "driver":
-            cone = fanin_cone(
-                endpoint,
-                rows=rows,
-                index=index,
-                top=top_name,
-                defines=compile_defines,
-                over_approximate_if=over_approx,
-                path_kind=request.path_kind,
-            )
-        else:
-            cone = fanout_cone(
-                endpoint,
-                rows=rows,
-                index=index,
-                top=top_name,
-                defines=compile_defines,
-                over_approximate_if=over_approx,
-                path_kind=request.path_kind,
-            )
+        endpoint = f"{inst_path}.{port_name}"
+        cone_fn = fanin_cone if trace_dir == "driver" else fanout_cone
+        cone = cone_fn(
+            endpoint,
+            rows=rows,
+            index=index,
+            top=top_name,
+            defines=compile_defines,
+            over_approximate_if=over_approx,
+            path_kind=request.path_kind,
+            cache=cache,
+        )
         if cone.errors:
             result.errors.extend(
                 f"{endpoint} ({trace_dir}): {err}" for err in cone.errors
@@ -348,6 +395,116 @@ def run_inst_trace(
     return result
 
 
+def run_inst_trace(
+    request: InstTraceRequest,
+    *,
+    rows: Sequence[FlatRow],
+    index: DesignIndex,
+    top: str,
+    defines: Optional[Mapping[str, str]] = None,
+) -> InstTraceResult:
+    top_name = (request.top or top or "").strip()
+    cache = ConeCache.from_rows(rows)
+    result, row = _resolve_request(
+        request, rows, cache.rows_by_path, index, top_name
+    )
+    if row is None:
+        return result
+    return _trace_ports(
+        request,
+        result,
+        row,
+        _ports_for_instance(index, row, top_name),
+        rows=rows,
+        index=index,
+        top_name=top_name,
+        compile_defines=_compile_defines(request, defines),
+        cache=cache,
+    )
+
+
+def run_inst_trace_batch(
+    requests: Sequence[InstTraceRequest],
+    *,
+    rows: Sequence[FlatRow],
+    index: DesignIndex,
+    top: str,
+    defines: Optional[Mapping[str, str]] = None,
+    jobs: int = 0,
+) -> List[InstTraceResult]:
+    """
+    Trace many instances at once; results follow *requests* order.
+
+    Instances are grouped by (module, param ctx) so the port list is parsed
+    once per group, and cones with the same defines share one
+    :class:`ConeCache`, so each (module, param ctx) connect index is built once
+    per batch.  Cones are still walked per instance and port.  Groups run on
+    *jobs* threads (0 = CPU count, <0 = serial), like
+    ``ConnectivitySession.run_request``.
+    """
+    caches: Dict[Tuple, ConeCache] = {}
+    caches_lock = threading.Lock()
+    base = ConeCache.from_rows(rows)
+    results: List[Optional[InstTraceResult]] = [None] * len(requests)
+    groups: Dict[Tuple[str, str], List[Tuple[int, str, FlatRow]]] = {}
+    group_ctx: Dict[Tuple[str, str], Mapping[str, str]] = {}
+    for pos, request in enumerate(requests):
+        top_name = (request.top or top or "").strip()
+        result, row = _resolve_request(
+            request, rows, base.rows_by_path, index, top_name
+        )
+        results[pos] = result
+        if row is None:
+            continue
+        ctx = _param_ctx_for_row(index, row, top_name)
+        key = (
+            row.module,
+            "|".join(f"{k}={v}" for k, v in sorted(ctx.items())),
+        )
+        group_ctx.setdefault(key, ctx)
+        groups.setdefault(key, []).append((pos, top_name, row))
+
+    def _cache_for(request: InstTraceRequest, compile_defines: Mapping[str, str]) -> ConeCache:
+        ck = (tuple(sorted(compile_defines.items())), _over_approximate(request))
+        with caches_lock:
+            hit = caches.get(ck)
+            if hit is None:
+                hit = caches[ck] = ConeCache(
+                    rows_by_path=base.rows_by_path,
+                    child_by_parent_leaf=base.child_by_parent_leaf,
+                )
+        return hit
+
+    def _run_group(key: Tuple[str, str]) -> None:
+        ports = _ports_for_module(index, key[0], group_ctx[key])
+        for pos, top_name, row in groups[key]:
+            request = requests[pos]
+            compile_defines = _compile_defines(request, defines)
+            result = results[pos]
+            assert result is not None
+            _trace_ports(
+                request,
+                result,
+                row,
+                ports,
+                rows=rows,
+                index=index,
+                top_name=top_name,
+                compile_defines=compile_defines,
+                cache=_cache_for(request, compile_defines),
+            )
+
+    keys = list(groups)
+    workers = _resolve_connect_jobs(jobs, len(keys))
+    if workers <= 1:
+        for key in keys:
+            _run_group(key)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_run_group, keys))
+    return [r for r in results if r is not None]
+
+
 def format_inst_trace_tsv(
     result: InstTraceResult,
     *,
@@ -0,0 +1,245 @@
+"""On-demand elaboration view: one hierarchy node expanded at a time.
+
+:func:`hierwalk.elab.elaborate` materializes every row below a top (bounded
+only by ``max_depth``/``scope_paths``).  :class:`LazyElabView` resolves a path
+by expanding just the instances along it, so endpoint resolution
+(:func:`hierwalk.connect_endpoints.resolve_endpoint`) and cones
+(:meth:`hierwalk.cone.ConeCache.from_view`, used by single-top cone runs)
+touch only the part of the hierarchy they need.
+
+Child edges come from :meth:`DesignIndex.instances_for` and are memoized per
+``(module, parent param ctx, overrides)``; rows are memoized per path.  One
+view is safe to share between threads.  Rows are field-for-field those of
+:func:`~hierwalk.elab.elaborate`, and :meth:`LazyElabView.walk` yields them in
+the same depth-first order.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Set, Tuple
+
+from hierwalk.index import DesignIndex, _ctx_key
+from hierwalk.models import FlatRow, InstanceEdge
+from hierwalk.params import resolve_param_map
+
+EdgeKey = Tuple[str, str, str]  # (module, parent ctx key, overrides key)
+
+
+class LazyElabView(Mapping[str, FlatRow]):
+    """
+    ``full_path -> FlatRow`` mapping over one top, filled in on first access.
+
+    ``get``/``in``/``[]`` expand only the ancestors of the requested path.
+    Iterating or ``len()`` expands the whole tree (same rows as ``elaborate``).
+    """
+
+    def __init__(self, index: DesignIndex, top: str) -> None:
+        if top not in index.modules:
+            raise ValueError(f"Top module not found: {top}")
+        self.index = index
+        self.top = top
+        self._lock = threading.Lock()
+        self._rows: Dict[str, FlatRow] = {}
+        self._overrides: Dict[str, Mapping[str, str]] = {}
+        # parent path -> {inst_leaf: child path}, in instance order
+        self._children: Dict[str, Dict[str, str]] = {}
+        self._edges: Dict[EdgeKey, Tuple[InstanceEdge, ...]] = {}
+        self.edge_hits = 0
+        self.edge_misses = 0
+        self.root = self._make_row(top, top, top, 0, None, {}, {})
+        self._rows[top] = self.root
+        self._overrides[top] = {}
+
+    def _make_row(
+        self,
+        mod_name: str,
+        inst_leaf: str,
+        full_path: str,
+        depth: int,
+        parent_path: Optional[str],
+        parent_ctx: Mapping[str, str],
+        overrides: Mapping[str, str],
+    ) -> FlatRow:
+        index = self.index
+        rec = index.get_module(mod_name)
+        file_path = rec.file_path if rec else ""
+        pmap = resolve_param_map(
+            rec.raw_params if rec else {},
+            overrides=overrides,
+            parent=parent_ctx,
+        )
+        return FlatRow(
+            full_path=full_path,
+            inst_leaf=inst_leaf,
+            module=mod_name,
+            depth=depth,
+            parent_path=parent_path,
+            file=file_path,
+            stop_reason=index.module_stop_reason(mod_name),
+            via_filelist=index.filelist_for(file_path),
+            filelist_chain=index.filelist_chain_for(file_path),
+            param_ctx=dict(pmap),
+        )
+
+    def _edges_for(
+        self,
+        mod_name: str,
+        parent_ctx: Mapping[str, str],
+        overrides: Mapping[str, str],
+    ) -> Tuple[InstanceEdge, ...]:
+        key = (mod_name, _ctx_key(parent_ctx), _ctx_key(overrides))
+        with self._lock:
+            hit = self._edges.get(key)
+            if hit is not None:
+                self.edge_hits += 1
+                return hit
+        edges = tuple(self.index.instances_for(mod_name, parent_ctx, overrides))
+        with self._lock:
+            self.edge_misses += 1
+            return self._edges.setdefault(key, edges)
+
+    def _child_map(self, row: FlatRow) -> Dict[str, str]:
+        path = row.full_path
+        with self._lock:
+            kids = self._children.get(path)
+            if kids is not None:
+                return kids
+        built: Dict[str, str] = {}
+        new_rows: List[Tuple[FlatRow, Mapping[str, str]]] = []
+        if not row.stop_reason:
+            parent_ctx = self._rows[row.parent_path].param_ctx if row.parent_path else {}
+            edges = self._edges_for(row.module, parent_ctx, self._overrides[path])
+            for edge in edges:
+                child_path = f"{path}.{edge.inst_name}"
+                if edge.inst_name in built:
+                    continue
+                built[edge.inst_name] = child_path
+                child = self._make_row(
+                    edge.child_module,
+                    edge.inst_name,
+                    child_path,
+                    row.depth + 1,
+                    path,
+                    row.param_ctx,
+                    edge.param_overrides,
+                )
+                new_rows.append((child, edge.param_overrides))
+        with self._lock:
+            kids = self._children.get(path)
+            if kids is not None:
+                return kids  # another thread expanded it first
+            for child, overrides in new_rows:
+                self._rows.setdefault(child.full_path, child)
+                self._overrides.setdefault(child.full_path, overrides)
+            self._children[path] = built
+            return built
+
+    def children(self, path: str) -> List[FlatRow]:
+        """Child rows of *path* (expanded on first call); ``[]`` for unknown paths."""
+        row = self.get(path)
+        if row is None:
+            return []
+        kids = self._child_map(row)
+        return [self._rows[p] for p in kids.values()]
+
+    def child_path(self, parent_path: str, inst_leaf: str) -> Optional[str]:
+        row = self.get(parent_path)
+        if row is None:
+            return None
+        return self._child_map(row).get(inst_leaf)
+
+    def get(self, path: str, default: Optional[FlatRow] = None) -> Optional[FlatRow]:  # type: ignore[override]
+        row = self._rows.get(path)
+        if row is not None:
+            return row
+        if not path.startswith(self.top + "."):
+            return default
+        node = self.root
+        rest = path[len(self.top) + 1 :]
+        while rest:
+            kids = self._child_map(node)
+            # Generate-scope leaves carry dots (``g[0].u``): try longest leaf first.
+            cut = len(rest)
+            while cut > 0:
+                child = kids.get(rest[:cut])
+                if child is not None:
+                    break
+                cut = rest.rfind(".", 0, cut)
+            if cut <= 0:
+                return default
+            node = self._rows[child]
+            rest = rest[cut + 1 :]
+        return node
+
+    def __getitem__(self, path: str) -> FlatRow:
+        row = self.get(path)
+        if row is None:
+            raise KeyError(path)
+        return row
+
+    def __contains__(self, path: object) -> bool:
+        return isinstance(path, str) and self.get(path) is not None
+
+    def walk(
+        self,
+        start: Optional[str] = None,
+        *,
+        enter: Optional[Callable[[FlatRow], bool]] = None,
+    ) -> Iterator[FlatRow]:
+        """
+        Depth-first rows from *start* (default: the top), parents before children.
+
+        *enter* decides whether a row's children are expanded and visited.
+        """
+        first = self.get(start or self.top)
+        if first is None:
+            return
+        seen: Set[str] = set()
+        stack = [first]
+        while stack:
+            row = stack.pop()
+            if row.full_path in seen:
+                continue
+            seen.add(row.full_path)
+            yield row
+            if enter is not None and not enter(row):
+                continue
+            kids = [self._rows[p] for p in self._child_map(row).values()]
+            stack.extend(reversed(kids))
+
+    def __iter__(self) -> Iterator[str]:
+        for row in self.walk():
+            yield row.full_path
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.walk())
+
+    @property
+    def materialized(self) -> int:
+        """Rows built so far (the expanded part of the hierarchy)."""
+        return len(self._rows)
+
+    @property
+    def child_by_parent_leaf(self) -> "_ChildByParentLeaf":
+        """Lazy ``(parent_path, inst_leaf) -> child path`` lookup (cone)."""
+        return _ChildByParentLeaf(self)
+
+
+class _ChildByParentLeaf(Mapping[Tuple[str, str], str]):
+    def __init__(self, view: LazyElabView) -> None:
+        self._view = view
+
+    def __getitem__(self, key: Tuple[str, str]) -> str:
+        path = self._view.child_path(*key)
+        if path is None:
+            raise KeyError(key)
+        return path
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        for row in self._view.walk():
+            if row.parent_path:
+                yield (row.parent_path, row.inst_leaf)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
@@ -45,6 +45,14 @@ def lazy_scoped_connect_elab() -> bool:
     return lazy_processing_enabled()
 
 
+def lazy_cone_view() -> bool:
+    """
+    Resolve cone rows on demand (:class:`~hierwalk.lazy_elab.LazyElabView`)
+    instead of elaborating the whole top (lazy default on; ``HIERWALK_LAZY_CONE=0``).
+    """
+    return lazy_processing_enabled() and _env_bool("HIERWALK_LAZY_CONE", default=True)
+
+
 def lazy_on_demand_full_preprocess() -> bool:
     """Upgrade to full preprocess (macro/bind/ifdef) when generate-fold elab needs it."""
     return lazy_processing_enabled()
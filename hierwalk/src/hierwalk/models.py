@@ -22,6 +22,8 @@ class ModuleRecord:
     is_blackbox: bool = False
     is_interface: bool = False
     stop_reason: str = ""
+    # (blob path, byte offset, byte length) of the body in a preprocessed-text blob
+    body_ref: Tuple[str, int, int] = ("", 0, 0)
 
     def __getstate__(self) -> dict:
         """Omit module bodies from pickle; live records keep lazy-filled bodies."""
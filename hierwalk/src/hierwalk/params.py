@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
+import operator
 import re
-from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple
 
 
 def _skip_balanced(text: str, start: int, open_ch: str, close_ch: str) -> int:
@@ -340,73 +342,149 @@ def _tokenize_expr(expr: str) -> list[str]:
     return tokens
 
 
-def _eval_tokens(tokens: list[str], ctx: Mapping[str, str]) -> Optional[int]:
-    if not tokens:
+ParamExprFn = Callable[[Mapping[str, str]], Optional[int]]
+ParamCondFn = Callable[[Mapping[str, str]], Optional[bool]]
+
+_CMP_OPS: Tuple[Tuple[str, Callable[[int, int], bool]], ...] = (
+    (">=", operator.ge),
+    ("<=", operator.le),
+    ("!=", operator.ne),
+    ("==", operator.eq),
+    (">", operator.gt),
+    ("<", operator.lt),
+)
+_TRUE_LITERALS = frozenset(("1", "1'b1", "1'h1", "'1", "true"))
+_FALSE_LITERALS = frozenset(("0", "1'b0", "1'h0", "'0", "false"))
+
+
+@lru_cache(maxsize=65536)
+def _ctx_int(val: str) -> Optional[int]:
+    return _param_int(val)
+
+
+def _const_fn(value: Optional[int]) -> ParamExprFn:
+    return lambda _ctx: value
+
+
+def _var_fn(name: str) -> ParamExprFn:
+    def var(ctx: Mapping[str, str]) -> Optional[int]:
+        if name in ctx:
+            return _ctx_int(ctx[name])
         return None
 
-    def value_at(idx: int) -> Tuple[Optional[int], int]:
-        if idx >= len(tokens):
+    return var
+
+
+def _neg_fn(inner: ParamExprFn) -> ParamExprFn:
+    def neg(ctx: Mapping[str, str]) -> Optional[int]:
+        v = inner(ctx)
+        return -v if v is not None else None
+
+    return neg
+
+
+def _binop_fn(
+    left: ParamExprFn,
+    right: ParamExprFn,
+    op: Callable[[int, int], int],
+) -> ParamExprFn:
+    def binop(ctx: Mapping[str, str]) -> Optional[int]:
+        a = left(ctx)
+        if a is None:
+            return None
+        b = right(ctx)
+        if b is None:
+            return None
+        return op(a, b)
+
+    return binop
+
+
+def _compile_tokens(tokens: list[str]) -> ParamExprFn:
+    """
+    Compile ``+ - *`` / unary / paren token streams to a closure tree.
+
+    Grammar and ``None`` propagation match the historical token evaluator:
+    any malformed stream folds to ``None``; unknown identifiers yield ``None``
+    at evaluation time.  Streams without identifiers fold to a constant.
+    """
+    n = len(tokens)
+    has_var = False
+
+    def value_at(idx: int) -> Tuple[Optional[ParamExprFn], int]:
+        nonlocal has_var
+        if idx >= n:
             return None, idx
         tok = tokens[idx]
         if tok == "(":
-            v, j = expr_at(idx + 1)
-            if j >= len(tokens) or tokens[j] != ")":
+            fn, j = sum_at(idx + 1)
+            if fn is None or j >= n or tokens[j] != ")":
                 return None, j
-            return v, j + 1
+            return fn, j + 1
         if tok == "-":
-            v, j = value_at(idx + 1)
-            return (-v if v is not None else None), j
+            fn, j = value_at(idx + 1)
+            return (_neg_fn(fn) if fn is not None else None), j
         if tok == "+":
             return value_at(idx + 1)
         if re.fullmatch(r"-?\d+", tok):
-            return int(tok), idx + 1
-        if re.fullmatch(r"\d+'[bdhBDH]", tok, re.I) and idx + 1 < len(tokens):
-            lit = tok + tokens[idx + 1]
-            v = _param_int(lit)
-            return v, idx + 2
+            return _const_fn(int(tok)), idx + 1
+        if re.fullmatch(r"\d+'[bdhBDH]", tok, re.I) and idx + 1 < n:
+            return _const_fn(_param_int(tok + tokens[idx + 1])), idx + 2
         v = _param_int(tok)
         if v is not None:
-            return v, idx + 1
-        if tok in ctx:
-            return _param_int(ctx[tok]), idx + 1
-        return None, idx + 1
+            return _const_fn(v), idx + 1
+        has_var = True
+        return _var_fn(tok), idx + 1
 
-    def term_at(idx: int) -> Tuple[Optional[int], int]:
+    def term_at(idx: int) -> Tuple[Optional[ParamExprFn], int]:
         left, j = value_at(idx)
-        while j < len(tokens) and tokens[j] == "*":
+        while left is not None and j < n and tokens[j] == "*":
             right, j = value_at(j + 1)
-            if left is None or right is None:
-                return None, j
-            left = left * right
+            left = _binop_fn(left, right, operator.mul) if right is not None else None
         return left, j
 
-    def sum_at(idx: int) -> Tuple[Optional[int], int]:
+    def sum_at(idx: int) -> Tuple[Optional[ParamExprFn], int]:
         left, j = term_at(idx)
-        while j < len(tokens) and tokens[j] in ("+", "-"):
-            op = tokens[j]
+        while left is not None and j < n and tokens[j] in ("+", "-"):
+            op = operator.add if tokens[j] == "+" else operator.sub
             right, j = term_at(j + 1)
-            if left is None or right is None:
-                return None, j
-            left = left + right if op == "+" else left - right
+            left = _binop_fn(left, right, op) if right is not None else None
         return left, j
 
-    def expr_at(idx: int) -> Tuple[Optional[int], int]:
-        return sum_at(idx)
+    if not tokens:
+        return _const_fn(None)
+    fn, pos = sum_at(0)
+    if fn is None or pos != n:
+        return _const_fn(None)
+    if not has_var:
+        return _const_fn(fn({}))
+    return fn
 
-    val, pos = expr_at(0)
-    if pos != len(tokens):
-        return None
-    return val
 
+@lru_cache(maxsize=16384)
+def compile_param_expr(expr: str) -> ParamExprFn:
+    """
+    Parse *expr* once into a closure ``ctx -> Optional[int]``.
 
-def resolve_param_expr(expr: str, ctx: Mapping[str, str]) -> Optional[int]:
-    expr = expr.strip()
-    if not expr:
-        return None
-    if expr in ctx:
-        v = _param_int(ctx[expr])
-        if v is not None:
-            return v
+    :func:`resolve_param_expr` is ``compile_param_expr(expr)(ctx)``; callers
+    evaluating one expression across many contexts can keep the closure.
+    """
+    key = expr.strip()
+    if not key:
+        return _const_fn(None)
+    body = _compile_expr_body(key)
+
+    def run(ctx: Mapping[str, str]) -> Optional[int]:
+        if key in ctx:
+            v = _ctx_int(ctx[key])
+            if v is not None:
+                return v
+        return body(ctx)
+
+    return run
+
+
+def _compile_expr_body(expr: str) -> ParamExprFn:
     qpos = _find_top_level_op(expr, "?")
     if qpos is not None:
         cond = expr[:qpos].strip()
@@ -415,48 +493,68 @@ def resolve_param_expr(expr: str, ctx: Mapping[str, str]) -> Optional[int]:
         rest = expr[qpos + 1 :]
         cpos = _find_top_level_op(rest, ":")
         if cpos is not None:
-            t_expr = rest[:cpos].strip()
-            f_expr = rest[cpos + 1 :].strip()
-            cval = expr_is_true(cond, ctx)
-            if cval is None:
-                return None
-            return resolve_param_expr(t_expr if cval else f_expr, ctx)
+            cond_fn = compile_param_cond(cond)
+            t_fn = compile_param_expr(rest[:cpos])
+            f_fn = compile_param_expr(rest[cpos + 1 :])
+
+            def ternary(ctx: Mapping[str, str]) -> Optional[int]:
+                cval = cond_fn(ctx)
+                if cval is None:
+                    return None
+                return t_fn(ctx) if cval else f_fn(ctx)
+
+            return ternary
     v = _param_int(expr)
     if v is not None:
-        return v
-    return _eval_tokens(_tokenize_expr(expr), ctx)
+        return _const_fn(v)
+    return _compile_tokens(_tokenize_expr(expr))
 
 
-def expr_is_true(expr: str, ctx: Mapping[str, str]) -> Optional[bool]:
+@lru_cache(maxsize=16384)
+def compile_param_cond(expr: str) -> ParamCondFn:
+    """Compiled form of :func:`expr_is_true` (comparison split done once)."""
     e = expr.strip()
-    if e.lower() in ("1", "1'b1", "1'h1", "'1", "true"):
-        return True
-    if e.lower() in ("0", "1'b0", "1'h0", "'0", "false"):
-        return False
-    for op in (">=", "<=", "!=", "==", ">", "<"):
+    low = e.lower()
+    if low in _TRUE_LITERALS:
+        return lambda _ctx: True
+    if low in _FALSE_LITERALS:
+        return lambda _ctx: False
+    checks: List[Tuple[Callable[[int, int], bool], ParamExprFn, ParamExprFn]] = []
+    for op, cmp in _CMP_OPS:
         parts = e.split(op, 1)
         if len(parts) != 2:
             continue
-        left = resolve_param_expr(parts[0].strip(), ctx)
-        right = resolve_param_expr(parts[1].strip(), ctx)
-        if left is None or right is None:
-            continue
-        if op == ">=":
-            return left >= right
-        if op == "<=":
-            return left <= right
-        if op == "!=":
-            return left != right
-        if op == "==":
-            return left == right
-        if op == ">":
-            return left > right
-        if op == "<":
-            return left < right
-    v = resolve_param_expr(e, ctx)
-    if v is not None:
-        return v != 0
-    return None
+        checks.append(
+            (cmp, compile_param_expr(parts[0]), compile_param_expr(parts[1]))
+        )
+    fallback = compile_param_expr(e)
+
+    def cond(ctx: Mapping[str, str]) -> Optional[bool]:
+        for cmp, left_fn, right_fn in checks:
+            left = left_fn(ctx)
+            if left is None:
+                continue
+            right = right_fn(ctx)
+            if right is None:
+                continue
+            return cmp(left, right)
+        v = fallback(ctx)
+        if v is not None:
+            return v != 0
+        return None
+
+    return cond
+
+
+def resolve_param_expr(expr: str, ctx: Mapping[str, str]) -> Optional[int]:
+    return compile_param_expr(expr)(ctx)
+
+
+def expr_is_true(expr: str, ctx: Mapping[str, str]) -> Optional[bool]:
+    return compile_param_cond(expr)(ctx)
+
+
+ParamItems = Tuple[Tuple[str, str], ...]
 
 
 def resolve_param_map(
@@ -468,35 +566,74 @@ def resolve_param_map(
     """
     Fold parameter/localparam declarations with optional parent scope and
     instance #(.) overrides. Returns name -> numeric string when possible.
+
+    Memoized per (declarations, overrides, parent ctx); each call returns a
+    fresh dict.
     """
-    raw: Dict[str, str] = dict(declarations)
-    if overrides:
-        raw.update(overrides)
+    key = (
+        tuple(declarations.items()),
+        tuple(overrides.items()) if overrides else (),
+        tuple(parent.items()) if parent else (),
+    )
+    try:
+        hash(key)
+    except TypeError:
+        return dict(_resolve_param_items(*key))
+    return dict(_cached_param_items(*key))
+
+
+@lru_cache(maxsize=8192)
+def _cached_param_items(
+    decl_items: ParamItems,
+    override_items: ParamItems,
+    parent_items: ParamItems,
+) -> ParamItems:
+    return _resolve_param_items(decl_items, override_items, parent_items)
+
+
+def _resolve_param_items(
+    decl_items: ParamItems,
+    override_items: ParamItems,
+    parent_items: ParamItems,
+) -> ParamItems:
+    raw: Dict[str, str] = dict(decl_items)
+    raw.update(override_items)
     resolved: Dict[str, str] = {}
-    if parent:
-        for k, v in parent.items():
+    if parent_items:
+        parent = dict(parent_items)
+        for k, v in parent_items:
             iv = resolve_param_expr(v, parent) if not str(v).isdigit() else int(v)
             if iv is not None:
                 resolved[k] = str(iv)
 
+    # Scope seen by declaration *name*: the other raw decls plus everything
+    # resolved so far (including *name* once resolved).  ``merged`` tracks that
+    # incrementally; only self-referencing exprs need a private copy.
+    merged: Dict[str, str] = dict(raw)
+    merged.update(resolved)
+    compiled = [(name, expr, compile_param_expr(expr)) for name, expr in raw.items()]
     for _ in range(len(raw) + 2):
         changed = False
-        for name, expr in raw.items():
-            ctx = {k: v for k, v in raw.items() if k != name}
-            ctx.update(resolved)
-            iv = resolve_param_expr(expr, ctx)
+        for name, expr, fn in compiled:
+            if name in resolved or name not in expr:
+                ctx: Mapping[str, str] = merged
+            else:
+                ctx = dict(merged)
+                del ctx[name]
+            iv = fn(ctx)
             if iv is None:
                 continue
             new_v = str(iv)
             if resolved.get(name) != new_v:
                 resolved[name] = new_v
+                merged[name] = new_v
                 changed = True
         if not changed:
             break
     for name, expr in raw.items():
         if name not in resolved:
             resolved[name] = expr.strip()
-    return resolved
+    return tuple(resolved.items())
 
 
 def parse_bound_token(token: str, param_map: Mapping[str, str]) -> Optional[int]:
@@ -7,9 +7,9 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Dict, List, Mapping, Optional, Sequence, Tuple
 
-from hierwalk.generate_fold import prepare_body_for_instance_scan
+from hierwalk.generate_fold import prepare_folded_for_instance_scan
 from hierwalk.index import DesignIndex, _ctx_key
-from hierwalk.inst_scan import iter_module_blocks, scan_hierarchy_instances
+from hierwalk.inst_scan import iter_module_blocks, scan_hierarchy_instances_chunks
 from hierwalk.manifest import path_content_digest
 from hierwalk.models import InstanceEdge
 from hierwalk.params import collect_module_params, parse_param_pairs, resolve_param_map, split_module_header
@@ -42,6 +42,8 @@ class PathRefineResult:
 
 _ModuleChunkCacheKey = Tuple[int, str, str]
 _module_chunk_cache: Dict[_ModuleChunkCacheKey, Tuple[str, str, str]] = {}
+# (chunk key, inst_leaf) -> header params + localparams declared before inst_leaf
+_scoped_params_cache: Dict[Tuple[_ModuleChunkCacheKey, str], Dict[str, str]] = {}
 
 
 def _module_chunk_cache_key(index: DesignIndex, mod_name: str, path: str) -> _ModuleChunkCacheKey:
@@ -52,6 +54,7 @@ def _module_chunk_cache_key(index: DesignIndex, mod_name: str, path: str) -> _Mo
 
 def clear_module_chunk_cache() -> None:
     _module_chunk_cache.clear()
+    _scoped_params_cache.clear()
 
 
 def _module_chunk(index: DesignIndex, mod_name: str) -> tuple[str, str, str]:
@@ -308,8 +311,8 @@ def _instance_edges_for_parent(
             return edges
         return []
 
-    folded = prepare_body_for_instance_scan(body, pmap)
-    edges = scan_hierarchy_instances(folded, param_map=pmap)
+    folded = prepare_folded_for_instance_scan(body, pmap)
+    edges = scan_hierarchy_instances_chunks(folded.iter_text(), param_map=pmap)
     if scan_cache is not None:
         scan_cache[cache_key] = edges
     return edges
@@ -321,6 +324,14 @@ def scoped_module_params(
     inst_leaf: str,
 ) -> Dict[str, str]:
     """Header params plus body localparams declared before ``inst_leaf``."""
+    rec = index.get_module(mod_name)
+    cache_key = (
+        _module_chunk_cache_key(index, mod_name, rec.file_path or "") if rec else None
+    )
+    if cache_key is not None:
+        cached = _scoped_params_cache.get((cache_key, inst_leaf))
+        if cached is not None:
+            return dict(cached)
     _path, header, body = _module_chunk(index, mod_name)
     params = dict(_header_params(header))
     if body:
@@ -330,9 +341,11 @@ def scoped_module_params(
             param_map=params,
         )
         params.update(body_params)
-        return params
-    rec = index.get_module(mod_name)
-    return dict(rec.raw_params) if rec else params
+    elif rec:
+        params = dict(rec.raw_params)
+    if cache_key is not None:
+        _scoped_params_cache[(cache_key, inst_leaf)] = dict(params)
+    return params
 
 
 def find_child_instance(
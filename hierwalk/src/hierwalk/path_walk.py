@@ -43,6 +43,7 @@ from hierwalk.hierarchy_log import (
     open_path_walk_trace_log,
     path_walk_child_miss_reason,
     path_walk_inst_miss_reason,
+    path_walk_trace_level,
     path_walk_trace_show_message,
 )
 from hierwalk.path_walk_db import (
@@ -258,13 +259,14 @@ class PathWalkState:
         return bool(self._trace_streams()) or self.on_progress is not None
 
     def _emit_walk(self, message: str) -> None:
-        if not message or not path_walk_trace_show_message(message):
+        if not message:
             return
+        level = path_walk_trace_level(message)
         streams = self._trace_streams()
         if streams:
             for stream in streams:
-                emit_path_walk_log(message, stream=stream)
-        elif self.on_progress is not None:
+                emit_path_walk_log(message, stream=stream, level=level)
+        elif self.on_progress is not None and path_walk_trace_show_message(message):
             self.on_progress(f"path-walk: {message}")
 
     def _emit_walk_spine(self, path: str, *, title: str) -> None:
@@ -2093,6 +2095,12 @@ def clear_path_walk_suite_session() -> None:
     _suite_session = None
 
 
+def quiesce_path_walk_suite_session() -> None:
+    """Stop tier-0 worker pools but keep the warm suite session (before ``fork``)."""
+    if _suite_session is not None:
+        _suite_session.mod_db.shutdown_workers(wait=True)
+
+
 def acquire_path_walk_session(
     fl: FilelistResult,
     *,
@@ -2383,8 +2391,9 @@ def _path_walk_trace_emit(
     trace_log_fh: Optional[TextIO] = None,
     on_progress: Optional[Callable[[str], None]] = None,
 ) -> None:
-    if not message or not path_walk_trace_show_message(message):
+    if not message:
         return
+    level = path_walk_trace_level(message)
     streams: List[TextIO] = []
     if trace_stream is not None:
         streams.append(trace_stream)
@@ -2392,8 +2401,8 @@ def _path_walk_trace_emit(
         streams.append(trace_log_fh)
     if streams:
         for stream in streams:
-            emit_path_walk_log(message, stream=stream)
-    elif on_progress is not None:
+            emit_path_walk_log(message, stream=stream, level=level)
+    elif on_progress is not None and path_walk_trace_show_message(message):
         on_progress(f"path-walk: {message}")
 
 
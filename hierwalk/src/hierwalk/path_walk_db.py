@@ -43,6 +43,7 @@ from hierwalk.params import parse_param_pairs
 from hierwalk.manifest import PathDigests, path_content_digest
 from hierwalk.models import InstanceEdge, ModuleRecord
 from hierwalk.params import resolve_param_map
+from hierwalk.rtl_profile import profile_rtl
 
 PATH_WALK_DB_VERSION = 11
 
@@ -1474,7 +1475,7 @@ class PathWalkModuleDb:
     def tier1_scan_file(self, path: str) -> Dict[str, ModuleRecord]:
         """Light preprocess + instance scan for one translation unit."""
         key = str(Path(path).resolve())
-        with self._tier1_scan_lock:
+        with self._tier1_scan_lock, profile_rtl("tier1_scan_file", file_path=key):
             mem = self._validated_memory.get(key)
             if mem is not None:
                 return mem
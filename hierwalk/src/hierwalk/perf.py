@@ -3,11 +3,16 @@
 from __future__ import annotations
 
 import os
+from pathlib import Path
 from typing import Optional
 
 DEFAULT_LOW_MEMORY_AUTO_THRESHOLD = 1500
 DEFAULT_INCLUDE_WARM_MAX = 200
 DEFAULT_BODY_PARAM_SCAN_MAX = 512 * 1024
+DEFAULT_BODY_CACHE_MB = 256
+DEFAULT_INDEX_SHARD_FILES = 2000
+DEFAULT_INDEX_SHARD_STALE_SEC = 1800.0
+DEFAULT_GENERATE_UNROLL_MAX = 64
 
 
 def low_memory_auto_threshold() -> int:
@@ -130,4 +135,143 @@ def slow_file_log_threshold_sec() -> Optional[float]:
     try:
         return max(0.1, float(raw))
     except ValueError:
-        return 10.0
\ No newline at end of file
+        return 10.0
+
+
+def port_cache_dir() -> Optional[Path]:
+    """
+    Disk port-index cache root (``HIERWALK_PORT_CACHE``).
+
+    Unset: ``<run work dir>/ports`` once a run work dir is active (CLI runs);
+    ``0``/``off`` disables; any other value is used as the directory.
+    """
+    raw = os.environ.get("HIERWALK_PORT_CACHE", "").strip()
+    if raw.lower() in ("0", "off", "false", "no", "disable", "disabled"):
+        return None
+    if raw and raw.lower() not in ("1", "true", "yes", "on", "auto"):
+        return Path(raw).expanduser()
+    from hierwalk.cache import get_active_work_dir
+
+    work_dir = get_active_work_dir()
+    return work_dir / "ports" if work_dir is not None else None
+
+
+def body_blob_dir() -> Optional[Path]:
+    """
+    Preprocessed-text blob root for O(1) module bodies (``HIERWALK_BODY_BLOB``).
+
+    Unset: ``<run work dir>/bodies`` once a run work dir is active (CLI runs);
+    ``0``/``off`` disables; any other value is used as the directory.
+    """
+    raw = os.environ.get("HIERWALK_BODY_BLOB", "").strip()
+    if raw.lower() in ("0", "off", "false", "no", "disable", "disabled"):
+        return None
+    if raw and raw.lower() not in ("1", "true", "yes", "on", "auto"):
+        return Path(raw).expanduser()
+    from hierwalk.cache import get_active_work_dir
+
+    work_dir = get_active_work_dir()
+    return work_dir / "bodies" if work_dir is not None else None
+
+
+def body_cache_bytes() -> int:
+    """LRU budget for blob-backed module bodies (``HIERWALK_BODY_CACHE_MB``, default 256)."""
+    raw = os.environ.get("HIERWALK_BODY_CACHE_MB", "").strip()
+    if raw:
+        try:
+            return max(0, int(float(raw) * 1024 * 1024))
+        except ValueError:
+            pass
+    return DEFAULT_BODY_CACHE_MB * 1024 * 1024
+
+
+def index_shard_count(num_sources: int) -> int:
+    """
+    Shards for a sharded index scan (``HIERWALK_INDEX_SHARDS``); 0 = off.
+
+    ``auto`` uses one shard per 2000 sources (at least 2); counts are capped
+    at *num_sources*.
+    """
+    raw = os.environ.get("HIERWALK_INDEX_SHARDS", "").strip().lower()
+    if raw in ("", "0", "1", "off", "false", "no", "disable", "disabled"):
+        return 0
+    if raw in ("auto", "on", "true", "yes"):
+        count = max(2, -(-num_sources // DEFAULT_INDEX_SHARD_FILES))
+    else:
+        try:
+            count = int(raw)
+        except ValueError:
+            return 0
+    count = min(count, num_sources)
+    return count if count > 1 else 0
+
+
+def index_shard_root() -> Optional[Path]:
+    """
+    Shard work-queue root (``HIERWALK_INDEX_SHARD_DIR``).
+
+    Unset: ``<run work dir>/shards`` once a run work dir is active. Must be on a
+    filesystem shared with every worker host.
+    """
+    raw = os.environ.get("HIERWALK_INDEX_SHARD_DIR", "").strip()
+    if raw:
+        return Path(raw).expanduser()
+    from hierwalk.cache import get_active_work_dir
+
+    work_dir = get_active_work_dir()
+    return work_dir / "shards" if work_dir is not None else None
+
+
+def index_shard_stale_sec() -> float:
+    """Age after which an unfinished shard claim is taken over (``HIERWALK_INDEX_SHARD_STALE_SEC``)."""
+    raw = os.environ.get("HIERWALK_INDEX_SHARD_STALE_SEC", "").strip()
+    if raw:
+        try:
+            return max(1.0, float(raw))
+        except ValueError:
+            pass
+    return DEFAULT_INDEX_SHARD_STALE_SEC
+
+
+def generate_unroll_max() -> int:
+    """
+    Max trip count of a for-generate loop that is unrolled (``HIERWALK_GENERATE_UNROLL_MAX``).
+
+    Larger loops stay folded; instance scans enumerate unrolled loops lazily, so
+    raising this costs scan time rather than one body copy per iteration.
+    """
+    raw = os.environ.get("HIERWALK_GENERATE_UNROLL_MAX", "").strip()
+    if raw:
+        try:
+            return max(0, int(raw))
+        except ValueError:
+            pass
+    return DEFAULT_GENERATE_UNROLL_MAX
+
+
+def trace_sink_binary() -> bool:
+    """
+    Write trace logs through the buffered gzip sink (``HIERWALK_TRACE_SINK=binary``).
+
+    Default ``text`` appends formatted lines to the run log as before.
+    """
+    raw = os.environ.get("HIERWALK_TRACE_SINK", "").strip().lower()
+    return raw in ("binary", "gz", "gzip", "compact", "1", "on", "true", "yes")
+
+
+def trace_sink_level() -> int:
+    """Lowest level kept by the trace sink (``HIERWALK_TRACE_LEVEL``: debug, info, warn)."""
+    from hierwalk.trace_sink import INFO, parse_trace_level
+
+    return parse_trace_level(os.environ.get("HIERWALK_TRACE_LEVEL", ""), INFO)
+
+
+def trace_rate_limit() -> int:
+    """Trace sink lines kept per category per second (``HIERWALK_TRACE_RATE``); 0 = no limit."""
+    raw = os.environ.get("HIERWALK_TRACE_RATE", "").strip()
+    if raw:
+        try:
+            return max(0, int(raw))
+        except ValueError:
+            pass
+    return 0
@@ -2,15 +2,30 @@
 
 from __future__ import annotations
 
+import hashlib
+import os
+import pickle
 import re
 from functools import lru_cache
 from itertools import product
 from pathlib import Path
-from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+from typing import (
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 
 from hierwalk.inst_scan import _MODULE_BLOCK_RE
 from hierwalk.models import PortInfo
 from hierwalk.params import resolve_param_expr, split_module_header
+from hierwalk.perf import port_cache_dir
 
 _DIM_RE = re.compile(r"\[([^\]]+)\]")
 _DEFAULT_MAX_EXPAND = 512
@@ -182,6 +197,21 @@ def expand_port_dims(
     return names, "resolved"
 
 
+def _port_names_and_note(
+    base: str,
+    dim_specs: List[str],
+    ctx: Mapping[str, str],
+    *,
+    materialize: bool,
+) -> tuple[List[str], str]:
+    if materialize:
+        return expand_port_dims(base, dim_specs, ctx)
+    for spec in dim_specs:
+        if resolve_dim_spec(spec, ctx) is None:
+            return [], f"unresolved: {', '.join(dim_specs)}"
+    return [], "resolved"
+
+
 def _split_port_list(text: str) -> List[str]:
     parts: List[str] = []
     depth = 0
@@ -248,12 +278,16 @@ def _port_info_from_token(
     token: str,
     ctx: Mapping[str, str],
     lines: List[str],
+    *,
+    materialize: bool = True,
 ) -> Optional[PortInfo]:
     parsed = _parse_port_token(_strip_port_type_prefix(token))
     if parsed is None:
         return None
     base, dim_specs = parsed
-    names, note = expand_port_dims(base, dim_specs, ctx)
+    names, note = _port_names_and_note(
+        base, dim_specs, ctx, materialize=materialize
+    )
     line = _decl_line(lines, base)
     decl = token.strip().replace("\n", " ")[:200]
     return PortInfo(
@@ -270,6 +304,8 @@ def _collect_ports_from_decl(
     decl: str,
     ctx: Mapping[str, str],
     lines: List[str],
+    *,
+    materialize: bool = True,
 ) -> List[PortInfo]:
     out: List[PortInfo] = []
     active_dir = ""
@@ -284,7 +320,9 @@ def _collect_ports_from_decl(
         if not body:
             continue
         prefixed = f"{active_dir} {body}" if active_dir else body
-        info = _port_info_from_token(prefixed, ctx, lines)
+        info = _port_info_from_token(
+            prefixed, ctx, lines, materialize=materialize
+        )
         if info is not None:
             if active_dir and not info.decl.lower().startswith(active_dir):
                 info = PortInfo(
@@ -305,7 +343,19 @@ def scan_ports_detail_from_module_text(
     *,
     param_ctx: Optional[Mapping[str, str]] = None,
 ) -> List[PortInfo]:
-    ctx = dict(param_ctx or {})
+    return _scan_port_infos(
+        text, module_name, dict(param_ctx or {}), materialize=True
+    )
+
+
+def _scan_port_infos(
+    text: str,
+    module_name: str,
+    ctx: Mapping[str, str],
+    *,
+    materialize: bool,
+) -> List[PortInfo]:
+    """Port decls of *module_name*; ``materialize=False`` leaves ``names`` empty."""
     lines = text.splitlines()
     infos: List[PortInfo] = []
     for m in _MODULE_BLOCK_RE.finditer(text):
@@ -318,14 +368,20 @@ def scan_ports_detail_from_module_text(
             tail = header_text[pm.end() :]
             semi = tail.find(";")
             chunk_decl = tail if semi < 0 else tail[:semi]
-            infos.extend(_collect_ports_from_decl(chunk_decl, ctx, lines))
+            infos.extend(
+                _collect_ports_from_decl(
+                    chunk_decl, ctx, lines, materialize=materialize
+                )
+            )
         for pm in re.finditer(
             r"\b([A-Za-z_]\w*)\s*((?:\[[^\]]+\])*)\s*(?:,|\))\s*(input|output|inout)\b",
             header_text,
             re.IGNORECASE,
         ):
             dim_specs = _DIM_RE.findall(pm.group(2) or "")
-            names, note = expand_port_dims(pm.group(1), dim_specs, ctx)
+            names, note = _port_names_and_note(
+                pm.group(1), dim_specs, ctx, materialize=materialize
+            )
             infos.append(
                 PortInfo(
                     base_name=pm.group(1),
@@ -338,7 +394,11 @@ def scan_ports_detail_from_module_text(
             )
         port_list = re.search(r"\(\s*([^)]*)\)\s*;", chunk, re.DOTALL)
         if port_list:
-            infos.extend(_collect_ports_from_decl(port_list.group(1), ctx, lines))
+            infos.extend(
+                _collect_ports_from_decl(
+                    port_list.group(1), ctx, lines, materialize=materialize
+                )
+            )
         prefix = body[:4000]
         for pm in re.finditer(r"\b(input|output|inout)\b[^;]*;", prefix, re.IGNORECASE):
             decl = re.sub(
@@ -347,7 +407,9 @@ def scan_ports_detail_from_module_text(
                 pm.group(0),
                 flags=re.IGNORECASE,
             ).rstrip(";").strip()
-            infos.extend(_collect_ports_from_decl(decl, ctx, lines))
+            infos.extend(
+                _collect_ports_from_decl(decl, ctx, lines, materialize=materialize)
+            )
         return infos
     return []
 
@@ -364,20 +426,168 @@ def _build_port_index(infos: List[PortInfo]) -> Dict[str, PortInfo]:
     return index
 
 
+# (base_name, dim_specs, line, decl, param_note): a PortInfo minus its bit names.
+PortRecord = Tuple[str, Tuple[str, ...], int, str, str]
+
+_PORT_CACHE_VERSION = 1
+
+
+def _port_record(info: PortInfo) -> PortRecord:
+    return (
+        info.base_name,
+        tuple(info.dim_specs),
+        info.line,
+        info.decl,
+        info.param_note,
+    )
+
+
+class PortIndex(Mapping[str, PortInfo]):
+    """
+    ``name -> PortInfo`` over compact :data:`PortRecord` entries.
+
+    Per-bit names (``data[3]``, ``data[7:0]`` …) are only expanded for the
+    base names a lookup touches; iterating the mapping expands everything.
+    """
+
+    __slots__ = ("_records", "_ctx", "_by_base", "_infos", "_full")
+
+    def __init__(self, records: Sequence[PortRecord], ctx: Mapping[str, str]) -> None:
+        self._records: Tuple[PortRecord, ...] = tuple(records)
+        self._ctx: Dict[str, str] = dict(ctx)
+        self._by_base: Dict[str, List[int]] = {}
+        for pos, rec in enumerate(self._records):
+            self._by_base.setdefault(rec[0].lower(), []).append(pos)
+        self._infos: Dict[int, Tuple[PortInfo, FrozenSet[str]]] = {}
+        self._full: Optional[Dict[str, PortInfo]] = None
+
+    @property
+    def records(self) -> Tuple[PortRecord, ...]:
+        return self._records
+
+    def _info(self, pos: int) -> Tuple[PortInfo, FrozenSet[str]]:
+        hit = self._infos.get(pos)
+        if hit is None:
+            base, dim_specs, line, decl, note = self._records[pos]
+            names, _ = expand_port_dims(base, list(dim_specs), self._ctx)
+            hit = (
+                PortInfo(
+                    base_name=base,
+                    names=names,
+                    dim_specs=list(dim_specs),
+                    line=line,
+                    decl=decl,
+                    param_note=note,
+                ),
+                frozenset(names),
+            )
+            self._infos[pos] = hit
+        return hit
+
+    def _materialized(self) -> Dict[str, PortInfo]:
+        if self._full is None:
+            self._full = _build_port_index(
+                [self._info(pos)[0] for pos in range(len(self._records))]
+            )
+        return self._full
+
+    def __getitem__(self, name: str) -> PortInfo:
+        if self._full is not None:
+            return self._full[name]
+        base, _dims = _split_port_base_dims(name)
+        # Later records win, matching the dict built by _build_port_index.
+        for pos in reversed(self._by_base.get(base.lower(), ())):
+            info, names = self._info(pos)
+            if name in names:
+                return info
+        raise KeyError(name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._materialized())
+
+    def __len__(self) -> int:
+        return len(self._materialized())
+
+    def literal_matches(self, pattern: str) -> List[str]:
+        """Names equal to *pattern* ignoring case (:func:`port_glob_match` literals)."""
+        base, _dims = _split_port_base_dims(pattern)
+        want = pattern.lower()
+        out: Set[str] = set()
+        for pos in self._by_base.get(base.lower(), ()):
+            out.update(n for n in self._info(pos)[1] if n.lower() == want)
+        return sorted(out)
+
+    def __repr__(self) -> str:
+        return f"PortIndex({len(self._records)} decls)"
+
+
+def _port_cache_path(root: Path, digest: str, module_name: str, ctx_key: str) -> Path:
+    key = f"{_PORT_CACHE_VERSION}\x00{digest}\x00{module_name}\x00{ctx_key}"
+    name = hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+    return root / name[:2] / f"{name}.ports.pkl"
+
+
+@lru_cache(maxsize=512)
+def _text_digest(module_text: str) -> str:
+    return hashlib.sha256(module_text.encode("utf-8", errors="ignore")).hexdigest()
+
+
+def _load_port_records(path: Path) -> Optional[List[PortRecord]]:
+    try:
+        with path.open("rb") as fh:
+            payload = pickle.load(fh)
+    except (OSError, pickle.PickleError, EOFError, ValueError, AttributeError):
+        return None
+    if (
+        not isinstance(payload, tuple)
+        or len(payload) != 2
+        or payload[0] != _PORT_CACHE_VERSION
+        or not isinstance(payload[1], list)
+    ):
+        return None
+    return payload[1]
+
+
+def _save_port_records(path: Path, records: List[PortRecord]) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with tmp.open("wb") as fh:
+            pickle.dump(
+                (_PORT_CACHE_VERSION, records),
+                fh,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        tmp.replace(path)
+    except OSError:
+        pass
+
+
 @lru_cache(maxsize=4096)
 def _cached_port_index_from_text(
     module_text: str,
     module_name: str,
     ctx_key: str,
     param_items: Tuple[Tuple[str, str], ...],
-) -> Dict[str, PortInfo]:
+) -> PortIndex:
     ctx = dict(param_items)
-    infos = scan_ports_detail_from_module_text(
-        module_text,
-        module_name,
-        param_ctx=ctx,
+    root = port_cache_dir()
+    path = (
+        _port_cache_path(root, _text_digest(module_text), module_name, ctx_key)
+        if root is not None
+        else None
     )
-    return _build_port_index(infos)
+    records = _load_port_records(path) if path is not None else None
+    if records is None:
+        records = [
+            _port_record(info)
+            for info in _scan_port_infos(
+                module_text, module_name, ctx, materialize=False
+            )
+        ]
+        if path is not None:
+            _save_port_records(path, records)
+    return PortIndex(records, ctx)
 
 
 @lru_cache(maxsize=512)
@@ -397,7 +607,7 @@ def _cached_port_index_from_file(
     module_name: str,
     ctx_key: str,
     param_items: Tuple[Tuple[str, str], ...],
-) -> Dict[str, PortInfo]:
+) -> Mapping[str, PortInfo]:
     text = _read_source_text(file_path)
     if not text:
         return {}
@@ -410,24 +620,23 @@ def port_index_for_module(
     param_ctx: Optional[Mapping[str, str]] = None,
     *,
     module_text: Optional[str] = None,
-) -> Dict[str, PortInfo]:
+) -> Mapping[str, PortInfo]:
+    """Read-only port index (a shared :class:`PortIndex`; copy before mutating)."""
     if not file_path and not module_text:
         return {}
     ctx = dict(param_ctx or {})
     items = tuple(sorted(ctx.items()))
     key = _param_ctx_key(ctx)
     if module_text is not None:
-        return dict(
-            _cached_port_index_from_text(module_text, module_name, key, items)
-        )
-    return dict(_cached_port_index_from_file(file_path, module_name, key, items))
+        return _cached_port_index_from_text(module_text, module_name, key, items)
+    return _cached_port_index_from_file(file_path, module_name, key, items)
 
 
 def port_index_for_design_module(
     index: object,
     module_name: str,
     param_ctx: Optional[Mapping[str, str]] = None,
-) -> Dict[str, PortInfo]:
+) -> Mapping[str, PortInfo]:
     """Port index resolved via :class:`DesignIndex` (one disk read per RTL file)."""
     get_module = getattr(index, "get_module", None)
     if not callable(get_module):
@@ -524,7 +733,15 @@ def matching_ports(
     *,
     param_ctx: Optional[Mapping[str, str]] = None,
 ) -> List[str]:
-    direct = sorted(name for name in port_index if port_glob_match(name, pattern))
+    literal = "*" not in pattern and "?" not in pattern and (
+        "[" in pattern or "]" not in pattern
+    )
+    if literal and isinstance(port_index, PortIndex):
+        direct = port_index.literal_matches(pattern)
+    else:
+        direct = sorted(
+            name for name in port_index if port_glob_match(name, pattern)
+        )
     if direct:
         return direct
 
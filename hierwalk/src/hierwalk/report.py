@@ -15,6 +15,7 @@ from hierwalk.hierarchy_log import format_hierarchy_rows_report
 from hierwalk.models import FlatRow, SearchHit
 from hierwalk.path_chain import format_path_chain_report
 from hierwalk.progress import format_duration, format_hierwalk_log
+from hierwalk.rtl_profile import write_hot_rtl_report
 
 
 def format_bytes(num: int) -> str:
@@ -232,6 +233,9 @@ def emit_run_report(
     write_run_report_log(report, log_path, append=append_log)
     if announce_log:
         print(format_hierwalk_log(f"report logged: {log_path}"), file=target, flush=True)
+    hot_path = write_hot_rtl_report(log_path)
+    if hot_path is not None and announce_log:
+        print(format_hierwalk_log(f"hot RTL report: {hot_path}"), file=target, flush=True)
     return log_path
 
 
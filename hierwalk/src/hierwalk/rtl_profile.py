@@ -0,0 +1,427 @@
+"""Opt-in per-RTL-module time/allocation attribution (``HIERWALK_PROFILE_RTL``).
+
+Hot index/connect/path-walk entry points wrap their work in
+:func:`profile_rtl`; samples are keyed by the ``(file, module)`` being
+processed rather than the Python function, so a slow run can be traced back to
+the RTL bodies that cost the time.  Scopes nest: a ``fold_generate_regions``
+call inside ``build_module_connect_index`` inherits the enclosing attribution
+and its time is subtracted from the parent's *self* time.
+
+``HIERWALK_PROFILE_RTL``:
+  unset/0 (default) — disabled, every hook is a no-op
+  1 / time          — wall time per (file, module)
+  alloc             — wall time plus ``tracemalloc`` allocation deltas
+
+Process-pool workers inherit the mode through the environment and append
+their samples to a spool directory owned by the parent; the parent merges them
+when :func:`write_hot_rtl_report` writes ``<log>.hot-rtl`` next to the
+``RunReport`` log.
+"""
+
+from __future__ import annotations
+
+import atexit
+import functools
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+_ENV_MODE = "HIERWALK_PROFILE_RTL"
+_ENV_OWNER = "HIERWALK_PROFILE_RTL_OWNER"
+_ENV_SPOOL = "HIERWALK_PROFILE_RTL_SPOOL"
+
+DEFAULT_HOT_RTL_LIMIT = 50
+
+ProfileKey = Tuple[str, str]  # (file, module)
+
+_F = TypeVar("_F", bound=Callable)
+
+
+def rtl_profile_mode() -> str:
+    """``off``, ``time`` or ``alloc`` from ``HIERWALK_PROFILE_RTL``."""
+    raw = os.environ.get(_ENV_MODE, "").strip().lower()
+    if raw in ("", "0", "off", "false", "no", "disable", "disabled"):
+        return "off"
+    if raw in ("alloc", "mem", "memory", "tracemalloc"):
+        return "alloc"
+    return "time"
+
+
+@dataclass
+class RtlProfileEntry:
+    """Accumulated cost of one ``(file, module)``."""
+
+    file_path: str
+    module: str
+    self_sec: float = 0.0
+    total_sec: float = 0.0
+    calls: int = 0
+    alloc_bytes: int = 0
+    by_kind: Dict[str, float] = field(default_factory=dict)
+
+    def merge(self, other: "RtlProfileEntry") -> None:
+        self.self_sec += other.self_sec
+        self.total_sec += other.total_sec
+        self.calls += other.calls
+        self.alloc_bytes += other.alloc_bytes
+        for kind, sec in other.by_kind.items():
+            self.by_kind[kind] = self.by_kind.get(kind, 0.0) + sec
+
+    def to_json(self) -> dict:
+        return {
+            "file": self.file_path,
+            "module": self.module,
+            "self_sec": self.self_sec,
+            "total_sec": self.total_sec,
+            "calls": self.calls,
+            "alloc_bytes": self.alloc_bytes,
+            "by_kind": self.by_kind,
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "RtlProfileEntry":
+        return cls(
+            file_path=str(data.get("file", "")),
+            module=str(data.get("module", "")),
+            self_sec=float(data.get("self_sec", 0.0)),
+            total_sec=float(data.get("total_sec", 0.0)),
+            calls=int(data.get("calls", 0)),
+            alloc_bytes=int(data.get("alloc_bytes", 0)),
+            by_kind={str(k): float(v) for k, v in dict(data.get("by_kind", {})).items()},
+        )
+
+
+@dataclass
+class _Frame:
+    key: ProfileKey
+    kind: str
+    t0: float
+    mem0: int = 0
+    child_sec: float = 0.0
+
+
+class RtlProfiler:
+    """Thread-safe sample store; one per process."""
+
+    def __init__(self, mode: str) -> None:
+        self.mode = mode
+        self._entries: Dict[ProfileKey, RtlProfileEntry] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._spool_dir = os.environ.get(_ENV_SPOOL, "")
+        if mode == "alloc":
+            import tracemalloc
+
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def _stack(self) -> List[_Frame]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = []
+            self._local.stack = stack
+        return stack
+
+    def _is_worker(self) -> bool:
+        # Checked per sample: ``fork`` children inherit the parent's profiler.
+        owner = os.environ.get(_ENV_OWNER, "")
+        return bool(owner) and owner != str(os.getpid())
+
+    def push(self, kind: str, key: Optional[ProfileKey]) -> _Frame:
+        stack = self._stack()
+        if key is None or not (key[0] or key[1]):
+            key = stack[-1].key if stack else ("", "")
+        mem0 = 0
+        if self.mode == "alloc":
+            import tracemalloc
+
+            mem0 = tracemalloc.get_traced_memory()[0]
+        frame = _Frame(key=key, kind=kind, t0=time.perf_counter(), mem0=mem0)
+        stack.append(frame)
+        return frame
+
+    def pop(self, frame: _Frame) -> None:
+        elapsed = time.perf_counter() - frame.t0
+        alloc = 0
+        if self.mode == "alloc":
+            import tracemalloc
+
+            alloc = max(0, tracemalloc.get_traced_memory()[0] - frame.mem0)
+        stack = self._stack()
+        if stack and stack[-1] is frame:
+            stack.pop()
+        if not frame.kind:
+            # Attribution-only frame: hand recorded descendants up unchanged.
+            if stack:
+                stack[-1].child_sec += frame.child_sec
+            return
+        if stack:
+            stack[-1].child_sec += elapsed
+        self_sec = max(0.0, elapsed - frame.child_sec)
+        sample = RtlProfileEntry(
+            file_path=frame.key[0],
+            module=frame.key[1],
+            self_sec=self_sec,
+            total_sec=elapsed,
+            calls=1,
+            # Nested scopes' retained bytes are already included in the parent.
+            alloc_bytes=0 if any(f.kind for f in stack) else alloc,
+            by_kind={frame.kind: self_sec},
+        )
+        if self._spool_dir and self._is_worker():
+            self._spool(sample)
+            return
+        with self._lock:
+            hit = self._entries.get(frame.key)
+            if hit is None:
+                self._entries[frame.key] = sample
+            else:
+                hit.merge(sample)
+
+    def _spool(self, sample: RtlProfileEntry) -> None:
+        path = Path(self._spool_dir) / f"{os.getpid()}.jsonl"
+        try:
+            with path.open("a", encoding="utf-8") as fh:
+                fh.write(json.dumps(sample.to_json()) + "\n")
+        except OSError:
+            pass
+
+    def _drain_spool(self) -> None:
+        if not self._spool_dir:
+            return
+        spool = Path(self._spool_dir)
+        if not spool.is_dir():
+            return
+        for path in sorted(spool.glob("*.jsonl")):
+            try:
+                lines = path.read_text(encoding="utf-8").splitlines()
+                path.unlink()
+            except OSError:
+                continue
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    sample = RtlProfileEntry.from_json(json.loads(line))
+                except (ValueError, TypeError):
+                    continue
+                key = (sample.file_path, sample.module)
+                hit = self._entries.get(key)
+                if hit is None:
+                    self._entries[key] = sample
+                else:
+                    hit.merge(sample)
+
+    def drain(self) -> List[RtlProfileEntry]:
+        """Return entries ranked by self time and reset the store."""
+        with self._lock:
+            self._drain_spool()
+            entries = list(self._entries.values())
+            self._entries = {}
+        entries.sort(key=lambda e: (-e.self_sec, -e.alloc_bytes, e.file_path, e.module))
+        return entries
+
+
+_PROFILER: Optional[RtlProfiler] = None
+_PROFILER_LOCK = threading.Lock()
+_SPOOL_CLEANUP_REGISTERED = False
+
+
+def _profiler() -> Optional[RtlProfiler]:
+    global _PROFILER
+    prof = _PROFILER
+    if prof is not None:
+        return prof if prof.enabled else None
+    with _PROFILER_LOCK:
+        if _PROFILER is None:
+            _PROFILER = RtlProfiler(rtl_profile_mode())
+        prof = _PROFILER
+    return prof if prof.enabled else None
+
+
+def reset_rtl_profile() -> None:
+    """Re-read ``HIERWALK_PROFILE_RTL`` on next use (tests, long-lived daemons)."""
+    global _PROFILER
+    with _PROFILER_LOCK:
+        _PROFILER = None
+
+
+def rtl_profile_enabled() -> bool:
+    return _profiler() is not None
+
+
+def begin_rtl_profile_session() -> bool:
+    """
+    Claim spool ownership before worker pools start (call once per run).
+
+    Sets ``HIERWALK_PROFILE_RTL_OWNER``/``_SPOOL`` so ``fork``/``spawn``
+    workers created afterwards report into this process.  The spool dir lives
+    until :func:`end_rtl_profile_session` (run at exit).
+    """
+    global _SPOOL_CLEANUP_REGISTERED
+    if _PROFILER is not None and _PROFILER.mode != rtl_profile_mode():
+        reset_rtl_profile()  # run JSON ``env`` may have toggled the mode
+    prof = _profiler()
+    if prof is None:
+        return False
+    if os.environ.get(_ENV_OWNER) != str(os.getpid()):
+        spool = tempfile.mkdtemp(prefix="hierwalk-rtl-profile-")
+        os.environ[_ENV_OWNER] = str(os.getpid())
+        os.environ[_ENV_SPOOL] = spool
+        prof._spool_dir = spool
+        if not _SPOOL_CLEANUP_REGISTERED:
+            # Suite steps share one spool (pool workers outlive a step), so it
+            # is removed when the process exits, after the last report.
+            atexit.register(end_rtl_profile_session)
+            _SPOOL_CLEANUP_REGISTERED = True
+    return True
+
+
+def end_rtl_profile_session() -> None:
+    """Remove the spool dir this process owns; undrained worker samples are discarded."""
+    if os.environ.get(_ENV_OWNER) != str(os.getpid()):
+        return  # not the owner (e.g. a forked worker inheriting the handler)
+    spool = os.environ.pop(_ENV_SPOOL, "")
+    del os.environ[_ENV_OWNER]
+    prof = _PROFILER
+    if prof is not None and prof._spool_dir == spool:
+        prof._spool_dir = ""
+    if spool:
+        shutil.rmtree(spool, ignore_errors=True)
+
+
+@contextmanager
+def profile_rtl(
+    kind: str,
+    *,
+    file_path: str = "",
+    module: str = "",
+) -> Iterator[None]:
+    """
+    Attribute the enclosed work to ``(file_path, module)``.
+
+    Empty *file_path*/*module* inherit the enclosing scope's attribution.
+    """
+    prof = _profiler()
+    if prof is None:
+        yield
+        return
+    key = (file_path, module) if (file_path or module) else None
+    frame = prof.push(kind, key)
+    try:
+        yield
+    finally:
+        prof.pop(frame)
+
+
+@contextmanager
+def attribute_rtl(file_path: str, module: str = "") -> Iterator[None]:
+    """Set the ``(file, module)`` for nested hooks without recording a sample."""
+    prof = _profiler()
+    if prof is None:
+        yield
+        return
+    frame = prof.push("", (file_path, module))
+    try:
+        yield
+    finally:
+        prof.pop(frame)
+
+
+def profiled_rtl(kind: str) -> Callable[[_F], _F]:
+    """Decorator form of :func:`profile_rtl` (inherits attribution)."""
+
+    def wrap(fn: _F) -> _F:
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            prof = _profiler()
+            if prof is None:
+                return fn(*args, **kwargs)
+            frame = prof.push(kind, None)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                prof.pop(frame)
+
+        return inner  # type: ignore[return-value]
+
+    return wrap
+
+
+def hot_rtl_report_path(log_path: Path) -> Path:
+    """``<run>.hier-walk.log`` -> ``<run>.hier-walk.hot-rtl.log``."""
+    return log_path.with_name(f"{log_path.stem}.hot-rtl{log_path.suffix or '.log'}")
+
+
+def _format_bytes(num: int) -> str:
+    from hierwalk.report import format_bytes
+
+    return format_bytes(num)
+
+
+def format_hot_rtl_report(
+    entries: List[RtlProfileEntry],
+    *,
+    limit: int = DEFAULT_HOT_RTL_LIMIT,
+    mode: str = "time",
+) -> List[str]:
+    from hierwalk.progress import format_duration
+
+    total = sum(e.self_sec for e in entries)
+    out = [
+        f"--- hier-walk hot RTL ({mode}) ---",
+        f"Modules:       {len(entries)}",
+        f"Attributed:    {format_duration(total)}",
+        "",
+        "rank\tself\ttotal\tcalls\talloc\tfile\tmodule\tkinds",
+    ]
+    shown = entries if limit <= 0 else entries[:limit]
+    for rank, entry in enumerate(shown, start=1):
+        kinds = ",".join(
+            f"{kind}={format_duration(sec)}"
+            for kind, sec in sorted(entry.by_kind.items(), key=lambda kv: -kv[1])
+        )
+        alloc = _format_bytes(entry.alloc_bytes) if mode == "alloc" else "-"
+        out.append(
+            f"{rank}\t{format_duration(entry.self_sec)}\t"
+            f"{format_duration(entry.total_sec)}\t{entry.calls}\t{alloc}\t"
+            f"{entry.file_path or '-'}\t{entry.module or '-'}\t{kinds}"
+        )
+    if limit > 0 and len(entries) > limit:
+        out.append(f"... {len(entries) - limit} more module(s)")
+    out.append("---")
+    return out
+
+
+def write_hot_rtl_report(
+    log_path: Path,
+    *,
+    limit: int = DEFAULT_HOT_RTL_LIMIT,
+) -> Optional[Path]:
+    """Drain samples and append a ranked report beside *log_path* (None when off)."""
+    prof = _profiler()
+    if prof is None:
+        return None
+    entries = prof.drain()
+    if not entries:
+        return None
+    path = hot_rtl_report_path(log_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with path.open("a", encoding="utf-8") as fh:
+        fh.write(f"# hier-walk run {stamp}\n")
+        fh.write("\n".join(format_hot_rtl_report(entries, limit=limit, mode=prof.mode)))
+        fh.write("\n")
+    return path
@@ -14,7 +14,7 @@ from hierwalk.connect_request import (
     parse_connect_request_json,
     try_parse_connect_request_json,
 )
-from hierwalk.inst_trace import InstTraceRequest, parse_inst_trace_json
+from hierwalk.inst_trace import InstTraceRequest, parse_inst_trace_requests
 from hierwalk.search_spec import (
     SearchSpec,
     document_has_search,
@@ -214,6 +214,7 @@ class RunConfig:
     fanout_cone: Optional[str] = None
     cone_graph: Optional[str] = None
     inst_trace: Optional[InstTraceRequest] = None
+    inst_traces: Tuple[InstTraceRequest, ...] = ()
     strict_generate: bool = False
     over_approximate_if: Optional[bool] = None
     ignore_path: Tuple[str, ...] = ()
@@ -244,6 +245,21 @@ class RunConfig:
     def define_list(self) -> List[str]:
         return [f"{k}={v}" if v != "1" else k for k, v in self.defines]
 
+    @property
+    def inst_trace_requests(self) -> List[InstTraceRequest]:
+        """Every inst-trace request; ``inst_trace`` is the first of ``inst_traces``."""
+        if self.inst_traces:
+            return list(self.inst_traces)
+        return [self.inst_trace] if self.inst_trace is not None else []
+
+
+def inst_trace_fields(requests: Sequence[InstTraceRequest]) -> Dict[str, Any]:
+    """``RunConfig`` fields for *requests* (a single request leaves ``inst_traces`` empty)."""
+    return {
+        "inst_trace": requests[0] if requests else None,
+        "inst_traces": tuple(requests) if len(requests) > 1 else (),
+    }
+
 
 def _resolve_path(base: Path, value: Optional[str]) -> Optional[str]:
     if value is None or value == "-":
@@ -636,9 +652,9 @@ def parse_run_request_json(
     fanin_ep = data.get("fanin_cone", data.get("fanin-cone"))
     fanout_ep = data.get("fanout_cone", data.get("fanout-cone"))
     inst_trace_raw = data.get("inst_trace", data.get("inst-trace"))
-    inst_trace_req: Optional[InstTraceRequest] = None
+    inst_trace_reqs: List[InstTraceRequest] = []
     if inst_trace_raw is not None:
-        inst_trace_req = parse_inst_trace_json(
+        inst_trace_reqs = parse_inst_trace_requests(
             inst_trace_raw,
             top=str(data.get("top") or "").strip(),
             defines=defines,
@@ -690,7 +706,7 @@ def parse_run_request_json(
         fanin_cone=str(fanin_ep or "").strip() or None,
         fanout_cone=str(fanout_ep or "").strip() or None,
         cone_graph=_resolve_path(base, data.get("cone_graph", data.get("cone-graph"))),
-        inst_trace=inst_trace_req,
+        **inst_trace_fields(inst_trace_reqs),
         strict_generate=bool(data.get("strict_generate", False)),
         over_approximate_if=over_approx,
         ignore_path=tuple(
@@ -758,6 +774,7 @@ def parse_shared_run_request_json(
         check_connect_batch=None,
         connect_inline=None,
         inst_trace=None,
+        inst_traces=(),
         fanin_cone=None,
         fanout_cone=None,
         ignore_path=(),
@@ -1040,10 +1057,12 @@ def _apply_run_document_fields(
         if inst_raw is not None:
             out = replace(
                 out,
-                inst_trace=parse_inst_trace_json(
-                    inst_raw,
-                    top=out.top or str(_mapping_get_ci(data, "top") or "").strip(),
-                    defines=dict(out.defines_map),
+                **inst_trace_fields(
+                    parse_inst_trace_requests(
+                        inst_raw,
+                        top=out.top or str(_mapping_get_ci(data, "top") or "").strip(),
+                        defines=dict(out.defines_map),
+                    )
                 ),
             )
 
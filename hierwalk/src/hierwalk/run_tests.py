@@ -3,9 +3,9 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, replace
-from typing import Any, Mapping, Optional, Sequence, Tuple
+from typing import Any, List, Mapping, Optional, Sequence, Tuple
 
-from hierwalk.inst_trace import InstTraceRequest, parse_inst_trace_json
+from hierwalk.inst_trace import InstTraceRequest, parse_inst_trace_requests
 from hierwalk.enable_diagnostics import resolve_block_enabled
 from hierwalk.run_request import (
     RUN_CONN_CHECK,
@@ -18,6 +18,7 @@ from hierwalk.run_request import (
     _mapping_get_ci,
     block_enable_raw,
     block_enabled,
+    inst_trace_fields,
     _parse_check_connect,
     _parse_jobs,
     _parse_string_list,
@@ -127,6 +128,9 @@ def _validate_conn_check_spec(spec: Mapping[str, Any], *, label: str) -> None:
 
 
 def _validate_io_trace_spec(spec: Mapping[str, Any], *, label: str) -> None:
+    instances = _first_ci(spec, "instances")
+    if isinstance(instances, list) and instances:
+        return
     instance = _first_ci(spec, "instance", "inst", "path")
     if not str(instance or "").strip():
         raise ValueError(f"{label} run_io_trace requires instance (hierarchy path)")
@@ -418,6 +422,7 @@ def run_config_for_full_index(
         check_connect_batch=None,
         connect_inline=None,
         inst_trace=None,
+        inst_traces=(),
         fanin_cone=None,
         fanout_cone=None,
         flat_suite_step=True,
@@ -509,6 +514,7 @@ def run_config_for_test(
             connect_inline=connect_inline,
             check_connect_batch=check_connect_batch,
             inst_trace=None,
+            inst_traces=(),
             fanin_cone=None,
             fanout_cone=None,
             connect_trace=connect_trace,
@@ -522,7 +528,7 @@ def run_config_for_test(
         )
 
     if entry.kind == RUN_IO_TRACE:
-        inst_req: InstTraceRequest = parse_inst_trace_json(
+        inst_reqs: List[InstTraceRequest] = parse_inst_trace_requests(
             spec,
             top=cfg.top or "",
             defines=cfg.defines_map,
@@ -533,7 +539,7 @@ def run_config_for_test(
             mode=exec_mode,
             index_strategy=index_strategy,
             output=output or "-",
-            inst_trace=inst_req,
+            **inst_trace_fields(inst_reqs),
             check_connect=None,
             check_connect_batch=None,
             connect_inline=None,
@@ -559,6 +565,7 @@ def run_config_for_test(
         fanout_cone=fanout,
         cone_graph=cone_graph,
         inst_trace=None,
+        inst_traces=(),
         check_connect=None,
         check_connect_batch=None,
         connect_inline=None,
@@ -624,6 +631,7 @@ def parse_flat_run_suite(
         check_connect_batch=None,
         connect_inline=None,
         inst_trace=None,
+        inst_traces=(),
         fanin_cone=None,
         fanout_cone=None,
         ignore_path=(),
@@ -899,6 +907,7 @@ def parse_legacy_tests_array_suite(
         check_connect_batch=None,
         connect_inline=None,
         inst_trace=None,
+        inst_traces=(),
         fanin_cone=None,
         fanout_cone=None,
     )
@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
+import functools
 import random
 import textwrap
-from dataclasses import dataclass, field
-from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
 
 from hierwalk.connect_request import (
     ConnectivityCheck,
@@ -1293,6 +1295,10 @@ class StressTrialResult:
     file_count: int
     layout: str
     errors: List[str] = field(default_factory=list)
+    status: str = "ok"  # ok | timeout | error (batch runner)
+
+
+STRESS_PHASES = ("gen", "index", "elab", "connect", "total")
 
 
 def run_stress_trial(
@@ -1395,21 +1401,68 @@ def run_stress_trial(
     return design, trial
 
 
+def _stress_trial_for_seed(seed: int, config: Optional[StressConfig]) -> StressTrialResult:
+    _, trial = run_stress_trial(seed=seed, config=config)
+    return trial
+
+
+def _failed_stress_trial(outcome: Any) -> StressTrialResult:
+    return StressTrialResult(
+        seed=outcome.seed,
+        depth=0,
+        branch_factor=0,
+        connected=False,
+        connected_port_port=False,
+        connected_port_inst=False,
+        connected_cross=False,
+        modules_parsed_note_pp=outcome.error,
+        modules_parsed_note_pi=outcome.error,
+        modules_parsed_note_x=outcome.error,
+        gen_sec=0.0,
+        index_sec=0.0,
+        elab_sec=0.0,
+        connect_sec=0.0,
+        total_sec=outcome.elapsed_sec,
+        instance_rows=0,
+        module_count=0,
+        file_count=0,
+        layout="-",
+        errors=[outcome.error],
+        status=outcome.status,
+    )
+
+
 def run_stress_batch(
     trials: int = 10,
     *,
     base_seed: int = 20260613,
     config: Optional[StressConfig] = None,
+    jobs: int = 1,
+    timeout_sec: Optional[float] = None,
+    results_path: Optional[Union[str, Path]] = None,
 ) -> List[StressTrialResult]:
-    """Run multiple randomized stress trials with distinct seeds."""
-    out: List[StressTrialResult] = []
-    for i in range(trials):
-        _, trial = run_stress_trial(
-            seed=base_seed + i * 9973,
-            config=config,
-        )
-        out.append(trial)
-    return out
+    """
+    Run multiple randomized stress trials with distinct seeds.
+
+    ``jobs`` > 1 (0 = CPU count) or ``timeout_sec`` runs each trial in its own
+    process (:mod:`hierwalk.trial_runner`); timed-out or crashed trials come
+    back with ``status`` ``timeout``/``error``.  ``results_path`` (JSONL) makes
+    the batch resumable: seeds already recorded there as ``ok`` are not rerun.
+    """
+    from hierwalk.trial_runner import run_trials, trial_seeds
+
+    outcomes = run_trials(
+        functools.partial(_stress_trial_for_seed, config=config),
+        trial_seeds(trials, base_seed, 9973),
+        jobs=jobs,
+        timeout_sec=timeout_sec,
+        results_path=results_path,
+        encode=asdict,
+        decode=lambda rec: StressTrialResult(**rec),
+    )
+    return [
+        o.result if o.status == "ok" else _failed_stress_trial(o) for o in outcomes
+    ]
 
 
 def format_stress_report(results: Sequence[StressTrialResult]) -> str:
@@ -1421,7 +1474,9 @@ def format_stress_report(results: Sequence[StressTrialResult]) -> str:
     )
     lines = [header]
     for i, r in enumerate(results):
-        if not r.connected_port_port:
+        if r.status != "ok":
+            note = f"{r.status}: {'; '.join(r.errors)}"
+        elif not r.connected_port_port:
             note = r.modules_parsed_note_pp
         elif not r.connected_port_inst:
             note = r.modules_parsed_note_pi
@@ -1440,11 +1495,33 @@ def format_stress_report(results: Sequence[StressTrialResult]) -> str:
             f"{r.elab_sec * 1e3:7.1f}  {r.connect_sec * 1e3:7.1f}  "
             f"{r.total_sec * 1e3:8.1f}  {note}"
         )
-    totals = [r.total_sec for r in results]
-    lines.append(
-        f"avg total_ms: {sum(totals) / len(totals) * 1e3:.1f}  "
-        f"max total_ms: {max(totals) * 1e3:.1f}"
-    )
+    # A timed-out trial's total_sec is only the time until it was killed.
+    totals = [r.total_sec for r in results if r.status == "ok"]
+    if totals:
+        lines.append(
+            f"avg total_ms: {sum(totals) / len(totals) * 1e3:.1f}  "
+            f"max total_ms: {max(totals) * 1e3:.1f}  (n={len(totals)} ok)"
+        )
+    failed = [r for r in results if r.status != "ok"]
+    if failed:
+        lines.append(
+            f"failed trials: {len(failed)}  "
+            f"timeouts: {sum(1 for r in failed if r.status == 'timeout')}  "
+            f"errors: {sum(1 for r in failed if r.status == 'error')}"
+        )
+    if len(results) > 1:
+        from hierwalk.trial_runner import format_phase_percentiles
+
+        lines.extend(
+            format_phase_percentiles(
+                [
+                    {phase: getattr(r, f"{phase}_sec") for phase in STRESS_PHASES}
+                    for r in results
+                    if r.status == "ok"
+                ],
+                STRESS_PHASES,
+            )
+        )
     return "\n".join(lines)
 
 
@@ -1467,8 +1544,53 @@ if __name__ == "__main__":
         metavar="DIR",
         help="write RTL, filelist.f, and connect.json for a single generated design",
     )
+    parser.add_argument(
+        "--scale",
+        choices=("ci", "million"),
+        default=None,
+        help="stream an SoC-scale design + endpoint manifest to --out-dir "
+        "(hierwalk.stress_scale)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="parallel trial processes (0 = CPU count)",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        metavar="SEC",
+        help="per-trial timeout; runs each trial in its own process",
+    )
+    parser.add_argument(
+        "--results",
+        default=None,
+        metavar="JSONL",
+        help="append per-trial results here and skip seeds already recorded",
+    )
     args = parser.parse_args()
     profile = STANDARD_CONFIG if args.standard else EXTREME_CONFIG
+    if args.scale:
+        from dataclasses import replace
+
+        from hierwalk.stress_scale import ScaleConfig, write_scale_design
+
+        if not args.out_dir:
+            parser.error("--scale requires --out-dir")
+        scale_cfg = ScaleConfig.million() if args.scale == "million" else ScaleConfig()
+        if args.seed is not None:
+            scale_cfg = replace(scale_cfg, seed=args.seed)
+        scale = write_scale_design(args.out_dir, scale_cfg)
+        print(
+            f"wrote {scale.files} files, ~{scale.instances} instances, "
+            f"{len(scale.endpoint_pairs)} endpoint pairs"
+        )
+        print(f"filelist: {scale.filelist}")
+        print(f"manifest: {scale.manifest}")
+        raise SystemExit(0)
     if args.seed is not None or args.depth is not None:
         design = generate_stress_design(
             seed=args.seed,
@@ -1490,6 +1612,12 @@ if __name__ == "__main__":
     else:
         print(
             format_stress_report(
-                run_stress_batch(args.trials, config=profile),
+                run_stress_batch(
+                    args.trials,
+                    config=profile,
+                    jobs=args.jobs,
+                    timeout_sec=args.timeout,
+                    results_path=args.results,
+                ),
             )
         )
\ No newline at end of file
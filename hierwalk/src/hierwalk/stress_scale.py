@@ -0,0 +1,353 @@
+"""SoC-scale synthetic designs streamed to disk (``stress_gen --scale``).
+
+:mod:`hierwalk.stress_gen` builds small, adversarial designs in memory.  This
+module writes designs shaped like a large SoC — clusters of parameterized IP
+arrays behind nested generate loops, per-IP pipeline stage modules (one file
+each), bind files, and an ``ifdef``-selected include tree — directly to disk,
+one file at a time, so design size is bounded by the disk rather than RAM.
+
+Layout under the output dir::
+
+    filelist.f          +incdir+/+define+ and -f to the sub-filelists
+    ip.f / cluster.f    one source per line
+    inc/                scale_cfg.vh -> tech/<tech>.vh + bus/bus_defs.vh
+    ip/                 scale_ip<k>.sv + stage/scale_s<k>_<d>.sv
+    cluster/            scale_cl<c>.sv (generate g_row[r].g_col[c] IP arrays)
+    bind/               scale_binds.sv (bind scale_mon into every IP type)
+    scale_top.sv
+    manifest.json       config, file/instance counts, connected endpoint pairs
+    scale.connect.json  the same pairs as a connectivity request
+
+Every manifest pair is a straight port chain (top ``din`` through cluster,
+generate scope, IP and all stage modules), so a correct tool must report it
+connected at any scale.  :meth:`ScaleConfig.million` yields ~1.2M instances
+in ~18k files.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import textwrap
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from hierwalk.connect_request import (
+    ConnectivityCheck,
+    ConnectivityRequest,
+    write_connect_request,
+)
+
+SCALE_TOP = "scale_top"
+
+
+@dataclass(frozen=True)
+class ScaleConfig:
+    """Scale profile; defaults are a CI-sized design (553 instances, 38 files)."""
+
+    clusters: int = 8
+    rows: int = 4
+    cols: int = 4
+    ip_types: int = 6
+    stage_depth: int = 3
+    tech: str = "A"  # A -> SCALE_W 8, B -> SCALE_W 16 (selected via +define+)
+    pairs_per_cluster: int = 2
+    seed: int = 20260613
+
+    @classmethod
+    def million(cls) -> ScaleConfig:
+        return cls(clusters=256, rows=8, cols=64, ip_types=2000, stage_depth=8)
+
+    @property
+    def width(self) -> int:
+        return 16 if self.tech.upper() == "B" else 8
+
+    @property
+    def defines(self) -> Dict[str, str]:
+        return {f"SCALE_TECH_{self.tech.upper()}": "1"}
+
+    @property
+    def file_count(self) -> int:
+        # ip + stages per type, clusters, top, bind, 4 include files.
+        return self.ip_types * (1 + self.stage_depth) + self.clusters + 1 + 1 + 4
+
+    @property
+    def instance_count(self) -> int:
+        """Elaborated hierarchy rows: top, clusters, IPs and stages (no bind monitors)."""
+        ips = self.clusters * (1 + self.rows * self.cols)
+        return 1 + self.clusters + ips * (1 + self.stage_depth)
+
+
+@dataclass(frozen=True)
+class ScaleDesign:
+    root: Path
+    top: str
+    filelist: Path
+    manifest: Path
+    connect_request: Path
+    config: ScaleConfig
+    files: int
+    instances: int
+    endpoint_pairs: Tuple[Tuple[str, str], ...]
+
+
+def _cluster_ip_types(cfg: ScaleConfig) -> List[int]:
+    rng = random.Random(cfg.seed)
+    return [rng.randrange(cfg.ip_types) for _ in range(cfg.clusters)]
+
+
+def _include_files() -> Iterator[Tuple[str, str]]:
+    yield "inc/scale_cfg.vh", textwrap.dedent(
+        """\
+        `ifndef SCALE_CFG_VH
+        `define SCALE_CFG_VH
+        `ifdef SCALE_TECH_B
+          `include "tech/tech_b.vh"
+        `else
+          `include "tech/tech_a.vh"
+        `endif
+        `include "bus/bus_defs.vh"
+        `endif
+        """
+    )
+    yield "inc/tech/tech_a.vh", "`define SCALE_W 8\n"
+    yield "inc/tech/tech_b.vh", "`define SCALE_W 16\n"
+    yield "inc/bus/bus_defs.vh", textwrap.dedent(
+        """\
+        `ifndef SCALE_BUS_VH
+        `define SCALE_BUS_VH
+        `define SCALE_BUS(w) logic [(w)-1:0]
+        `endif
+        """
+    )
+
+
+def _stage_module(k: int, d: int, depth: int) -> str:
+    name = f"scale_s{k}_{d}"
+    if d + 1 < depth:
+        inner = (
+            f"  scale_s{k}_{d + 1} #(.W(W)) u_s (.clk(clk), .d(d), .q(q_next));\n"
+            f"  always_ff @(posedge clk) q <= q_next;\n"
+        )
+        decl = "  logic [W-1:0] q_next;\n"
+    else:
+        inner = "  always_ff @(posedge clk) q <= d;\n"
+        decl = ""
+    return (
+        '`include "scale_cfg.vh"\n'
+        f"module {name} #(parameter int W = `SCALE_W) (\n"
+        "  input  logic         clk,\n"
+        "  input  logic [W-1:0] d,\n"
+        "  output logic [W-1:0] q\n"
+        ");\n"
+        f"{decl}{inner}"
+        "endmodule\n"
+    )
+
+
+def _ip_module(k: int) -> str:
+    return textwrap.dedent(
+        f"""\
+        `include "scale_cfg.vh"
+        module scale_ip{k} #(
+          parameter int W  = `SCALE_W,
+          parameter int ID = 0
+        ) (
+          input  logic         clk,
+          input  logic [W-1:0] din,
+          output logic [W-1:0] dout
+        );
+          scale_s{k}_0 #(.W(W)) u_s (.clk(clk), .d(din), .q(dout));
+        endmodule
+        """
+    )
+
+
+def _cluster_module(c: int, k: int, cfg: ScaleConfig) -> str:
+    lanes = cfg.rows * cfg.cols
+    return textwrap.dedent(
+        f"""\
+        `include "scale_cfg.vh"
+        module scale_cl{c} #(
+          parameter int ROWS = {cfg.rows},
+          parameter int COLS = {cfg.cols}
+        ) (
+          input  logic               clk,
+          input  `SCALE_BUS(`SCALE_W) din,
+          output `SCALE_BUS(`SCALE_W) dout
+        );
+          logic [`SCALE_W-1:0] head_q;
+          logic [`SCALE_W-1:0] lane_q [0:{lanes - 1}];
+          scale_ip{k} #(.W(`SCALE_W), .ID(0)) u_head (.clk(clk), .din(din), .dout(head_q));
+          generate
+            for (genvar r = 0; r < ROWS; r++) begin : g_row
+              for (genvar c = 0; c < COLS; c++) begin : g_col
+                scale_ip{k} #(.W(`SCALE_W), .ID(r * COLS + c + 1)) u_ip (
+                  .clk (clk),
+                  .din (din),
+                  .dout(lane_q[r * COLS + c])
+                );
+              end
+            end
+          endgenerate
+          assign dout = head_q ^ lane_q[0];
+        endmodule
+        """
+    )
+
+
+def _top_module(cfg: ScaleConfig) -> str:
+    insts = "\n".join(
+        f"  scale_cl{c} u_cl{c} (.clk(clk), .din(din), .dout(cl_q[{c}]));"
+        for c in range(cfg.clusters)
+    )
+    return (
+        '`include "scale_cfg.vh"\n'
+        f"module {SCALE_TOP} (\n"
+        "  input  logic                clk,\n"
+        "  input  logic [`SCALE_W-1:0] din,\n"
+        f"  output logic [{cfg.clusters - 1}:0] any_q\n"
+        ");\n"
+        f"  logic [`SCALE_W-1:0] cl_q [0:{cfg.clusters - 1}];\n"
+        f"{insts}\n"
+        "  generate\n"
+        f"    for (genvar c = 0; c < {cfg.clusters}; c++) begin : g_or\n"
+        "      assign any_q[c] = |cl_q[c];\n"
+        "    end\n"
+        "  endgenerate\n"
+        "endmodule\n"
+    )
+
+
+def _bind_file(cfg: ScaleConfig) -> str:
+    lines = [
+        '`include "scale_cfg.vh"',
+        "module scale_mon #(parameter int W = `SCALE_W) (",
+        "  input logic         clk,",
+        "  input logic [W-1:0] sig",
+        ");",
+        "endmodule",
+        "",
+    ]
+    lines.extend(
+        f"bind scale_ip{k} scale_mon #(.W(W)) u_mon (.clk(clk), .sig(din));"
+        for k in range(cfg.ip_types)
+    )
+    return "\n".join(lines) + "\n"
+
+
+def _stage_leaf_path(base: str, depth: int) -> str:
+    return base + ".u_s" * depth + ".d"
+
+
+def scale_endpoint_pairs(cfg: ScaleConfig) -> Iterator[Tuple[str, str]]:
+    """Known-connected pairs: top ``din`` to the last stage input of sampled IPs."""
+    rng = random.Random(cfg.seed ^ 0x5CA1E)
+    src = f"{SCALE_TOP}.din"
+    for c in range(cfg.clusters):
+        cluster = f"{SCALE_TOP}.u_cl{c}"
+        yield src, _stage_leaf_path(f"{cluster}.u_head", cfg.stage_depth)
+        for _ in range(max(0, cfg.pairs_per_cluster - 1)):
+            r = rng.randrange(cfg.rows)
+            col = rng.randrange(cfg.cols)
+            ip = f"{cluster}.g_row[{r}].g_col[{col}].u_ip"
+            yield src, _stage_leaf_path(ip, cfg.stage_depth)
+
+
+def iter_scale_files(cfg: ScaleConfig) -> Iterator[Tuple[str, str]]:
+    """Yield ``(relative path, text)`` one file at a time (includes, IP, clusters, top)."""
+    yield from _include_files()
+    for k in range(cfg.ip_types):
+        yield f"ip/scale_ip{k}.sv", _ip_module(k)
+        for d in range(cfg.stage_depth):
+            yield f"ip/stage/scale_s{k}_{d}.sv", _stage_module(k, d, cfg.stage_depth)
+    for c, k in enumerate(_cluster_ip_types(cfg)):
+        yield f"cluster/scale_cl{c}.sv", _cluster_module(c, k, cfg)
+    yield "bind/scale_binds.sv", _bind_file(cfg)
+    yield f"{SCALE_TOP}.sv", _top_module(cfg)
+
+
+def write_scale_design(
+    out_dir: Union[str, Path],
+    config: Optional[ScaleConfig] = None,
+) -> ScaleDesign:
+    """Stream a scale design to *out_dir*; only the current file is held in memory."""
+    cfg = config or ScaleConfig()
+    root = Path(out_dir).resolve()
+    root.mkdir(parents=True, exist_ok=True)
+    lists = {
+        "ip": (root / "ip.f").open("w", encoding="utf-8"),
+        "cluster": (root / "cluster.f").open("w", encoding="utf-8"),
+    }
+    files = 0
+    made_dirs = set()
+    try:
+        for rel, text in iter_scale_files(cfg):
+            path = root / rel
+            if path.parent not in made_dirs:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                made_dirs.add(path.parent)
+            path.write_text(text, encoding="utf-8")
+            files += 1
+            group = rel.split("/", 1)[0]
+            if group in lists:
+                lists[group].write(f"{path}\n")
+    finally:
+        for fh in lists.values():
+            fh.close()
+
+    define_lines = "".join(f"+define+{k}={v}\n" for k, v in cfg.defines.items())
+    filelist = root / "filelist.f"
+    filelist.write_text(
+        f"+incdir+{root / 'inc'}\n"
+        f"{define_lines}"
+        f"-f {root / 'ip.f'}\n"
+        f"-f {root / 'cluster.f'}\n"
+        f"{root / 'bind' / 'scale_binds.sv'}\n"
+        f"{root / (SCALE_TOP + '.sv')}\n",
+        encoding="utf-8",
+    )
+
+    pairs = tuple(scale_endpoint_pairs(cfg))
+    connect_path = root / "scale.connect.json"
+    write_connect_request(
+        connect_path,
+        ConnectivityRequest(
+            top=SCALE_TOP,
+            defines=dict(cfg.defines),
+            include_ff=True,
+            trace=False,
+            checks=tuple(
+                ConnectivityCheck(a, b, check_id=f"scale_{i}")
+                for i, (a, b) in enumerate(pairs)
+            ),
+        ),
+    )
+    manifest = root / "manifest.json"
+    manifest.write_text(
+        json.dumps(
+            {
+                "top": SCALE_TOP,
+                "config": asdict(cfg),
+                "defines": cfg.defines,
+                "files": files,
+                "instances": cfg.instance_count,
+                "connected_pairs": [list(p) for p in pairs],
+            },
+            indent=2,
+        )
+        + "\n",
+        encoding="utf-8",
+    )
+    return ScaleDesign(
+        root=root,
+        top=SCALE_TOP,
+        filelist=filelist,
+        manifest=manifest,
+        connect_request=connect_path,
+        config=cfg,
+        files=files,
+        instances=cfg.instance_count,
+        endpoint_pairs=pairs,
+    )
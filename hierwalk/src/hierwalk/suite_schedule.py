@@ -0,0 +1,338 @@
+"""DAG-aware parallel executor for flat run suites (``HIERWALK_SUITE_PARALLEL``).
+
+``build_test_run_configs`` yields an ordered plan that the CLI normally runs
+one step at a time.  Independent ``run_conn_check`` / ``run_io_trace`` /
+``run_cone_trace`` steps against the same index only need the index (and, for
+path-walk, the suite session) to be warm; after that they can run side by
+side.  :func:`plan_suite_dag` derives the dependencies:
+
+* ``run_on_full_index`` and non-suite steps are barriers (run in the parent).
+* The first verification step of each index group (strategy + filelist + top
+  + defines + ignore rules) is the group's *warm* step and runs in the parent,
+  so the index/elab cache and path-walk suite session are built once.
+* Steps that share an output file (the same TSV/log/graph path) are chained
+  so their files are never written concurrently.  Steps writing to stdout
+  (``output: "-"``) are not chained: each one's stdout is buffered and
+  written in plan order.
+
+:func:`run_suite_dag` then executes ready steps wave by wave: parent steps
+serially, the rest in a ``fork`` process pool that inherits the warm state.
+A step returns its exit code plus flags (what it saw, for end-of-run hints);
+both come back from the pool, since a child cannot update the parent's state.
+Each step writes its own TSV/log as it finishes; buffered stdout is
+emitted once every earlier stdout step has been emitted.  Platforms without ``fork``
+fall back to the serial order.
+"""
+
+from __future__ import annotations
+
+import io
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+from hierwalk.progress import format_duration
+from hierwalk.run_request import RUN_ON_FULL_INDEX, RunConfig, normalize_run_mode
+from hierwalk.run_tests import RunTestEntry
+from hierwalk.verification_timing import StepTiming, suite_recorder
+
+SuitePlan = Sequence[Tuple[Optional[RunTestEntry], RunConfig]]
+# (exit code, flags the step raised)
+StepResult = Tuple[int, FrozenSet[str]]
+StepRunner = Callable[[Optional[RunTestEntry], RunConfig], StepResult]
+
+_NO_FLAGS: FrozenSet[str] = frozenset()
+
+_PREFIX = "run: suite-parallel"
+
+
+def suite_parallel_workers() -> int:
+    """Parallel suite workers from ``HIERWALK_SUITE_PARALLEL`` (0/1 = serial)."""
+    raw = os.environ.get("HIERWALK_SUITE_PARALLEL", "").strip().lower()
+    if raw in ("", "0", "1", "off", "false", "no", "disable", "disabled"):
+        return 0
+    if raw in ("auto", "on", "true", "yes"):
+        return os.cpu_count() or 1
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        return 0
+
+
+@dataclass(frozen=True)
+class SuiteNode:
+    """One plan step plus the plan positions it must wait for."""
+
+    position: int
+    entry: Optional[RunTestEntry]
+    cfg: RunConfig
+    deps: Tuple[int, ...]
+    in_parent: bool
+    label: str
+
+
+def _step_label(entry: Optional[RunTestEntry], cfg: RunConfig, position: int) -> str:
+    if entry is not None:
+        return entry.name or f"{entry.kind}[{entry.index}]"
+    return cfg.verification_step_name or f"step[{position}]"
+
+
+def _index_group_key(cfg: RunConfig) -> Tuple:
+    strategy = normalize_run_mode(cfg.index_strategy or "full-index")
+    return (
+        strategy,
+        cfg.filelist,
+        cfg.index_cwd or "",
+        cfg.top or "",
+        cfg.defines,
+        cfg.ignore_path,
+        cfg.ignore_path_file,
+        cfg.ignore_module,
+        cfg.ignore_filelist,
+        cfg.cache_dir or "",
+        cfg.no_cache,
+    )
+
+
+def _writes_stdout(cfg: RunConfig) -> bool:
+    return cfg.output in ("", "-")
+
+
+def _output_targets(cfg: RunConfig) -> Set[str]:
+    targets: Set[str] = set()
+    if not _writes_stdout(cfg):
+        targets.add(os.path.abspath(cfg.output))
+    if cfg.log_file and not cfg.no_log_file:
+        targets.add(os.path.abspath(cfg.log_file))
+    elif not cfg.no_log_file and cfg.output not in ("", "-"):
+        # default_log_path(): <work_dir>/<output stem>.hier-walk.log
+        targets.add(f"log:{os.path.splitext(os.path.basename(cfg.output))[0]}")
+    if cfg.cone_graph:
+        targets.add(os.path.abspath(cfg.cone_graph))
+    return targets
+
+
+def plan_suite_dag(plan: SuitePlan) -> List[SuiteNode]:
+    """Dependency graph over *plan* (positions are plan order)."""
+    nodes: List[SuiteNode] = []
+    barrier: Optional[int] = None
+    since_barrier: List[int] = []
+    warm_for_group: Dict[Tuple, int] = {}
+    last_writer: Dict[str, int] = {}
+    for pos, (entry, cfg) in enumerate(plan):
+        is_barrier = entry is None or entry.kind == RUN_ON_FULL_INDEX
+        deps: Set[int] = set()
+        if is_barrier:
+            deps.update(since_barrier)
+            if barrier is not None:
+                deps.add(barrier)
+        elif barrier is not None:
+            deps.add(barrier)
+        group = _index_group_key(cfg)
+        warm = warm_for_group.get(group)
+        in_parent = is_barrier
+        if not is_barrier:
+            if warm is None:
+                warm_for_group[group] = pos
+                in_parent = True
+            else:
+                deps.add(warm)
+        for target in _output_targets(cfg):
+            prev = last_writer.get(target)
+            if prev is not None:
+                deps.add(prev)
+            last_writer[target] = pos
+        nodes.append(
+            SuiteNode(
+                position=pos,
+                entry=entry,
+                cfg=cfg,
+                deps=tuple(sorted(deps)),
+                in_parent=in_parent,
+                label=_step_label(entry, cfg, pos),
+            )
+        )
+        if is_barrier:
+            barrier = pos
+            since_barrier = []
+            # Verification after a full-index step reuses its caches; re-warm groups.
+            warm_for_group = {}
+        else:
+            since_barrier.append(pos)
+    return nodes
+
+
+def _split_jobs(cfg: RunConfig, per_worker: int) -> RunConfig:
+    if cfg.jobs <= 0 or cfg.jobs > per_worker:
+        return replace(cfg, jobs=per_worker)
+    return cfg
+
+
+def _run_buffered(
+    run_step: StepRunner,
+    entry: Optional[RunTestEntry],
+    cfg: RunConfig,
+) -> Tuple[StepResult, str]:
+    """Run one step; a stdout step's output is returned instead of written."""
+    if not _writes_stdout(cfg):
+        return run_step(entry, cfg), ""
+    buf = io.StringIO()
+    with redirect_stdout(buf):
+        result = run_step(entry, cfg)
+    return result, buf.getvalue()
+
+
+class _StdoutInOrder:
+    """Write buffered step stdout in plan order as steps finish."""
+
+    def __init__(self, nodes: Sequence[SuiteNode]) -> None:
+        self._order = [n.position for n in nodes if _writes_stdout(n.cfg)]
+        self._next = 0
+        self._held: Dict[int, str] = {}
+
+    def finished(self, position: int, text: str) -> None:
+        self._held[position] = text
+        while self._next < len(self._order) and self._order[self._next] in self._held:
+            out = self._held.pop(self._order[self._next])
+            self._next += 1
+            if out:
+                sys.stdout.write(out)
+        sys.stdout.flush()
+
+
+# Inherited by ``fork`` workers; never pickled.
+_WORKER_NODES: List[SuiteNode] = []
+_WORKER_RUNNER: Optional[StepRunner] = None
+
+
+def _run_node_in_worker(
+    position: int,
+) -> Tuple[int, StepResult, str, List[StepTiming], float]:
+    node = _WORKER_NODES[position]
+    assert _WORKER_RUNNER is not None
+    recorder = suite_recorder()
+    before = len(recorder.steps)
+    t0 = time.perf_counter()
+    out = ""
+    try:
+        result, out = _run_buffered(_WORKER_RUNNER, node.entry, node.cfg)
+    except SystemExit as exc:  # ap.error in a worker
+        result = (exc.code if isinstance(exc.code, int) else 2, _NO_FLAGS)
+    sys.stdout.flush()
+    sys.stderr.flush()
+    return position, result, out, list(recorder.steps[before:]), time.perf_counter() - t0
+
+
+def _quiesce_before_fork() -> None:
+    """Stop background thread/process pools that a forked child cannot reuse."""
+    try:
+        from hierwalk.path_walk import quiesce_path_walk_suite_session
+    except ImportError:
+        return
+    quiesce_path_walk_suite_session()
+
+
+def run_suite_dag(
+    plan: SuitePlan,
+    run_step: StepRunner,
+    *,
+    workers: int,
+    jobs_budget: int = 0,
+    quiet: bool = False,
+) -> List[StepResult]:
+    """
+    Run *plan* honouring :func:`plan_suite_dag`; return per-step results.
+
+    *jobs_budget* (0 = CPU count) is shared by concurrent workers: each pool
+    step gets ``budget // workers`` index/connect jobs.
+    """
+    global _WORKER_NODES, _WORKER_RUNNER
+    nodes = plan_suite_dag(plan)
+    results: List[StepResult] = [(0, _NO_FLAGS)] * len(nodes)
+    if not nodes:
+        return results
+    budget = jobs_budget if jobs_budget > 0 else (os.cpu_count() or 1)
+    workers = max(1, min(workers, budget))
+    if "fork" not in multiprocessing.get_all_start_methods():
+        workers = 1
+    per_worker = max(1, budget // workers)
+    recorder = suite_recorder()
+
+    def _log(msg: str) -> None:
+        if not quiet:
+            print(f"{_PREFIX} {msg}", file=sys.stderr, flush=True)
+
+    _log(
+        f"{len(nodes)} step(s), workers={workers}, jobs/worker={per_worker} "
+        f"(budget {budget})"
+    )
+    stdout = _StdoutInOrder(nodes)
+    done: Set[int] = set()
+    pending = list(nodes)
+    while pending:
+        ready = [n for n in pending if all(d in done for d in n.deps)]
+        if not ready:  # defensive: deps always point backwards
+            ready = [pending[0]]
+        parent_ready = [n for n in ready if n.in_parent or workers == 1]
+        if parent_ready:
+            for node in parent_ready:
+                t0 = time.perf_counter()
+                results[node.position], out = _run_buffered(
+                    run_step, node.entry, node.cfg
+                )
+                stdout.finished(node.position, out)
+                done.add(node.position)
+                pending.remove(node)
+                _log(
+                    f"done {node.label} rc={results[node.position][0]} "
+                    f"{format_duration(time.perf_counter() - t0)} (parent)"
+                )
+            continue
+
+        wave = [replace(n, cfg=_split_jobs(n.cfg, per_worker)) for n in ready]
+        _WORKER_NODES = list(nodes)
+        for node in wave:
+            _WORKER_NODES[node.position] = node
+        _WORKER_RUNNER = run_step
+        _log(f"wave {len(wave)} step(s): " + ", ".join(n.label for n in wave))
+        _quiesce_before_fork()
+        sys.stdout.flush()
+        sys.stderr.flush()
+        ctx = multiprocessing.get_context("fork")
+        try:
+            with ProcessPoolExecutor(
+                max_workers=min(workers, len(wave)),
+                mp_context=ctx,
+            ) as pool:
+                futures = {
+                    pool.submit(_run_node_in_worker, n.position): n.position
+                    for n in wave
+                }
+                for fut in as_completed(futures):
+                    position = futures[fut]
+                    try:
+                        _pos, result, out, steps, elapsed = fut.result()
+                    except Exception as exc:  # worker crashed (BrokenProcessPool, …)
+                        results[position] = (1, _NO_FLAGS)
+                        stdout.finished(position, "")
+                        done.add(position)
+                        _log(f"FAILED {nodes[position].label}: {exc!r}")
+                        continue
+                    results[position] = result
+                    stdout.finished(position, out)
+                    recorder.steps.extend(steps)
+                    done.add(position)
+                    _log(
+                        f"done {nodes[position].label} rc={result[0]} "
+                        f"{format_duration(elapsed)}"
+                    )
+        finally:
+            _WORKER_NODES = []
+            _WORKER_RUNNER = None
+        pending = [n for n in pending if n.position not in done]
+    return results
@@ -28,14 +28,7 @@ def find_top_modules(index: DesignIndex) -> List[str]:
     Matches hc_hierarchy / regexVerilogAST intent but skips IP/orphan stubs
     created by ``--ignore-path``.
     """
-    instantiated: set[str] = set()
-    for rec in index.modules.values():
-        if rec.needs_generate_fold:
-            edges = index.instances_for(rec.module_name, {}, {})
-        else:
-            edges = rec.instances
-        for edge in edges:
-            instantiated.add(edge.child_module)
+    instantiated = index.instantiation_graph()
 
     candidates = [
         name
@@ -0,0 +1,391 @@
+"""Buffered binary trace sink for path-walk / connectivity traces (``HIERWALK_TRACE_SINK``).
+
+Text trace logging formats a timestamped line per walked node and hop and
+flushes it synchronously; on large runs that is a large share of runtime and
+log volume.  :class:`TraceSink` instead queues ``(time, level, category,
+message)`` tuples and a background thread encodes them into a gzip stream
+beside the run log (``<run>.hier-walk.trace.gz``)::
+
+    HWTRACE1 <start time f64>             session header (one per open)
+    <kind u8> <level u8> <cat u16> <time f64> <len u32> <utf-8 payload>
+
+``kind`` is 0 (category name for ``cat``), 1 (message) or 2 (rate-limited
+line count for ``cat``, written on close).  Appended sessions are separate
+gzip members, so one file can hold every trace of a run.
+
+Records below ``HIERWALK_TRACE_LEVEL`` are discarded before queueing, and
+``HIERWALK_TRACE_RATE`` caps the lines kept per category per second.  The sink
+is also a text stream: lines printed to it are parsed back into records, so
+code that ``print``\\s to a log handle works unchanged.
+
+Decode and filter afterwards with ``python -m hierwalk.trace_sink TRACE``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import io
+import logging
+import re
+import struct
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+WARN = logging.WARNING
+
+TRACE_MAGIC = b"HWTRACE1"
+_START = struct.Struct("<d")
+_REC = struct.Struct("<BBHdI")
+_K_CATEGORY = 0
+_K_MESSAGE = 1
+_K_DROPPED = 2
+_MAX_CATEGORIES = 0xFFFF
+DEFAULT_MAX_PENDING = 1 << 16
+_FLUSH_SEC = 0.25
+
+_LEVEL_NAMES = {DEBUG: "debug", INFO: "info", WARN: "warn"}
+_TEXT_LINE_RE = re.compile(
+    r"^(?:\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2} )?\[hier-walk(?: ([\w-]+))?\]\s?(.*)$"
+)
+
+
+class TraceRecord(NamedTuple):
+    time: float
+    level: int
+    category: str
+    message: str
+
+
+def parse_trace_level(raw: str, default: int = INFO) -> int:
+    """``debug``/``info``/``warn`` (or a number) -> logging level."""
+    key = raw.strip().lower()
+    for level, name in _LEVEL_NAMES.items():
+        if key == name:
+            return level
+    if key == "warning":
+        return WARN
+    try:
+        return int(key)
+    except ValueError:
+        return default
+
+
+def trace_sink_path(log_path: Path) -> Path:
+    """``<run>.hier-walk.log`` -> ``<run>.hier-walk.trace.gz``."""
+    return log_path.with_name(f"{log_path.stem}.trace.gz")
+
+
+def _text_line_record(line: str) -> Tuple[str, str]:
+    m = _TEXT_LINE_RE.match(line)
+    if m is None:
+        return "log", line
+    return m.group(1) or "hier-walk", m.group(2)
+
+
+class TraceSink(io.TextIOBase):
+    """
+    Asynchronous gzip trace writer with level filtering and per-category rate limits.
+
+    :meth:`emit` only filters and queues; encoding, compression and I/O run on
+    a writer thread.  At most *max_pending* records wait in memory — producers
+    block beyond that instead of growing the queue.  If the writer thread fails
+    (e.g. disk full) its exception is kept in :attr:`error` and later records
+    are counted in :attr:`lost` and discarded instead of blocking.  Safe to
+    share between threads; :meth:`close` drains the queue.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        level: int = INFO,
+        rate_per_sec: int = 0,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        compresslevel: int = 1,
+    ) -> None:
+        super().__init__()
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.level = level
+        self.rate_per_sec = rate_per_sec
+        self.written = 0
+        self.dropped: Dict[str, int] = {}
+        self.error: Optional[BaseException] = None
+        self.lost = 0
+        self._max_pending = max(1, max_pending)
+        self._fh = gzip.open(self.path, "ab", compresslevel=compresslevel)
+        self._fh.write(TRACE_MAGIC + _START.pack(time.time()))
+        self._cats: Dict[str, int] = {}  # writer thread only
+        self._window: Dict[str, Tuple[int, int]] = {}  # category -> (second, count)
+        self._pending: List[Tuple[float, int, str, str]] = []
+        self._partial = ""
+        self._closing = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(
+            target=self._run, name="hierwalk-trace-sink", daemon=True
+        )
+        self._thread.start()
+
+    def emit(self, category: str, message: str, level: int = INFO) -> None:
+        if level < self.level or not message:
+            return
+        now = time.time()
+        with self._cond:
+            if self._closing:
+                return
+            if self.error is not None:
+                self.lost += 1
+                return
+            if self.rate_per_sec > 0:
+                sec = int(now)
+                start, count = self._window.get(category, (sec, 0))
+                if start != sec:
+                    start, count = sec, 0
+                if count >= self.rate_per_sec:
+                    self.dropped[category] = self.dropped.get(category, 0) + 1
+                    return
+                self._window[category] = (start, count + 1)
+            while (
+                len(self._pending) >= self._max_pending
+                and not self._closing
+                and self.error is None
+            ):
+                self._cond.wait()
+            if self.error is not None:
+                self.lost += 1
+                return
+            if not self._pending:
+                self._cond.notify_all()
+            self._pending.append((now, level, category, message))
+
+    # -- text stream adapter ------------------------------------------------
+
+    def writable(self) -> bool:
+        return True
+
+    def isatty(self) -> bool:
+        return False
+
+    def write(self, s: str) -> int:
+        if self.closed:
+            raise ValueError("write to closed trace sink")
+        with self._cond:
+            text = self._partial + s
+            if "\n" not in text:
+                self._partial = text
+                return len(s)
+            *lines, self._partial = text.split("\n")
+        for line in lines:
+            if line.strip():
+                category, message = _text_line_record(line)
+                self.emit(category, message)
+        return len(s)
+
+    def flush(self) -> None:
+        """No-op: records reach disk from the writer thread (``print(flush=True)`` stays cheap)."""
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        if self._partial.strip():
+            category, message = _text_line_record(self._partial)
+            self.emit(category, message)
+        self._partial = ""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join()
+        if self.error is not None:
+            try:
+                self._fh.close()
+            except OSError:
+                pass
+            super().close()
+            return
+        try:
+            now = time.time()
+            out = bytearray()
+            for category, count in self.dropped.items():
+                cid = self._category_id(category, now, out)
+                payload = str(count).encode("ascii")
+                out += _REC.pack(_K_DROPPED, WARN, cid, now, len(payload)) + payload
+            if out:
+                self._fh.write(bytes(out))
+        finally:
+            self._fh.close()
+            super().close()
+
+    # -- writer thread ------------------------------------------------------
+
+    def _category_id(self, category: str, ts: float, out: bytearray) -> int:
+        cid = self._cats.get(category)
+        if cid is None:
+            if len(self._cats) >= _MAX_CATEGORIES - 1 and category != "other":
+                return self._category_id("other", ts, out)
+            cid = self._cats[category] = len(self._cats)
+            name = category.encode("utf-8", "replace")
+            out += _REC.pack(_K_CATEGORY, 0, cid, ts, len(name)) + name
+        return cid
+
+    def _run(self) -> None:
+        try:
+            self._drain()
+        except Exception as exc:
+            with self._cond:
+                self.error = exc
+                self.lost += len(self._pending)
+                self._pending = []
+                self._cond.notify_all()
+            print(
+                f"trace sink: writing {self.path} failed ({exc}); dropping further records",
+                file=sys.stderr,
+            )
+
+    def _drain(self) -> None:
+        while True:
+            with self._cond:
+                if not self._pending and not self._closing:
+                    self._cond.wait(_FLUSH_SEC)
+                batch, self._pending = self._pending, []
+                closing = self._closing
+                self._cond.notify_all()
+            if batch:
+                out = bytearray()
+                for ts, level, category, message in batch:
+                    cid = self._category_id(category, ts, out)
+                    data = message.encode("utf-8", "replace")
+                    out += _REC.pack(_K_MESSAGE, level, cid, ts, len(data)) + data
+                self._fh.write(bytes(out))
+                self.written += len(batch)
+            elif closing:
+                return
+
+
+def read_trace(path: Path) -> Iterator[TraceRecord]:
+    """
+    Decode every session in a trace file, in write order.
+
+    Rate-limited counts come back as ``warn`` records.  A file cut short by a
+    killed run yields the records before the damage.
+    """
+    with gzip.open(Path(path), "rb") as fh:
+        cats: Dict[int, str] = {}
+        try:
+            while True:
+                head = fh.read(1)
+                if not head:
+                    return
+                if head == TRACE_MAGIC[:1]:
+                    rest = fh.read(len(TRACE_MAGIC) - 1 + _START.size)
+                    if rest[: len(TRACE_MAGIC) - 1] != TRACE_MAGIC[1:]:
+                        return
+                    cats = {}
+                    continue
+                hdr = head + fh.read(_REC.size - 1)
+                if len(hdr) < _REC.size:
+                    return
+                kind, level, cid, ts, size = _REC.unpack(hdr)
+                payload = fh.read(size)
+                if len(payload) < size:
+                    return
+                text = payload.decode("utf-8", "replace")
+                if kind == _K_CATEGORY:
+                    cats[cid] = text
+                elif kind == _K_MESSAGE:
+                    yield TraceRecord(ts, level, cats.get(cid, "?"), text)
+                elif kind == _K_DROPPED:
+                    yield TraceRecord(
+                        ts, level, cats.get(cid, "?"), f"rate-limited: {text} line(s) dropped"
+                    )
+        except (EOFError, OSError, zlib.error):
+            return
+
+
+def format_trace_record(rec: TraceRecord) -> str:
+    """Same shape as the text run log: ``stamp [hier-walk <category>] message``."""
+    stamp = datetime.fromtimestamp(rec.time).strftime("%Y-%m-%d %H:%M:%S")
+    tag = rec.category.split(".", 1)[0]  # path-walk.pw-db -> path-walk
+    return f"{stamp} [hier-walk {tag}] {rec.message}"
+
+
+def filter_trace(
+    records: Iterator[TraceRecord],
+    *,
+    level: int = DEBUG,
+    categories: Sequence[str] = (),
+    pattern: Optional[str] = None,
+) -> Iterator[TraceRecord]:
+    """Keep records at *level* or above, in *categories* (or a ``cat.`` subcategory), matching *pattern*."""
+    wanted = tuple(categories)
+    rx = re.compile(pattern) if pattern else None
+    for rec in records:
+        if rec.level < level:
+            continue
+        if wanted and not any(
+            rec.category == c or rec.category.startswith(c + ".") for c in wanted
+        ):
+            continue
+        if rx is not None and not rx.search(rec.message):
+            continue
+        yield rec
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Decode and filter a compact hier-walk trace (<run>.hier-walk.trace.gz)",
+    )
+    parser.add_argument("trace", help="trace file written with HIERWALK_TRACE_SINK=binary")
+    parser.add_argument(
+        "--level",
+        default="debug",
+        help="minimum level: debug, info, warn (default debug = everything recorded)",
+    )
+    parser.add_argument(
+        "-c",
+        "--category",
+        action="append",
+        default=[],
+        help="keep only this category (repeatable), e.g. connect, path-walk, path-walk.miss",
+    )
+    parser.add_argument("-g", "--grep", default=None, metavar="REGEX", help="keep matching messages")
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="print record counts per category instead of the records",
+    )
+    args = parser.parse_args(argv)
+    path = Path(args.trace)
+    if not path.is_file():
+        print(f"trace: no such file {path}", file=sys.stderr)
+        return 2
+    records = filter_trace(
+        read_trace(path),
+        level=parse_trace_level(args.level, DEBUG),
+        categories=args.category,
+        pattern=args.grep,
+    )
+    if args.stats:
+        counts: Dict[str, int] = {}
+        for rec in records:
+            counts[rec.category] = counts.get(rec.category, 0) + 1
+        for category, count in sorted(counts.items(), key=lambda kv: (-kv[1], kv[0])):
+            print(f"{count:>10}  {category}")
+        return 0
+    try:
+        for rec in records:
+            sys.stdout.write(format_trace_record(rec) + "\n")
+    except BrokenPipeError:
+        return 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
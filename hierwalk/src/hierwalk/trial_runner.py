@@ -0,0 +1,266 @@
+"""Process-parallel seeded trial runner shared by ``stress_gen`` and ``vuln_gen``.
+
+:func:`run_trials` runs ``fn(seed)`` for each seed of a deterministic seed list
+(:func:`trial_seeds`) — in-process when ``jobs=1`` and no timeout is set,
+otherwise one ``fork``-ed child per trial with at most *jobs* alive at once.
+A child that exceeds *timeout_sec* is terminated and recorded as ``timeout``;
+an exception is recorded as ``error``.  Outcomes come back in seed order, so
+reports do not depend on scheduling.
+
+With *results_path* every outcome is appended to a JSONL file as soon as it
+finishes; a rerun with the same file skips seeds whose latest record is
+``ok`` (resume after an interrupted nightly run) and retries timed-out or
+failed ones.
+
+:func:`format_phase_percentiles` turns per-trial phase timings into
+p50/p90/p99/max lines for the batch reports.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import multiprocessing
+import sys
+import time
+import traceback
+from dataclasses import dataclass
+from multiprocessing.connection import wait
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
+
+PERCENTILES = (50, 90, 99)
+
+
+@dataclass
+class TrialOutcome:
+    seed: int
+    status: str  # ok | timeout | error
+    elapsed_sec: float
+    result: Any = None
+    error: str = ""
+
+
+def trial_seeds(trials: int, base_seed: int, stride: int) -> List[int]:
+    """Seeds for a batch; trial *i* always gets ``base_seed + i * stride``."""
+    return [base_seed + i * stride for i in range(trials)]
+
+
+def load_trial_records(
+    path: Path,
+    decode: Callable[[Mapping[str, Any]], Any],
+) -> Dict[int, TrialOutcome]:
+    """Outcomes already recorded in a results JSONL (last record per seed wins)."""
+    out: Dict[int, TrialOutcome] = {}
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return out
+    for line in lines:
+        try:
+            rec = json.loads(line)
+            seed = int(rec["seed"])
+            result = decode(rec["result"]) if rec.get("result") is not None else None
+        except (ValueError, KeyError, TypeError):
+            continue  # torn line from an interrupted run
+        out[seed] = TrialOutcome(
+            seed=seed,
+            status=str(rec.get("status", "ok")),
+            elapsed_sec=float(rec.get("elapsed_sec", 0.0)),
+            result=result,
+            error=str(rec.get("error", "")),
+        )
+    return out
+
+
+def _append_record(
+    path: Path,
+    outcome: TrialOutcome,
+    encode: Callable[[Any], Mapping[str, Any]],
+) -> None:
+    rec = {
+        "seed": outcome.seed,
+        "status": outcome.status,
+        "elapsed_sec": round(outcome.elapsed_sec, 6),
+        "error": outcome.error,
+        "result": encode(outcome.result) if outcome.result is not None else None,
+    }
+    with path.open("a", encoding="utf-8") as fh:
+        fh.write(json.dumps(rec, sort_keys=True) + "\n")
+
+
+def _run_one(fn: Callable[[int], Any], seed: int) -> TrialOutcome:
+    t0 = time.perf_counter()
+    try:
+        result = fn(seed)
+    except Exception as exc:
+        return TrialOutcome(
+            seed=seed,
+            status="error",
+            elapsed_sec=time.perf_counter() - t0,
+            error=f"{type(exc).__name__}: {exc}",
+        )
+    return TrialOutcome(
+        seed=seed, status="ok", elapsed_sec=time.perf_counter() - t0, result=result
+    )
+
+
+def _trial_child(fn: Callable[[int], Any], seed: int, conn) -> None:
+    try:
+        outcome = _run_one(fn, seed)
+        conn.send(outcome)
+    except Exception:  # unpicklable result, broken pipe, …
+        conn.send(
+            TrialOutcome(
+                seed=seed,
+                status="error",
+                elapsed_sec=0.0,
+                error=traceback.format_exc(limit=1).strip().splitlines()[-1],
+            )
+        )
+    finally:
+        conn.close()
+
+
+def _run_forked(
+    fn: Callable[[int], Any],
+    seeds: Sequence[int],
+    *,
+    jobs: int,
+    timeout_sec: Optional[float],
+    on_outcome: Callable[[TrialOutcome], None],
+) -> None:
+    ctx = multiprocessing.get_context("fork")
+    queue = list(seeds)
+    running: Dict[Any, tuple] = {}  # conn -> (process, seed, start)
+
+    def _finish(conn, outcome: TrialOutcome) -> None:
+        proc, _seed, _start = running.pop(conn)
+        conn.close()
+        proc.join(timeout=5)
+        if proc.is_alive():
+            proc.kill()
+            proc.join()
+        on_outcome(outcome)
+
+    while queue or running:
+        while queue and len(running) < jobs:
+            seed = queue.pop(0)
+            parent_conn, child_conn = ctx.Pipe(duplex=False)
+            sys.stdout.flush()
+            sys.stderr.flush()
+            proc = ctx.Process(target=_trial_child, args=(fn, seed, child_conn))
+            proc.start()
+            child_conn.close()
+            running[parent_conn] = (proc, seed, time.perf_counter())
+
+        now = time.perf_counter()
+        wait_for: Optional[float] = None
+        if timeout_sec is not None:
+            wait_for = max(
+                0.0, min(start + timeout_sec - now for _p, _s, start in running.values())
+            )
+        for conn in wait(list(running), timeout=wait_for):
+            proc, seed, start = running[conn]
+            try:
+                outcome = conn.recv()
+            except (EOFError, OSError):
+                proc.join()
+                outcome = TrialOutcome(
+                    seed=seed,
+                    status="error",
+                    elapsed_sec=time.perf_counter() - start,
+                    error=f"worker exited with code {proc.exitcode}",
+                )
+            _finish(conn, outcome)
+
+        if timeout_sec is None:
+            continue
+        now = time.perf_counter()
+        for conn, (proc, seed, start) in list(running.items()):
+            if now - start < timeout_sec:
+                continue
+            proc.terminate()
+            _finish(
+                conn,
+                TrialOutcome(
+                    seed=seed,
+                    status="timeout",
+                    elapsed_sec=now - start,
+                    error=f"timeout after {timeout_sec:g}s",
+                ),
+            )
+
+
+def run_trials(
+    fn: Callable[[int], Any],
+    seeds: Sequence[int],
+    *,
+    jobs: int = 1,
+    timeout_sec: Optional[float] = None,
+    results_path: Optional[Path | str] = None,
+    encode: Optional[Callable[[Any], Mapping[str, Any]]] = None,
+    decode: Optional[Callable[[Mapping[str, Any]], Any]] = None,
+    on_outcome: Optional[Callable[[TrialOutcome], None]] = None,
+) -> List[TrialOutcome]:
+    """
+    Run ``fn(seed)`` for every seed; return outcomes in *seeds* order.
+
+    *jobs* ``<= 0`` means CPU count.  *encode*/*decode* convert results to and
+    from JSON objects and are required with *results_path*.
+    """
+    path = Path(results_path) if results_path is not None else None
+    if path is not None and (encode is None or decode is None):
+        raise ValueError("results_path requires encode and decode")
+    done: Dict[int, TrialOutcome] = {}
+    if path is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        recorded = load_trial_records(path, decode)
+        done = {
+            s: recorded[s] for s in seeds if s in recorded and recorded[s].status == "ok"
+        }
+    todo = [s for s in dict.fromkeys(seeds) if s not in done]
+
+    def _record(outcome: TrialOutcome) -> None:
+        done[outcome.seed] = outcome
+        if path is not None:
+            _append_record(path, outcome, encode)
+        if on_outcome is not None:
+            on_outcome(outcome)
+
+    workers = jobs if jobs > 0 else (multiprocessing.cpu_count() or 1)
+    workers = max(1, min(workers, len(todo) or 1))
+    forked = (workers > 1 or timeout_sec is not None) and (
+        "fork" in multiprocessing.get_all_start_methods()
+    )
+    if forked:
+        _run_forked(fn, todo, jobs=workers, timeout_sec=timeout_sec, on_outcome=_record)
+    else:
+        for seed in todo:
+            _record(_run_one(fn, seed))
+    return [done[s] for s in seeds]
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile (``values`` need not be sorted)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def format_phase_percentiles(
+    rows: Sequence[Mapping[str, float]],
+    phases: Sequence[str],
+) -> List[str]:
+    """``phase  p50_ms  p90_ms  p99_ms  max_ms`` lines over per-trial timings (seconds)."""
+    if not rows:
+        return []
+    head = "phase       " + "  ".join(f"p{p}_ms".rjust(8) for p in PERCENTILES)
+    lines = [f"{head}    max_ms   (n={len(rows)})"]
+    for phase in phases:
+        vals = [float(r[phase]) for r in rows]
+        cells = "  ".join(f"{percentile(vals, p) * 1e3:8.1f}" for p in PERCENTILES)
+        lines.append(f"{phase:10s}  {cells}  {max(vals) * 1e3:8.1f}")
+    return lines
@@ -4,8 +4,9 @@ from __future__ import annotations
 
 import random
 import textwrap
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Sequence, Tuple
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
 
 from hierwalk.vuln_plan import VULN_PLAN, VulnCaseSpec
 
@@ -486,6 +487,15 @@ class VulnTrialResult:
     verify_sec: float
     surprises_default: List[str] = field(default_factory=list)
     surprises_strict: List[str] = field(default_factory=list)
+    # verify_sec split (index + elab + connect); status set by the batch runner.
+    index_sec: float = 0.0
+    elab_sec: float = 0.0
+    connect_sec: float = 0.0
+    status: str = "ok"  # ok | timeout | error
+    error: str = ""
+
+
+VULN_PHASES = ("gen", "index", "elab", "connect", "verify")
 
 
 def _case_endpoints(spec: VulnCaseSpec) -> Tuple[str, str]:
@@ -509,7 +519,9 @@ def run_vuln_trial(*, seed: Optional[int] = None) -> Tuple[VulnDesign, VulnTrial
         path = Path(tmp) / f"vuln_{design.seed}.v"
         path.write_text(design.verilog, encoding="utf-8")
         index = DesignIndex.build({str(path): design.verilog})
+        t_index = time.perf_counter()
         _root, rows = elaborate(index, design.top)
+        t_elab = time.perf_counter()
 
         results: List[VulnCaseResult] = []
         surprises_d: List[str] = []
@@ -580,16 +592,63 @@ def run_vuln_trial(*, seed: Optional[int] = None) -> Tuple[VulnDesign, VulnTrial
             verify_sec=t_verify - t_gen,
             surprises_default=surprises_d,
             surprises_strict=surprises_s,
+            index_sec=t_index - t_gen,
+            elab_sec=t_elab - t_index,
+            connect_sec=t_verify - t_elab,
         )
     return design, trial
 
 
-def run_vuln_batch(trials: int = 10, *, base_seed: int = 424242) -> List[VulnTrialResult]:
-    out: List[VulnTrialResult] = []
-    for i in range(trials):
-        _, trial = run_vuln_trial(seed=base_seed + i * 7919)
-        out.append(trial)
-    return out
+def _vuln_trial_for_seed(seed: int) -> VulnTrialResult:
+    _, trial = run_vuln_trial(seed=seed)
+    return trial
+
+
+def _decode_vuln_trial(rec: Mapping[str, Any]) -> VulnTrialResult:
+    data = dict(rec)
+    data["case_results"] = [VulnCaseResult(**cr) for cr in data["case_results"]]
+    return VulnTrialResult(**data)
+
+
+def _failed_vuln_trial(outcome: Any) -> VulnTrialResult:
+    return VulnTrialResult(
+        seed=outcome.seed,
+        decoy_count=0,
+        case_results=[],
+        default_pass=0,
+        strict_pass=0,
+        total=len(VULN_PLAN),
+        gen_sec=0.0,
+        verify_sec=outcome.elapsed_sec,
+        status=outcome.status,
+        error=outcome.error,
+    )
+
+
+def run_vuln_batch(
+    trials: int = 10,
+    *,
+    base_seed: int = 424242,
+    jobs: int = 1,
+    timeout_sec: Optional[float] = None,
+    results_path: Optional[Union[str, Path]] = None,
+) -> List[VulnTrialResult]:
+    """
+    Run *trials* seeded vuln trials; see :func:`hierwalk.stress_gen.run_stress_batch`
+    for ``jobs`` / ``timeout_sec`` / ``results_path``.
+    """
+    from hierwalk.trial_runner import run_trials, trial_seeds
+
+    outcomes = run_trials(
+        _vuln_trial_for_seed,
+        trial_seeds(trials, base_seed, 7919),
+        jobs=jobs,
+        timeout_sec=timeout_sec,
+        results_path=results_path,
+        encode=asdict,
+        decode=_decode_vuln_trial,
+    )
+    return [o.result if o.status == "ok" else _failed_vuln_trial(o) for o in outcomes]
 
 
 def format_vuln_report(
@@ -615,6 +674,25 @@ def format_vuln_report(
             f"{t.default_pass:3d}/{t.total:3d}  {t.strict_pass:3d}/{t.total:3d}  "
             f"{t.total:5d}  {t.gen_sec * 1e3:6.1f}  {t.verify_sec * 1e3:8.1f}  "
             f"{len(t.surprises_default):3d}/{len(t.surprises_strict):3d}"
+            + (f"  {t.status}: {t.error}" if t.status != "ok" else "")
+        )
+
+    ok_trials = [t for t in trials if t.status == "ok"]
+    if len(trials) > 1 and ok_trials:
+        from hierwalk.trial_runner import format_phase_percentiles
+
+        lines.append("")
+        failed = len(trials) - len(ok_trials)
+        if failed:
+            lines.append(f"failed trials (timeout/error): {failed}")
+        lines.extend(
+            format_phase_percentiles(
+                [
+                    {phase: getattr(t, f"{phase}_sec") for phase in VULN_PHASES}
+                    for t in ok_trials
+                ],
+                VULN_PHASES,
+            )
         )
 
     if trials:
@@ -658,6 +736,26 @@ if __name__ == "__main__":
     parser.add_argument("--trials", type=int, default=10)
     parser.add_argument("--seed", type=int, default=None)
     parser.add_argument("--plan", action="store_true", help="print remediation plan")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="parallel trial processes (0 = CPU count)",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        metavar="SEC",
+        help="per-trial timeout; runs each trial in its own process",
+    )
+    parser.add_argument(
+        "--results",
+        default=None,
+        metavar="JSONL",
+        help="append per-trial results here and skip seeds already recorded",
+    )
     args = parser.parse_args()
     if args.seed is not None:
         _, trial = run_vuln_trial(seed=args.seed)
@@ -665,7 +763,12 @@ if __name__ == "__main__":
     else:
         print(
             format_vuln_report(
-                run_vuln_batch(args.trials),
+                run_vuln_batch(
+                    args.trials,
+                    jobs=args.jobs,
+                    timeout_sec=args.timeout,
+                    results_path=args.results,
+                ),
                 show_plan=args.plan,
             )
         )
\ No newline at end of file
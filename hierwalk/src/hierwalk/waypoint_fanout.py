@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Dict, List, Mapping, Optional, Sequence, Set, Tuple, Union
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Set, Tuple, Union
 
 from hierwalk.cone import (
     ConeModuleIndex,
@@ -20,6 +22,10 @@ from hierwalk.inst_trace import _ports_for_instance
 from hierwalk.models import ConnectEndpoint, ConnectResult, ElabIndex, FlatRow
 NetState = Tuple[str, str]
 BfsState = Tuple[str, str, bool]
+# (next state, edge kind, rtl line)
+FanoutEdge = Tuple[NetState, str, int]
+# (boundary kind, rtl line) or None
+BoundaryHit = Optional[Tuple[str, int]]
 
 
 @dataclass(frozen=True)
@@ -352,6 +358,143 @@ def _rtl_line_for_boundary(
     return 0
 
 
+class _FanoutGraph:
+    """
+    Waypoint-independent fanout structure of one cone context, filled lazily.
+
+    Waypoint qualification only doubles BFS states; the states, edges, RTL
+    lines and boundaries themselves depend on the cone context alone, so every
+    origin (and every check in a session) traced under the same context can
+    share them.
+    """
+
+    def __init__(self, ctx: _ConeCtx) -> None:
+        self.ctx = ctx
+        self._starts: Dict[Tuple[str, str], Optional[NetState]] = {}
+        self._boundaries: Dict[NetState, BoundaryHit] = {}
+        self._steps: Dict[NetState, Tuple[FanoutEdge, ...]] = {}
+
+    def start(self, scope: str, net: str) -> Optional[NetState]:
+        key = (scope, net)
+        if key not in self._starts:
+            row = self.ctx.rows_by_path.get(scope)
+            self._starts[key] = (
+                _state_key(scope, net, _cached_cone_mod(self.ctx, row))
+                if row is not None
+                else None
+            )
+        return self._starts[key]
+
+    def boundary(self, state: NetState) -> BoundaryHit:
+        """Non-origin boundary at *state* with its RTL line."""
+        if state in self._boundaries:
+            return self._boundaries[state]
+        hit: BoundaryHit = None
+        b = _boundary_at_state(self.ctx, state, is_origin=False)
+        if b is not None:
+            hit = (b.kind, _rtl_line_for_boundary(self.ctx, state[0], state[1], b.kind))
+        self._boundaries[state] = hit
+        return hit
+
+    def step(self, state: NetState) -> Tuple[FanoutEdge, ...]:
+        hit = self._steps.get(state)
+        if hit is not None:
+            return hit
+        ctx = self.ctx
+        scope, net = state
+        edges: List[FanoutEdge] = []
+        for nxt, kind, _detail in _expand_fanout(state, ctx):
+            nxt_scope, nxt_net = nxt
+            inst_leaf = ""
+            if kind in ("child-down", "child-hier"):
+                if ctx.rows_by_path.get(scope) is not None:
+                    suffix = nxt_scope[len(scope) + 1 :] if nxt_scope.startswith(scope + ".") else ""
+                    inst_leaf = suffix.split(".", 1)[0] if suffix else ""
+            rtl_line = _rtl_line_for_edge(
+                ctx,
+                scope,
+                net,
+                nxt_scope,
+                nxt_net,
+                kind,
+                inst_leaf=inst_leaf,
+            )
+            edges.append((nxt, kind, rtl_line))
+        out = tuple(edges)
+        self._steps[state] = out
+        return out
+
+    @property
+    def states(self) -> int:
+        return len(self._steps)
+
+
+def _waypoint_key(waypoints: WaypointSet) -> Tuple[Any, ...]:
+    return (frozenset(waypoints.port_nets), frozenset(waypoints.inst_prefixes))
+
+
+def _peer_index_key(peer_index: Optional[_PeerHitIndex]) -> Tuple[Any, ...]:
+    if peer_index is None:
+        return ()
+    return (peer_index.inst_specs, tuple(sorted(peer_index.port_specs.items())))
+
+
+class FanoutCache:
+    """
+    Cross-check fanout memo for one :class:`~hierwalk.connectivity.ConnectivitySession`.
+
+    Holds a :class:`_FanoutGraph` per cone context (path kind, defines,
+    over-approximation) and the finished event list per origin + waypoint/peer
+    set, so checks that share an origin bus trace its cone once.  Only valid
+    for the session's rows and index; drop it with the session caches.
+    """
+
+    def __init__(self) -> None:
+        self.mod_cache: Dict[Tuple[str, str], ConeModuleIndex] = {}
+        self._graphs: Dict[Tuple[Any, ...], _FanoutGraph] = {}
+        self._events: Dict[Tuple[Any, ...], Tuple[WaypointFanoutEvent, ...]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _ctx_key(ctx: _ConeCtx) -> Tuple[Any, ...]:
+        return (
+            ctx.path_kind,
+            tuple(sorted(ctx.defines.items())),
+            ctx.over_approximate_if,
+            ctx.comb_cache is None,
+        )
+
+    def graph(self, ctx: _ConeCtx) -> _FanoutGraph:
+        key = self._ctx_key(ctx)
+        with self._lock:
+            hit = self._graphs.get(key)
+            if hit is None:
+                hit = _FanoutGraph(ctx)
+                self._graphs[key] = hit
+            return hit
+
+    def lookup(self, key: Tuple[Any, ...]) -> Optional[Tuple[WaypointFanoutEvent, ...]]:
+        with self._lock:
+            hit = self._events.get(key)
+            if hit is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return hit
+
+    def store(self, key: Tuple[Any, ...], events: Sequence[WaypointFanoutEvent]) -> None:
+        with self._lock:
+            self._events[key] = tuple(events)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.mod_cache.clear()
+            self._graphs.clear()
+            self._events.clear()
+
+
 def _trace_origin_fanout(
     source: str,
     start_scope: str,
@@ -364,12 +507,12 @@ def _trace_origin_fanout(
     peer_index: Optional[_PeerHitIndex] = None,
     path_kind: str = "",
     emit_interior: bool = False,
+    graph: Optional[_FanoutGraph] = None,
 ) -> List[WaypointFanoutEvent]:
-    row = rows_by_path.get(start_scope)
-    if row is None:
+    graph = graph if graph is not None else _FanoutGraph(ctx)
+    start = graph.start(start_scope, start_net)
+    if start is None:
         return []
-    start_mod = _cached_cone_mod(ctx, row)
-    start = _state_key(start_scope, start_net, start_mod)
     start_qualified = _waypoint_hit(start[0], start[1], waypoints)
 
     visited: Set[BfsState] = {(start[0], start[1], start_qualified)}
@@ -380,12 +523,9 @@ def _trace_origin_fanout(
         next_front: List[BfsState] = []
         for scope, net, qualified in frontier:
             state: NetState = (scope, net)
-            boundary = _boundary_at_state(
-                ctx,
-                state,
-                is_origin=(state == start),
-            )
-            if boundary is not None and state != start:
+            boundary = graph.boundary(state) if state != start else None
+            if boundary is not None:
+                b_kind, b_line = boundary
                 hit = _waypoint_hit(scope, net, waypoints)
                 qual = qualified or hit
                 row_hit = rows_by_path.get(scope)
@@ -403,13 +543,11 @@ def _trace_origin_fanout(
                 events.append(
                     WaypointFanoutEvent(
                         source=source,
-                        event_kind=boundary.kind,
+                        event_kind=b_kind,
                         scope=scope,
                         net=net,
                         rtl_file=row_hit.file if row_hit else "",
-                        rtl_line=_rtl_line_for_boundary(
-                            ctx, scope, net, boundary.kind
-                        ),
+                        rtl_line=b_line,
                         waypoint_hit=_yn(hit),
                         waypoint_qualified=_yn(qual),
                         is_terminator="Y",
@@ -420,25 +558,10 @@ def _trace_origin_fanout(
                 )
                 continue
 
-            for nxt, kind, detail in _expand_fanout(state, ctx):
+            for nxt, kind, rtl_line in graph.step(state):
                 nxt_scope, nxt_net = nxt
                 hit = _waypoint_hit(nxt_scope, nxt_net, waypoints)
                 qual = qualified or hit
-                inst_leaf = ""
-                if kind in ("child-down", "child-hier"):
-                    parent_row = rows_by_path.get(scope)
-                    if parent_row is not None:
-                        suffix = nxt_scope[len(scope) + 1 :] if nxt_scope.startswith(scope + ".") else ""
-                        inst_leaf = suffix.split(".", 1)[0] if suffix else ""
-                rtl_line = _rtl_line_for_edge(
-                    ctx,
-                    scope,
-                    net,
-                    nxt_scope,
-                    nxt_net,
-                    kind,
-                    inst_leaf=inst_leaf,
-                )
                 row_nxt = rows_by_path.get(nxt_scope)
                 if emit_interior or (
                     ctx.path_kind == "ff" and kind.startswith("ff-")
@@ -459,13 +582,11 @@ def _trace_origin_fanout(
                             path_kind=path_kind,
                         )
                     )
-                b2 = _boundary_at_state(ctx, nxt, is_origin=False)
+                b2 = graph.boundary(nxt)
                 if b2 is not None:
-                    term_hit = _waypoint_hit(nxt_scope, nxt_net, waypoints)
+                    b2_kind, term_line = b2
+                    term_hit = hit
                     term_qual = qual or term_hit
-                    term_line = _rtl_line_for_boundary(
-                        ctx, nxt_scope, nxt_net, b2.kind
-                    )
                     if not term_line:
                         term_line = rtl_line
                     term_peer = (
@@ -482,7 +603,7 @@ def _trace_origin_fanout(
                     events.append(
                         WaypointFanoutEvent(
                             source=source,
-                            event_kind=b2.kind,
+                            event_kind=b2_kind,
                             scope=nxt_scope,
                             net=nxt_net,
                             rtl_file=row_nxt.file if row_nxt else "",
@@ -523,7 +644,16 @@ def run_waypoint_fanout_check(
     full_path_kinds: bool = False,
     elab_index: Optional[ElabIndex] = None,
     comb_cache: Optional[Dict[Tuple[str, str], ModuleConnectIndex]] = None,
+    fanout_cache: Optional[FanoutCache] = None,
+    jobs: int = 1,
 ) -> Tuple[ConnectResult, List[WaypointFanoutEvent]]:
+    """
+    Trace fanout from every origin and qualify terminators by waypoints/peers.
+
+    *fanout_cache* (a session's :class:`FanoutCache`) reuses cone structure and
+    per-origin events across checks; *jobs* traces distinct origins on a
+    thread pool (0 = CPU count, 1 = serial).
+    """
     if elab_index is not None:
         rows_by_path = elab_index.rows_by_path
         child_by_parent_leaf = elab_index.child_by_parent_leaf
@@ -603,7 +733,9 @@ def run_waypoint_fanout_check(
         if dual
         else None
     )
-    shared_mod_cache: Dict[Tuple[str, str], ConeModuleIndex] = {}
+    shared_mod_cache: Dict[Tuple[str, str], ConeModuleIndex] = (
+        fanout_cache.mod_cache if fanout_cache is not None else {}
+    )
 
     emit_interior = trace_interior or connect_trace
     short_circuit_kinds = not full_path_kinds and not connect_trace
@@ -623,38 +755,65 @@ def run_waypoint_fanout_check(
             comb_cache=comb_cache,
         )
         pk_label = pk if multi_kind else ""
-        kind_events: List[WaypointFanoutEvent] = []
-        for source, scope, net in origins_a:
-            kind_events.extend(
-                _trace_origin_fanout(
+        graph = fanout_cache.graph(ctx) if fanout_cache is not None else _FanoutGraph(ctx)
+        tasks: List[Tuple[str, str, str, WaypointSet, str, Optional[_PeerHitIndex]]] = [
+            (source, scope, net, peers_b, "a-fanout" if dual else "", peer_index_b)
+            for source, scope, net in origins_a
+        ]
+        if dual:
+            tasks.extend(
+                (source, scope, net, peers_a, "b-fanout", peer_index_a)
+                for source, scope, net in origins_b
+            )
+
+        def _trace(
+            task: Tuple[str, str, str, WaypointSet, str, Optional[_PeerHitIndex]],
+        ) -> Sequence[WaypointFanoutEvent]:
+            source, scope, net, waypoints, side, peer_index = task
+            key: Tuple[Any, ...] = ()
+            if fanout_cache is not None:
+                key = (
+                    FanoutCache._ctx_key(ctx),
                     source,
                     scope,
                     net,
-                    ctx=ctx,
-                    waypoints=peers_b,
-                    rows_by_path=rows_by_path,
-                    side="a-fanout" if dual else "",
-                    peer_index=peer_index_b,
-                    path_kind=pk_label,
-                    emit_interior=emit_interior,
+                    side,
+                    pk_label,
+                    emit_interior,
+                    _waypoint_key(waypoints),
+                    _peer_index_key(peer_index),
                 )
+                hit = fanout_cache.lookup(key)
+                if hit is not None:
+                    return hit
+            events = _trace_origin_fanout(
+                source,
+                scope,
+                net,
+                ctx=ctx,
+                waypoints=waypoints,
+                rows_by_path=rows_by_path,
+                side=side,
+                peer_index=peer_index,
+                path_kind=pk_label,
+                emit_interior=emit_interior,
+                graph=graph,
             )
-        if dual:
-            for source, scope, net in origins_b:
-                kind_events.extend(
-                    _trace_origin_fanout(
-                        source,
-                        scope,
-                        net,
-                        ctx=ctx,
-                        waypoints=peers_a,
-                        rows_by_path=rows_by_path,
-                        side="b-fanout",
-                        peer_index=peer_index_a,
-                        path_kind=pk_label,
-                        emit_interior=emit_interior,
-                    )
-                )
+            if fanout_cache is not None:
+                fanout_cache.store(key, events)
+            return events
+
+        from hierwalk.connectivity import _resolve_connect_jobs
+
+        workers = _resolve_connect_jobs(jobs, len(tasks)) if len(tasks) > 1 else 1
+        kind_events: List[WaypointFanoutEvent] = []
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for part in pool.map(_trace, tasks):
+                    kind_events.extend(part)
+        else:
+            for task in tasks:
+                kind_events.extend(_trace(task))
         all_events.extend(kind_events)
         if short_circuit_kinds and multi_kind:
             if any(
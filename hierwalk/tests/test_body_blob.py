@@ -0,0 +1,150 @@
+"""Blob-backed module bodies: byte spans at index time, mmap slice + LRU on fetch."""
+
+from __future__ import annotations
+
+import pickle
+from pathlib import Path
+
+import pytest
+
+from hierwalk.body_blob import (
+    BodyBlobReader,
+    BodyLru,
+    byte_spans,
+    prune_body_blobs,
+    record_blob_refs,
+    referenced_blobs,
+    write_body_blob,
+)
+from hierwalk.index import DesignIndex
+
+_RTL = """// gen – multi-module file (non-ASCII comment: ü)
+`define W 4
+module leaf(input a, output y);
+  assign y = a; // ñ
+endmodule
+module mid(input a, output y);
+  leaf u_leaf (.a(a), .y(y));
+endmodule
+module top(input a, output y);
+  mid u_mid (.a(a), .y(y));
+endmodule
+"""
+
+
+@pytest.fixture
+def blob_dir(monkeypatch, tmp_path):
+    root = tmp_path / "bodies"
+    monkeypatch.setenv("HIERWALK_BODY_BLOB", str(root))
+    return root
+
+
+def _build(tmp_path: Path) -> DesignIndex:
+    rtl = tmp_path / "gen.v"
+    rtl.write_text(_RTL, encoding="utf-8")
+    return DesignIndex.build_from_sources(
+        [str(rtl)],
+        include_dirs=[],
+        defines={"SIM": "1"},
+        jobs=1,
+    )
+
+
+def test_byte_spans_non_ascii():
+    text = "ü-abc-ñ-def"
+    spans = [(2, 5), (8, 11)]
+    data = text.encode("utf-8")
+    for (start, end), (off, length) in zip(spans, byte_spans(text, spans)):
+        assert data[off : off + length].decode("utf-8") == text[start:end]
+
+
+def test_module_body_sliced_from_blob_after_pickle(blob_dir, tmp_path, monkeypatch):
+    index = _build(tmp_path)
+    refs = {name: rec.body_ref for name, rec in index.modules.items()}
+    assert all(ref[0] for ref in refs.values())
+    assert len({ref[0] for ref in refs.values()}) == 1
+    assert list(blob_dir.rglob("*.body"))
+    expected = {name: index.module_body(name) for name in refs}
+    assert "assign y = a;" in expected["leaf"]
+
+    loaded = pickle.loads(pickle.dumps(index))
+    assert all(rec.body == "" for rec in loaded.modules.values())
+
+    def _no_reparse(*_a, **_k):
+        raise AssertionError("module_body re-read source despite body blob")
+
+    monkeypatch.setattr(loaded, "_source_text", _no_reparse)
+    for name, body in expected.items():
+        assert loaded.module_body(name) == body
+    assert len(loaded._body_lru) == 3
+
+
+def test_missing_blob_falls_back_to_source(blob_dir, tmp_path):
+    index = _build(tmp_path)
+    want = index.module_body("mid")
+    for path in blob_dir.rglob("*.body"):
+        path.unlink()
+    loaded = pickle.loads(pickle.dumps(index))
+    assert loaded.module_body("mid") == want
+
+
+def test_body_lru_evicts_by_bytes():
+    lru = BodyLru(max_bytes=10)
+    lru.put(("a", 0, 6), "x" * 6)
+    lru.put(("b", 0, 4), "y" * 4)
+    assert lru.get(("a", 0, 6)) is not None
+    lru.put(("c", 0, 4), "z" * 4)
+    assert lru.get(("b", 0, 4)) is None
+    assert lru.get(("a", 0, 6)) == "x" * 6
+    assert lru.cached_bytes == 10
+    lru.put(("huge", 0, 11), "h" * 11)
+    assert lru.get(("huge", 0, 11)) is None
+
+
+def test_reader_caps_open_maps(tmp_path):
+    paths = []
+    for i in range(3):
+        blob = tmp_path / f"b{i}.body"
+        blob.write_bytes(f"body{i}".encode())
+        paths.append(str(blob))
+    reader = BodyBlobReader(max_maps=2)
+    assert reader.read((paths[0], 0, 5)) == "body0"
+    first = reader._maps[paths[0]]
+    assert reader.read((paths[1], 0, 5)) == "body1"
+    assert reader.read((paths[2], 0, 5)) == "body2"
+    assert len(reader) == 2
+    assert first.closed
+    assert reader.read((paths[0], 0, 5)) == "body0"
+    reader.close()
+    assert len(reader) == 0
+
+
+def test_prune_body_blobs_keeps_referenced(blob_dir, tmp_path):
+    index = _build(tmp_path)
+    kept = {rec.body_ref[0] for rec in index.modules.values()}
+    stale = write_body_blob(b"module gone; endmodule\n", blob_dir)
+    assert stale is not None
+    assert prune_body_blobs(blob_dir, kept) == 0  # still inside the grace period
+    assert prune_body_blobs(blob_dir, kept, min_age_s=0) == 1
+    assert not stale.exists()
+    assert all(Path(p).is_file() for p in kept)
+
+
+def test_prune_keeps_blobs_of_other_saved_caches(blob_dir, tmp_path):
+    a = write_body_blob(b"module a; endmodule\n", blob_dir)
+    b = write_body_blob(b"module b; endmodule\n", blob_dir)
+    assert a is not None and b is not None
+    cache_a = tmp_path / "a.hier-walk.pkl"
+    cache_b = tmp_path / "b.hier-walk.pkl"
+    cache_a.write_bytes(b"")
+    cache_b.write_bytes(b"")
+    record_blob_refs(blob_dir, cache_a, [str(a)])
+    record_blob_refs(blob_dir, cache_b, [str(b)])
+    # Saving cache a again must not drop cache b's blob.
+    assert prune_body_blobs(blob_dir, referenced_blobs(blob_dir), min_age_s=0) == 0
+    assert a.is_file() and b.is_file()
+
+    cache_b.unlink()  # b's refs are forgotten once its cache is gone
+    assert referenced_blobs(blob_dir) == {str(a)}
+    assert prune_body_blobs(blob_dir, referenced_blobs(blob_dir), min_age_s=0) == 1
+    assert a.is_file() and not b.exists()
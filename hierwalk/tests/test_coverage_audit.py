@@ -4,13 +4,15 @@ from __future__ import annotations
 
 from pathlib import Path
 
+from hierwalk import coverage_audit
 from hierwalk.coverage_audit import (
     compute_coverage_audit,
     minimal_unused_dir_roots,
 )
 from hierwalk.elab import elaborate
-from hierwalk.filelist import filelist_provenance_maps, parse_filelist
+from hierwalk.filelist import FilelistResult, filelist_provenance_maps, parse_filelist
 from hierwalk.index import DesignIndex
+from hierwalk.models import FlatRow
 
 
 def test_minimal_unused_dir_roots_collapses_siblings(tmp_path: Path):
@@ -90,4 +92,42 @@ def test_coverage_audit_unused_filelists_and_dirs(tmp_path: Path):
     assert audit.untouched_rtl == 1
     assert str(pcie_f.resolve()) in audit.unused_filelists
     assert str(core_f.resolve()) not in audit.unused_filelists
-    assert list(audit.untouched_dir_roots) == [str(pcie_dir.resolve())]
\ No newline at end of file
+    assert list(audit.untouched_dir_roots) == [str(pcie_dir.resolve())]
+
+    graph_audit = compute_coverage_audit(index, fl, None, tops=["top"])
+    assert graph_audit == audit
+
+
+def test_incremental_audit_reuses_roots_outside_changed_dirs(tmp_path: Path, monkeypatch):
+    for sub in ("a/x", "a/y", "b"):
+        d = tmp_path / sub
+        d.mkdir(parents=True)
+        (d / "m.v").write_text("module m; endmodule\n", encoding="utf-8")
+    srcs = [tmp_path / s / "m.v" for s in ("a/x", "a/y", "b")]
+    fl = FilelistResult(source_files=srcs)
+    index = DesignIndex({})
+    state = tmp_path / "cache" / "coverage.pkl"
+
+    def row(p):
+        return FlatRow(str(p), "u", "m", 1, "top", str(p))
+
+    first = compute_coverage_audit(index, fl, [row(srcs[0])], tops=["top"], state_path=state)
+    assert first.untouched_dir_roots == (
+        str((tmp_path / "a/y").resolve()),
+        str((tmp_path / "b").resolve()),
+    )
+    assert state.is_file()
+    assert [p.name for p in state.parent.iterdir()] == ["coverage.pkl"]  # no temp left
+
+    probed: list[str] = []
+    real = coverage_audit._unused_root
+    monkeypatch.setattr(
+        coverage_audit, "_unused_root", lambda raw, used: probed.append(raw) or real(raw, used)
+    )
+    second = compute_coverage_audit(
+        index, fl, [row(srcs[0]), row(srcs[1])], tops=["top"], state_path=state
+    )
+    assert second.untouched_dir_roots == (str((tmp_path / "b").resolve()),)
+    # b/ shares no directory with the newly elaborated a/y file: root reused.
+    assert probed == []
+    assert second == compute_coverage_audit(index, fl, [row(srcs[0]), row(srcs[1])], tops=["top"])
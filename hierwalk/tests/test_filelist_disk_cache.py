@@ -0,0 +1,46 @@
+"""parse_filelist reuses the shared on-disk filelist cache."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from hierwalk.filelist import parse_filelist
+
+
+def _design(tmp_path: Path) -> Path:
+    blk_f = tmp_path / "blk.f"
+    (tmp_path / "top.v").write_text("module top; endmodule\n", encoding="utf-8")
+    (tmp_path / "blk.v").write_text("module blk; endmodule\n", encoding="utf-8")
+    blk_f.write_text("blk.v\n", encoding="utf-8")
+    top_f = tmp_path / "top.f"
+    top_f.write_text("top.v\n-f blk.f\n", encoding="utf-8")
+    return top_f
+
+
+def test_parse_filelist_hits_disk_cache(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("HCH_FILELIST_CACHE_DIR", str(tmp_path / "cache"))
+    top_f = _design(tmp_path)
+    msgs: list[str] = []
+    first = parse_filelist(str(top_f), on_progress=msgs.append)
+    assert any("reading blk.f" in m for m in msgs)
+
+    msgs.clear()
+    again = parse_filelist(str(top_f), on_progress=msgs.append, extra_defines={"X": "1"})
+    assert msgs == ["filelist: cached top.f — 2 sources, 2 .f files"]
+    assert again.source_files == first.source_files
+    assert again.filelist_info == first.filelist_info
+    assert again.defines == {"X": "1"}
+    assert parse_filelist(str(top_f)).defines == {}  # extra defines are not cached
+
+    # Options that change the expansion get their own entry.
+    ignored = parse_filelist(str(top_f), ignore_filelists=["blk.f"])
+    assert [p.name for p in ignored.source_files] == ["top.v"]
+
+    (tmp_path / "blk.f").write_text("blk.v\ntop.v\n", encoding="utf-8")
+    msgs.clear()
+    parse_filelist(str(top_f), on_progress=msgs.append)
+    assert any("reading blk.f" in m for m in msgs)
+
+    msgs.clear()
+    parse_filelist(str(top_f), on_progress=msgs.append, use_cache=False)
+    assert not any("cached" in m for m in msgs)
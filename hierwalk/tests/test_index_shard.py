@@ -0,0 +1,173 @@
+"""Sharded index scan over the file-lock work queue (HIERWALK_INDEX_SHARDS)."""
+
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from hierwalk import index_shard
+from hierwalk.index import DesignIndex
+from hierwalk.index_shard import (
+    _lock_path,
+    _result_path,
+    _try_claim,
+    build_sharded_scan,
+    make_shard_plan,
+    partition_shards,
+    publish_plan,
+    run_shard_worker,
+)
+from hierwalk.perf import index_shard_count
+
+
+def _write_design(tmp_path: Path, n: int = 7) -> list[str]:
+    paths = []
+    for i in range(n):
+        p = tmp_path / f"m{i}.v"
+        child = f"  m{i + 1} u_m{i + 1} (.a(a));\n" if i + 1 < n else ""
+        p.write_text(f"module m{i}(input a);\n{child}endmodule\n", encoding="utf-8")
+        paths.append(str(p))
+    # Duplicate definition in a later shard: first source still wins.
+    dup = tmp_path / "zz_dup.v"
+    dup.write_text("module m0(input a, input b);\nendmodule\n", encoding="utf-8")
+    paths.append(str(dup))
+    return paths
+
+
+def test_partition_is_contiguous_and_balanced():
+    shards = partition_shards([str(i) for i in range(10)], 3)
+    assert [len(s) for s in shards] == [4, 3, 3]
+    assert [p for s in shards for p in s] == [str(i) for i in range(10)]
+
+
+def test_shard_count_env(monkeypatch):
+    monkeypatch.delenv("HIERWALK_INDEX_SHARDS", raising=False)
+    assert index_shard_count(100) == 0
+    monkeypatch.setenv("HIERWALK_INDEX_SHARDS", "4")
+    assert index_shard_count(100) == 4
+    assert index_shard_count(1) == 0
+    monkeypatch.setenv("HIERWALK_INDEX_SHARDS", "auto")
+    assert index_shard_count(4500) == 3
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_sharded_build_matches_fused(monkeypatch, tmp_path, jobs):
+    sources = _write_design(tmp_path)
+    fused = DesignIndex.build_from_sources(
+        sources, include_dirs=[], defines={}, jobs=1, low_memory=True
+    )
+    queue_root = tmp_path / "queue"
+    monkeypatch.setenv("HIERWALK_INDEX_SHARDS", "3")
+    monkeypatch.setenv("HIERWALK_INDEX_SHARD_DIR", str(queue_root))
+    sharded = DesignIndex.build_from_sources(
+        sources, include_dirs=[], defines={}, jobs=jobs
+    )
+    assert sorted(sharded.modules) == sorted(fused.modules)
+    for name, rec in fused.modules.items():
+        got = sharded.modules[name]
+        assert (got.file_path, got.instances) == (rec.file_path, rec.instances)
+    assert sharded.modules["m0"].file_path.endswith("m0.v")
+    assert not any(queue_root.iterdir())
+
+
+def test_resume_reuses_finished_shards(monkeypatch, tmp_path):
+    sources = _write_design(tmp_path)
+    queue = tmp_path / "q"
+    plan = make_shard_plan(sources, 3, include_dirs=[], defines={})
+    publish_plan(queue, plan)
+    assert _try_claim(queue, 0, stale_sec=60)
+    index_shard._write_result(queue, 0, index_shard.scan_shard(plan, 0))
+
+    scanned: list[int] = []
+    real_scan = index_shard.scan_shard
+
+    def _spy(p, i):
+        scanned.append(i)
+        return real_scan(p, i)
+
+    monkeypatch.setattr(index_shard, "scan_shard", _spy)
+    merged = build_sharded_scan(
+        sources, 3, include_dirs=[], defines={}, jobs=-1, queue=queue
+    )
+    assert scanned == [1, 2]
+    assert merged is not None and "m6" in merged
+    assert not queue.exists()
+
+
+def test_claims_exclusive_until_stale(tmp_path):
+    sources = _write_design(tmp_path, n=2)
+    queue = tmp_path / "q"
+    plan = make_shard_plan(sources, 2, include_dirs=[], defines={})
+    publish_plan(queue, plan)
+    assert _try_claim(queue, 1, stale_sec=60)
+    assert not _try_claim(queue, 1, stale_sec=60)
+    # Worker sees shard 1 held elsewhere and only scans shard 0.
+    assert run_shard_worker(queue) == 1
+    assert _result_path(queue, 0).is_file()
+    assert not _result_path(queue, 1).is_file()
+
+    old = time.time() - 120
+    os.utime(_lock_path(queue, 1), (old, old))
+    # Two takers race for the stale claim: only one creates generation 1.
+    assert _try_claim(queue, 1, stale_sec=60)
+    assert not _try_claim(queue, 1, stale_sec=60)
+    assert _lock_path(queue, 1, 1).is_file()
+    index_shard._write_result(queue, 1, index_shard.scan_shard(plan, 1))
+    assert not _try_claim(queue, 1, stale_sec=0)
+
+
+def test_queue_kept_until_last_worker_leaves(monkeypatch, tmp_path):
+    sources = _write_design(tmp_path, n=2)
+    queue = tmp_path / "q"
+    plan = make_shard_plan(sources, 2, include_dirs=[], defines={})
+    publish_plan(queue, plan)
+    late = index_shard._enter_queue(queue)  # e.g. a remote worker mid-shard
+    assert late is not None
+    merged = build_sharded_scan(
+        sources, 2, include_dirs=[], defines={}, jobs=-1, queue=queue
+    )
+    assert merged is not None and "m1" in merged
+    assert queue.is_dir()
+    assert run_shard_worker(queue) == 0  # merged queue: nothing left to join
+    index_shard._leave_queue(queue, late)
+    assert not queue.exists()
+
+
+def test_long_scan_keeps_claim_and_queue(monkeypatch, tmp_path):
+    monkeypatch.setenv("HIERWALK_INDEX_SHARD_STALE_SEC", "1")
+    sources = _write_design(tmp_path, n=1)
+    queue = tmp_path / "q"
+    plan = make_shard_plan(sources, 1, include_dirs=[], defines={})
+    publish_plan(queue, plan)
+    real_scan = index_shard.scan_shard
+    seen = []
+
+    def slow_scan(plan, i):
+        time.sleep(1.6)
+        seen.append(_try_claim(queue, i, stale_sec=1.0))  # heartbeat: not stale
+        (queue / "merged").write_text("x")
+        index_shard._remove_if_idle(queue)  # fresh claim: queue kept
+        seen.append(queue.is_dir())
+        return real_scan(plan, i)
+
+    monkeypatch.setattr(index_shard, "scan_shard", slow_scan)
+    assert run_shard_worker(queue) == 1
+    assert seen == [None, True]
+    assert not queue.exists()  # last one out removes it
+
+
+def test_result_dropped_when_queue_is_gone(tmp_path):
+    queue = tmp_path / "gone"
+    assert index_shard._write_result(queue, 0, {}) is False
+
+
+def test_plan_digest_tracks_sources(tmp_path):
+    sources = _write_design(tmp_path, n=2)
+    a = make_shard_plan(sources, 2, include_dirs=[], defines={})
+    assert make_shard_plan(sources, 2, include_dirs=[], defines={}).digest == a.digest
+    assert make_shard_plan(sources, 2, include_dirs=[], defines={"X": "1"}).digest != a.digest
+    Path(sources[0]).write_text("module m0(input a);\nendmodule\n// edit\n")
+    assert make_shard_plan(sources, 2, include_dirs=[], defines={}).digest != a.digest
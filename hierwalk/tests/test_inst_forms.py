@@ -3,9 +3,14 @@
 from __future__ import annotations
 
 from hierwalk.index import DesignIndex
-from hierwalk.inst_scan import scan_hierarchy_instances
+from hierwalk.inst_scan import scan_hierarchy_instances, scan_hierarchy_instances_chunks
 from hierwalk.preprocess import preprocess_file
-from hierwalk.generate_fold import needs_generate_fold, prepare_body_for_instance_scan
+from hierwalk.generate_fold import (
+    fold_generate_regions,
+    fold_generate_symbolic,
+    needs_generate_fold,
+    prepare_body_for_instance_scan,
+)
 from hierwalk.scan import flatten, scan_preprocessed
 
 
@@ -204,6 +209,46 @@ module mem; endmodule
     assert names == ["u_arr[0]", "u_arr[1]"]
 
 
+_NESTED_GEN_BODY = """
+  generate
+    for (genvar r = 0; r < ROWS; r++) begin : g_row
+      for (genvar c = 0; c < 2; c++) begin : g_col
+        ip #(.ID(r)) u_ip (.d(d[r][c]), .q(q [ r ]));
+      end
+      leaf u_arr [r] (.a(a[r]));
+    end
+  endgenerate
+  assign y = q[0];
+"""
+
+
+def test_symbolic_fold_matches_text_fold():
+    pmap = {"ROWS": "3"}
+    folded = fold_generate_symbolic(_NESTED_GEN_BODY, pmap)
+    (loop,) = folded.loops
+    assert (loop.lo, loop.hi, loop.label) == (0, 2, "g_row")
+    assert "g_row[1].g_col[0].u_ip" in loop.render(1)
+    assert folded.text() == fold_generate_regions(_NESTED_GEN_BODY, pmap)
+    assert "".join(folded.iter_text(batch_chars=1)) == folded.text()
+
+    whole = scan_hierarchy_instances(folded.text(), param_map=pmap)
+    chunked = scan_hierarchy_instances_chunks(folded.iter_text(batch_chars=1), param_map=pmap)
+    assert [(e.inst_name, e.param_overrides) for e in chunked] == [
+        (e.inst_name, e.param_overrides) for e in whole
+    ]
+    assert len(chunked) == 3 * 3
+    assert chunked[0].param_overrides == {"ID": "0"}
+
+
+def test_generate_unroll_max_env(monkeypatch):
+    body = "generate\n for (genvar i=0; i<100; i++) begin : g\n  leaf u ( );\n end\nendgenerate\n"
+    monkeypatch.delenv("HIERWALK_GENERATE_UNROLL_MAX", raising=False)
+    assert "g[0].u" not in prepare_body_for_instance_scan(body, {})
+    monkeypatch.setenv("HIERWALK_GENERATE_UNROLL_MAX", "128")
+    folded = prepare_body_for_instance_scan(body, {})
+    assert "g[99].u" in folded and "g[100].u" not in folded
+
+
 def test_ifdef_generate_branch(tmp_path):
     rtl = tmp_path / "ifdefgen.v"
     rtl.write_text(
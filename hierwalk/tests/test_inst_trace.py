@@ -15,6 +15,7 @@ from hierwalk.inst_trace import (
     InstTraceRequest,
     parse_inst_trace_json,
     run_inst_trace,
+    run_inst_trace_batch,
 )
 from hierwalk.run_request import parse_run_request_json
 
@@ -129,6 +130,47 @@ def test_inst_trace_both_traces_input_and_output(tmp_path: Path):
     assert ("qout", "sinker") in traced
 
 
+BATCH_RTL = """
+module top(input logic clk, input logic a, input logic b, output logic y, output logic z);
+  mid u_a (.clk(clk), .din(a), .qout(y));
+  mid u_b (.clk(clk), .din(b), .qout(z));
+endmodule
+module mid(input logic clk, input logic din, output logic qout);
+  logic r;
+  always_ff @(posedge clk) r <= din;
+  assign qout = r;
+endmodule
+"""
+
+
+@pytest.mark.parametrize("jobs", [-1, 2])
+def test_inst_trace_batch_matches_single_traces(tmp_path: Path, jobs: int):
+    index, rows = _index_and_rows(BATCH_RTL, tmp_path)
+    requests = [
+        InstTraceRequest(instance="top.u_a", direction="both", path_kind="comb"),
+        InstTraceRequest(instance="top.u_missing", direction="both"),
+        InstTraceRequest(instance="top.u_b", direction="both", path_kind="comb"),
+    ]
+    batch = run_inst_trace_batch(
+        requests, rows=rows, index=index, top="top", jobs=jobs
+    )
+    assert [r.instance for r in batch] == [r.instance for r in requests]
+    assert batch[1].errors and not batch[1].port_results
+    for req, got in zip(requests, batch):
+        want = run_inst_trace(req, rows=rows, index=index, top="top")
+        assert got.errors == want.errors
+        assert [
+            (pr.port_name, pr.trace_direction, pr.cone.boundaries)
+            for pr in got.port_results
+        ] == [
+            (pr.port_name, pr.trace_direction, pr.cone.boundaries)
+            for pr in want.port_results
+        ]
+    assert any(
+        b.kind == "port-out" and b.net == "z" for _, b in batch[2].boundaries
+    )
+
+
 def test_path_kind_comb_stops_at_ff_driver(tmp_path: Path):
     index, rows = _index_and_rows(CONE_RTL, tmp_path)
     comb = fanin_cone("top.z", rows=rows, index=index, top="top", path_kind="comb")
@@ -166,4 +208,54 @@ def test_cli_inst_trace_smoke(tmp_path: Path):
         check=True,
     )
     assert "origin_port\ttrace_direction" in proc.stdout
-    assert "port-in" in proc.stdout
\ No newline at end of file
+    assert "port-in" in proc.stdout
+
+
+def _inst_trace_list_cfg(tmp_path: Path):
+    rtl = tmp_path / "d.v"
+    rtl.write_text(BATCH_RTL, encoding="utf-8")
+    fl = tmp_path / "filelist.f"
+    fl.write_text(f"{rtl}\n", encoding="utf-8")
+    return parse_run_request_json(
+        {
+            "filelist": str(fl),
+            "top": "top",
+            "mode": "inst-trace",
+            "inst_trace": {
+                "instances": ["top.u_a", {"instance": "top.u_b", "direction": "sinker"}],
+                "path_kind": "comb",
+            },
+            "no_cache": True,
+            "no_log_file": True,
+            "quiet": True,
+        },
+        base_dir=tmp_path,
+    )
+
+
+def test_parse_inst_trace_instances_list(tmp_path: Path):
+    cfg = _inst_trace_list_cfg(tmp_path)
+    assert cfg.inst_trace.instance == "top.u_a"
+    assert [(r.instance, r.direction, r.path_kind) for r in cfg.inst_trace_requests] == [
+        ("top.u_a", "both", "comb"),
+        ("top.u_b", "sinker", "comb"),
+    ]
+
+
+def test_cli_inst_trace_list_runs_as_one_batch(tmp_path: Path, capsys, monkeypatch):
+    from hierwalk import cli_execute
+    from hierwalk.cli import _build_parser
+
+    cfg = _inst_trace_list_cfg(tmp_path)
+    batches = []
+    real_batch = cli_execute.run_inst_trace_batch
+
+    def spy(requests, **kw):
+        batches.append([r.instance for r in requests])
+        return real_batch(requests, **kw)
+
+    monkeypatch.setattr(cli_execute, "run_inst_trace_batch", spy)
+    assert cli_execute.execute_run(cfg, _build_parser()) == 0
+    assert batches == [["top.u_a", "top.u_b"]]
+    out = capsys.readouterr().out
+    assert "# instance\ttop.u_a" in out and "# instance\ttop.u_b" in out
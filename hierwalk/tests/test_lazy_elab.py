@@ -0,0 +1,93 @@
+"""Lazy on-demand elaboration view (LazyElabView) and its endpoint/cone users."""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from hierwalk.cone import ConeCache, fanout_cone
+from hierwalk.connect_endpoints import resolve_endpoint
+from hierwalk.elab import elaborate
+from hierwalk.index import DesignIndex
+from hierwalk.lazy_elab import LazyElabView
+
+RTL = """
+module top(input logic clk, input logic a, output logic z);
+  wire mid;
+  assign mid = a;
+  blk #(.N(2)) u_blk (.clk(clk), .din(mid), .qout(z));
+  blk #(.N(3)) u_other (.clk(clk), .din(a), .qout());
+endmodule
+module blk #(parameter N = 1) (input logic clk, input logic din, output logic qout);
+  logic r;
+  always_ff @(posedge clk) r <= din;
+  assign qout = r;
+  generate
+    for (genvar i = 0; i < N; i++) begin : g_lane
+      lane u_lane (.d(din));
+    end
+  endgenerate
+endmodule
+module lane(input logic d);
+  leaf u_leaf ( );
+endmodule
+module leaf; endmodule
+"""
+
+
+def _index(tmp_path: Path) -> DesignIndex:
+    rtl = tmp_path / "d.sv"
+    rtl.write_text(RTL, encoding="utf-8")
+    return DesignIndex.build({str(rtl): RTL})
+
+
+def test_walk_matches_elaborate(tmp_path):
+    index = _index(tmp_path)
+    _, rows = elaborate(index, "top")
+    view = LazyElabView(index, "top")
+    assert list(view.walk()) == rows
+    assert len(view) == len(rows)
+    with pytest.raises(ValueError):
+        LazyElabView(index, "nope")
+
+
+def test_get_expands_only_the_requested_branch(tmp_path):
+    view = LazyElabView(_index(tmp_path), "top")
+    row = view.get("top.u_blk.g_lane[1].u_lane.u_leaf")
+    assert row is not None and row.module == "leaf" and row.depth == 3
+    assert view["top.u_blk.g_lane[1].u_lane"].inst_leaf == "g_lane[1].u_lane"
+    assert "top.u_blk.g_lane[2].u_lane" not in view
+    assert view.get("top.u_blk.nope") is None
+    # u_other (3 lanes) was never expanded.
+    assert not any(p.startswith("top.u_other.") for p in view._rows)
+    assert view.child_by_parent_leaf.get(("top.u_blk", "g_lane[0].u_lane")) == (
+        "top.u_blk.g_lane[0].u_lane"
+    )
+
+
+def test_children_memoized_per_module_ctx_and_thread_safe(tmp_path):
+    view = LazyElabView(_index(tmp_path), "top")
+    paths = [f"top.u_blk.g_lane[{i % 2}].u_lane.u_leaf" for i in range(32)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        got = list(pool.map(view.get, paths))
+    assert all(r is not None and r.module == "leaf" for r in got)
+    assert len({id(r) for r in got}) == 2
+    # Both lane instances share one (lane, ctx) edge list.
+    assert view.edge_hits >= 1
+
+
+def test_endpoint_and_cone_over_view(tmp_path):
+    index = _index(tmp_path)
+    view = LazyElabView(index, "top")
+    ep, errs = resolve_endpoint("top.u_blk.din", (), index, top="top", rows_by_path=view)
+    assert not errs and ep.port_found and ep.module == "blk"
+    _, errs = resolve_endpoint("top.u_blk.u_nope.x", (), index, top="top", rows_by_path=view)
+    assert any("g_lane[0].u_lane" in e for e in errs)
+
+    result = fanout_cone(
+        "top.a", rows=(), index=index, top="top", cache=ConeCache.from_view(view)
+    )
+    assert not result.errors
+    assert "top.u_blk" in {b.scope for b in result.flip_flops}
@@ -0,0 +1,62 @@
+"""Compiled parameter expressions and memoized parameter maps."""
+
+from __future__ import annotations
+
+import pytest
+
+from hierwalk.params import (
+    compile_param_cond,
+    compile_param_expr,
+    expr_is_true,
+    resolve_param_expr,
+    resolve_param_map,
+)
+
+
+@pytest.mark.parametrize(
+    ("expr", "ctx", "want"),
+    [
+        ("W-1", {"W": "8"}, 7),
+        ("(W+1)*2", {"W": "3"}, 8),
+        ("-W*2+8'hFF", {"W": "4"}, 247),
+        ("(D > 2) ? D-1 : 0", {"D": "4"}, 3),
+        ("(D > 2) ? D-1 : 0", {"D": "1"}, 0),
+        ("UNKNOWN+1", {}, None),
+        ("W W", {"W": "1"}, None),
+        ("(W", {"W": "1"}, None),
+        ("W-1", {"W-1": "5"}, 5),
+    ],
+)
+def test_compiled_expr_values(expr, ctx, want):
+    assert resolve_param_expr(expr, ctx) == want
+    assert compile_param_expr(expr)(ctx) == want
+
+
+def test_compiled_expr_is_reused_across_contexts():
+    fn = compile_param_expr("WIDTH*DEPTH-1")
+    assert compile_param_expr("WIDTH*DEPTH-1") is fn
+    assert [fn({"WIDTH": str(w), "DEPTH": "4"}) for w in (1, 2, 8)] == [3, 7, 31]
+
+
+def test_compiled_cond_matches_expr_is_true():
+    cond = compile_param_cond("N >= 4")
+    assert cond({"N": "4"}) is True
+    assert cond({"N": "3"}) is False
+    assert cond({}) is None
+    assert expr_is_true("1'b1", {}) is True
+    assert expr_is_true("MODE", {"MODE": "0"}) is False
+
+
+def test_resolve_param_map_memoized_returns_fresh_dicts():
+    decls = {"W": "8", "MSB": "W-1", "SEL": "(W > 4) ? MSB : 0"}
+    first = resolve_param_map(decls, parent={"W": "16"})
+    assert first == {"W": "8", "MSB": "7", "SEL": "7"}
+    first["W"] = "mutated"
+    again = resolve_param_map(decls, parent={"W": "16"})
+    assert again["W"] == "8"
+    overridden = resolve_param_map(decls, overrides={"W": "2"})
+    assert overridden == {"W": "2", "MSB": "1", "SEL": "0"}
+
+
+def test_resolve_param_map_self_reference_unresolved():
+    assert resolve_param_map({"A": "A+1"}) == {"A": "A+1"}
@@ -0,0 +1,85 @@
+"""Compact/lazy port index and its disk cache (HIERWALK_PORT_CACHE)."""
+
+from __future__ import annotations
+
+import pytest
+
+from hierwalk import port_scan
+from hierwalk.port_scan import (
+    PortIndex,
+    _build_port_index,
+    matching_ports,
+    port_index_for_module,
+    scan_ports_detail_from_module_text,
+)
+
+_RTL = """
+module wide #(parameter W = 1024, parameter D = 4) (
+  input  logic clk,
+  input  logic [W-1:0] data,
+  output logic [D-1:0][7:0] lanes,
+  output logic [N-1:0] sym
+);
+endmodule
+"""
+
+
+@pytest.fixture
+def fresh_port_cache(monkeypatch, tmp_path):
+    root = tmp_path / "ports"
+    monkeypatch.setenv("HIERWALK_PORT_CACHE", str(root))
+    port_scan._cached_port_index_from_text.cache_clear()
+    port_scan._cached_port_index_from_file.cache_clear()
+    yield root
+    port_scan._cached_port_index_from_text.cache_clear()
+    port_scan._cached_port_index_from_file.cache_clear()
+
+
+def test_port_index_matches_eager_dict(fresh_port_cache):
+    ctx = {"W": "16", "D": "2"}
+    idx = port_index_for_module("", "wide", ctx, module_text=_RTL)
+    assert isinstance(idx, PortIndex)
+    eager = _build_port_index(
+        scan_ports_detail_from_module_text(_RTL, "wide", param_ctx=ctx)
+    )
+    assert dict(idx) == eager
+    assert "sym[N-1:0]" in idx
+    assert idx["sym"].param_note.startswith("unresolved")
+
+
+def test_literal_lookup_expands_only_touched_port(fresh_port_cache):
+    idx = port_index_for_module(
+        "", "wide", {"W": "1024", "D": "4"}, module_text=_RTL
+    )
+    assert idx["data[1000]"].base_name == "data"
+    assert matching_ports(idx, "LANES[1][3]") == ["lanes[1][3]"]
+    assert "data[1024]" not in idx
+    assert len(idx._infos) == 2
+    assert idx._full is None
+    assert "data[1023]" in matching_ports(idx, "data[*]")
+    assert idx._full is not None
+
+
+def test_port_index_loaded_from_disk(fresh_port_cache, monkeypatch):
+    first = port_index_for_module("", "wide", {"W": "8"}, module_text=_RTL)
+    assert list(fresh_port_cache.rglob("*.ports.pkl"))
+    port_scan._cached_port_index_from_text.cache_clear()
+
+    def _no_scan(*_a, **_k):
+        raise AssertionError("port header re-parsed despite disk cache")
+
+    monkeypatch.setattr(port_scan, "_scan_port_infos", _no_scan)
+    again = port_index_for_module("", "wide", {"W": "8"}, module_text=_RTL)
+    assert again.records == first.records
+    assert dict(again) == dict(first)
+
+
+def test_port_cache_off_writes_nothing(monkeypatch, tmp_path):
+    monkeypatch.setenv("HIERWALK_PORT_CACHE", "0")
+    port_scan._cached_port_index_from_text.cache_clear()
+    try:
+        idx = port_index_for_module("", "wide", {}, module_text=_RTL)
+        assert "clk" in idx
+        assert not list(tmp_path.rglob("*.ports.pkl"))
+    finally:
+        port_scan._cached_port_index_from_text.cache_clear()
@@ -0,0 +1,118 @@
+"""Per-RTL-module profiling hook (HIERWALK_PROFILE_RTL)."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from hierwalk.connect_scan import build_module_connect_index
+from hierwalk.filelist import parse_filelist
+from hierwalk.index import DesignIndex, scan_preprocessed
+from hierwalk.preprocess import preprocess_file
+from hierwalk.report import RunReport, emit_run_report
+from hierwalk.rtl_profile import (
+    attribute_rtl,
+    begin_rtl_profile_session,
+    end_rtl_profile_session,
+    hot_rtl_report_path,
+    profile_rtl,
+    reset_rtl_profile,
+    rtl_profile_enabled,
+    write_hot_rtl_report,
+)
+
+_RTL = """
+module leaf(input a, output y);
+  assign y = a;
+endmodule
+module top(input a, output y);
+  wire [3:0] w;
+  generate
+    genvar i;
+    for (i = 0; i < 4; i = i + 1) begin : g
+      leaf u_leaf (.a(a), .y(w[i]));
+    end
+  endgenerate
+  assign y = w[0];
+endmodule
+"""
+
+
+@pytest.fixture
+def rtl_profile(monkeypatch):
+    monkeypatch.setenv("HIERWALK_PROFILE_RTL", "1")
+    monkeypatch.delenv("HIERWALK_PROFILE_RTL_OWNER", raising=False)
+    monkeypatch.delenv("HIERWALK_PROFILE_RTL_SPOOL", raising=False)
+    reset_rtl_profile()
+    yield
+    reset_rtl_profile()
+
+
+def test_profile_disabled_by_default(monkeypatch):
+    monkeypatch.delenv("HIERWALK_PROFILE_RTL", raising=False)
+    reset_rtl_profile()
+    try:
+        assert rtl_profile_enabled() is False
+        with profile_rtl("scan_preprocessed", file_path="x.v", module="m"):
+            pass
+    finally:
+        reset_rtl_profile()
+
+
+def test_scan_and_connect_attributed_to_rtl_module(rtl_profile, tmp_path):
+    scan_preprocessed(_RTL, "design.v")
+    with attribute_rtl("design.v", "top"):
+        build_module_connect_index(_RTL.split("module top", 1)[1])
+    path = write_hot_rtl_report(tmp_path / "run.hier-walk.log")
+    assert path == hot_rtl_report_path(tmp_path / "run.hier-walk.log")
+    assert path.name == "run.hier-walk.hot-rtl.log"
+    text = path.read_text(encoding="utf-8")
+    assert "hier-walk hot RTL" in text
+    rows = [ln.split("\t") for ln in text.splitlines() if ln[:1].isdigit()]
+    keys = {(r[5], r[6]) for r in rows}
+    assert ("design.v", "top") in keys
+    assert ("design.v", "leaf") in keys
+    top_row = next(r for r in rows if r[6] == "top")
+    assert "scan_preprocessed=" in top_row[7]
+    assert "build_module_connect_index=" in top_row[7]
+    # Drained: a second report has nothing new to rank.
+    assert write_hot_rtl_report(tmp_path / "run.hier-walk.log") is None
+
+
+def test_emit_run_report_writes_hot_rtl_beside_log(rtl_profile, tmp_path):
+    rtl = tmp_path / "d.v"
+    rtl.write_text(_RTL, encoding="utf-8")
+    fl_path = tmp_path / "design.f"
+    fl_path.write_text(f"{rtl}\n", encoding="utf-8")
+    fl = parse_filelist(fl_path)
+    index = DesignIndex.build({str(rtl): preprocess_file(rtl, [], {})})
+    log_file = tmp_path / "run.hier-walk.log"
+    emit_run_report(
+        RunReport(
+            filelist_path=str(fl_path),
+            elapsed_sec=0.1,
+            fl=fl,
+            index=index,
+            mode="find-top",
+        ),
+        log_path=log_file,
+        announce_log=False,
+    )
+    hot = hot_rtl_report_path(log_file)
+    assert hot.is_file()
+    assert "top" in hot.read_text(encoding="utf-8")
+
+
+def test_session_spool_removed_at_end(rtl_profile, tmp_path):
+    assert begin_rtl_profile_session()
+    spool = Path(os.environ["HIERWALK_PROFILE_RTL_SPOOL"])
+    assert spool.is_dir()
+    with profile_rtl("scan_preprocessed", file_path="x.v", module="m"):
+        pass
+    assert write_hot_rtl_report(tmp_path / "run.hier-walk.log") is not None
+    end_rtl_profile_session()
+    assert not spool.exists()
+    assert "HIERWALK_PROFILE_RTL_OWNER" not in os.environ
+    assert "HIERWALK_PROFILE_RTL_SPOOL" not in os.environ
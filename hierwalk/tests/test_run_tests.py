@@ -149,6 +149,28 @@ def test_parse_flat_suite_with_full_db_and_three_tests():
     assert req.checks[0].check_id == "a"
 
 
+def test_io_trace_instances_become_one_batched_step():
+    doc = {
+        "filelist": "design.f",
+        "top": "top",
+        "run_io_trace": {
+            "enable": 1,
+            "instances": ["top.u_a", "top.u_b"],
+            "direction": "driver",
+            "output": "trace.tsv",
+        },
+    }
+    suite = parse_flat_run_suite(doc, base_dir="/tmp")
+    plans = build_test_run_configs(suite, doc, base_dir="/tmp")
+    assert len(plans) == 1
+    _, cfg = plans[0]
+    assert cfg.mode == "inst-trace"
+    assert [(r.instance, r.direction) for r in cfg.inst_trace_requests] == [
+        ("top.u_a", "driver"),
+        ("top.u_b", "driver"),
+    ]
+
+
 def test_run_on_full_index_step_when_enabled():
     doc = {
         "filelist": "design.f",
@@ -0,0 +1,148 @@
+"""DAG-aware parallel flat-suite scheduling (HIERWALK_SUITE_PARALLEL)."""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+from pathlib import Path
+
+import pytest
+
+from hierwalk.run_tests import build_test_run_configs, parse_flat_run_suite
+from hierwalk.suite_schedule import plan_suite_dag, run_suite_dag, suite_parallel_workers
+
+
+def _suite_doc(tmp_path: Path, *, full_index: bool) -> dict:
+    return {
+        "filelist": str(tmp_path / "design.f"),
+        "top": "top",
+        "run_on_full_index": {"enable": 1 if full_index else 0, "mode": "hierarchy"},
+        "run_conn_check": {
+            "enable": 1,
+            "mode": "path-walk",
+            "checks": [{"id": "c0", "a": "top.a", "b": "top.z"}],
+            "output": str(tmp_path / "conn.tsv"),
+        },
+        "run_io_trace": {
+            "enable": 1,
+            "mode": "path-walk",
+            "instance": "top.u_m",
+            "output": str(tmp_path / "io.tsv"),
+        },
+        "run_cone_trace": {
+            "enable": 1,
+            "mode": "path-walk",
+            "fanout_cone": "top.a",
+            "output": str(tmp_path / "cone.tsv"),
+        },
+    }
+
+
+def _plan(tmp_path: Path, *, full_index: bool):
+    doc = _suite_doc(tmp_path, full_index=full_index)
+    suite = parse_flat_run_suite(doc, base_dir=tmp_path)
+    return list(build_test_run_configs(suite, doc, base_dir=tmp_path))
+
+
+def test_suite_parallel_workers_env(monkeypatch):
+    monkeypatch.delenv("HIERWALK_SUITE_PARALLEL", raising=False)
+    assert suite_parallel_workers() == 0
+    monkeypatch.setenv("HIERWALK_SUITE_PARALLEL", "1")
+    assert suite_parallel_workers() == 0
+    monkeypatch.setenv("HIERWALK_SUITE_PARALLEL", "4")
+    assert suite_parallel_workers() == 4
+
+
+def test_plan_warm_step_then_independent_entries(tmp_path):
+    nodes = plan_suite_dag(_plan(tmp_path, full_index=False))
+    assert [n.entry.kind for n in nodes] == [
+        "run_conn_check",
+        "run_io_trace",
+        "run_cone_trace",
+    ]
+    warm, io, cone = nodes
+    assert warm.in_parent and warm.deps == ()
+    assert io.deps == (0,) and not io.in_parent
+    assert cone.deps == (0,) and not cone.in_parent
+
+
+def test_plan_full_index_is_barrier(tmp_path):
+    nodes = plan_suite_dag(_plan(tmp_path, full_index=True))
+    assert nodes[0].entry.kind == "run_on_full_index"
+    assert nodes[0].in_parent
+    assert all(0 in n.deps for n in nodes[1:])
+
+
+def test_plan_shared_output_is_serialized(tmp_path):
+    plan = _plan(tmp_path, full_index=False)
+    same = plan[1][1].output
+    from dataclasses import replace
+
+    plan[2] = (plan[2][0], replace(plan[2][1], output=same))
+    nodes = plan_suite_dag(plan)
+    assert 1 in nodes[2].deps
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="parallel suite workers need fork",
+)
+def test_run_suite_dag_parallel_writes_each_output(tmp_path):
+    plan = _plan(tmp_path, full_index=False)
+    parent = os.getpid()
+
+    def run_step(entry, cfg):
+        Path(cfg.output).write_text(f"{entry.kind}\t{os.getpid()}\t{cfg.jobs}\n")
+        flags = frozenset() if os.getpid() == parent else frozenset({entry.kind})
+        return (0 if entry.kind != "run_cone_trace" else 3), flags
+
+    results = run_suite_dag(plan, run_step, workers=2, jobs_budget=4, quiet=True)
+    assert [rc for rc, _ in results] == [0, 0, 3]
+    # Flags raised in forked workers come back to the parent.
+    assert [set(flags) for _, flags in results] == [
+        set(),
+        {"run_io_trace"},
+        {"run_cone_trace"},
+    ]
+    rows = {
+        kind: (int(pid), int(jobs))
+        for kind, pid, jobs in (
+            Path(cfg.output).read_text().split() for _, cfg in plan
+        )
+    }
+    assert rows["run_conn_check"][0] == parent
+    assert rows["run_io_trace"][0] != parent
+    assert rows["run_cone_trace"][1] == 2
+
+
+def _stdout_plan(tmp_path: Path):
+    from dataclasses import replace
+
+    plan = _plan(tmp_path, full_index=False)
+    return [(entry, replace(cfg, output="-")) for entry, cfg in plan]
+
+
+def test_plan_stdout_steps_are_not_serialized(tmp_path):
+    nodes = plan_suite_dag(_stdout_plan(tmp_path))
+    assert [n.deps for n in nodes] == [(), (0,), (0,)]
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="parallel suite workers need fork",
+)
+def test_run_suite_dag_stdout_in_plan_order(tmp_path, capsys):
+    import time
+
+    def run_step(entry, cfg):
+        if entry.kind == "run_io_trace":
+            time.sleep(0.5)  # finishes after run_cone_trace
+        print(f"{entry.kind} out")
+        return 0, frozenset()
+
+    plan = _stdout_plan(tmp_path)
+    results = run_suite_dag(plan, run_step, workers=2, jobs_budget=2, quiet=True)
+    assert [rc for rc, _ in results] == [0, 0, 0]
+    assert capsys.readouterr().out == (
+        "run_conn_check out\nrun_io_trace out\nrun_cone_trace out\n"
+    )
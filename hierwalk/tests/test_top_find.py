@@ -68,4 +68,37 @@ module top_b; endmodule
         resolve_top_modules(index, top=None)
         assert False, "expected ValueError"
     except ValueError as exc:
-        assert "top_a" in str(exc) and "top_b" in str(exc)
\ No newline at end of file
+        assert "top_a" in str(exc) and "top_b" in str(exc)
+
+def test_instantiation_graph_persists_and_patches(tmp_path):
+    import pickle
+
+    a = tmp_path / "a.v"
+    a.write_text(
+        """
+module top;
+  generate
+    for (genvar i = 0; i < 2; i++) begin : g
+      mid u_mid ( );
+    end
+  endgenerate
+endmodule
+""",
+        encoding="utf-8",
+    )
+    b = tmp_path / "b.v"
+    b.write_text("module mid; leaf u ( ); endmodule\nmodule leaf; endmodule\n", encoding="utf-8")
+    index = DesignIndex.build_from_sources([str(a), str(b)], include_dirs=[], defines={}, jobs=1)
+    assert index.module_parents("mid") == ["top"]
+    assert index.reachable_modules(["top"]) == {"top", "mid", "leaf"}
+
+    loaded = pickle.loads(pickle.dumps(index))
+    loaded.instances_for = None  # graph comes from the pickle, no refold
+    assert find_top_modules(loaded) == ["top"]
+    assert loaded.module_parents("leaf") == ["mid"]
+
+    b.write_text("module mid; endmodule\nmodule leaf; endmodule\nmodule spare; leaf u ( ); endmodule\n")
+    index.patch_files([str(b)], [], include_dirs=[], defines={}, jobs=1)
+    assert index.module_parents("leaf") == ["spare"]
+    assert index.module_children("top") == ("mid",)
+    assert find_top_modules(index) == ["spare", "top"]
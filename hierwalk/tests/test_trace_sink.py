@@ -0,0 +1,102 @@
+"""Buffered binary trace sink: levels, rate limits, text adapter, viewer."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from hierwalk.hierarchy_log import (
+    emit_path_walk_log,
+    emit_path_walk_spine_log,
+    open_path_walk_trace_log,
+    path_walk_trace_show_message,
+)
+from hierwalk.models import FlatRow
+from hierwalk.trace_sink import DEBUG, INFO, WARN, TraceSink, main, read_trace, trace_sink_path
+
+
+def test_sink_roundtrip_levels_rate_limit_and_sessions(tmp_path: Path):
+    path = tmp_path / "run.trace.gz"
+    with TraceSink(path, level=INFO, rate_per_sec=3, max_pending=2) as sink:
+        sink.emit("a", "dropped by level", DEBUG)
+        for i in range(10):
+            sink.emit("a", f"a{i}")
+        sink.emit("b", "b0", WARN)
+        print("2024-01-01 00:00:00 [hier-walk connect] [chk] A -> B", file=sink, flush=True)
+        sink.write("partial ")
+        sink.write("line\n")
+    assert sink.dropped == {"a": 7}
+    with TraceSink(path, level=DEBUG) as sink:
+        sink.emit("a", "second session", DEBUG)
+
+    recs = list(read_trace(path))
+    got = [(r.category, r.message) for r in recs]
+    assert got[:3] == [("a", "a0"), ("a", "a1"), ("a", "a2")]
+    assert ("b", "b0") in got
+    assert ("connect", "[chk] A -> B") in got
+    assert ("log", "partial line") in got
+    assert ("a", "rate-limited: 7 line(s) dropped") in got
+    assert got[-1] == ("a", "second session") and recs[-1].level == DEBUG
+
+
+def test_path_walk_trace_to_binary_sink(tmp_path: Path, monkeypatch, capsys):
+    monkeypatch.setenv("HIERWALK_TRACE_SINK", "binary")
+    monkeypatch.setenv("HIERWALK_TRACE_LEVEL", "debug")
+    log_path = tmp_path / "run.hier-walk.log"
+    row = FlatRow("top.u", "u", "m", 1, "top", "m.v")
+    fh = open_path_walk_trace_log(log_path)
+    assert isinstance(fh, TraceSink)
+    emit_path_walk_log("walk target=top.u", stream=fh)
+    emit_path_walk_log("ok top.u  module=m", stream=fh)
+    emit_path_walk_log("miss inst=x under top.u (not declared)", stream=fh)
+    emit_path_walk_spine_log("top.u", {"top.u": row}, stream=fh)
+    fh.close()
+    assert "trace sink:" in log_path.read_text(encoding="utf-8")
+    assert not path_walk_trace_show_message("walk target=top.u")
+
+    trace = trace_sink_path(log_path)
+    recs = list(read_trace(trace))
+    by_msg = {r.message: r for r in recs}
+    assert by_msg["walk target=top.u"].level == DEBUG
+    assert by_msg["ok top.u  module=m"].category == "path-walk.ok"
+    assert by_msg["miss inst=x under top.u (not declared)"].level == WARN
+    assert any(r.category == "path-walk.spine" for r in recs)
+
+    assert main([str(trace), "--level", "info", "-c", "path-walk.ok"]) == 0
+    out = capsys.readouterr().out.splitlines()
+    assert len(out) == 1 and out[0].endswith("[hier-walk path-walk] ok top.u  module=m")
+    assert main([str(trace), "--stats", "-g", "top\\.u"]) == 0
+    stats = capsys.readouterr().out
+    assert "path-walk.miss" in stats and "path-walk.spine" in stats
+
+
+def test_sink_drops_records_after_writer_failure(tmp_path: Path, capsys):
+    import threading
+
+    sink = TraceSink(tmp_path / "run.trace.gz", max_pending=2)
+
+    class _Full:
+        def write(self, _data):
+            raise OSError("No space left on device")
+
+        def close(self):
+            pass
+
+    sink._fh.close()
+    sink._fh = _Full()
+    producer = threading.Thread(target=lambda: [sink.emit("a", f"m{i}") for i in range(50)])
+    producer.start()
+    producer.join(10)
+    assert not producer.is_alive()  # never blocks on a dead writer
+    sink.close()
+    assert isinstance(sink.error, OSError)
+    assert sink.written == 0 and sink.lost > 0
+    assert "dropping further records" in capsys.readouterr().err
+
+
+def test_trace_level_env(monkeypatch):
+    from hierwalk.perf import trace_sink_level
+
+    monkeypatch.setenv("HIERWALK_TRACE_LEVEL", "warn")
+    assert trace_sink_level() == WARN
+    monkeypatch.setenv("HIERWALK_TRACE_LEVEL", "bogus")
+    assert trace_sink_level() == INFO
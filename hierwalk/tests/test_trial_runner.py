@@ -0,0 +1,126 @@
+"""Parallel seeded trial runner: timeouts, resume, percentiles, batch wiring."""
+
+from __future__ import annotations
+
+import multiprocessing
+import time
+
+import pytest
+
+from hierwalk.stress_gen import format_stress_report, run_stress_batch
+from hierwalk.trial_runner import (
+    format_phase_percentiles,
+    percentile,
+    run_trials,
+    trial_seeds,
+)
+from hierwalk.vuln_gen import format_vuln_report, run_vuln_batch
+
+needs_fork = pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="per-trial processes need fork",
+)
+
+
+def _square_or_fail(seed: int) -> dict:
+    if seed == 3:
+        raise ValueError("boom")
+    if seed == 4:
+        time.sleep(30)
+    return {"seed": seed, "sq": seed * seed}
+
+
+@needs_fork
+def test_parallel_trials_timeout_error_and_order():
+    outcomes = run_trials(_square_or_fail, [5, 4, 3, 2], jobs=3, timeout_sec=2.0)
+    assert [o.seed for o in outcomes] == [5, 4, 3, 2]
+    assert [o.status for o in outcomes] == ["ok", "timeout", "error", "ok"]
+    assert outcomes[0].result == {"seed": 5, "sq": 25}
+    assert "boom" in outcomes[2].error
+    assert outcomes[1].elapsed_sec < 10
+
+
+def test_results_file_resumes(tmp_path):
+    path = tmp_path / "trials.jsonl"
+    calls: list[int] = []
+
+    def fn(seed: int) -> dict:
+        calls.append(seed)
+        return {"v": seed}
+
+    kw = dict(results_path=path, encode=dict, decode=dict)
+    first = run_trials(fn, trial_seeds(2, 10, 5), **kw)
+    assert [o.result for o in first] == [{"v": 10}, {"v": 15}]
+    with path.open("a", encoding="utf-8") as fh:
+        fh.write('{"seed": 20, "status": "ok", "resu')  # torn by a kill
+    again = run_trials(fn, trial_seeds(4, 10, 5), **kw)
+    assert calls == [10, 15, 20, 25]
+    assert [o.result["v"] for o in again] == [10, 15, 20, 25]
+
+
+def test_resume_retries_failed_seeds(tmp_path):
+    path = tmp_path / "trials.jsonl"
+    path.write_text(
+        '{"seed": 1, "status": "ok", "elapsed_sec": 0.1, "result": {"v": 1}}\n'
+        '{"seed": 2, "status": "timeout", "elapsed_sec": 9.0, "result": null}\n'
+        '{"seed": 3, "status": "error", "elapsed_sec": 0.0, "result": null}\n',
+        encoding="utf-8",
+    )
+    calls: list[int] = []
+
+    def fn(seed: int) -> dict:
+        calls.append(seed)
+        return {"v": seed}
+
+    outcomes = run_trials(fn, [1, 2, 3], results_path=path, encode=dict, decode=dict)
+    assert calls == [2, 3]
+    assert [o.status for o in outcomes] == ["ok", "ok", "ok"]
+
+
+def test_stress_report_averages_ok_trials_only():
+    from hierwalk.stress_gen import _failed_stress_trial
+    from hierwalk.trial_runner import TrialOutcome
+
+    ok = run_stress_batch(1, base_seed=77)[0]
+    timed_out = _failed_stress_trial(
+        TrialOutcome(seed=5, status="timeout", elapsed_sec=600.0, error="timeout")
+    )
+    report = format_stress_report([ok, timed_out])
+    assert f"avg total_ms: {ok.total_sec * 1e3:.1f}" in report
+    assert "(n=1 ok)" in report
+    assert "failed trials: 1  timeouts: 1  errors: 0" in report
+
+
+def test_percentiles_nearest_rank():
+    vals = [float(v) for v in range(1, 101)]
+    assert percentile(vals, 50) == 50.0
+    assert percentile(vals, 99) == 99.0
+    lines = format_phase_percentiles([{"total": 0.001}, {"total": 0.003}], ["total"])
+    assert lines[0].startswith("phase") and "(n=2)" in lines[0]
+    assert lines[1].split()[1:] == ["1.0", "3.0", "3.0", "3.0"]
+
+
+@needs_fork
+def test_stress_batch_parallel_matches_serial(tmp_path):
+    serial = run_stress_batch(2, base_seed=77)
+    path = tmp_path / "stress.jsonl"
+    parallel = run_stress_batch(2, base_seed=77, jobs=2, results_path=path)
+    assert [(r.seed, r.connected, r.instance_rows) for r in parallel] == [
+        (r.seed, r.connected, r.instance_rows) for r in serial
+    ]
+    resumed = run_stress_batch(2, base_seed=77, results_path=path)
+    assert [r.total_sec for r in resumed] == [r.total_sec for r in parallel]
+    report = format_stress_report(parallel)
+    assert "avg total_ms" in report and "p99_ms" in report
+
+
+def test_vuln_batch_reports_phase_percentiles(tmp_path):
+    path = tmp_path / "vuln.jsonl"
+    results = run_vuln_batch(1, results_path=path)
+    assert all(t.status == "ok" and t.index_sec > 0 for t in results)
+    resumed = run_vuln_batch(1, results_path=path)
+    assert [c.case_id for c in resumed[0].case_results] == [
+        c.case_id for c in results[0].case_results
+    ]
+    report = format_vuln_report(results + resumed)
+    assert "connect" in report and "p50_ms" in report
@@ -21,6 +21,7 @@ from hierwalk.connect_scan import build_module_connect_index, lookup_edge_prov
 from hierwalk.elab import elaborate
 from hierwalk.index import DesignIndex
 from hierwalk.waypoint_fanout import (
+    FanoutCache,
     format_waypoint_fanout_tsv,
     run_waypoint_fanout_check,
 )
@@ -329,4 +330,47 @@ def test_waypoint_fanout_tsv_in_connect_output(tmp_path: Path):
     )
     tsv = format_connect_results_tsv([result])
     assert "waypoint-fanout trace" in tsv
-    assert "waypoint_qualified" in tsv
\ No newline at end of file
+    assert "waypoint_qualified" in tsv
+
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_fanout_cache_and_parallel_origins_match_uncached(tmp_path: Path, jobs):
+    index, rows, top = _elab(WAYPOINT_RTL, tmp_path)
+    kwargs = dict(rows=rows, index=index, top=top, path_kind=["comb", "ff"])
+    kwargs["full_path_kinds"] = True
+    want, _ = run_waypoint_fanout_check(["top.u_c", "top.drv"], ["top.u_leaf"], **kwargs)
+
+    cache = FanoutCache()
+    first, _ = run_waypoint_fanout_check(
+        ["top.u_c", "top.drv"], ["top.u_leaf"], fanout_cache=cache, jobs=jobs, **kwargs
+    )
+    assert first.waypoint_events == want.waypoint_events
+    assert cache.hits == 0 and cache.misses > 0
+
+    # Same origins, different peers: cone structure reused, events re-qualified.
+    other, _ = run_waypoint_fanout_check(
+        ["top.u_c", "top.drv"], ["top.u_c"], fanout_cache=cache, jobs=jobs, **kwargs
+    )
+    plain, _ = run_waypoint_fanout_check(["top.u_c", "top.drv"], ["top.u_c"], **kwargs)
+    assert other.waypoint_events == plain.waypoint_events
+    assert cache.hits == 0
+
+    again, _ = run_waypoint_fanout_check(
+        ["top.u_c", "top.drv"], ["top.u_leaf"], fanout_cache=cache, jobs=jobs, **kwargs
+    )
+    assert again.waypoint_events == want.waypoint_events
+    assert cache.hits == cache.misses // 2
+
+
+def test_session_shares_fanout_cache_across_checks(tmp_path: Path):
+    index, rows, top = _elab(WAYPOINT_RTL, tmp_path)
+    expand = build_expand_meta(
+        ["top.drv"], ["top.u_c"], map_spec={"kind": "waypoint-fanout"}
+    )
+    session = ConnectivitySession(rows=rows, index=index, top=top)
+    r1 = session.check("[top.drv]", "[top.u_c]", expand=expand, check_id="a")
+    r2 = session.check("[top.drv]", "[top.u_c]", expand=expand, check_id="b")
+    assert r1.connected and r2.connected
+    assert r1.waypoint_events == r2.waypoint_events
+    assert session.fanout_cache is not None and session.fanout_cache.hits == 1
+    session.clear_cache()
+    assert session.fanout_cache.lookup(()) is None